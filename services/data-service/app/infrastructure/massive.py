@@ -10,6 +10,30 @@ from app.core.config import Settings
 
 logger = structlog.get_logger()
 
+# Shared REST client: keeps connections alive across IngestionService instances
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the pooled HTTP client for Massive REST calls."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=10, max_keepalive_connections=5, keepalive_expiry=60.0
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
 class MassiveClient:
     """
     Client for interacting with Massive Data APIs.
@@ -71,11 +95,11 @@ class MassiveClient:
             "api_key": self.settings.MASSIVE_API_KEY
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json().get("results", [])
-            except httpx.HTTPError as e:
-                logger.error("news_fetch_error", error=str(e), ticker=ticker)
-                return []
+        client = get_http_client()
+        try:
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            return response.json().get("results", [])
+        except httpx.HTTPError as e:
+            logger.error("news_fetch_error", error=str(e), ticker=ticker)
+            return []
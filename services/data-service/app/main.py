@@ -6,6 +6,7 @@ Provides data ingestion and ETL functionality for market data and news.
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 from datetime import date
 
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException
@@ -13,6 +14,7 @@ from sqlalchemy.orm import Session
 import structlog
 
 from app.database import get_db, engine, Base
+from app.infrastructure.massive import close_http_client
 from app.services.ingestion import IngestionService
 
 # Configuration
@@ -52,12 +54,22 @@ Base.metadata.create_all(bind=engine)
 logger = structlog.get_logger(__name__)
 logger.info("Data Service starting up...")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared resources on shutdown."""
+    yield
+    await close_http_client()
+    logger.info("Data Service shut down")
+
+
 app = FastAPI(
     title="Finio Data Service",
     description="Data ingestion and ETL service for market data and news",
     version="1.0.0",
     docs_url="/docs" if DEBUG else None,
     redoc_url="/redoc" if DEBUG else None,
+    lifespan=lifespan,
 )
 
 @app.get("/health")
@@ -5,6 +5,7 @@ Provides stock search functionality using ISIN, WKN, or symbol codes
 with caching, rate limiting, and multiple API source fallback.
 """
 
+import asyncio
 import logging
 import time
 from contextlib import asynccontextmanager
@@ -16,6 +17,9 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from .cache import CacheManager
+from .cache.history_cache import get_history_cache
+from .cache.report_cache import flatten_report, get_report_cache
+from .core.stage_timing import ServerTimingMiddleware
 from .database import get_db, init_db
 from .infrastructure.massive_adapter import MassiveAPIAdapter, get_massive_adapter
 from .metrics import metrics_endpoint, track_request_metrics
@@ -46,6 +50,9 @@ MAX_RESPONSE_TIME_MS = 2000
 # Cache TTL
 CACHE_TTL_MINUTES = 5
 
+# Stale-while-revalidate window after CACHE_TTL_MINUTES
+CACHE_STALE_TTL_MINUTES = 10
+
 # Configure OpenTelemetry tracing
 configure_opentelemetry(
     service_name="search-service",
@@ -100,6 +107,50 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize Redis: {e}")
         raise
 
+    # Initialize cross-replica invalidation for the in-memory cache
+    try:
+        from .cache.invalidation_bus import RedisInvalidationBus
+        from .cache.memory_cache import get_memory_cache
+
+        invalidation_bus = RedisInvalidationBus(await redis_manager.get_client())
+        get_memory_cache().attach_invalidation_bus(invalidation_bus)
+        await invalidation_bus.start()
+        app.state.invalidation_bus = invalidation_bus
+        logger.info("Memory cache invalidation bus started")
+    except Exception as e:
+        logger.error(f"Failed to start memory cache invalidation bus: {e}")
+        # Don't raise - replicas fall back to TTL-only consistency
+
+    # Share closed chart bars across replicas
+    try:
+        from .cache.bar_cache import RedisBarStore, get_bar_cache
+
+        get_bar_cache().attach_store(RedisBarStore(await redis_manager.get_client()))
+    except Exception as e:
+        logger.error(f"Failed to attach Redis bar store: {e}")
+        # Don't raise - chart bars fall back to the in-process store
+
+    # Load known identifiers so junk ISIN/WKN queries are rejected up front
+    try:
+        from .cache.negative_cache import get_known_identifiers, load_known_identifiers
+        from .database import SessionLocal
+
+        def read_identifiers():
+            db = SessionLocal()
+            try:
+                return load_known_identifiers(db)
+            finally:
+                db.close()
+
+        async def loader():
+            return await asyncio.to_thread(read_identifiers)
+
+        await get_known_identifiers().start(loader)
+        logger.info("Known-identifier filter started")
+    except Exception as e:
+        logger.error(f"Failed to load known-identifier filter: {e}")
+        # Don't raise - the filter fails open and every query takes the normal path
+
     # Initialize StockSearchService and register with container
     try:
         from .database import SessionLocal
@@ -109,6 +160,7 @@ async def lifespan(app: FastAPI):
         )
         from .repositories.redis_repository import RedisStockRepository
         from .infrastructure.massive_adapter import MassiveAPIAdapter
+        from .cache.popularity import PopularityRanking
         from .services.stock_service import StockSearchService
         from .dependencies import get_service_container
 
@@ -119,10 +171,28 @@ async def lifespan(app: FastAPI):
         redis_client = await redis_manager.get_client()
 
         # Create repositories
-        postgres_repo = PostgresStockRepository(db)
-        redis_repo = RedisStockRepository(redis_client)
+        postgres_repo = PostgresStockRepository(
+            db,
+            cache_ttl_minutes=CACHE_TTL_MINUTES,
+            stale_ttl_minutes=CACHE_STALE_TTL_MINUTES,
+        )
+        redis_repo = RedisStockRepository(
+            redis_client,
+            ttl_seconds=CACHE_TTL_MINUTES * 60,
+            stale_ttl_seconds=CACHE_STALE_TTL_MINUTES * 60,
+        )
         history_repo = PostgresSearchHistoryRepository(db)
 
+        # Shared popularity ranking, seeded once from search history
+        popularity = PopularityRanking(redis_client)
+        try:
+            if await popularity.size() == 0:
+                seeded = await popularity.seed(await history_repo.get_search_stats())
+                logger.info(f"Popularity ranking seeded with {seeded} entries")
+        except Exception as e:
+            logger.warning(f"Failed to seed popularity ranking: {e}")
+            # Don't raise - the ranking fills up from live searches
+
         # Create API client using Massive API
         api_client = MassiveAPIAdapter()
 
@@ -132,6 +202,8 @@ async def lifespan(app: FastAPI):
             postgres_repo=postgres_repo,
             api_client=api_client,
             history_repo=history_repo,
+            memory_stale_ttl_minutes=CACHE_STALE_TTL_MINUTES,
+            popularity=popularity,
         )
         get_service_container().register_stock_service(stock_service)
 
@@ -143,15 +215,77 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize StockSearchService: {e}")
         # Don't raise - allow service to start, but search_router will return 503
 
+    # Load the local autocomplete fallback from PostgreSQL (independent of Meilisearch)
+    try:
+        from .search.local_autocomplete import get_local_autocomplete_index
+        from .services.meilisearch_sync_service import get_sync_service
+
+        await get_local_autocomplete_index().load(get_sync_service().iter_all_documents())
+    except Exception as e:
+        logger.error(f"Failed to load local autocomplete index: {e}")
+        # Don't raise - autocomplete returns no results while Meilisearch is down
+
+    # Keep hot memory cache entries fresh ahead of expiry
+    try:
+        from .cache.cache_warmer import RefreshAheadWarmer
+        from .cache.memory_cache import get_memory_cache
+        from .dependencies import get_service_container
+
+        refresh_ahead = RefreshAheadWarmer(
+            get_memory_cache(), get_service_container().get_stock_service()
+        )
+        await refresh_ahead.start()
+        app.state.refresh_ahead = refresh_ahead
+    except Exception as e:
+        logger.error(f"Failed to start refresh-ahead warmer: {e}")
+        # Don't raise - hot entries expire and reload on demand
+
+    # Share report pages across replicas and rebuild popular ones ahead of expiry
+    try:
+        from .cache.report_cache import REPORT_REBUILD_TOP_N
+        from .database import SessionLocal
+        from .dependencies import get_service_container
+
+        report_cache = get_report_cache()
+        report_cache.attach(await redis_manager.get_client(), SessionLocal)
+
+        async def popular_report_symbols():
+            service = get_service_container().get_stock_service()
+            popular = await service.get_popular_searches(limit=REPORT_REBUILD_TOP_N)
+            return [entry["query"] for entry in popular if entry.get("query")]
+
+        await report_cache.start(popular_report_symbols, _build_report_data)
+    except Exception as e:
+        logger.error(f"Failed to start tiered report cache: {e}")
+        # Don't raise - reports fall back to the in-process tier
+
     # Setup graceful shutdown handlers
     async def cleanup_redis():
         """Clean up Redis connections."""
+        if hasattr(app.state, "invalidation_bus"):
+            await app.state.invalidation_bus.stop()
         if hasattr(app.state, "redis_manager"):
             await app.state.redis_manager.close()
             logger.info("Redis connections closed")
 
+    async def cleanup_background_tasks():
+        """Stop refresh-ahead, known-identifier reload and report rebuild tasks."""
+        from .cache.negative_cache import get_known_identifiers
+
+        if hasattr(app.state, "refresh_ahead"):
+            await app.state.refresh_ahead.stop()
+        await get_known_identifiers().stop()
+        await get_report_cache().stop()
+
+    async def cleanup_upstream_http():
+        """Close pooled upstream HTTP connections."""
+        from .infrastructure.http_client import get_http_client_pool
+
+        await get_http_client_pool().close()
+
     shutdown_handler = setup_graceful_shutdown(
-        service_name="search-service", cleanup_callbacks=[cleanup_redis]
+        service_name="search-service",
+        cleanup_callbacks=[cleanup_redis, cleanup_background_tasks, cleanup_upstream_http],
     )
     app.state.shutdown_handler = shutdown_handler
     app.state.is_shutting_down = False
@@ -167,6 +301,12 @@ async def lifespan(app: FastAPI):
     # Cleanup Redis
     await cleanup_redis()
 
+    # Stop background refresh tasks
+    await cleanup_background_tasks()
+
+    # Cleanup upstream HTTP connections
+    await cleanup_upstream_http()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -187,6 +327,9 @@ configure_security_middleware(app)
 # Add Prometheus metrics middleware
 app.add_middleware(PrometheusMiddleware, track_func=track_request_metrics)
 
+# Add Server-Timing header with per-stage search latencies
+app.add_middleware(ServerTimingMiddleware)
+
 # Instrument FastAPI with OpenTelemetry
 instrument_fastapi(app, excluded_urls="/health,/metrics,/")
 
@@ -220,9 +363,9 @@ stock_api_client = StockAPIClient()
 
 
 @app.get("/metrics", include_in_schema=False)
-async def metrics():
+async def metrics(request: Request):
     """Prometheus metrics endpoint."""
-    return await metrics_endpoint()
+    return await metrics_endpoint(request.headers.get("accept"))
 
 
 @app.get("/", tags=["Health"])
@@ -1002,7 +1145,8 @@ async def get_stock_report(
     - Last updated timestamp
 
     The endpoint accepts either ISIN or stock symbol as identifier.
-    Data is cached for 5 minutes to reduce API calls and improve response time.
+    Data is cached for 5 minutes in memory, Redis and PostgreSQL; older
+    reports are served while they are rebuilt in the background.
 
     Features:
         - Target response time: <2 seconds
@@ -1048,13 +1192,10 @@ async def get_stock_report(
 
         logger.info(f"Stock report request for {identifier} (type: {query_type})")
 
-        # Initialize cache manager
-        cache_manager = CacheManager(db)
-
         # If identifier is ISIN, we need to find the symbol first
         symbol: str = identifier
         if query_type == "isin":
-            resolved_symbol = _get_symbol_from_isin(identifier, cache_manager)
+            resolved_symbol = _get_symbol_from_isin(identifier, CacheManager(db))
             if not resolved_symbol:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -1065,18 +1206,21 @@ async def get_stock_report(
                 )
             symbol = resolved_symbol
 
-        # Try cache first
-        cached_report = cache_manager.get_cached_report(symbol)
+        # Try the tiered report cache first (memory -> Redis -> PostgreSQL)
+        report_cache = get_report_cache()
+        cached_report, stale = await report_cache.get(symbol)
         if cached_report:
+            if stale:
+                report_cache.schedule_rebuild(symbol, _build_report_data)
             return _build_cached_report_response(cached_report, start_time)
 
         # Cache miss - fetch from external API
         logger.info(f"Report cache miss - fetching from API for {symbol}")
-        report_data = stock_api_client.get_stock_report_data(symbol)
+        report_data = await asyncio.to_thread(stock_api_client.get_stock_report_data, symbol)
 
         if not report_data:
-            # Try to return stale cache data if available
-            stale_data = _get_stale_cached_report(symbol, cache_manager)
+            # Try to return expired cache data if available
+            stale_data, _ = await report_cache.get(symbol, allow_expired=True)
             if stale_data:
                 return _build_stale_cache_response(stale_data, start_time)
 
@@ -1091,8 +1235,8 @@ async def get_stock_report(
         # Validate that we have the minimum required data
         _validate_report_data(report_data)
 
-        # Cache the report data
-        cache_manager.cache_report_data(report_data)
+        # Cache the report data in every tier
+        await report_cache.set(symbol, flatten_report(report_data))
 
         # Build and return response
         return _build_report_response(report_data, start_time)
@@ -1316,45 +1460,21 @@ def _build_cached_report_response(
     )
 
 
-def _get_stale_cached_report(
-    symbol: str, cache_manager: CacheManager
-) -> Optional[Dict[str, Any]]:
+def _build_report_data(symbol: str) -> Optional[Dict[str, Any]]:
     """
-    Get stale (expired) cached report data as fallback.
+    Build a flat report for background rebuilds (blocking).
 
     Args:
         symbol: Stock symbol
-        cache_manager: Cache manager instance
 
     Returns:
-        Stale cached data or None if not found
+        Flat report dict, or None if upstream has no valid data
     """
-    try:
-        from .models import StockReportCache
-
-        # Query without expiration filter to get stale data
-        cache_entry = (
-            cache_manager.db.query(StockReportCache)
-            .filter(StockReportCache.symbol == symbol.upper())
-            .order_by(StockReportCache.updated_at.desc())
-            .first()
-        )
-
-        if cache_entry:
-            logger.info(f"Using stale cache data for {symbol}")
-            cache_age = int(
-                (
-                    datetime.now(timezone.utc).replace(tzinfo=None)
-                    - cache_entry.created_at
-                ).total_seconds()
-            )
-            return cache_manager._build_report_dict(cache_entry, cache_age)
-
-        return None
-
-    except Exception as e:
-        logger.error(f"Error retrieving stale cache: {e}")
+    report_data = stock_api_client.get_stock_report_data(symbol)
+    if not report_data:
         return None
+    _validate_report_data(report_data)
+    return flatten_report(report_data)
 
 
 def _build_stale_cache_response(
@@ -1589,29 +1709,9 @@ async def get_historical_data(
 
         logger.info(f"Historical data request: {symbol} ({period}, {interval})")
 
-        # Initialize cache manager
-        cache_manager = CacheManager(db)
-
-        # Check cache for historical data (short TTL for real-time data)
-        cache_key = f"hist_{symbol}_{period}_{interval}"
-        cached_data = _get_cached_historical_data(cache_key, cache_manager)
-
-        if cached_data:
-            response_time_ms = int((time.time() - start_time) * 1000)
-            return {
-                "success": True,
-                "symbol": symbol,
-                "period": period,
-                "interval": interval,
-                "data": cached_data,
-                "count": len(cached_data),
-                "cached": True,
-                "response_time_ms": response_time_ms,
-            }
-
-        # Fetch fresh data from Yahoo Finance
-        historical_data = stock_api_client.get_historical_data_ohlcv(
-            symbol, period=period, interval=interval
+        # Serve from the historical cache; stale series only refetch their tail
+        historical_data, cached = get_history_cache().load(
+            symbol, period, interval, _fetch_historical_data
         )
 
         if not historical_data:
@@ -1626,14 +1726,11 @@ async def get_historical_data(
                 },
             )
 
-        # Cache the data (short TTL for real-time data)
-        _cache_historical_data(cache_key, historical_data, cache_manager)
-
         response_time_ms = int((time.time() - start_time) * 1000)
 
         logger.info(
             f"Historical data retrieved: {symbol} - {len(historical_data)} points "
-            f"({period}, {interval}) in {response_time_ms}ms"
+            f"({period}, {interval}) in {response_time_ms}ms (cached={cached})"
         )
 
         return {
@@ -1643,7 +1740,7 @@ async def get_historical_data(
             "interval": interval,
             "data": historical_data,
             "count": len(historical_data),
-            "cached": False,
+            "cached": cached,
             "response_time_ms": response_time_ms,
         }
 
@@ -1735,45 +1832,21 @@ def _validate_period_interval_combination(period: str, interval: str) -> None:
         )
 
 
-def _get_cached_historical_data(
-    cache_key: str, cache_manager: CacheManager
-) -> Optional[list]:
+def _fetch_historical_data(symbol: str, period: str, interval: str) -> list:
     """
-    Get cached historical data if available and not expired.
+    Fetch historical OHLCV rows from the upstream client.
 
     Args:
-        cache_key: Cache key for the data
-        cache_manager: Cache manager instance
+        symbol: Stock symbol
+        period: Time period
+        interval: Data interval
 
     Returns:
-        Cached data list or None if not found/expired
-    """
-    try:
-        # For historical data, use shorter cache TTL (2 minutes for real-time data)
-        # This is implemented in the cache manager - for now return None to always fetch fresh
-        return None
-    except Exception as e:
-        logger.warning(f"Error retrieving cached historical data: {e}")
-        return None
-
-
-def _cache_historical_data(
-    cache_key: str, data: list, cache_manager: CacheManager
-) -> None:
-    """
-    Cache historical data with appropriate TTL.
-
-    Args:
-        cache_key: Cache key for the data
-        data: Historical data to cache
-        cache_manager: Cache manager instance
+        List of OHLCV row dicts (empty if none)
     """
-    try:
-        # For now, we'll skip caching historical data to always get fresh data
-        # In production, you might want to implement short-term caching
-        pass
-    except Exception as e:
-        logger.warning(f"Error caching historical data: {e}")
+    return stock_api_client.get_historical_data_ohlcv(
+        symbol, period=period, interval=interval
+    ) or []
 
 
 @app.exception_handler(Exception)
@@ -1875,6 +1948,14 @@ try:
 except Exception as e:
     logger.error(f"Failed to register search_router: {e}")
 
+# Admin router - on-demand profiling, admin access only
+try:
+    from .routers.admin_router import router as admin_router
+    app.include_router(admin_router)
+    logger.info("admin_router registered successfully")
+except Exception as e:
+    logger.error(f"Failed to register admin_router: {e}")
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,6 +1,38 @@
 """Cache module initialization."""
 
+from app.cache.bar_cache import (AggregateBarCache, BarStore, InMemoryBarStore,
+                                 RedisBarStore, get_bar_cache)
 from app.cache.cache_manager import CacheManager
+from app.cache.history_cache import HistoricalDataCache, get_history_cache
+from app.cache.invalidation_bus import (InvalidationBus, LocalInvalidationBroker,
+                                        LocalInvalidationBus,
+                                        RedisInvalidationBus)
 from app.cache.memory_cache import MemoryStockCache, get_memory_cache
+from app.cache.negative_cache import (BloomFilter, KnownIdentifierIndex,
+                                      NegativeCache, get_known_identifiers)
+from app.cache.popularity import PopularityRanking
+from app.cache.report_cache import ReportCache, get_report_cache
 
-__all__ = ["MemoryStockCache", "get_memory_cache", "CacheManager"]
+__all__ = [
+    "MemoryStockCache",
+    "get_memory_cache",
+    "CacheManager",
+    "InvalidationBus",
+    "LocalInvalidationBroker",
+    "LocalInvalidationBus",
+    "RedisInvalidationBus",
+    "AggregateBarCache",
+    "BarStore",
+    "InMemoryBarStore",
+    "RedisBarStore",
+    "get_bar_cache",
+    "HistoricalDataCache",
+    "get_history_cache",
+    "BloomFilter",
+    "KnownIdentifierIndex",
+    "NegativeCache",
+    "get_known_identifiers",
+    "PopularityRanking",
+    "ReportCache",
+    "get_report_cache",
+]
@@ -0,0 +1,639 @@
+"""
+Aggregate bar cache for chart data.
+
+Every bar whose period has ended is immutable, so charts only need the
+upstream API for the tail of the range that is still forming. Closed bars
+are kept permanently per series (ticker, timespan, multiplier, adjusted)
+together with a coverage marker recording which span is complete. A
+request then reads the covered history from the store, fetches only the
+missing tail from Massive and merges the two. Tail responses, which hold
+the still-forming current bar, are cached for a few seconds only.
+
+Stores:
+- RedisBarStore: sorted set per series, shared by all replicas
+- InMemoryBarStore: bounded LRU of series, default for single-process runs
+
+Adjusted series change when a ticker splits; call invalidate_ticker() to
+drop its stored history.
+"""
+
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Union
+from zoneinfo import ZoneInfo
+
+import redis.asyncio as redis
+from cachetools import LRUCache, TTLCache  # type: ignore[import-untyped]
+
+from app.infrastructure.massive_client import (AggregateBar, MassiveClient,
+                                               MassiveTimespan)
+from app.metrics import track_cache_hit, track_cache_miss
+
+logger = logging.getLogger(__name__)
+
+# Massive aggregate timestamps and date ranges follow US market time
+MARKET_TZ = ZoneInfo("America/New_York")
+
+# Largest page the aggregates endpoint returns
+MAX_AGGREGATES_LIMIT = 50000
+
+_MINUTE_MS = 60 * 1000
+_DAY_MS = 24 * 60 * _MINUTE_MS
+
+# Upper bound of one bar period per timespan; calendar spans use their
+# longest length so a bar is never treated as closed too early
+_TIMESPAN_MS = {
+    MassiveTimespan.MINUTE: _MINUTE_MS,
+    MassiveTimespan.HOUR: 60 * _MINUTE_MS,
+    MassiveTimespan.DAY: _DAY_MS,
+    MassiveTimespan.WEEK: 7 * _DAY_MS,
+    MassiveTimespan.MONTH: 31 * _DAY_MS,
+    MassiveTimespan.QUARTER: 92 * _DAY_MS,
+    MassiveTimespan.YEAR: 366 * _DAY_MS,
+}
+
+
+def bar_span_ms(timespan: MassiveTimespan, multiplier: int) -> int:
+    """
+    Get the maximum duration of one bar in milliseconds.
+
+    Args:
+        timespan: Bar timespan
+        multiplier: Timespan multiplier
+
+    Returns:
+        Bar duration in milliseconds
+    """
+    return _TIMESPAN_MS[timespan] * max(multiplier, 1)
+
+
+def date_to_ms(value: str) -> int:
+    """
+    Convert a YYYY-MM-DD date to the millisecond timestamp of its market-time midnight.
+
+    Args:
+        value: Date string
+
+    Returns:
+        Unix timestamp in milliseconds
+    """
+    day = date.fromisoformat(value)
+    midnight = datetime(day.year, day.month, day.day, tzinfo=MARKET_TZ)
+    return int(midnight.timestamp() * 1000)
+
+
+def end_of_date_ms(value: str) -> int:
+    """
+    Get the exclusive end of a YYYY-MM-DD date (next market-time midnight).
+
+    Args:
+        value: Date string
+
+    Returns:
+        Unix timestamp in milliseconds
+    """
+    next_day = date.fromisoformat(value) + timedelta(days=1)
+    return date_to_ms(next_day.isoformat())
+
+
+@dataclass
+class SeriesCoverage:
+    """
+    Span of a series for which every closed bar is stored.
+
+    Attributes:
+        from_ms: Start of the covered span (inclusive)
+        closed_until_ms: End of the covered span (exclusive); bars starting
+            before this are final
+    """
+
+    from_ms: int
+    closed_until_ms: int
+
+
+def _encode_bar(bar: AggregateBar) -> str:
+    """Serialize a bar as a compact JSON array."""
+    return json.dumps(
+        [
+            bar.timestamp,
+            str(bar.open),
+            str(bar.high),
+            str(bar.low),
+            str(bar.close),
+            bar.volume,
+            str(bar.vwap) if bar.vwap is not None else None,
+            bar.transactions,
+        ],
+        separators=(",", ":"),
+    )
+
+
+def _decode_bar(raw: Union[bytes, str]) -> AggregateBar:
+    """Deserialize a bar written by _encode_bar."""
+    t, o, h, low, c, v, vw, n = json.loads(raw)
+    return AggregateBar(
+        timestamp=t,
+        open=Decimal(o),
+        high=Decimal(h),
+        low=Decimal(low),
+        close=Decimal(c),
+        volume=v,
+        vwap=Decimal(vw) if vw is not None else None,
+        transactions=n,
+    )
+
+
+class BarStore(ABC):
+    """Storage for closed bars and their coverage, keyed by series."""
+
+    @abstractmethod
+    async def get_coverage(self, key: str) -> Optional[SeriesCoverage]:
+        """Get the covered span of a series, or None if nothing is stored."""
+        pass
+
+    @abstractmethod
+    async def get_bars(self, key: str, start_ms: int, end_ms: int) -> List[AggregateBar]:
+        """Get stored bars with start_ms <= timestamp < end_ms in ascending order."""
+        pass
+
+    @abstractmethod
+    async def save(
+        self,
+        key: str,
+        bars: List[AggregateBar],
+        coverage: SeriesCoverage,
+        replace_from_ms: int,
+    ) -> None:
+        """
+        Store closed bars and the new coverage.
+
+        Bars already stored in [replace_from_ms, coverage.closed_until_ms)
+        are replaced by the given ones.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_ticker(self, ticker: str) -> int:
+        """Delete every series of a ticker and return the number removed."""
+        pass
+
+
+@dataclass
+class _MemorySeries:
+    """Stored bars of one series in InMemoryBarStore."""
+
+    coverage: SeriesCoverage
+    bars: Dict[int, AggregateBar] = field(default_factory=dict)
+
+
+class InMemoryBarStore(BarStore):
+    """
+    Process-local bar store.
+
+    Keeps the most recently used series up to max_series.
+    """
+
+    def __init__(self, max_series: int = 500):
+        """
+        Initialize in-memory store.
+
+        Args:
+            max_series: Maximum number of series kept (default: 500)
+        """
+        self.series: LRUCache = LRUCache(maxsize=max_series)
+
+    async def get_coverage(self, key: str) -> Optional[SeriesCoverage]:
+        """Get the covered span of a series."""
+        entry = self.series.get(key)
+        return entry.coverage if entry else None
+
+    async def get_bars(self, key: str, start_ms: int, end_ms: int) -> List[AggregateBar]:
+        """Get stored bars in [start_ms, end_ms)."""
+        entry = self.series.get(key)
+        if entry is None:
+            return []
+        return [entry.bars[t] for t in sorted(entry.bars) if start_ms <= t < end_ms]
+
+    async def save(
+        self,
+        key: str,
+        bars: List[AggregateBar],
+        coverage: SeriesCoverage,
+        replace_from_ms: int,
+    ) -> None:
+        """Store closed bars and coverage."""
+        entry = self.series.get(key)
+        if entry is None:
+            entry = _MemorySeries(coverage=coverage)
+            self.series[key] = entry
+
+        for t in [t for t in entry.bars if replace_from_ms <= t < coverage.closed_until_ms]:
+            del entry.bars[t]
+        for bar in bars:
+            entry.bars[bar.timestamp] = bar
+        entry.coverage = coverage
+
+    async def delete_ticker(self, ticker: str) -> int:
+        """Delete every series of a ticker."""
+        prefix = f"{ticker.upper()}:"
+        keys = [key for key in self.series if key.startswith(prefix)]
+        for key in keys:
+            del self.series[key]
+        return len(keys)
+
+
+class RedisBarStore(BarStore):
+    """
+    Bar store in Redis.
+
+    Each series is a sorted set of encoded bars scored by timestamp plus a
+    hash holding its coverage. History is kept without expiry unless
+    history_ttl_seconds is set.
+    """
+
+    KEY_PREFIX = "bars:"
+
+    def __init__(self, redis_client: redis.Redis, history_ttl_seconds: Optional[int] = None):
+        """
+        Initialize Redis store.
+
+        Args:
+            redis_client: Async Redis client
+            history_ttl_seconds: Optional expiry for stored series (default: none)
+        """
+        self.redis = redis_client
+        self.history_ttl_seconds = history_ttl_seconds
+
+    def _bars_key(self, key: str) -> str:
+        """Build the sorted set key of a series."""
+        return f"{self.KEY_PREFIX}{key}"
+
+    def _meta_key(self, key: str) -> str:
+        """Build the coverage hash key of a series."""
+        return f"{self.KEY_PREFIX}{key}:meta"
+
+    async def get_coverage(self, key: str) -> Optional[SeriesCoverage]:
+        """Get the covered span of a series."""
+        meta = await self.redis.hgetall(self._meta_key(key))
+        if not meta:
+            return None
+        return SeriesCoverage(
+            from_ms=int(meta["from_ms"]),
+            closed_until_ms=int(meta["closed_until_ms"]),
+        )
+
+    async def get_bars(self, key: str, start_ms: int, end_ms: int) -> List[AggregateBar]:
+        """Get stored bars in [start_ms, end_ms)."""
+        members = await self.redis.zrangebyscore(self._bars_key(key), start_ms, f"({end_ms}")
+        # Without withscores every member is a plain bytes/str value
+        return [_decode_bar(member) for member in members if isinstance(member, (bytes, str))]
+
+    async def save(
+        self,
+        key: str,
+        bars: List[AggregateBar],
+        coverage: SeriesCoverage,
+        replace_from_ms: int,
+    ) -> None:
+        """Replace bars in the saved span and update coverage atomically."""
+        bars_key = self._bars_key(key)
+        meta_key = self._meta_key(key)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(bars_key, replace_from_ms, f"({coverage.closed_until_ms}")
+            if bars:
+                pipe.zadd(bars_key, {_encode_bar(bar): bar.timestamp for bar in bars})
+            pipe.hset(
+                meta_key,
+                mapping={
+                    "from_ms": coverage.from_ms,
+                    "closed_until_ms": coverage.closed_until_ms,
+                },
+            )
+            if self.history_ttl_seconds:
+                pipe.expire(bars_key, self.history_ttl_seconds)
+                pipe.expire(meta_key, self.history_ttl_seconds)
+            await pipe.execute()
+
+    async def delete_ticker(self, ticker: str) -> int:
+        """Delete every series of a ticker."""
+        keys = [
+            key
+            async for key in self.redis.scan_iter(match=f"{self.KEY_PREFIX}{ticker.upper()}:*")
+        ]
+        if not keys:
+            return 0
+        await self.redis.delete(*keys)
+        return len([key for key in keys if not key.endswith(":meta")])
+
+
+class AggregateBarCache:
+    """
+    Serves aggregate bars from stored history plus a fetched tail.
+
+    For a request covered by the stored span, only bars starting at or
+    after the coverage end are fetched (by millisecond timestamp), then
+    newly closed bars extend the coverage. Requests starting before the
+    covered span fall back to a full fetch, which then becomes the new
+    coverage.
+
+    Attributes:
+        store: Closed-bar store
+        open_bar_ttl_seconds: TTL of cached tail responses
+        hits: Requests served entirely from the store
+        partial_hits: Requests served from the store plus a tail fetch
+        misses: Requests needing a full fetch
+        tail_cache_hits: Tail fetches answered from the short TTL cache
+    """
+
+    def __init__(
+        self,
+        store: Optional[BarStore] = None,
+        open_bar_ttl_seconds: int = 15,
+        max_open_entries: int = 1000,
+    ):
+        """
+        Initialize bar cache.
+
+        Args:
+            store: Closed-bar store (default: InMemoryBarStore)
+            open_bar_ttl_seconds: TTL for tail responses containing forming bars (default: 15)
+            max_open_entries: Maximum number of cached tail responses (default: 1000)
+        """
+        self.store = store or InMemoryBarStore()
+        self.open_bar_ttl_seconds = open_bar_ttl_seconds
+        self.open_bars: TTLCache = TTLCache(maxsize=max_open_entries, ttl=open_bar_ttl_seconds)
+
+        # Statistics
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.tail_cache_hits = 0
+        self.store_errors = 0
+
+    def attach_store(self, store: BarStore) -> None:
+        """
+        Replace the closed-bar store (e.g. with a shared Redis store).
+
+        Args:
+            store: New bar store
+        """
+        self.store = store
+        self.open_bars.clear()
+        logger.info(f"AggregateBarCache using {type(store).__name__}")
+
+    @staticmethod
+    def series_key(
+        ticker: str, multiplier: int, timespan: MassiveTimespan, adjusted: bool
+    ) -> str:
+        """
+        Build the key identifying a bar series.
+
+        Args:
+            ticker: Stock ticker
+            multiplier: Timespan multiplier
+            timespan: Bar timespan
+            adjusted: Whether prices are split-adjusted
+
+        Returns:
+            Series key, e.g. "AAPL:1:week:adj"
+        """
+        adjustment = "adj" if adjusted else "raw"
+        return f"{ticker.upper()}:{multiplier}:{timespan.value}:{adjustment}"
+
+    async def get_aggregates(
+        self,
+        client: MassiveClient,
+        ticker: str,
+        multiplier: int,
+        timespan: MassiveTimespan,
+        from_date: str,
+        to_date: str,
+        adjusted: bool = True,
+    ) -> List[AggregateBar]:
+        """
+        Get aggregate bars for a date range, fetching only what is missing.
+
+        Args:
+            client: Massive API client used for missing bars
+            ticker: Stock ticker
+            multiplier: Timespan multiplier
+            timespan: Bar timespan
+            from_date: Start date (YYYY-MM-DD)
+            to_date: End date (YYYY-MM-DD)
+            adjusted: Adjust for splits
+
+        Returns:
+            Bars in ascending timestamp order
+
+        Raises:
+            Exception: Whatever the upstream fetch raised
+        """
+        ticker = ticker.upper()
+        key = self.series_key(ticker, multiplier, timespan, adjusted)
+        span_ms = bar_span_ms(timespan, multiplier)
+        start_ms = date_to_ms(from_date)
+        end_ms = end_of_date_ms(to_date)
+        # Bars overlapping the start date (e.g. the week containing it)
+        window_start_ms = start_ms - span_ms + 1
+
+        coverage = await self._get_coverage(key)
+
+        # Usable only if the stored span starts in time and reaches the window;
+        # a span ending before the window would pull in bars outside the range
+        if (
+            coverage is not None
+            and coverage.from_ms <= start_ms
+            and coverage.closed_until_ms >= window_start_ms
+        ):
+            if end_ms <= coverage.closed_until_ms:
+                cached = await self._get_stored(key, window_start_ms, end_ms)
+                if cached is not None:
+                    self.hits += 1
+                    track_cache_hit("bars")
+                    return cached
+
+            cached = await self._get_stored(key, window_start_ms, coverage.closed_until_ms)
+            if cached is not None:
+                fresh = await self._fetch_tail(
+                    client, key, ticker, multiplier, timespan, coverage.closed_until_ms, to_date,
+                    adjusted,
+                )
+                tail = [
+                    bar
+                    for bar in fresh
+                    if bar.timestamp >= max(coverage.closed_until_ms, window_start_ms)
+                ]
+
+                self.partial_hits += 1
+                track_cache_hit("bars")
+                await self._save_closed(
+                    key, fresh, coverage.from_ms, coverage.closed_until_ms, end_ms, span_ms,
+                    coverage,
+                )
+                return cached + [bar for bar in tail if bar.timestamp < end_ms]
+
+        self.misses += 1
+        track_cache_miss("bars")
+        fresh = await client.get_aggregates(
+            ticker=ticker,
+            multiplier=multiplier,
+            timespan=timespan,
+            from_date=from_date,
+            to_date=to_date,
+            adjusted=adjusted,
+            limit=MAX_AGGREGATES_LIMIT,
+        )
+        await self._save_closed(key, fresh, start_ms, window_start_ms, end_ms, span_ms, None)
+        return fresh
+
+    async def invalidate_ticker(self, ticker: str) -> int:
+        """
+        Drop stored history for a ticker (e.g. after a split).
+
+        Args:
+            ticker: Stock ticker
+
+        Returns:
+            Number of series removed
+        """
+        prefix = f"{ticker.upper()}:"
+        for tail_key in [k for k in self.open_bars if k[0].startswith(prefix)]:
+            self.open_bars.pop(tail_key, None)
+        return await self.store.delete_ticker(ticker)
+
+    async def _fetch_tail(
+        self,
+        client: MassiveClient,
+        key: str,
+        ticker: str,
+        multiplier: int,
+        timespan: MassiveTimespan,
+        from_ms: int,
+        to_date: str,
+        adjusted: bool,
+    ) -> List[AggregateBar]:
+        """Fetch bars from from_ms onwards, reusing a recent response if present."""
+        tail_key = (key, from_ms, to_date)
+        cached = self.open_bars.get(tail_key)
+        if cached is not None:
+            self.tail_cache_hits += 1
+            return cached
+
+        bars = await client.get_aggregates(
+            ticker=ticker,
+            multiplier=multiplier,
+            timespan=timespan,
+            from_date=str(from_ms),
+            to_date=to_date,
+            adjusted=adjusted,
+            limit=MAX_AGGREGATES_LIMIT,
+        )
+        self.open_bars[tail_key] = bars
+        return bars
+
+    async def _save_closed(
+        self,
+        key: str,
+        fresh: List[AggregateBar],
+        from_ms: int,
+        replace_from_ms: int,
+        end_ms: int,
+        span_ms: int,
+        previous: Optional[SeriesCoverage],
+    ) -> None:
+        """Store the closed bars of a fetch and advance coverage."""
+        now_ms = int(time.time() * 1000)
+        closed = [
+            bar
+            for bar in fresh
+            if bar.timestamp >= replace_from_ms
+            and bar.timestamp < end_ms
+            and bar.timestamp + span_ms <= now_ms
+        ]
+
+        if end_ms + span_ms <= now_ms + 1 and len(fresh) < MAX_AGGREGATES_LIMIT:
+            # Whole range has ended
+            closed_until_ms = end_ms
+        elif closed:
+            # Stop right after the last closed bar so the tail key stays
+            # stable until another bar closes
+            closed_until_ms = closed[-1].timestamp + 1
+        else:
+            return
+
+        if previous is not None and closed_until_ms <= previous.closed_until_ms:
+            return
+        if closed_until_ms <= from_ms:
+            return
+
+        coverage = SeriesCoverage(from_ms=from_ms, closed_until_ms=closed_until_ms)
+
+        try:
+            await self.store.save(key, closed, coverage, replace_from_ms)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Failed to store bars for {key}: {e}")
+
+    async def _get_coverage(self, key: str) -> Optional[SeriesCoverage]:
+        """Read coverage, treating store errors as a miss."""
+        try:
+            return await self.store.get_coverage(key)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Failed to read bar coverage for {key}: {e}")
+            return None
+
+    async def _get_stored(
+        self, key: str, start_ms: int, end_ms: int
+    ) -> Optional[List[AggregateBar]]:
+        """Read stored bars, returning None on store errors."""
+        try:
+            return await self.store.get_bars(key, start_ms, end_ms)
+        except Exception as e:
+            self.store_errors += 1
+            logger.warning(f"Failed to read stored bars for {key}: {e}")
+            return None
+
+    def get_stats(self) -> dict:
+        """
+        Get bar cache statistics.
+
+        Returns:
+            Dictionary with hit, partial hit and miss counts
+        """
+        total = self.hits + self.partial_hits + self.misses
+        return {
+            "store": type(self.store).__name__,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+            "tail_cache_hits": self.tail_cache_hits,
+            "store_errors": self.store_errors,
+            "open_entries": len(self.open_bars),
+            "full_hit_rate": round(self.hits / total, 4) if total > 0 else 0.0,
+        }
+
+
+# Global bar cache instance
+_bar_cache: Optional[AggregateBarCache] = None
+
+
+def get_bar_cache() -> AggregateBarCache:
+    """
+    Get or create global aggregate bar cache instance.
+
+    Returns:
+        Global AggregateBarCache instance
+    """
+    global _bar_cache
+
+    if _bar_cache is None:
+        _bar_cache = AggregateBarCache()
+
+    return _bar_cache
@@ -1,21 +1,37 @@
 """
 Cache warmer for pre-populating memory cache on startup.
 
-Loads the most popular stocks into memory for ultra-fast access.
+Loads the most popular stocks into memory for ultra-fast access, then
+keeps them hot: RefreshAheadWarmer periodically refreshes the most
+frequently accessed entries shortly before they expire.
 """
 
+import asyncio
 import logging
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from app.cache.memory_cache import MemoryStockCache
 from app.database import get_db
 from app.domain.entities import (DataSource, Stock, StockIdentifier,
                                  StockMetadata, StockPrice)
+from app.metrics import track_background_refresh
 from app.models import StockCache, StockSearchIndex
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    from app.services.stock_service import StockSearchService
+
 logger = logging.getLogger(__name__)
 
+# Refresh-ahead configuration
+REFRESH_AHEAD_INTERVAL_SECONDS = float(os.getenv("REFRESH_AHEAD_INTERVAL_SECONDS", "20"))
+REFRESH_AHEAD_LEAD_SECONDS = float(os.getenv("REFRESH_AHEAD_LEAD_SECONDS", "60"))
+REFRESH_AHEAD_MAX_KEYS = int(os.getenv("REFRESH_AHEAD_MAX_KEYS", "200"))
+REFRESH_AHEAD_BATCH_SIZE = int(os.getenv("REFRESH_AHEAD_BATCH_SIZE", "100"))
+REFRESH_AHEAD_MIN_FREQUENCY = int(os.getenv("REFRESH_AHEAD_MIN_FREQUENCY", "2"))
+
 
 class CacheWarmer:
     """
@@ -192,6 +208,135 @@ class CacheWarmer:
         )
 
 
+class RefreshAheadWarmer:
+    """
+    Continuously refreshes hot memory cache entries before they expire.
+
+    Every interval, picks the most frequently accessed entries whose soft
+    TTL ends within the lead time (see MemoryStockCache.refresh_candidates)
+    and reloads them in batches through StockSearchService.refresh_stocks,
+    one upstream call per batch at warmup priority. Combined with jittered
+    TTLs, hot symbols are renewed a few at a time instead of expiring
+    together and cold-missing all at once.
+    """
+
+    def __init__(
+        self,
+        memory_cache: MemoryStockCache,
+        stock_service: "StockSearchService",
+        interval_seconds: float = REFRESH_AHEAD_INTERVAL_SECONDS,
+        lead_seconds: float = REFRESH_AHEAD_LEAD_SECONDS,
+        max_keys: int = REFRESH_AHEAD_MAX_KEYS,
+        batch_size: int = REFRESH_AHEAD_BATCH_SIZE,
+        min_frequency: int = REFRESH_AHEAD_MIN_FREQUENCY,
+    ):
+        """
+        Initialize refresh-ahead warmer.
+
+        Args:
+            memory_cache: Memory cache to keep hot
+            stock_service: Service used to reload and store stocks
+            interval_seconds: Seconds between refresh cycles
+            lead_seconds: Refresh entries going stale within this time
+                (should exceed interval_seconds)
+            max_keys: Maximum cache keys refreshed per cycle
+            batch_size: Maximum symbols per upstream call
+            min_frequency: Minimum estimated accesses for a key to be refreshed
+        """
+        self.memory_cache = memory_cache
+        self.stock_service = stock_service
+        self.interval_seconds = interval_seconds
+        self.lead_seconds = lead_seconds
+        self.max_keys = max_keys
+        self.batch_size = batch_size
+        self.min_frequency = min_frequency
+        self._task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    async def refresh_once(self) -> int:
+        """
+        Run one refresh cycle.
+
+        Returns:
+            Number of symbols refreshed
+        """
+        candidates = self.memory_cache.refresh_candidates(
+            within_seconds=self.lead_seconds,
+            limit=self.max_keys,
+            min_frequency=self.min_frequency,
+        )
+        self.cycles += 1
+        if not candidates:
+            return 0
+
+        # Group cache keys (symbol, ISIN, WKN) by the symbol that backs them
+        keys_by_symbol: Dict[str, List[str]] = {}
+        for key, stock in candidates:
+            symbol = (stock.identifier.symbol or key).upper()
+            keys_by_symbol.setdefault(symbol, []).append(key)
+
+        symbols = list(keys_by_symbol)
+        refreshed = 0
+        for i in range(0, len(symbols), self.batch_size):
+            batch = {s: keys_by_symbol[s] for s in symbols[i : i + self.batch_size]}
+            try:
+                result = await self.stock_service.refresh_stocks(batch)
+            except Exception as e:
+                logger.warning(f"Refresh-ahead batch of {len(batch)} symbols failed: {e}")
+                result = {}
+            for symbol in batch:
+                track_background_refresh(symbol in result)
+            refreshed += len(result)
+            self.failed += len(batch) - len(result)
+
+        self.refreshed += refreshed
+        logger.info(f"Refresh-ahead cycle: {refreshed}/{len(symbols)} hot symbols refreshed")
+        return refreshed
+
+    async def start(self) -> None:
+        """Start the periodic refresh task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Refresh-ahead warmer started (interval={self.interval_seconds}s, "
+                f"lead={self.lead_seconds}s)"
+            )
+
+    async def stop(self) -> None:
+        """Cancel the periodic refresh task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Refresh loop; errors are logged and the next cycle proceeds."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.refresh_once()
+            except Exception as e:
+                logger.error(f"Refresh-ahead cycle failed: {e}")
+
+    def get_stats(self) -> dict:
+        """Get refresh-ahead statistics."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval_seconds,
+            "lead_seconds": self.lead_seconds,
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+        }
+
+
 def warmup_cache_on_startup(max_stocks: int = 1000) -> None:
     """
     Warm up cache on application startup.
@@ -0,0 +1,321 @@
+"""
+Historical OHLCV cache for the /api/stocks/{symbol}/historical endpoint.
+
+Series are cached per (symbol, period, interval) in a compact columnar
+form: one int64 array of epoch seconds for ordering, one float64 array
+per numeric column and the original timestamp strings. Freshness depends
+on the interval: intraday series go stale within a minute, daily and
+longer series keep their closed bars much longer.
+
+A stale series is not refetched in full. Only a short tail period (e.g.
+the last 5 days of daily bars) is fetched and merged: tail rows replace
+the cached rows from the tail's first timestamp onward, and for rolling
+periods the same number of old rows is dropped from the front. The full
+series is reloaded only once it exceeds its max age.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache  # type: ignore[import-untyped]
+
+from app.metrics import track_cache_hit, track_cache_miss
+
+logger = logging.getLogger(__name__)
+
+HISTORY_CACHE_MAX_SERIES = int(os.getenv("HISTORY_CACHE_MAX_SERIES", "2000"))
+
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+
+# Seconds a series is served without contacting upstream
+_FRESH_TTL_SECONDS = {
+    "intraday": 60,
+    "daily": 15 * 60,
+    "long": 60 * 60,
+}
+
+# Seconds after which a series is reloaded in full instead of tail-merged
+_MAX_AGE_SECONDS = {
+    "intraday": 60 * 60,
+    "daily": 24 * 60 * 60,
+    "long": 7 * 24 * 60 * 60,
+}
+
+# Upstream period fetched to refresh the tail of a series
+_TAIL_PERIOD = {
+    "intraday": "1d",
+    "daily": "5d",
+    "long": "3mo",
+}
+
+# Periods that start at a fixed point and grow instead of rolling forward
+_ANCHORED_PERIODS = {"ytd", "max"}
+
+# Periods no longer than their tail are always fetched in full
+_PERIOD_ORDER = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"]
+
+
+def interval_class(interval: str) -> str:
+    """Classify an interval as intraday, daily or long."""
+    if interval in INTRADAY_INTERVALS:
+        return "intraday"
+    if interval in ("1d", "5d"):
+        return "daily"
+    return "long"
+
+
+def _to_epoch(timestamp: Any) -> int:
+    """Convert an ISO-8601 string or epoch number to epoch seconds."""
+    if isinstance(timestamp, (int, float)):
+        # Millisecond timestamps are larger than any plausible second value
+        return int(timestamp / 1000) if timestamp > 1e11 else int(timestamp)
+    return int(datetime.fromisoformat(str(timestamp).replace("Z", "+00:00")).timestamp())
+
+
+@dataclass
+class HistorySeries:
+    """
+    Columnar OHLCV series.
+
+    Attributes:
+        epochs: Epoch seconds per row, ascending
+        timestamps: Original timestamp values per row
+        columns: float64 array per numeric column (NaN for missing values)
+        int_columns: Numeric columns that held integers
+        loaded_at: When the full series was last fetched
+        refreshed_at: When the series was last fetched or tail-merged
+    """
+
+    epochs: np.ndarray
+    timestamps: List[Any]
+    columns: Dict[str, np.ndarray]
+    int_columns: frozenset = frozenset()
+    loaded_at: float = field(default_factory=lambda: time.time())
+    refreshed_at: float = field(default_factory=lambda: time.time())
+
+    def __len__(self) -> int:
+        return len(self.epochs)
+
+    @classmethod
+    def from_rows(cls, rows: List[dict]) -> "HistorySeries":
+        """
+        Encode row dicts ({"timestamp", "open", ..., "volume"}) as columns.
+
+        Rows are sorted by timestamp; duplicate timestamps keep the last row.
+        """
+        epochs = np.fromiter((_to_epoch(r["timestamp"]) for r in rows), np.int64, len(rows))
+        order = np.argsort(epochs, kind="stable")
+        # Keep the last occurrence of each timestamp
+        keep = np.ones(len(order), dtype=bool)
+        if len(order) > 1:
+            keep[:-1] = epochs[order][1:] != epochs[order][:-1]
+        order = order[keep]
+
+        names = [k for k in rows[0] if k != "timestamp"] if rows else []
+        columns = {}
+        int_columns = set()
+        for name in names:
+            values = [rows[i].get(name) for i in order]
+            if all(v is None or isinstance(v, int) for v in values):
+                int_columns.add(name)
+            columns[name] = np.array(
+                [np.nan if v is None else float(v) for v in values], dtype=np.float64
+            )
+
+        return cls(
+            epochs=epochs[order],
+            timestamps=[rows[i]["timestamp"] for i in order],
+            columns=columns,
+            int_columns=frozenset(int_columns),
+        )
+
+    def to_rows(self) -> List[dict]:
+        """Decode the columns back into row dicts."""
+        decoded = {}
+        for name, values in self.columns.items():
+            is_int = name in self.int_columns
+            decoded[name] = [
+                None if np.isnan(v) else (int(v) if is_int else v) for v in values.tolist()
+            ]
+        return [
+            {"timestamp": ts, **{name: decoded[name][i] for name in decoded}}
+            for i, ts in enumerate(self.timestamps)
+        ]
+
+    def merge_tail(self, tail: "HistorySeries", rolling: bool) -> "HistorySeries":
+        """
+        Merge a freshly fetched tail into this series.
+
+        Args:
+            tail: Series covering the most recent rows
+            rolling: Drop as many old rows as new ones were appended
+
+        Returns:
+            New merged series (loaded_at preserved)
+        """
+        if len(tail) == 0:
+            return replace(self, refreshed_at=time.time())
+
+        # Cached rows before the tail start stay, the tail replaces the rest
+        cut = int(np.searchsorted(self.epochs, tail.epochs[0], side="left"))
+        start = 0
+        if rolling:
+            appended = int(np.count_nonzero(tail.epochs > self.epochs[-1])) if len(self) else 0
+            start = min(appended, cut)
+
+        columns = {
+            name: np.concatenate(
+                [values[start:cut], tail.columns.get(name, np.full(len(tail), np.nan))]
+            )
+            for name, values in self.columns.items()
+        }
+        return HistorySeries(
+            epochs=np.concatenate([self.epochs[start:cut], tail.epochs]),
+            timestamps=self.timestamps[start:cut] + tail.timestamps,
+            columns=columns,
+            int_columns=self.int_columns,
+            loaded_at=self.loaded_at,
+            refreshed_at=time.time(),
+        )
+
+
+class HistoricalDataCache:
+    """
+    Bounded in-process LRU of historical series.
+
+    Series are never mutated in place; a tail merge stores a new series,
+    so a reader always sees a complete one.
+    """
+
+    def __init__(self, max_series: int = HISTORY_CACHE_MAX_SERIES):
+        """
+        Initialize historical data cache.
+
+        Args:
+            max_series: Maximum number of cached (symbol, period, interval) series
+        """
+        self._series: LRUCache = LRUCache(maxsize=max_series)
+        self.hits = 0
+        self.tail_merges = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(symbol: str, period: str, interval: str) -> Tuple[str, str, str]:
+        return (symbol.upper(), period, interval)
+
+    @staticmethod
+    def tail_period(period: str, interval: str) -> Optional[str]:
+        """Upstream period used to refresh the tail, or None to reload in full."""
+        tail = _TAIL_PERIOD[interval_class(interval)]
+        if period in _PERIOD_ORDER and _PERIOD_ORDER.index(period) <= _PERIOD_ORDER.index(tail):
+            return None
+        return tail
+
+    def get(self, symbol: str, period: str, interval: str) -> Tuple[Optional[list], bool]:
+        """
+        Look up a series.
+
+        Args:
+            symbol: Stock symbol
+            period: Requested period
+            interval: Requested interval
+
+        Returns:
+            (rows, fresh); rows is None when nothing usable is cached and
+            fresh is False when the tail should be refreshed first
+        """
+        series: Optional[HistorySeries] = self._series.get(self._key(symbol, period, interval))
+        kind = interval_class(interval)
+        now = time.time()
+
+        if series is None or now - series.loaded_at > _MAX_AGE_SECONDS[kind]:
+            return None, False
+        if now - series.refreshed_at <= _FRESH_TTL_SECONDS[kind]:
+            return series.to_rows(), True
+        return series.to_rows(), False
+
+    def put(self, symbol: str, period: str, interval: str, rows: List[dict]) -> None:
+        """Store a fully fetched series."""
+        self._series[self._key(symbol, period, interval)] = HistorySeries.from_rows(rows)
+
+    def merge_tail(
+        self, symbol: str, period: str, interval: str, tail_rows: List[dict]
+    ) -> Optional[list]:
+        """
+        Merge fresh tail rows into a cached series.
+
+        Returns:
+            Merged rows, or None if the series is no longer cached
+        """
+        key = self._key(symbol, period, interval)
+        series: Optional[HistorySeries] = self._series.get(key)
+        if series is None:
+            return None
+        merged = series.merge_tail(
+            HistorySeries.from_rows(tail_rows), rolling=period not in _ANCHORED_PERIODS
+        )
+        self._series[key] = merged
+        return merged.to_rows()
+
+    def load(self, symbol: str, period: str, interval: str, fetch) -> Tuple[list, bool]:
+        """
+        Serve a series from cache, refreshing its tail or reloading as needed.
+
+        Args:
+            symbol: Stock symbol
+            period: Requested period
+            interval: Requested interval
+            fetch: Callable (symbol, period, interval) -> list of row dicts
+
+        Returns:
+            (rows, cached); cached is True when no full upstream fetch was needed
+        """
+        rows, fresh = self.get(symbol, period, interval)
+        if rows is not None and fresh:
+            self.hits += 1
+            track_cache_hit("history")
+            return rows, True
+
+        tail_period = self.tail_period(period, interval)
+        if rows is not None and tail_period:
+            tail_rows = fetch(symbol, tail_period, interval)
+            if tail_rows:
+                merged = self.merge_tail(symbol, period, interval, tail_rows)
+                if merged is not None:
+                    self.tail_merges += 1
+                    track_cache_hit("history_tail")
+                    return merged, True
+
+        self.misses += 1
+        track_cache_miss("history")
+        rows = fetch(symbol, period, interval)
+        if rows:
+            self.put(symbol, period, interval, rows)
+        return rows, False
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        return {
+            "series": len(self._series),
+            "max_series": self._series.maxsize,
+            "hits": self.hits,
+            "tail_merges": self.tail_merges,
+            "misses": self.misses,
+        }
+
+
+# Singleton instance
+_history_cache: Optional[HistoricalDataCache] = None
+
+
+def get_history_cache() -> HistoricalDataCache:
+    """Get or create the historical data cache singleton."""
+    global _history_cache
+    if _history_cache is None:
+        _history_cache = HistoricalDataCache()
+    return _history_cache
@@ -0,0 +1,254 @@
+"""
+Cross-replica invalidation bus for the in-process memory cache.
+
+Every worker/pod has its own MemoryStockCache. When one replica refreshes
+or deletes a stock, it publishes the key on the bus and all other replicas
+evict their local copy, so the next read falls through to Redis and picks
+up the fresh value. This keeps L0 consistent across replicas and allows
+much longer L0 TTLs.
+
+Implementations:
+- RedisInvalidationBus: Redis pub/sub, used in production
+- LocalInvalidationBus: in-process broker, used in tests and single-process runs
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Set
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Message actions
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+ACTION_CLEAR = "clear"
+
+InvalidationHandler = Callable[[str, Optional[str]], None]
+
+
+class InvalidationBus(ABC):
+    """
+    Base class for cache invalidation buses.
+
+    Messages carry the origin instance ID so replicas ignore their own
+    broadcasts. Handlers are called with (action, key) for messages from
+    other replicas only.
+    """
+
+    def __init__(self) -> None:
+        """Initialize bus with a unique origin ID for this process."""
+        self.instance_id = uuid.uuid4().hex
+        self._handlers: List[InvalidationHandler] = []
+        self._pending: Set[asyncio.Task] = set()
+
+        # Statistics
+        self.published = 0
+        self.received = 0
+        self.publish_errors = 0
+
+    def subscribe(self, handler: InvalidationHandler) -> None:
+        """
+        Register a handler for remote invalidations.
+
+        Args:
+            handler: Callable receiving (action, key)
+        """
+        self._handlers.append(handler)
+
+    async def publish(self, action: str, key: Optional[str] = None) -> None:
+        """
+        Broadcast an invalidation to all replicas.
+
+        Errors are logged and swallowed; a lost message only means a replica
+        serves its copy until the local TTL expires.
+
+        Args:
+            action: One of update, delete, clear
+            key: Cache key (None for clear)
+        """
+        payload = json.dumps({"origin": self.instance_id, "action": action, "key": key})
+        try:
+            await self._publish(payload)
+            self.published += 1
+        except Exception as e:
+            self.publish_errors += 1
+            logger.warning(f"Failed to publish cache invalidation for {key}: {e}")
+
+    def publish_nowait(self, action: str, key: Optional[str] = None) -> None:
+        """
+        Schedule a broadcast from synchronous code.
+
+        Does nothing when no event loop is running.
+
+        Args:
+            action: One of update, delete, clear
+            key: Cache key (None for clear)
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"No running event loop, skipping invalidation for {key}")
+            return
+
+        task = loop.create_task(self.publish(action, key))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _dispatch(self, raw: str) -> None:
+        """Decode a message and hand it to handlers unless it is our own."""
+        try:
+            message = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed invalidation message: {raw!r}")
+            return
+
+        if message.get("origin") == self.instance_id:
+            return
+
+        self.received += 1
+        action = message.get("action")
+        key = message.get("key")
+
+        for handler in self._handlers:
+            try:
+                handler(action, key)
+            except Exception as e:
+                logger.error(f"Invalidation handler failed for {key}: {e}")
+
+    async def start(self) -> None:
+        """Start receiving messages."""
+
+    async def stop(self) -> None:
+        """Stop receiving messages and flush pending publishes."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        """Get bus statistics."""
+        return {
+            "instance_id": self.instance_id,
+            "published": self.published,
+            "received": self.received,
+            "publish_errors": self.publish_errors,
+        }
+
+    @abstractmethod
+    async def _publish(self, payload: str) -> None:
+        """Send a serialized message to all replicas."""
+        pass
+
+
+class LocalInvalidationBroker:
+    """In-process message broker connecting LocalInvalidationBus instances."""
+
+    def __init__(self) -> None:
+        """Initialize broker with no attached buses."""
+        self.buses: List["LocalInvalidationBus"] = []
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """
+    In-memory invalidation bus.
+
+    Buses sharing a broker behave like replicas subscribed to the same
+    channel. Delivery is synchronous.
+    """
+
+    def __init__(self, broker: Optional[LocalInvalidationBroker] = None):
+        """
+        Initialize local bus.
+
+        Args:
+            broker: Shared broker (creates a private one if None)
+        """
+        super().__init__()
+        self.broker = broker or LocalInvalidationBroker()
+        self.broker.buses.append(self)
+
+    async def _publish(self, payload: str) -> None:
+        """Deliver message to every bus on the broker."""
+        for bus in list(self.broker.buses):
+            bus._dispatch(payload)
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """
+    Invalidation bus over Redis pub/sub.
+
+    A background task polls the subscription and dispatches messages from
+    other replicas. The listener resubscribes after connection errors.
+    """
+
+    DEFAULT_CHANNEL = "cache:invalidation:stock"
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        channel: str = DEFAULT_CHANNEL,
+        poll_timeout: float = 1.0,
+    ):
+        """
+        Initialize Redis bus.
+
+        Args:
+            redis_client: Async Redis client
+            channel: Pub/sub channel name
+            poll_timeout: Seconds to block per poll for new messages
+        """
+        super().__init__()
+        self.redis = redis_client
+        self.channel = channel
+        self.poll_timeout = poll_timeout
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def _publish(self, payload: str) -> None:
+        """Publish message on the Redis channel."""
+        await self.redis.publish(self.channel, payload)
+
+    async def start(self) -> None:
+        """Subscribe to the channel and start the listener task."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+            logger.info(f"Cache invalidation bus listening on '{self.channel}'")
+
+    async def stop(self) -> None:
+        """Cancel the listener task."""
+        await super().stop()
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self) -> None:
+        """Receive messages, reconnecting with a delay on errors."""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=self.poll_timeout
+                    )
+                    if message and message.get("type") == "message":
+                        data = message["data"]
+                        if isinstance(data, bytes):
+                            data = data.decode("utf-8")
+                        self._dispatch(data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error, resubscribing: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.reset()
+                except Exception:
+                    pass
@@ -5,15 +5,83 @@ This module provides ultra-fast access to frequently searched stocks
 using an in-memory Least Recently Used (LRU) cache. Target latency: <10ms.
 """
 
+import dataclasses
 import logging
+import os
+import random
+from array import array
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from app.cache.invalidation_bus import (ACTION_CLEAR, ACTION_DELETE,
+                                        ACTION_UPDATE, InvalidationBus)
 from app.domain.entities import Stock
 from cachetools import LRUCache  # type: ignore[import-untyped]
 
 logger = logging.getLogger(__name__)
 
+# Random spread applied to soft TTLs so entries written together do not
+# expire together (0.1 = +/-10%)
+MEMORY_CACHE_TTL_JITTER = float(os.getenv("MEMORY_CACHE_TTL_JITTER", "0.1"))
+
+
+class CountMinSketch:
+    """
+    Approximate per-key access counter with aging.
+
+    A depth x width table of counters; each key increments one counter per
+    row and its frequency is the minimum over its rows, so estimates never
+    undercount. After sample_size additions every counter is halved, so
+    the sketch tracks recent popularity rather than all-time totals.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, sample_size: Optional[int] = None):
+        """
+        Initialize sketch.
+
+        Args:
+            width: Counters per row
+            depth: Number of rows (independent hashes)
+            sample_size: Additions between halvings (default: 10 x width)
+        """
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or 10 * width
+        self._rows = [array("L", [0]) * width for _ in range(depth)]
+        self._additions = 0
+
+    def _indexes(self, key: str) -> Iterator[Tuple[int, int]]:
+        """Yield (row, column) pairs for a key."""
+        for row in range(self.depth):
+            yield row, hash((row, key)) % self.width
+
+    def add(self, key: str) -> None:
+        """Record one access to a key."""
+        for row, col in self._indexes(key):
+            self._rows[row][col] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        """Estimate recent accesses to a key."""
+        return min(self._rows[row][col] for row, col in self._indexes(key))
+
+    def _age(self) -> None:
+        """Halve all counters."""
+        for counters in self._rows:
+            for i, value in enumerate(counters):
+                if value:
+                    counters[i] = value >> 1
+        self._additions //= 2
+
+    def clear(self) -> None:
+        """Reset all counters."""
+        for counters in self._rows:
+            for i in range(self.width):
+                counters[i] = 0
+        self._additions = 0
+
 
 class MemoryStockCache:
     """
@@ -28,42 +96,72 @@ class MemoryStockCache:
     - L2: PostgreSQL - ~10ms access
     - L3: External API - ~500ms access
 
+    Supports stale-while-revalidate: each entry has a soft TTL (fresh
+    until) and a hard TTL (soft TTL + stale window). Between the two, the
+    entry is only returned to callers passing allow_stale=True, flagged as
+    stale so they can serve it immediately and refresh in the background.
+
+    When an InvalidationBus is attached, broadcast updates, deletes and
+    clears evict the key on every other replica.
+
+    Every lookup is counted in a count-min sketch; refresh_candidates()
+    uses the counts to pick the hottest entries that are about to expire
+    so they can be refreshed ahead of time. Soft TTLs are jittered by
+    ttl_jitter so entries written together expire at different times.
+
     Attributes:
         cache: LRU cache storing stock data
         max_size: Maximum number of items to cache (default: 1000)
+        stale_ttl_minutes: Default stale window after the soft TTL
+        ttl_jitter: Relative random spread applied to soft TTLs
+        access_sketch: Approximate per-key access frequency
         hits: Number of cache hits
         misses: Number of cache misses
         evictions: Number of items evicted due to size limit
     """
 
-    def __init__(self, max_size: int = 1000):
+    def __init__(
+        self, max_size: int = 1000, stale_ttl_minutes: float = 0, ttl_jitter: float = 0
+    ):
         """
         Initialize memory cache.
 
         Args:
             max_size: Maximum number of stocks to cache (default: 1000)
+            stale_ttl_minutes: Default stale window after the soft TTL (default: 0)
+            ttl_jitter: Relative random spread of soft TTLs (default: 0, no jitter)
         """
         self.cache: LRUCache = LRUCache(maxsize=max_size)
         self.max_size = max_size
+        self.stale_ttl_minutes = stale_ttl_minutes
+        self.ttl_jitter = ttl_jitter
+        self.access_sketch = CountMinSketch(width=max(64, max_size * 2))
 
         # Statistics
         self.hits = 0
         self.misses = 0
         self.evictions = 0
+        self.stale_hits = 0
+        self.remote_invalidations = 0
+
+        # Cross-replica invalidation (optional)
+        self.invalidation_bus: Optional[InvalidationBus] = None
 
         logger.info(f"Initialized MemoryStockCache with max_size={max_size}")
 
-    def get(self, key: str) -> Optional[Stock]:
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Stock]:
         """
         Get stock data from cache.
 
         Args:
             key: Cache key (typically symbol or identifier)
+            allow_stale: Return entries past their soft TTL (flagged stale)
 
         Returns:
             Stock if found and not expired, None otherwise
         """
         try:
+            self.access_sketch.add(key)
             stock_data = self.cache.get(key)
 
             if stock_data is None:
@@ -79,6 +177,16 @@ class MemoryStockCache:
                 logger.debug(f"Cache MISS (expired): {key}")
                 return None
 
+            if self._is_soft_expired(stock_data):
+                if not allow_stale:
+                    self.misses += 1
+                    logger.debug(f"Cache MISS (stale): {key}")
+                    return None
+
+                self.stale_hits += 1
+                logger.debug(f"Cache HIT (stale): {key}")
+                return dataclasses.replace(stock_data, stale=True)
+
             self.hits += 1
             logger.debug(f"Cache HIT: {key}")
             return stock_data
@@ -88,37 +196,65 @@ class MemoryStockCache:
             self.misses += 1
             return None
 
-    def set(self, key: str, stock: Stock, ttl_minutes: int = 5) -> None:
+    def set(
+        self,
+        key: str,
+        stock: Stock,
+        ttl_minutes: float = 5,
+        stale_ttl_minutes: Optional[float] = None,
+        broadcast: bool = False,
+    ) -> None:
         """
         Store stock data in cache.
 
         Args:
             key: Cache key (typically symbol or identifier)
             stock: Stock entity to cache
-            ttl_minutes: Time-to-live in minutes (default: 5)
+            ttl_minutes: Soft time-to-live in minutes (default: 5), jittered by ttl_jitter
+            stale_ttl_minutes: Stale window after the soft TTL
+                (default: the cache's stale_ttl_minutes)
+            broadcast: Tell other replicas to drop their copy of this key.
+                Use for newly fetched data, not for promotions from Redis.
         """
         try:
+            if stock.stale:
+                # Never re-cache a stale copy as if it were fresh
+                return
+
             # Check if we'll evict an item
             if len(self.cache) >= self.max_size and key not in self.cache:
                 self.evictions += 1
 
-            # Add expiration timestamp to stock (using object.__setattr__ for frozen dataclass)
-            if not hasattr(stock, "cache_expires_at"):
-                expires_at = datetime.now(timezone.utc).timestamp() + (ttl_minutes * 60)
-                object.__setattr__(stock, "cache_expires_at", expires_at)
+            if stale_ttl_minutes is None:
+                stale_ttl_minutes = self.stale_ttl_minutes
+
+            if self.ttl_jitter:
+                ttl_minutes *= 1 + random.uniform(-self.ttl_jitter, self.ttl_jitter)
+
+            # Add expiration timestamps to stock (using object.__setattr__ for frozen dataclass)
+            fresh_until = datetime.now(timezone.utc).timestamp() + (ttl_minutes * 60)
+            expires_at = fresh_until + (stale_ttl_minutes * 60)
+            object.__setattr__(stock, "cache_fresh_until", fresh_until)
+            object.__setattr__(stock, "cache_expires_at", expires_at)
 
             self.cache[key] = stock
-            logger.debug(f"Cached: {key} (TTL: {ttl_minutes}m)")
+            logger.debug(
+                f"Cached: {key} (TTL: {ttl_minutes}m, stale window: {stale_ttl_minutes}m)"
+            )
+
+            if broadcast:
+                self._broadcast(ACTION_UPDATE, key)
 
         except Exception as e:
             logger.error(f"Error setting cache: {e}")
 
-    def delete(self, key: str) -> None:
+    def delete(self, key: str, broadcast: bool = True) -> None:
         """
         Delete item from cache.
 
         Args:
             key: Cache key to delete
+            broadcast: Also delete the key on other replicas
         """
         try:
             if key in self.cache:
@@ -127,8 +263,16 @@ class MemoryStockCache:
         except Exception as e:
             logger.error(f"Error deleting from cache: {e}")
 
-    def clear(self) -> None:
-        """Clear all items from cache."""
+        if broadcast:
+            self._broadcast(ACTION_DELETE, key)
+
+    def clear(self, broadcast: bool = True) -> None:
+        """
+        Clear all items from cache.
+
+        Args:
+            broadcast: Also clear the cache on other replicas
+        """
         try:
             count = len(self.cache)
             self.cache.clear()
@@ -136,6 +280,96 @@ class MemoryStockCache:
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
 
+        if broadcast:
+            self._broadcast(ACTION_CLEAR, None)
+
+    def attach_invalidation_bus(self, bus: InvalidationBus) -> None:
+        """
+        Connect this cache to a cross-replica invalidation bus.
+
+        Args:
+            bus: Invalidation bus shared by all replicas
+        """
+        self.invalidation_bus = bus
+        bus.subscribe(self._handle_remote_invalidation)
+        logger.info(f"MemoryStockCache attached to invalidation bus {bus.instance_id}")
+
+    def _broadcast(self, action: str, key: Optional[str]) -> None:
+        """Publish an invalidation if a bus is attached."""
+        if self.invalidation_bus is not None:
+            self.invalidation_bus.publish_nowait(action, key)
+
+    def _handle_remote_invalidation(self, action: str, key: Optional[str]) -> None:
+        """
+        Apply an invalidation received from another replica.
+
+        Updates and deletes both evict the local copy; the next read falls
+        through to Redis, which already holds the new value.
+
+        Args:
+            action: One of update, delete, clear
+            key: Cache key (None for clear)
+        """
+        self.remote_invalidations += 1
+
+        if action == ACTION_CLEAR:
+            self.clear(broadcast=False)
+        elif key is not None:
+            self.delete(key, broadcast=False)
+
+    def access_frequency(self, key: str) -> int:
+        """
+        Get the estimated recent access count of a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Estimated number of recent lookups
+        """
+        return self.access_sketch.estimate(key)
+
+    def refresh_candidates(
+        self, within_seconds: float, limit: int, min_frequency: int = 2
+    ) -> List[Tuple[str, Stock]]:
+        """
+        Get the hottest entries that go stale within the given time.
+
+        Entries already in their stale window are included; hard-expired
+        entries are not. Lookups made here are not counted as accesses.
+
+        Args:
+            within_seconds: Include entries whose soft TTL ends within this time
+            limit: Maximum number of entries
+            min_frequency: Minimum estimated access count
+
+        Returns:
+            (key, stock) pairs, hottest first
+        """
+        ranked = sorted(
+            (
+                (frequency, key)
+                for key in list(self.cache.keys())
+                if (frequency := self.access_sketch.estimate(key)) >= min_frequency
+            ),
+            reverse=True,
+        )
+
+        now = datetime.now(timezone.utc).timestamp()
+        candidates: List[Tuple[str, Stock]] = []
+        for _, key in ranked:
+            stock = self.cache.get(key)
+            if stock is None or not hasattr(stock, "cache_fresh_until"):
+                continue
+            if now > stock.cache_expires_at:
+                continue
+            if stock.cache_fresh_until - now <= within_seconds:
+                candidates.append((key, stock))
+                if len(candidates) >= limit:
+                    break
+
+        return candidates
+
     def get_stats(self) -> Dict[str, int]:
         """
         Get cache statistics.
@@ -152,6 +386,8 @@ class MemoryStockCache:
             "hits": self.hits,
             "misses": self.misses,
             "evictions": self.evictions,
+            "stale_hits": self.stale_hits,
+            "remote_invalidations": self.remote_invalidations,
             "total_requests": total_requests,
             "hit_rate_percent": int(round(hit_rate)),
         }
@@ -172,6 +408,22 @@ class MemoryStockCache:
         current_time = datetime.now(timezone.utc).timestamp()
         return current_time > stock.cache_expires_at
 
+    def _is_soft_expired(self, stock: Stock) -> bool:
+        """
+        Check if cached data is past its soft TTL (stale but servable).
+
+        Args:
+            stock: Stock entity to check
+
+        Returns:
+            True if stale, False otherwise
+        """
+        if not hasattr(stock, "cache_fresh_until"):
+            return False
+
+        current_time = datetime.now(timezone.utc).timestamp()
+        return current_time > stock.cache_fresh_until
+
     def warmup(self, stock_list: list[Stock]) -> int:
         """
         Pre-populate cache with stock data.
@@ -212,6 +464,6 @@ def get_memory_cache(max_size: int = 1000) -> MemoryStockCache:
     global _memory_cache
 
     if _memory_cache is None:
-        _memory_cache = MemoryStockCache(max_size=max_size)
+        _memory_cache = MemoryStockCache(max_size=max_size, ttl_jitter=MEMORY_CACHE_TTL_JITTER)
 
     return _memory_cache
@@ -0,0 +1,336 @@
+"""
+Negative-result cache and known-identifier Bloom filter.
+
+Junk queries (typos, random strings, delisted tickers) otherwise fall
+through every cache tier and end in an upstream Massive call that is
+known to fail. Two guards answer them up front:
+
+- NegativeCache: remembers identifiers that were recently not found, for
+  a short TTL, so repeated junk is rejected without any I/O.
+- KnownIdentifierIndex: a Bloom filter of every ISIN/WKN (and symbol)
+  seen in symbol_mappings and the stock cache. An identifier that is not
+  in the filter definitely has no local mapping; a Bloom filter has no
+  false negatives, so only junk is rejected and a small fraction of junk
+  (the false-positive rate) still takes the normal path.
+
+The index fails open: until it has been loaded, or for identifier types
+it is not authoritative for, every query passes.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+from typing import Awaitable, Callable, Iterable, Optional, Set
+
+from cachetools import TTLCache  # type: ignore[import-untyped]
+from prometheus_client import Counter
+
+from ..domain.entities import IdentifierType
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+NEGATIVE_CACHE_SIZE = int(os.getenv("NEGATIVE_CACHE_SIZE", "10000"))
+NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "60"))
+KNOWN_IDENTIFIERS_ERROR_RATE = float(os.getenv("KNOWN_IDENTIFIERS_ERROR_RATE", "0.01"))
+KNOWN_IDENTIFIERS_RELOAD_SECONDS = int(os.getenv("KNOWN_IDENTIFIERS_RELOAD_SECONDS", "3600"))
+# symbol_mappings is not a complete ticker universe, so symbols are only
+# rejected when explicitly enabled
+KNOWN_SYMBOLS_AUTHORITATIVE = os.getenv("KNOWN_SYMBOLS_AUTHORITATIVE", "false").lower() == "true"
+
+# Prometheus metrics
+known_identifier_rejections_total = Counter(
+    "search_known_identifier_rejections_total",
+    "Queries rejected because the identifier is not in the known-identifier filter",
+    ["identifier_type"],
+)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Uses blake2b double hashing (Kirsch-Mitzenmacher) to derive the bit
+    positions. Sized for a target capacity and false-positive rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Initialize Bloom filter.
+
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false-positive rate at capacity
+        """
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        """Yield the bit positions for an item."""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        """Add an item to the filter."""
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class NegativeCache:
+    """
+    Short-lived cache of identifiers that were not found.
+
+    Entries expire after the TTL so newly listed stocks become searchable
+    again without manual invalidation.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = NEGATIVE_CACHE_SIZE,
+        ttl_seconds: float = NEGATIVE_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize negative cache.
+
+        Args:
+            maxsize: Maximum number of remembered misses
+            ttl_seconds: How long a miss is remembered
+        """
+        self.ttl_seconds = ttl_seconds
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    def contains(self, key: str) -> bool:
+        """
+        Check whether a key recently was not found.
+
+        Args:
+            key: Normalized cache key
+
+        Returns:
+            True if the key is negatively cached
+        """
+        if key in self._cache:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, key: str) -> None:
+        """Remember a key as not found."""
+        self._cache[key] = True
+
+    def discard(self, key: str) -> None:
+        """Forget a key, e.g. after it was found."""
+        self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        """Forget all keys."""
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        """Get negative cache statistics."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total * 100, 2) if total else 0.0,
+        }
+
+
+class KnownIdentifierIndex:
+    """
+    Bloom filter of known ISINs, WKNs and symbols.
+
+    The filter is rebuilt from the database by load() and swapped in
+    atomically; identifiers learned at runtime are added with add().
+    """
+
+    def __init__(
+        self,
+        error_rate: float = KNOWN_IDENTIFIERS_ERROR_RATE,
+        authoritative_symbols: bool = KNOWN_SYMBOLS_AUTHORITATIVE,
+    ):
+        """
+        Initialize known-identifier index.
+
+        Args:
+            error_rate: Target false-positive rate of the filter
+            authoritative_symbols: Also reject symbols missing from the filter
+        """
+        self.error_rate = error_rate
+        self.authoritative_symbols = authoritative_symbols
+        self._filter: Optional[BloomFilter] = None
+        self.rejections = 0
+        self._reload_task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the filter holds a loaded identifier set."""
+        return self._filter is not None and len(self._filter) > 0
+
+    def load(self, identifiers: Iterable[str]) -> int:
+        """
+        Rebuild the filter from a full identifier set.
+
+        Args:
+            identifiers: All known identifiers (normalized to upper case here)
+
+        Returns:
+            Number of identifiers loaded
+        """
+        values: Set[str] = {i.strip().upper() for i in identifiers if i and i.strip()}
+        bloom = BloomFilter(capacity=max(2 * len(values), 1000), error_rate=self.error_rate)
+        for value in values:
+            bloom.add(value)
+        self._filter = bloom
+        logger.info(f"Known-identifier filter loaded with {len(values)} identifiers")
+        return len(values)
+
+    def add(self, *identifiers: Optional[str]) -> None:
+        """Add identifiers learned at runtime (no-op until loaded)."""
+        if self._filter is None:
+            return
+        for identifier in identifiers:
+            if identifier:
+                self._filter.add(identifier.strip().upper())
+
+    def might_exist(self, identifier_type: IdentifierType, value: str) -> bool:
+        """
+        Check whether an identifier can possibly be resolved.
+
+        Args:
+            identifier_type: Detected identifier type
+            value: Normalized identifier value
+
+        Returns:
+            False only if the identifier is definitely unknown
+        """
+        bloom = self._filter
+        if bloom is None or not self.loaded or identifier_type == IdentifierType.NAME:
+            return True
+        if identifier_type == IdentifierType.SYMBOL and not self.authoritative_symbols:
+            return True
+        if value in bloom:
+            return True
+
+        self.rejections += 1
+        known_identifier_rejections_total.labels(identifier_type=identifier_type.value).inc()
+        return False
+
+    async def start(
+        self,
+        loader: Callable[[], Awaitable[Iterable[str]]],
+        interval_seconds: int = KNOWN_IDENTIFIERS_RELOAD_SECONDS,
+    ) -> None:
+        """
+        Load the filter and start periodic reloads.
+
+        Args:
+            loader: Coroutine function returning all known identifiers
+            interval_seconds: Seconds between reloads
+        """
+        self.load(await loader())
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.create_task(self._reload_loop(loader, interval_seconds))
+
+    async def stop(self) -> None:
+        """Cancel the reload task."""
+        if self._reload_task:
+            self._reload_task.cancel()
+            try:
+                await self._reload_task
+            except asyncio.CancelledError:
+                pass
+            self._reload_task = None
+
+    async def _reload_loop(
+        self, loader: Callable[[], Awaitable[Iterable[str]]], interval_seconds: int
+    ) -> None:
+        """Reload the filter periodically, keeping the old one on errors."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.load(await loader())
+            except Exception as e:
+                logger.warning(f"Known-identifier filter reload failed: {e}")
+
+    def get_stats(self) -> dict:
+        """Get filter statistics."""
+        return {
+            "loaded": self.loaded,
+            "identifiers": len(self._filter) if self._filter else 0,
+            "bits": self._filter.num_bits if self._filter else 0,
+            "hashes": self._filter.num_hashes if self._filter else 0,
+            "error_rate": self.error_rate,
+            "authoritative_symbols": self.authoritative_symbols,
+            "rejections": self.rejections,
+        }
+
+
+def load_known_identifiers(db) -> Set[str]:
+    """
+    Collect every known identifier from the database.
+
+    Reads active symbol_mappings (identifier values and their tickers),
+    the cached stocks' symbols/ISINs/WKNs, and the adapter's built-in
+    ISIN/WKN mappings.
+
+    Args:
+        db: SQLAlchemy session
+
+    Returns:
+        Set of identifiers
+    """
+    from ..infrastructure.massive_adapter import ISIN_TICKER_MAP, WKN_TICKER_MAP
+    from ..models import StockCache, SymbolMapping
+
+    identifiers: Set[str] = set()
+    identifiers.update(ISIN_TICKER_MAP)
+    identifiers.update(WKN_TICKER_MAP)
+    identifiers.update(ISIN_TICKER_MAP.values())
+
+    mappings = db.query(SymbolMapping.identifier_value, SymbolMapping.yahoo_symbol).filter(
+        SymbolMapping.is_active == 1
+    )
+    for identifier_value, yahoo_symbol in mappings:
+        identifiers.add(identifier_value)
+        identifiers.add(yahoo_symbol)
+
+    for symbol, isin, wkn in db.query(StockCache.symbol, StockCache.isin, StockCache.wkn):
+        identifiers.update(v for v in (symbol, isin, wkn) if v)
+
+    return identifiers
+
+
+# Singleton instance
+_known_identifiers: Optional[KnownIdentifierIndex] = None
+
+
+def get_known_identifiers() -> KnownIdentifierIndex:
+    """Get or create the known-identifier index singleton."""
+    global _known_identifiers
+    if _known_identifiers is None:
+        _known_identifiers = KnownIdentifierIndex()
+    return _known_identifiers
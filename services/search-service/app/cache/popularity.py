@@ -0,0 +1,215 @@
+"""
+Time-decayed search popularity ranking in a Redis sorted set.
+
+Replaces the GROUP BY over search_history that relevance scoring and
+/popular used to run. Every successful search increments its symbol in
+one sorted set shared by all service processes, and readers take the top
+N members in O(log n + N).
+
+Decay uses forward decay: instead of periodically shrinking every score,
+each increment is weighted by 2 ** ((now - epoch) / half_life). Newer
+searches therefore count exponentially more than older ones, and dividing
+a stored score by the current weight yields the decayed count.
+
+Weights double once per half-life, so the epoch is rebased to keep them
+small. Time is split into generations of REBASE_HALF_LIVES half-lives,
+each with its own sorted set ("<key>:<generation>") whose weights are
+relative to the generation start. The first process to reach a new
+generation merges the previous set into it, scaled down with
+ZUNIONSTORE ... WEIGHTS, and lets the old set expire. Weights therefore
+never exceed 2 ** REBASE_HALF_LIVES, whatever the half-life.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+POPULARITY_KEY = os.getenv("POPULARITY_KEY", "search:popularity")
+POPULARITY_HALF_LIFE_HOURS = float(os.getenv("POPULARITY_HALF_LIFE_HOURS", "168"))
+POPULARITY_MAX_MEMBERS = int(os.getenv("POPULARITY_MAX_MEMBERS", "10000"))
+# Fixed reference point for forward decay (2024-01-01 UTC)
+POPULARITY_EPOCH = float(os.getenv("POPULARITY_EPOCH", "1704067200"))
+# Trim the long tail once per this many increments
+TRIM_EVERY = 500
+# Generation length in half-lives; weights stay below 2 ** REBASE_HALF_LIVES
+REBASE_HALF_LIVES = 4
+
+
+class PopularityRanking:
+    """
+    Incrementally maintained, time-decayed popularity of searched symbols.
+
+    Failures are logged and swallowed: popularity only influences ranking,
+    so a Redis hiccup must never fail a search.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        key: str = POPULARITY_KEY,
+        half_life_hours: float = POPULARITY_HALF_LIFE_HOURS,
+        max_members: int = POPULARITY_MAX_MEMBERS,
+        epoch: float = POPULARITY_EPOCH,
+    ):
+        """
+        Initialize popularity ranking.
+
+        Args:
+            redis_client: Async Redis client
+            key: Sorted set key
+            half_life_hours: Time after which a search counts half as much
+            max_members: Number of members kept; the long tail is trimmed
+            epoch: Unix time generations are counted from
+        """
+        self.redis = redis_client
+        self.key = key
+        self.half_life_seconds = half_life_hours * 3600
+        self.generation_seconds = self.half_life_seconds * REBASE_HALF_LIVES
+        self.max_members = max_members
+        self.epoch = epoch
+        self._increments = 0
+        # Generation this process has already migrated into
+        self._generation: Optional[int] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def _generation_at(self, now: float) -> int:
+        """Generation number containing `now`."""
+        return int((now - self.epoch) // self.generation_seconds)
+
+    def _weight(self, now: Optional[float] = None) -> float:
+        """Forward-decay weight of an event at `now`, relative to its generation."""
+        now = time.time() if now is None else now
+        start = self.epoch + self._generation_at(now) * self.generation_seconds
+        return 2.0 ** ((now - start) / self.half_life_seconds)
+
+    def _generation_key(self, generation: int) -> str:
+        return f"{self.key}:{generation}"
+
+    async def _current_key(self, now: float) -> str:
+        """
+        Sorted set of the current generation, carrying the previous one over.
+
+        Exactly one process wins the migration marker and merges the
+        previous generation in; increments written before the merge are
+        kept because the merge includes the destination set.
+        """
+        generation = self._generation_at(now)
+        key = self._generation_key(generation)
+        if self._generation == generation:
+            return key
+
+        previous = self._generation_key(generation - 1)
+        if await self.redis.set(f"{key}:migrated", 1, nx=True, ex=int(self.generation_seconds) * 2):
+            factor = 2.0 ** -REBASE_HALF_LIVES
+            await self.redis.zunionstore(key, {key: 1, previous: factor})
+            await self.redis.expire(previous, int(self.generation_seconds))
+            logger.info(f"Rebased popularity ranking into generation {generation}")
+        self._generation = generation
+        return key
+
+    async def record(self, member: str) -> None:
+        """
+        Count one search for a member.
+
+        Args:
+            member: Normalized query or symbol (upper case)
+        """
+        try:
+            now = time.time()
+            key = await self._current_key(now)
+            await self.redis.zincrby(key, self._weight(now), member)
+            self._increments += 1
+            if self._increments % TRIM_EVERY == 0:
+                await self.trim()
+        except Exception as e:
+            logger.warning(f"Failed to record popularity for {member}: {e}")
+
+    def record_nowait(self, member: str) -> None:
+        """
+        Schedule record() in the background, off the search path.
+
+        Does nothing when no event loop is running.
+
+        Args:
+            member: Normalized query or symbol (upper case)
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug(f"No running event loop, skipping popularity for {member}")
+            return
+
+        task = loop.create_task(self.record(member))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def seed(self, counts: Dict[str, int]) -> int:
+        """
+        Seed the ranking from historical counts without overwriting.
+
+        Args:
+            counts: Mapping of member to search count
+
+        Returns:
+            Number of members added
+        """
+        if not counts:
+            return 0
+        now = time.time()
+        key = await self._current_key(now)
+        weight = self._weight(now)
+        added = await self.redis.zadd(
+            key, {member: count * weight for member, count in counts.items()}, nx=True
+        )
+        return int(added or 0)
+
+    async def trim(self) -> None:
+        """Drop the least popular members beyond max_members."""
+        key = await self._current_key(time.time())
+        await self.redis.zremrangebyrank(key, 0, -(self.max_members + 1))
+
+    async def size(self) -> int:
+        """Number of ranked members."""
+        return await self.redis.zcard(await self._current_key(time.time()))
+
+    async def top(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Get the most popular members with their decayed counts.
+
+        Args:
+            limit: Number of members
+
+        Returns:
+            List of (member, decayed count), most popular first
+        """
+        now = time.time()
+        key = await self._current_key(now)
+        rows: Iterable = await self.redis.zrevrange(key, 0, limit - 1, withscores=True)
+        weight = self._weight(now)
+        return [
+            (member.decode() if isinstance(member, bytes) else member, score / weight)
+            for member, score in rows
+        ]
+
+    async def get_scores(self, limit: int = 1000) -> Dict[str, float]:
+        """
+        Get decayed counts of the top members for relevance scoring.
+
+        Args:
+            limit: Number of members
+
+        Returns:
+            Mapping of member to decayed count
+        """
+        try:
+            return dict(await self.top(limit))
+        except Exception as e:
+            logger.warning(f"Failed to read popularity ranking: {e}")
+            return {}
@@ -0,0 +1,496 @@
+"""
+Tiered cache for stock report pages.
+
+Reports are looked up tier by tier and promoted on the way back:
+- L0: in-process LRU (serves the common case without I/O)
+- L1: Redis, zlib-compressed JSON shared by all replicas
+- L2: PostgreSQL stock_report_cache rows (read and written in a worker
+  thread with a dedicated session)
+
+Every entry records when it was built. Entries younger than the TTL are
+fresh; entries within the stale window are still served, flagged stale,
+and trigger one background rebuild per symbol (stale-while-revalidate).
+Older entries are only used as a last resort when upstream fails.
+
+A background loop also rebuilds the reports of popular symbols shortly
+before they go stale, so report pages for hot symbols stay in memory.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from cachetools import LRUCache  # type: ignore[import-untyped]
+from redis.asyncio import Redis
+
+from app.metrics import track_cache_hit, track_cache_miss, track_cache_stale_hit
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+REPORT_CACHE_TTL_SECONDS = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "300"))
+REPORT_CACHE_STALE_SECONDS = int(os.getenv("REPORT_CACHE_STALE_SECONDS", "3600"))
+REPORT_CACHE_MEMORY_SIZE = int(os.getenv("REPORT_CACHE_MEMORY_SIZE", "1000"))
+REPORT_REBUILD_INTERVAL_SECONDS = int(os.getenv("REPORT_REBUILD_INTERVAL_SECONDS", "60"))
+REPORT_REBUILD_TOP_N = int(os.getenv("REPORT_REBUILD_TOP_N", "50"))
+
+REDIS_KEY_PREFIX = "report:"
+
+# Builds a flat report dict for a symbol (blocking; run in a thread)
+ReportBuilder = Callable[[str], Optional[Dict[str, Any]]]
+
+
+def flatten_report(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert upstream report data into the flat cached report format.
+
+    Args:
+        report_data: Report data with basic_info, price_change_1d,
+            week_52_range and price_history_7d
+
+    Returns:
+        Flat report dict as consumed by the cached report response
+    """
+    basic_info = report_data["basic_info"]
+    return {
+        "symbol": basic_info["symbol"].upper(),
+        "name": basic_info["name"],
+        "isin": basic_info.get("isin"),
+        "wkn": basic_info.get("wkn"),
+        "current_price": basic_info["current_price"],
+        "currency": basic_info.get("currency", "USD"),
+        "exchange": basic_info.get("exchange", ""),
+        "market_cap": basic_info.get("market_cap"),
+        "sector": basic_info.get("sector"),
+        "industry": basic_info.get("industry"),
+        "price_change_1d": report_data.get("price_change_1d"),
+        "week_52_range": report_data.get("week_52_range"),
+        "price_history_7d": report_data.get("price_history_7d", []),
+        "data_source": basic_info.get("source", "yahoo"),
+    }
+
+
+def encode_entry(report: Dict[str, Any], built_at: float) -> bytes:
+    """Serialize and compress a cache entry for Redis."""
+    payload = json.dumps({"built_at": built_at, "report": report}, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"), 6)
+
+
+def decode_entry(blob: Union[bytes, str]) -> Tuple[Dict[str, Any], float]:
+    """Decompress and deserialize a Redis cache entry."""
+    if isinstance(blob, str):
+        # Clients decoding responses hand back text; latin-1 maps it back byte for byte
+        blob = blob.encode("latin-1")
+    entry = json.loads(zlib.decompress(blob))
+    return entry["report"], entry["built_at"]
+
+
+class ReportCache:
+    """
+    L0 memory -> L1 Redis -> L2 PostgreSQL report cache.
+
+    Redis and PostgreSQL tiers are optional; without them the cache is a
+    memory-only LRU.
+    """
+
+    def __init__(
+        self,
+        redis_client: Optional[Redis] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        ttl_seconds: int = REPORT_CACHE_TTL_SECONDS,
+        stale_seconds: int = REPORT_CACHE_STALE_SECONDS,
+        memory_size: int = REPORT_CACHE_MEMORY_SIZE,
+    ):
+        """
+        Initialize report cache.
+
+        Args:
+            redis_client: Async Redis client for the L1 tier
+            session_factory: SQLAlchemy session factory for the L2 tier
+            ttl_seconds: Age up to which a report is fresh
+            stale_seconds: Additional age during which a stale report is served
+            memory_size: Maximum number of reports kept in memory
+        """
+        self.redis = redis_client
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._memory: LRUCache = LRUCache(maxsize=memory_size)
+        self._rebuild_tasks: Dict[str, asyncio.Task] = {}
+        self._popular_task: Optional[asyncio.Task] = None
+        self.stats = {"memory": 0, "redis": 0, "postgresql": 0, "miss": 0, "stale": 0}
+
+    def attach(
+        self,
+        redis_client: Optional[Redis] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        """
+        Attach the shared tiers once they are available.
+
+        Args:
+            redis_client: Async Redis client for the L1 tier
+            session_factory: SQLAlchemy session factory for the L2 tier
+        """
+        if redis_client is not None:
+            self.redis = redis_client
+        if session_factory is not None:
+            self.session_factory = session_factory
+
+    def _age(self, built_at: float) -> float:
+        return time.time() - built_at
+
+    async def get(
+        self, symbol: str, allow_expired: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Look up a report across all tiers.
+
+        Args:
+            symbol: Stock symbol
+            allow_expired: Also return reports older than the stale window
+                (last-resort fallback when upstream fails)
+
+        Returns:
+            (report, stale); report is None on a miss. The report carries a
+            cache_timestamp field with its build time.
+        """
+        symbol = symbol.upper()
+        limit = float("inf") if allow_expired else self.ttl_seconds + self.stale_seconds
+        best: Optional[Tuple[str, Dict[str, Any], float]] = None
+
+        # A stale entry in an upper tier may have been rebuilt by another
+        # replica, so lower tiers are checked before serving it
+        for tier, lookup in (
+            ("memory", self._get_memory),
+            ("redis", self._get_redis),
+            ("postgresql", self._get_postgres),
+        ):
+            entry = await lookup(symbol)
+            if entry is None or self._age(entry[1]) > limit:
+                continue
+            if best is None or entry[1] > best[2]:
+                best = (tier, entry[0], entry[1])
+            if self._age(entry[1]) <= self.ttl_seconds:
+                break
+
+        if best is None:
+            self.stats["miss"] += 1
+            track_cache_miss("report")
+            return None, False
+
+        tier, report, built_at = best
+        if tier != "memory":
+            await self._promote(tier, symbol, report, built_at)
+        stale = self._age(built_at) > self.ttl_seconds
+        self.stats[tier] += 1
+        if stale:
+            self.stats["stale"] += 1
+            track_cache_stale_hit(f"report_{tier}")
+        else:
+            track_cache_hit(f"report_{tier}")
+        return self._with_timestamp(report, built_at), stale
+
+    async def set(
+        self, symbol: str, report: Dict[str, Any], built_at: Optional[float] = None
+    ) -> None:
+        """
+        Store a freshly built report in every tier.
+
+        Args:
+            symbol: Stock symbol
+            report: Flat report dict
+            built_at: Build time (default: now)
+        """
+        symbol = symbol.upper()
+        built_at = time.time() if built_at is None else built_at
+        self._memory[symbol] = (report, built_at)
+        await self._set_redis(symbol, report, built_at)
+        if self.session_factory is not None:
+            try:
+                await asyncio.to_thread(self._write_postgres, symbol, report, built_at)
+            except Exception as e:
+                logger.warning(f"Failed to persist report for {symbol}: {e}")
+
+    def schedule_rebuild(self, symbol: str, builder: ReportBuilder) -> None:
+        """
+        Rebuild a report in the background, at most once at a time per symbol.
+
+        Args:
+            symbol: Stock symbol
+            builder: Blocking report builder, run in a worker thread
+        """
+        symbol = symbol.upper()
+        task = self._rebuild_tasks.get(symbol)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._rebuild(symbol, builder))
+        task.add_done_callback(lambda _: self._rebuild_tasks.pop(symbol, None))
+        self._rebuild_tasks[symbol] = task
+
+    async def _rebuild(self, symbol: str, builder: ReportBuilder) -> bool:
+        """Build a report and store it; keep the old entry on failure."""
+        try:
+            report = await asyncio.to_thread(builder, symbol)
+            if not report:
+                return False
+            await self.set(symbol, report)
+            logger.debug(f"Report rebuilt in background: {symbol}")
+            return True
+        except Exception as e:
+            logger.warning(f"Background report rebuild failed for {symbol}: {e}")
+            return False
+
+    async def rebuild_popular(
+        self, symbols: List[str], builder: ReportBuilder, lead_seconds: float
+    ) -> int:
+        """
+        Rebuild cached reports of popular symbols that are about to go stale.
+
+        Only symbols whose report is already in memory are rebuilt, so
+        popular non-symbol queries never trigger upstream report builds.
+
+        Args:
+            symbols: Popular symbols, most popular first
+            builder: Blocking report builder
+            lead_seconds: Rebuild reports this close to their TTL
+
+        Returns:
+            Number of reports rebuilt
+        """
+        rebuilt = 0
+        for symbol in symbols:
+            entry = self._memory.get(symbol.upper())
+            if entry is None or self._age(entry[1]) < self.ttl_seconds - lead_seconds:
+                continue
+            if await self._rebuild(symbol.upper(), builder):
+                rebuilt += 1
+        return rebuilt
+
+    async def start(
+        self,
+        popular_symbols: Callable[[], Awaitable[List[str]]],
+        builder: ReportBuilder,
+        interval_seconds: int = REPORT_REBUILD_INTERVAL_SECONDS,
+    ) -> None:
+        """
+        Start rebuilding popular reports periodically.
+
+        Args:
+            popular_symbols: Coroutine function returning popular symbols
+            builder: Blocking report builder
+            interval_seconds: Seconds between rebuild passes
+        """
+        if self._popular_task is None or self._popular_task.done():
+            self._popular_task = asyncio.create_task(
+                self._popular_loop(popular_symbols, builder, interval_seconds)
+            )
+
+    async def stop(self) -> None:
+        """Cancel the popular rebuild loop and pending rebuilds."""
+        tasks = list(self._rebuild_tasks.values())
+        if self._popular_task:
+            tasks.append(self._popular_task)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._popular_task = None
+        self._rebuild_tasks.clear()
+
+    async def _popular_loop(
+        self,
+        popular_symbols: Callable[[], Awaitable[List[str]]],
+        builder: ReportBuilder,
+        interval_seconds: int,
+    ) -> None:
+        """Rebuild popular reports every interval, ahead of their TTL."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                symbols = await popular_symbols()
+                rebuilt = await self.rebuild_popular(symbols, builder, interval_seconds)
+                if rebuilt:
+                    logger.info(f"Rebuilt {rebuilt} popular stock reports")
+            except Exception as e:
+                logger.warning(f"Popular report rebuild failed: {e}")
+
+    # Tier access
+
+    async def _get_memory(self, symbol: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        return self._memory.get(symbol)
+
+    async def _get_redis(self, symbol: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        if self.redis is None:
+            return None
+        try:
+            blob = await self.redis.get(REDIS_KEY_PREFIX + symbol)
+            return decode_entry(blob) if blob else None
+        except Exception as e:
+            logger.warning(f"Redis report lookup failed for {symbol}: {e}")
+            return None
+
+    async def _set_redis(self, symbol: str, report: Dict[str, Any], built_at: float) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                REDIS_KEY_PREFIX + symbol,
+                encode_entry(report, built_at),
+                ex=max(1, int(self.ttl_seconds + self.stale_seconds - self._age(built_at))),
+            )
+        except Exception as e:
+            logger.warning(f"Redis report write failed for {symbol}: {e}")
+
+    async def _get_postgres(self, symbol: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        if self.session_factory is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._read_postgres, symbol)
+        except Exception as e:
+            logger.warning(f"PostgreSQL report lookup failed for {symbol}: {e}")
+            return None
+
+    async def _promote(
+        self, tier: str, symbol: str, report: Dict[str, Any], built_at: float
+    ) -> None:
+        """Copy an entry found in a lower tier into the tiers above it."""
+        self._memory[symbol] = (report, built_at)
+        if tier == "postgresql":
+            await self._set_redis(symbol, report, built_at)
+
+    @staticmethod
+    def _with_timestamp(report: Dict[str, Any], built_at: float) -> Dict[str, Any]:
+        timestamp = datetime.fromtimestamp(built_at, tz=timezone.utc).isoformat()
+        return {**report, "cache_timestamp": timestamp}
+
+    def _read_postgres(self, symbol: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Read a report row (blocking)."""
+        from app.models import StockReportCache
+
+        session_factory = self.session_factory
+        if session_factory is None:
+            return None
+        db = session_factory()
+        try:
+            row = db.query(StockReportCache).filter(StockReportCache.symbol == symbol).first()
+            if row is None:
+                return None
+            report = {
+                "symbol": row.symbol,
+                "name": row.name,
+                "isin": row.isin,
+                "wkn": row.wkn,
+                "current_price": row.current_price,
+                "currency": row.currency,
+                "exchange": row.exchange,
+                "market_cap": row.market_cap,
+                "sector": row.sector,
+                "industry": row.industry,
+                "price_change_1d": (
+                    {
+                        "absolute": row.price_change_absolute,
+                        "percentage": row.price_change_percentage,
+                        "direction": row.price_change_direction,
+                    }
+                    if row.price_change_direction
+                    else None
+                ),
+                "week_52_range": (
+                    {
+                        "high": row.week_52_high,
+                        "low": row.week_52_low,
+                        "high_date": row.week_52_high_date,
+                        "low_date": row.week_52_low_date,
+                    }
+                    if row.week_52_high is not None
+                    else None
+                ),
+                "price_history_7d": json.loads(row.price_history_7d or "[]"),
+                "data_source": row.data_source,
+            }
+            built_at = row.updated_at.replace(tzinfo=timezone.utc).timestamp()
+            return report, built_at
+        finally:
+            db.close()
+
+    def _write_postgres(self, symbol: str, report: Dict[str, Any], built_at: float) -> None:
+        """Upsert a report row (blocking)."""
+        from app.models import StockReportCache
+
+        built = datetime.fromtimestamp(built_at, tz=timezone.utc).replace(tzinfo=None)
+        price_change = report.get("price_change_1d") or {}
+        week_52 = report.get("week_52_range") or {}
+        values = {
+            "isin": report.get("isin"),
+            "wkn": report.get("wkn"),
+            "name": report["name"],
+            "current_price": report["current_price"],
+            "currency": report.get("currency", "USD"),
+            "exchange": report.get("exchange", ""),
+            "market_cap": report.get("market_cap"),
+            "sector": report.get("sector"),
+            "industry": report.get("industry"),
+            "price_change_absolute": price_change.get("absolute"),
+            "price_change_percentage": price_change.get("percentage"),
+            "price_change_direction": price_change.get("direction"),
+            "week_52_high": week_52.get("high"),
+            "week_52_low": week_52.get("low"),
+            "week_52_high_date": week_52.get("high_date"),
+            "week_52_low_date": week_52.get("low_date"),
+            "price_history_7d": json.dumps(report.get("price_history_7d", [])),
+            "data_source": report.get("data_source", "yahoo"),
+            "updated_at": built,
+            "expires_at": built + timedelta(seconds=self.ttl_seconds),
+        }
+
+        session_factory = self.session_factory
+        if session_factory is None:
+            return
+        db = session_factory()
+        try:
+            row = db.query(StockReportCache).filter(StockReportCache.symbol == symbol).first()
+            if row is None:
+                db.add(StockReportCache(symbol=symbol, created_at=built, **values))
+            else:
+                for name, value in values.items():
+                    setattr(row, name, value)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_stats(self) -> dict:
+        """Get report cache statistics."""
+        return {
+            "memory_size": len(self._memory),
+            "memory_max_size": self._memory.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "stale_seconds": self.stale_seconds,
+            "redis_enabled": self.redis is not None,
+            "postgresql_enabled": self.session_factory is not None,
+            "pending_rebuilds": len(self._rebuild_tasks),
+            "served": dict(self.stats),
+        }
+
+
+# Singleton instance
+_report_cache: Optional[ReportCache] = None
+
+
+def get_report_cache() -> ReportCache:
+    """Get or create the report cache singleton."""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache()
+    return _report_cache
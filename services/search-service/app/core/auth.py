@@ -19,6 +19,11 @@ security = HTTPBearer(auto_error=False)
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
 
+# Comma-separated emails granted admin access (operational endpoints)
+ADMIN_EMAILS = {
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+}
+
 
 # Type alias for user context dict (used by some routers)
 class UserContext(TypedDict, total=False):
@@ -41,15 +46,22 @@ class User:
         id: User UUID from auth-service
         email: User email address
         tier: Subscription tier (anonymous, free, paid, enterprise)
+        role: Access role (user, admin)
         is_authenticated: Whether user is authenticated
     """
 
-    def __init__(self, id: str, email: str, tier: str):
+    def __init__(self, id: str, email: str, tier: str, role: str = "user"):
         self.id = id
         self.email = email
         self.tier = tier
+        self.role = role
         self.is_authenticated = True
 
+    @property
+    def is_admin(self) -> bool:
+        """Whether the user has an admin role or a configured admin email."""
+        return self.role == "admin" or self.email.lower() in ADMIN_EMAILS
+
     def __repr__(self) -> str:
         return f"User(id={self.id}, email={self.email}, tier={self.tier})"
 
@@ -126,12 +138,13 @@ async def get_current_user(
     user_id = payload.get("sub")
     email = payload.get("email")
     tier = payload.get("tier", "free")
+    role = payload.get("role", "user")
 
     if not user_id or not email:
         logger.warning("Invalid token payload - missing user_id or email")
         return None
 
-    user = User(id=user_id, email=email, tier=tier)
+    user = User(id=user_id, email=email, tier=tier, role=role)
     logger.info("User authenticated", user_id=user_id, tier=tier)
 
     return user
@@ -197,3 +210,29 @@ async def require_paid_tier(user: User = Depends(require_authentication)) -> Use
             detail="This feature requires a paid subscription. Upgrade at /upgrade",
         )
     return user
+
+
+async def require_admin(user: User = Depends(require_authentication)) -> User:
+    """
+    Require admin access.
+
+    Use this dependency for operational endpoints (profiling, diagnostics).
+    Raises 403 if the user has neither the admin role nor an email listed
+    in ADMIN_EMAILS.
+
+    Args:
+        user: Authenticated user from require_authentication
+
+    Returns:
+        Admin User object
+
+    Raises:
+        HTTPException: 403 if user is not an admin
+    """
+    if not user.is_admin:
+        logger.warning("Admin access denied", user_id=user.id)
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return user
@@ -7,7 +7,7 @@ and relevance ranking for stock symbol search.
 
 import logging
 import os
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 from meilisearch_python_sdk import AsyncClient
 from meilisearch_python_sdk.errors import MeilisearchError
@@ -174,6 +174,7 @@ class MeilisearchClientManager:
         query: str,
         limit: int = 10,
         filters: Optional[str] = None,
+        raise_errors: bool = False,
     ) -> list[dict[str, Any]]:
         """
         Perform autocomplete search.
@@ -182,6 +183,8 @@ class MeilisearchClientManager:
             query: Search query
             limit: Maximum results (default 10)
             filters: Optional filter expression
+            raise_errors: Re-raise Meilisearch errors instead of returning []
+                (used by the local fallback to detect outages)
 
         Returns:
             List of matching stocks
@@ -200,19 +203,24 @@ class MeilisearchClientManager:
 
         except MeilisearchError as e:
             logger.error("Autocomplete search failed: %s", e)
+            if raise_errors:
+                raise
             return []
 
     async def add_documents(
         self,
         documents: list[dict[str, Any]],
         primary_key: str = "symbol",
-    ) -> None:
+    ) -> int:
         """
         Add or update documents in index.
 
         Args:
             documents: List of stock documents
             primary_key: Primary key field
+
+        Returns:
+            Uid of the enqueued indexing task
         """
         try:
             client = await self.get_client()
@@ -229,17 +237,21 @@ class MeilisearchClientManager:
                 self.config.index_name,
                 task.task_uid,
             )
+            return task.task_uid
 
         except MeilisearchError as e:
             logger.error("Failed to add documents: %s", e)
             raise
 
-    async def delete_documents(self, document_ids: list[str]) -> None:
+    async def delete_documents(self, document_ids: list[str]) -> int:
         """
         Delete documents from index.
 
         Args:
             document_ids: List of document IDs to delete
+
+        Returns:
+            Uid of the enqueued deletion task
         """
         try:
             client = await self.get_client()
@@ -253,11 +265,66 @@ class MeilisearchClientManager:
                 self.config.index_name,
                 task.task_uid,
             )
+            return task.task_uid
 
         except MeilisearchError as e:
             logger.error("Failed to delete documents: %s", e)
             raise
 
+    async def wait_for_task(self, task_uid: int, timeout_ms: Optional[int] = 60000) -> bool:
+        """
+        Wait until an enqueued task has been processed.
+
+        Args:
+            task_uid: Task uid returned by add_documents/delete_documents
+            timeout_ms: Maximum wait in milliseconds (None waits indefinitely)
+
+        Returns:
+            True if the task succeeded, False if it failed or was canceled
+
+        Raises:
+            MeilisearchTimeoutError: If the task is not finished within the timeout
+        """
+        client = await self.get_client()
+        result = await client.wait_for_task(task_uid, timeout_in_ms=timeout_ms)
+
+        if result.status != "succeeded":
+            logger.error(
+                "Meilisearch task %s finished with status %s: %s",
+                task_uid,
+                result.status,
+                result.error,
+            )
+            return False
+        return True
+
+    async def iter_documents(
+        self,
+        fields: Optional[list[str]] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over all documents in the index page by page.
+
+        Args:
+            fields: Only return these fields (default: all)
+            batch_size: Documents fetched per request
+
+        Yields:
+            Index documents
+        """
+        client = await self.get_client()
+        index = client.index(self.config.index_name)
+
+        offset = 0
+        while True:
+            page = await index.get_documents(offset=offset, limit=batch_size, fields=fields)
+            for document in page.results:
+                yield document
+            offset += len(page.results)
+            if not page.results or offset >= page.total:
+                break
+
     async def get_index_stats(self) -> dict[str, Any]:
         """
         Get index statistics.
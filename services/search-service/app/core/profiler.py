@@ -0,0 +1,264 @@
+"""
+On-demand sampling profiler for a running search-service worker.
+
+Nothing is installed while no profile is running, so the profiler can stay
+enabled in production. A profile run for N seconds:
+
+- Samples the event loop thread's stack from a background thread every few
+  milliseconds and aggregates the stacks in collapsed format
+  ("frame;frame;frame count"), which flamegraph.pl and speedscope read
+  directly.
+- Measures event-loop lag: how late a periodic sleep wakes up.
+- Times every callback the event loop runs (each coroutine step is one
+  callback) and keeps the slowest ones.
+
+Callback timing hooks asyncio.Handle._run, so it only covers the default
+asyncio loop, not uvloop.
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+PROFILER_MAX_DEPTH = int(os.getenv("PROFILER_MAX_DEPTH", "64"))
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+@dataclass
+class ProfileResult:
+    """
+    Result of one profiling run.
+
+    Attributes:
+        duration_seconds: Wall time profiled
+        interval_ms: Stack sampling interval
+        samples: Number of stack samples taken
+        stacks: Collapsed stack -> sample count
+        loop_lag_ms: Event-loop lag measurements in milliseconds
+        slow_steps: (duration ms, description) of the slowest loop callbacks
+    """
+
+    duration_seconds: float
+    interval_ms: float
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    loop_lag_ms: List[float] = field(default_factory=list)
+    slow_steps: List[Tuple[float, str]] = field(default_factory=list)
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, most frequent first."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def loop_lag_summary(self) -> Dict[str, float]:
+        """Summary statistics of the event-loop lag."""
+        if not self.loop_lag_ms:
+            return {"count": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        lags = sorted(self.loop_lag_ms)
+        return {
+            "count": len(lags),
+            "mean_ms": round(sum(lags) / len(lags), 3),
+            "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 3),
+            "max_ms": round(lags[-1], 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the result for the admin API."""
+        return {
+            "duration_seconds": round(self.duration_seconds, 3),
+            "interval_ms": self.interval_ms,
+            "samples": self.samples,
+            "loop_lag": self.loop_lag_summary(),
+            "slow_steps": [
+                {"duration_ms": round(duration, 3), "step": step}
+                for duration, step in self.slow_steps
+            ],
+            "collapsed": self.collapsed(),
+        }
+
+
+def _frame_name(frame) -> str:
+    """Flamegraph frame label: qualified function name and file."""
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, max_depth: int = PROFILER_MAX_DEPTH) -> str:
+    """
+    Collapse a frame and its callers into one line, root first.
+
+    Args:
+        frame: Innermost frame
+        max_depth: Frames kept from the innermost frame outwards
+
+    Returns:
+        Semicolon-separated frame labels
+    """
+    names: List[str] = []
+    while frame is not None and len(names) < max_depth:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def describe_step(handle: asyncio.Handle) -> str:
+    """Describe what an event loop callback runs, naming the coroutine of a task step."""
+    callback = getattr(handle, "_callback", None)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return f"{owner.get_name()} {getattr(coro, '__qualname__', repr(coro))}"
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+class EventLoopProfiler:
+    """
+    Statistical profiler for the event loop of this worker.
+
+    Only one profile runs at a time; all hooks are removed when it ends.
+    """
+
+    def __init__(self, max_seconds: float = PROFILER_MAX_SECONDS, top_steps: int = 20):
+        """
+        Initialize profiler.
+
+        Args:
+            max_seconds: Longest allowed profile
+            top_steps: Number of slowest loop callbacks reported
+        """
+        self.max_seconds = max_seconds
+        self.top_steps = top_steps
+        self._lock = asyncio.Lock()
+        self._slow_steps: List[Tuple[float, str]] = []
+        self._original_run: Optional[Callable[[asyncio.Handle], None]] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is in progress."""
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, interval_ms: float = 5.0) -> ProfileResult:
+        """
+        Profile the event loop for a number of seconds.
+
+        Args:
+            seconds: Profile duration, capped at max_seconds
+            interval_ms: Stack sampling and lag probe interval
+
+        Returns:
+            Profile result
+
+        Raises:
+            ProfilerBusyError: If another profile is running
+        """
+        if self._lock.locked():
+            raise ProfilerBusyError("A profile is already running")
+
+        async with self._lock:
+            seconds = min(seconds, self.max_seconds)
+            interval = max(interval_ms, 1.0) / 1000
+            result = ProfileResult(duration_seconds=seconds, interval_ms=interval * 1000)
+
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), interval, stop, result),
+                name="event-loop-sampler",
+                daemon=True,
+            )
+            lag_probe = asyncio.create_task(self._probe_lag(interval, result))
+
+            logger.info(f"Profiling event loop for {seconds}s at {interval * 1000}ms")
+            start = time.perf_counter()
+            self._install_step_timer()
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                self._remove_step_timer()
+                lag_probe.cancel()
+                try:
+                    await lag_probe
+                except asyncio.CancelledError:
+                    pass
+                await asyncio.to_thread(sampler.join)
+
+            result.duration_seconds = time.perf_counter() - start
+            result.slow_steps = sorted(self._slow_steps, reverse=True)
+            self._slow_steps = []
+            return result
+
+    @staticmethod
+    def _sample(thread_id: int, interval: float, stop: threading.Event, result: ProfileResult):
+        """Sample the event loop thread's stack until stopped."""
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            result.stacks[collapse_stack(frame)] += 1
+            result.samples += 1
+
+    @staticmethod
+    async def _probe_lag(interval: float, result: ProfileResult) -> None:
+        """Record how late a periodic sleep wakes up."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            result.loop_lag_ms.append(max(0.0, loop.time() - expected) * 1000)
+
+    def _install_step_timer(self) -> None:
+        """Time every event loop callback while profiling."""
+        original_run = asyncio.events.Handle._run
+        self._original_run = original_run
+        profiler = self
+
+        def timed_run(handle):
+            start = time.perf_counter()
+            try:
+                return original_run(handle)
+            finally:
+                profiler._record_step(handle, (time.perf_counter() - start) * 1000)
+
+        # setattr: mypy rejects assigning to a method
+        setattr(asyncio.events.Handle, "_run", timed_run)
+
+    def _remove_step_timer(self) -> None:
+        """Restore the original event loop callback runner."""
+        if self._original_run is not None:
+            setattr(asyncio.events.Handle, "_run", self._original_run)
+            self._original_run = None
+
+    def _record_step(self, handle: asyncio.Handle, duration_ms: float) -> None:
+        """Keep a callback if it is among the slowest seen so far."""
+        if len(self._slow_steps) < self.top_steps:
+            heapq.heappush(self._slow_steps, (duration_ms, describe_step(handle)))
+        elif duration_ms > self._slow_steps[0][0]:
+            heapq.heapreplace(self._slow_steps, (duration_ms, describe_step(handle)))
+
+
+# Singleton instance
+_profiler: Optional[EventLoopProfiler] = None
+
+
+def get_profiler() -> EventLoopProfiler:
+    """Get or create the event loop profiler singleton."""
+    global _profiler
+    if _profiler is None:
+        _profiler = EventLoopProfiler()
+    return _profiler
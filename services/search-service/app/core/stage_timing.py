@@ -0,0 +1,153 @@
+"""
+Per-stage latency instrumentation for the search hot path.
+
+Each stage of a search (memory lookup, Redis, PostgreSQL exact lookup,
+name search, fuzzy matching, scoring, history write, upstream fetch) is
+timed with the stage() context manager. Every timing is recorded in the
+search_stage_latency_seconds histogram, with an exemplar carrying the
+current OpenTelemetry trace ID so a slow bucket links to a trace.
+
+Within an HTTP request, ServerTimingMiddleware also collects the stage
+timings and returns them in a Server-Timing header, e.g.:
+
+    Server-Timing: redis;dur=0.8, postgres_exact;dur=4.1, total;dur=6.3
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from fastapi import Request
+from prometheus_client import Histogram
+from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger(__name__)
+
+# OpenTelemetry is optional; without it no exemplars are attached
+try:
+    from opentelemetry import trace
+
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+STAGES = (
+    "memory",
+    "redis",
+    "postgres_exact",
+    "name_search",
+    "fuzzy",
+    "scoring",
+    "history_write",
+    "upstream",
+)
+
+search_stage_latency_seconds = Histogram(
+    "search_stage_latency_seconds",
+    "Search pipeline latency per stage in seconds",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# Stage durations (ms) of the current request, if it is being collected
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "search_stage_timings", default=None
+)
+
+
+def _trace_exemplar() -> Optional[Dict[str, str]]:
+    """Exemplar labels linking to the current trace, if one is sampled."""
+    if not OTEL_AVAILABLE:
+        return None
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid:
+        return None
+    return {"trace_id": format(context.trace_id, "032x")}
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """
+    Record one stage duration.
+
+    Args:
+        name: Stage name (see STAGES)
+        seconds: Duration in seconds
+    """
+    search_stage_latency_seconds.labels(stage=name).observe(
+        seconds, exemplar=_trace_exemplar()
+    )
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds * 1000
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block as a search pipeline stage.
+
+    Works around awaits; failed stages are recorded too.
+
+    Args:
+        name: Stage name (see STAGES)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def format_server_timing(timings: Dict[str, float], total_ms: float) -> str:
+    """
+    Format stage timings as a Server-Timing header value.
+
+    Args:
+        timings: Milliseconds per stage
+        total_ms: Total request duration in milliseconds
+
+    Returns:
+        Header value, stages in pipeline order followed by total
+    """
+    order = {name: i for i, name in enumerate(STAGES)}
+    entries = [
+        f"{name};dur={duration:.1f}"
+        for name, duration in sorted(timings.items(), key=lambda item: order.get(item[0], 99))
+    ]
+    entries.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware adding a Server-Timing header with search stage timings.
+
+    Only responses for which at least one stage was recorded get the
+    header, so unrelated endpoints are left untouched.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        """
+        Collect stage timings for the request and expose them.
+
+        Args:
+            request: Incoming HTTP request
+            call_next: Next middleware or route handler
+
+        Returns:
+            HTTP response
+        """
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _request_timings.reset(token)
+
+        if timings:
+            total_ms = (time.perf_counter() - start) * 1000
+            response.headers["Server-Timing"] = format_server_timing(timings, total_ms)
+        return response
@@ -253,6 +253,7 @@ class Stock:
     data_source: DataSource
     last_updated: datetime
     cache_age_seconds: Optional[int] = None
+    stale: bool = False
 
     def is_stale(self, max_age_seconds: int = 300) -> bool:
         """
@@ -337,4 +338,5 @@ class Stock:
             "data_source": self.data_source.value,
             "last_updated": self.last_updated.isoformat(),
             "cache_age_seconds": self.cache_age_seconds,
+            "stale": self.stale,
         }
@@ -120,3 +120,21 @@ class CircuitBreakerOpenException(SearchServiceException):
                 "retry_after": retry_after,
             },
         )
+
+
+class BulkheadFullException(SearchServiceException):
+    """Raised when a bulkhead has no free slot and its wait queue is full."""
+
+    def __init__(self, service: str, max_concurrent: int, max_queued: int):
+        message = (
+            f"Bulkhead full for '{service}': {max_concurrent} calls in flight, "
+            f"{max_queued} queued"
+        )
+        super().__init__(
+            message=message,
+            details={
+                "service": service,
+                "max_concurrent": max_concurrent,
+                "max_queued": max_queued,
+            },
+        )
@@ -3,16 +3,22 @@ Circuit breaker implementation for fault tolerance.
 
 Prevents cascading failures by temporarily blocking requests to failing services.
 Includes Prometheus metrics for observability.
+
+CircuitBreaker wraps synchronous calls. AsyncCircuitBreaker wraps coroutines
+and adds a bulkhead (bounded concurrency with a bounded wait queue) and a
+half-open state that admits exactly one probe request.
 """
 
+import asyncio
 import logging
 from datetime import datetime
 from enum import Enum
-from typing import Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from prometheus_client import Counter, Gauge
 
-from ..domain.exceptions import CircuitBreakerOpenException
+from ..domain.exceptions import (BulkheadFullException,
+                                 CircuitBreakerOpenException)
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +56,18 @@ circuit_breaker_state_changes = Counter(
     ["name", "from_state", "to_state"],
 )
 
+bulkhead_in_flight = Gauge(
+    "bulkhead_in_flight",
+    "Number of calls currently executing inside a bulkhead",
+    ["name"],
+)
+
+bulkhead_rejections = Counter(
+    "bulkhead_rejections_total",
+    "Total number of calls rejected because the bulkhead queue was full",
+    ["name"],
+)
+
 
 class CircuitBreaker:
     """
@@ -109,27 +127,9 @@ class CircuitBreaker:
         """
         if self.state == CircuitState.OPEN:
             if self._should_attempt_recovery():
-                logger.info(f"Circuit breaker '{self.name}' entering HALF_OPEN state")
-                old_state = self.state
-                self.state = CircuitState.HALF_OPEN
-                self.success_count = 0
-                self._update_state_metric()
-                circuit_breaker_state_changes.labels(
-                    name=self.name,
-                    from_state=old_state.value,
-                    to_state=self.state.value,
-                ).inc()
+                self._enter_half_open()
             else:
-                retry_after = self._get_retry_after_seconds()
-                logger.warning(
-                    f"Circuit breaker '{self.name}' is OPEN, "
-                    f"retry after {retry_after}s"
-                )
-                raise CircuitBreakerOpenException(
-                    service=self.name,
-                    failure_count=self.failure_count,
-                    retry_after=retry_after,
-                )
+                self._raise_open()
 
         try:
             result = func(*args, **kwargs)
@@ -139,6 +139,33 @@ class CircuitBreaker:
             self._on_failure()
             raise
 
+    def _enter_half_open(self):
+        """Transition from OPEN to HALF_OPEN to test recovery."""
+        logger.info(f"Circuit breaker '{self.name}' entering HALF_OPEN state")
+        old_state = self.state
+        self.state = CircuitState.HALF_OPEN
+        self.success_count = 0
+        self._update_state_metric()
+        circuit_breaker_state_changes.labels(
+            name=self.name,
+            from_state=old_state.value,
+            to_state=self.state.value,
+        ).inc()
+
+    def _raise_open(self, retry_after: Optional[int] = None):
+        """Reject a call while the circuit is open."""
+        if retry_after is None:
+            retry_after = self._get_retry_after_seconds()
+        logger.warning(
+            f"Circuit breaker '{self.name}' is {self.state.value.upper()}, "
+            f"retry after {retry_after}s"
+        )
+        raise CircuitBreakerOpenException(
+            service=self.name,
+            failure_count=self.failure_count,
+            retry_after=retry_after,
+        )
+
     def _on_success(self):
         """Handle successful call."""
         self.failure_count = 0
@@ -255,3 +282,188 @@ class CircuitBreaker:
                 else None
             ),
         }
+
+
+class AsyncCircuitBreaker(CircuitBreaker):
+    """
+    Circuit breaker for coroutines with a concurrency bulkhead.
+
+    - CLOSED: calls pass through the bulkhead
+    - OPEN: calls are rejected without touching the bulkhead
+    - HALF_OPEN: a single probe call is admitted; its success closes the
+      circuit, its failure reopens it, and other calls are rejected
+      while it is in flight
+
+    The bulkhead caps concurrent calls at max_concurrent. Up to max_queued
+    callers may wait for a slot; further callers are rejected with
+    BulkheadFullException instead of piling up on the event loop.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: int = 60,
+        max_concurrent: int = 10,
+        max_queued: int = 50,
+        name: str = "default",
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        """
+        Initialize async circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures before opening circuit
+            recovery_timeout: Seconds to wait before admitting a probe
+            max_concurrent: Maximum calls in flight (bulkhead size)
+            max_queued: Maximum callers waiting for a bulkhead slot
+            name: Circuit breaker name for logging and metrics
+            is_failure: Predicate deciding whether an exception counts as a
+                service failure (default: every exception)
+        """
+        super().__init__(
+            failure_threshold=failure_threshold,
+            recovery_timeout=recovery_timeout,
+            half_open_max_calls=1,
+            name=name,
+        )
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.is_failure = is_failure or (lambda exc: True)
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight = 0
+        self._queued = 0
+        self._probe_in_flight = False
+        self.rejected_calls = 0
+
+    def check(self):
+        """
+        Fail fast if a call would currently be rejected.
+
+        Does not claim the half-open probe, so callers can check before
+        spending other resources (e.g. rate limiter tokens).
+
+        Raises:
+            CircuitBreakerOpenException: If circuit is open or probing
+        """
+        if self.state == CircuitState.OPEN and not self._should_attempt_recovery():
+            self._raise_open()
+        if self.state == CircuitState.HALF_OPEN and self._probe_in_flight:
+            self._raise_open(retry_after=1)
+
+    async def call(  # type: ignore[override]
+        self, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """
+        Await a coroutine function through the breaker and bulkhead.
+
+        Args:
+            func: Coroutine function to execute
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            CircuitBreakerOpenException: If circuit is open or a probe is in flight
+            BulkheadFullException: If no slot is free and the wait queue is full
+            Exception: Any exception from func execution
+        """
+        is_probe = self._admit()
+
+        try:
+            async with self._bulkhead():
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as exc:
+                    if self.is_failure(exc):
+                        self._on_failure()
+                    else:
+                        # The service answered (e.g. 404): it is healthy
+                        self._on_success()
+                    raise
+                self._on_success()
+                return result
+        finally:
+            if is_probe:
+                self._probe_in_flight = False
+
+    def _admit(self) -> bool:
+        """
+        Admit a call or raise.
+
+        Returns:
+            True if the call is the half-open probe
+        """
+        self.check()
+        if self.state == CircuitState.OPEN:
+            self._enter_half_open()
+        if self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def _bulkhead(self) -> "_Bulkhead":
+        """Acquire a bulkhead slot, rejecting if the wait queue is full."""
+        if self._semaphore.locked() and self._queued >= self.max_queued:
+            self.rejected_calls += 1
+            bulkhead_rejections.labels(name=self.name).inc()
+            logger.warning(
+                f"Bulkhead '{self.name}' full: {self._in_flight} in flight, "
+                f"{self._queued} queued"
+            )
+            raise BulkheadFullException(self.name, self.max_concurrent, self.max_queued)
+        return _Bulkhead(self)
+
+    def _on_failure(self):
+        """Handle failed call; late failures do not re-open an open circuit."""
+        if self.state == CircuitState.OPEN:
+            # Call admitted before the circuit opened
+            self.failure_count += 1
+            circuit_breaker_failures.labels(name=self.name).inc()
+            return
+        super()._on_failure()
+
+    def reset(self):
+        """Manually reset circuit breaker to CLOSED state."""
+        super().reset()
+        self._probe_in_flight = False
+
+    def get_status(self) -> dict:
+        """Get current circuit breaker and bulkhead status."""
+        status = super().get_status()
+        status.update(
+            {
+                "in_flight": self._in_flight,
+                "queued": self._queued,
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "rejected_calls": self.rejected_calls,
+            }
+        )
+        return status
+
+
+class _Bulkhead:
+    """Async context manager holding one bulkhead slot."""
+
+    def __init__(self, breaker: AsyncCircuitBreaker):
+        self.breaker = breaker
+
+    async def __aenter__(self):
+        breaker = self.breaker
+        breaker._queued += 1
+        try:
+            await breaker._semaphore.acquire()
+        finally:
+            breaker._queued -= 1
+        breaker._in_flight += 1
+        bulkhead_in_flight.labels(name=breaker.name).set(breaker._in_flight)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        breaker = self.breaker
+        breaker._in_flight -= 1
+        bulkhead_in_flight.labels(name=breaker.name).set(breaker._in_flight)
+        breaker._semaphore.release()
+        return False
@@ -0,0 +1,215 @@
+"""
+Shared pooled HTTP transport for upstream market-data calls.
+
+Every upstream client (MassiveClient, FinancialDataService) borrows its
+httpx.AsyncClient from one pool, keyed by origin, instead of opening its
+own. Requests to the same host therefore share keep-alive connections and
+TLS sessions, so handshakes are paid once per connection rather than per
+client or per call.
+
+Per origin the pool applies:
+- explicit connection limits (max connections, max idle keep-alive
+  connections, keep-alive expiry)
+- HTTP/2 when enabled and the h2 package is installed
+- transparent response decompression (gzip/deflate, plus br/zstd when
+  their decoders are installed) via httpx's Accept-Encoding negotiation
+
+Connection reuse is observable through Prometheus: each request is
+labelled with whether it opened a new connection, and TCP connect and
+TLS handshake durations are recorded.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 support is optional (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# Pool configuration (per origin)
+MAX_CONNECTIONS = int(os.getenv("UPSTREAM_HTTP_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_HTTP_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("UPSTREAM_HTTP_KEEPALIVE_EXPIRY", "60"))
+ENABLE_HTTP2 = os.getenv("UPSTREAM_HTTP2", "true").lower() == "true"
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_HTTP_TIMEOUT", "10"))
+
+
+# Prometheus metrics for connection reuse
+upstream_http_requests = Counter(
+    "upstream_http_requests_total",
+    "Upstream HTTP requests by host, connection reuse and protocol",
+    ["host", "connection", "http_version"],
+)
+
+upstream_http_connect_seconds = Histogram(
+    "upstream_http_connect_seconds",
+    "Time spent establishing upstream connections by phase",
+    ["host", "phase"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+class _ConnectionTrace:
+    """
+    httpcore trace hook recording connection setup for one request.
+
+    Attached to the request's "trace" extension; httpcore reports
+    connect_tcp and start_tls events only when a new connection is opened.
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.new_connection = False
+        self._started: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        prefix, _, step = event_name.rpartition(".")
+        if prefix == "connection.connect_tcp":
+            self.new_connection = True
+            self._observe("tcp", step)
+        elif prefix == "connection.start_tls":
+            self._observe("tls", step)
+
+    def _observe(self, phase: str, step: str) -> None:
+        """Time a connect phase from its started to complete event."""
+        if step == "started":
+            self._started[phase] = time.perf_counter()
+        elif step == "complete" and phase in self._started:
+            upstream_http_connect_seconds.labels(host=self.host, phase=phase).observe(
+                time.perf_counter() - self._started.pop(phase)
+            )
+
+
+async def _attach_trace(request: httpx.Request) -> None:
+    """Request hook: trace connection setup."""
+    request.extensions["trace"] = _ConnectionTrace(request.url.host)
+
+
+async def _record_response(response: httpx.Response) -> None:
+    """Response hook: count the request as new or reused connection."""
+    trace = response.request.extensions.get("trace")
+    if not isinstance(trace, _ConnectionTrace):
+        return
+    upstream_http_requests.labels(
+        host=trace.host,
+        connection="new" if trace.new_connection else "reused",
+        http_version=response.http_version,
+    ).inc()
+
+
+def _origin(base_url: str) -> str:
+    """Normalize a URL to its scheme://host[:port] origin."""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class UpstreamHTTPClientPool:
+    """
+    One pooled httpx.AsyncClient per upstream origin.
+
+    Clients are created lazily and shared by every caller of the same
+    origin. Authentication and other per-caller headers are passed per
+    request, so sharing a client never leaks credentials between callers.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY_SECONDS,
+        http2: bool = ENABLE_HTTP2,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize client pool.
+
+        Args:
+            max_connections: Max open connections per origin
+            max_keepalive_connections: Max idle keep-alive connections per origin
+            keepalive_expiry: Seconds an idle connection is kept open
+            http2: Negotiate HTTP/2 when the h2 package is installed
+            timeout_seconds: Default request timeout
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and H2_AVAILABLE
+        self.timeout = timeout_seconds
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+        if http2 and not H2_AVAILABLE:
+            logger.info("h2 package not installed - upstream HTTP/2 disabled")
+
+    def get_client(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Get the shared client for an origin.
+
+        Args:
+            base_url: Any URL on the upstream origin
+
+        Returns:
+            Pooled AsyncClient with base_url set to the origin
+        """
+        origin = _origin(base_url)
+        client = self._clients.get(origin)
+
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=origin,
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                headers={"User-Agent": "Finio-Search-Service/1.0"},
+                event_hooks={"request": [_attach_trace], "response": [_record_response]},
+            )
+            self._clients[origin] = client
+            logger.info(
+                f"Upstream HTTP pool created for {origin} "
+                f"(max_connections={self.limits.max_connections}, http2={self.http2})"
+            )
+
+        return client
+
+    async def close(self) -> None:
+        """Close every pooled client."""
+        for origin, client in list(self._clients.items()):
+            if not client.is_closed:
+                await client.aclose()
+            logger.info(f"Upstream HTTP pool closed for {origin}")
+        self._clients.clear()
+
+    def get_stats(self) -> dict:
+        """Get pool configuration and open origins."""
+        return {
+            "origins": sorted(self._clients),
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+        }
+
+
+# Singleton instance
+_http_client_pool: Optional[UpstreamHTTPClientPool] = None
+
+
+def get_http_client_pool() -> UpstreamHTTPClientPool:
+    """Get or create the shared upstream HTTP client pool."""
+    global _http_client_pool
+    if _http_client_pool is None:
+        _http_client_pool = UpstreamHTTPClientPool()
+    return _http_client_pool
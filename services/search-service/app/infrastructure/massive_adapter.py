@@ -5,10 +5,14 @@ Wraps MassiveClient to provide the IStockAPIClient interface
 for use with StockSearchService.
 """
 
+import asyncio
+import contextvars
 import logging
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
+
+from cachetools import TTLCache  # type: ignore[import-untyped]
 
 from ..domain.entities import (
     DataSource,
@@ -19,11 +23,37 @@ from ..domain.entities import (
     IdentifierType,
 )
 from ..domain.exceptions import ExternalServiceException, StockNotFoundException
-from .massive_client import MassiveClient, get_massive_client
+from .massive_client import MassiveClient, TickerInfo, get_massive_client
 from .stock_api_client import IStockAPIClient
+from .token_bucket import RequestPriority, request_priority
 
 logger = logging.getLogger(__name__)
 
+# Built-in ISIN/WKN resolution for identifiers the Massive API cannot look up
+# (can be extended)
+ISIN_TICKER_MAP = {
+    "US0378331005": "AAPL",
+    "US5949181045": "MSFT",
+    "US02079K3059": "GOOGL",
+    "US0231351067": "AMZN",
+    "US88160R1014": "TSLA",
+    "US30303M1027": "META",
+    "US67066G1040": "NVDA",
+    "DE0005190003": "BMW.DE",
+    "DE0007664039": "VOW3.DE",
+    "DE0007100000": "MBG.DE",
+}
+
+WKN_TICKER_MAP = {
+    "865985": "AAPL",
+    "870747": "MSFT",
+    "A14Y6F": "GOOGL",
+    "906866": "AMZN",
+    "A1CX3T": "TSLA",
+    "A1JWVX": "META",
+    "918422": "NVDA",
+}
+
 
 class MassiveAPIAdapter(IStockAPIClient):
     """
@@ -33,6 +63,13 @@ class MassiveAPIAdapter(IStockAPIClient):
     while keeping the clean architecture separation.
     """
 
+    # Ticker reference data (name, exchange, description) rarely changes
+    DETAILS_CACHE_SIZE = 5000
+    DETAILS_CACHE_TTL_SECONDS = 24 * 60 * 60
+    # Uncached ticker details fetched before a batch returns; the rest load
+    # in the background so a cold batch stays at one or two upstream calls
+    INLINE_DETAILS_LIMIT = 5
+
     def __init__(self, client: Optional[MassiveClient] = None):
         """
         Initialize the adapter.
@@ -41,6 +78,11 @@ class MassiveAPIAdapter(IStockAPIClient):
             client: MassiveClient instance (creates default if None)
         """
         self.client = client or get_massive_client()
+        self._details_cache: TTLCache = TTLCache(
+            maxsize=self.DETAILS_CACHE_SIZE, ttl=self.DETAILS_CACHE_TTL_SECONDS
+        )
+        self._details_pending: Set[str] = set()
+        self._background_tasks: Set[asyncio.Task] = set()
 
     async def fetch_stock(self, identifier: StockIdentifier) -> Optional[Stock]:
         """
@@ -69,7 +111,7 @@ class MassiveAPIAdapter(IStockAPIClient):
                 return None
 
             # Get ticker details for additional metadata
-            ticker_info = await self.client.get_ticker_details(ticker)
+            ticker_info = await self._get_ticker_details(ticker)
             
             # Convert to domain entity
             return self._convert_to_stock(snapshot, ticker_info, identifier)
@@ -78,6 +120,91 @@ class MassiveAPIAdapter(IStockAPIClient):
             logger.error(f"Failed to fetch stock from Massive API: {e}")
             raise ExternalServiceException("massive", str(e))
 
+    async def fetch_stocks(self, symbols: List[str]) -> Dict[str, Stock]:
+        """
+        Fetch several stocks with batched multi-ticker snapshots.
+
+        Prices come from one snapshot request per chunk of tickers; ticker
+        details are served from the reference-data cache. At most
+        INLINE_DETAILS_LIMIT uncached details are fetched before returning;
+        the other stocks are built from their snapshot alone and their
+        details are loaded in the background at warmup priority.
+
+        Args:
+            symbols: Normalized (uppercase) stock symbols
+
+        Returns:
+            Mapping of symbol to Stock for the symbols that were found
+
+        Raises:
+            ExternalServiceException: If the snapshot request fails
+        """
+        if not symbols:
+            return {}
+
+        try:
+            snapshots = await self.client.get_snapshots(symbols)
+        except Exception as e:
+            logger.error(f"Failed to fetch {len(symbols)} stocks from Massive API: {e}")
+            raise ExternalServiceException("massive", str(e))
+
+        uncached = [symbol for symbol in snapshots if symbol not in self._details_cache]
+        inline = uncached[: self.INLINE_DETAILS_LIMIT]
+        results = await asyncio.gather(
+            *[self._get_ticker_details(symbol) for symbol in inline],
+            return_exceptions=True,
+        )
+        # Started after the inline fetches so they do not compete for tokens
+        self._load_details_later(uncached[self.INLINE_DETAILS_LIMIT :])
+        details: Dict[str, Optional[TickerInfo]] = {}
+        for symbol, result in zip(inline, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Failed to get ticker details for {symbol}: {result}")
+                continue
+            details[symbol] = result
+
+        found: Dict[str, Stock] = {}
+        for symbol, snapshot in snapshots.items():
+            ticker_info = details.get(symbol) or self._details_cache.get(symbol)
+            stock = self._convert_to_stock(snapshot, ticker_info, StockIdentifier(symbol=symbol))
+            if stock:
+                found[symbol] = stock
+
+        logger.info(f"Massive fetch_stocks returned {len(found)}/{len(symbols)} stocks")
+        return found
+
+    async def _get_ticker_details(self, ticker: str) -> Optional[TickerInfo]:
+        """Get ticker details, using the reference-data cache."""
+        if ticker in self._details_cache:
+            return self._details_cache[ticker]
+
+        ticker_info = await self.client.get_ticker_details(ticker)
+        if ticker_info:
+            self._details_cache[ticker] = ticker_info
+        return ticker_info
+
+    def _load_details_later(self, symbols: List[str]) -> None:
+        """Load ticker details in the background, skipping ones already queued."""
+        symbols = [s for s in symbols if s not in self._details_pending]
+        if not symbols:
+            return
+        self._details_pending.update(symbols)
+        # Fresh context: the caller's request deadline must not apply here
+        task = asyncio.create_task(self._load_details(symbols), context=contextvars.Context())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _load_details(self, symbols: List[str]) -> None:
+        """Fetch ticker details one by one at warmup priority."""
+        with request_priority(RequestPriority.WARMUP):
+            for symbol in symbols:
+                try:
+                    await self._get_ticker_details(symbol)
+                except Exception as e:
+                    logger.debug(f"Background ticker details for {symbol} failed: {e}")
+                finally:
+                    self._details_pending.discard(symbol)
+
     async def search_by_name(self, name: str, limit: int = 10) -> List[Stock]:
         """
         Search stocks by company name.
@@ -132,6 +259,11 @@ class MassiveAPIAdapter(IStockAPIClient):
             "service": "massive",
             "status": "healthy" if self.client.api_key else "degraded",
             "api_configured": bool(self.client.api_key),
+            "single_flight": self.client.single_flight.get_stats(),
+            "circuit_breakers": {
+                family: breaker.get_status()
+                for family, breaker in self.client.circuit_breakers.items()
+            },
         }
 
     def _get_ticker_from_identifier(self, identifier: StockIdentifier) -> Optional[str]:
@@ -146,38 +278,16 @@ class MassiveAPIAdapter(IStockAPIClient):
         
         # For ISIN, try known mappings
         if identifier.isin:
-            # Try to find in local mappings (can be extended)
-            isin_mappings = {
-                "US0378331005": "AAPL",
-                "US5949181045": "MSFT",
-                "US02079K3059": "GOOGL",
-                "US0231351067": "AMZN",
-                "US88160R1014": "TSLA",
-                "US30303M1027": "META",
-                "US67066G1040": "NVDA",
-                "DE0005190003": "BMW.DE",
-                "DE0007664039": "VOW3.DE",
-                "DE0007100000": "MBG.DE",
-            }
-            if identifier.isin in isin_mappings:
-                return isin_mappings[identifier.isin]
+            if identifier.isin in ISIN_TICKER_MAP:
+                return ISIN_TICKER_MAP[identifier.isin]
             # For unknown ISINs, log and return None
             logger.warning(f"Unknown ISIN: {identifier.isin}, cannot resolve to ticker")
             return None
         
         # For WKN, try known mappings
         if identifier.wkn:
-            wkn_mappings = {
-                "865985": "AAPL",
-                "870747": "MSFT",
-                "A14Y6F": "GOOGL",
-                "906866": "AMZN",
-                "A1CX3T": "TSLA",
-                "A1JWVX": "META",
-                "918422": "NVDA",
-            }
-            if identifier.wkn in wkn_mappings:
-                return wkn_mappings[identifier.wkn]
+            if identifier.wkn in WKN_TICKER_MAP:
+                return WKN_TICKER_MAP[identifier.wkn]
             logger.warning(f"Unknown WKN: {identifier.wkn}, cannot resolve to ticker")
             return None
         
@@ -27,11 +27,65 @@ from tenacity import (
     wait_exponential,
 )
 
-from .circuit_breaker import CircuitBreaker
-from .rate_limiter import RateLimiter
+from .circuit_breaker import AsyncCircuitBreaker
+from .http_client import UpstreamHTTPClientPool, get_http_client_pool
+from .single_flight import SingleFlight, make_request_key
+from .token_bucket import AsyncTokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Tickers per multi-ticker snapshot request (keeps URLs well under proxy limits)
+SNAPSHOT_CHUNK_SIZE = 250
+
+# Max concurrent upstream calls per endpoint family (bulkhead sizes)
+ENDPOINT_FAMILY_CONCURRENCY = {
+    "snapshot": 8,
+    "aggregates": 4,
+    "reference": 4,
+    "news": 2,
+}
+
+
+def endpoint_family(endpoint: str) -> str:
+    """
+    Map an API path to its endpoint family.
+
+    Each family has its own circuit breaker and bulkhead, so a failing
+    news endpoint cannot open the circuit for quotes.
+
+    Args:
+        endpoint: API endpoint path
+
+    Returns:
+        One of the ENDPOINT_FAMILY_CONCURRENCY keys
+    """
+    if endpoint.startswith("/v2/snapshot"):
+        return "snapshot"
+    if endpoint.startswith("/v2/aggs"):
+        return "aggregates"
+    if endpoint.startswith("/v2/reference/news"):
+        return "news"
+    return "reference"
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Decide whether an exception indicates an unhealthy upstream.
+
+    Client errors (e.g. 404 for an unknown ticker) mean the service
+    answered and do not count towards opening the circuit; 429 does.
+
+    Args:
+        exc: Exception raised by a request
+
+    Returns:
+        True if the exception should count as a failure
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code
+        return status_code >= 500 or status_code == 429
+    return True
+
 
 class MassiveTimespan(str, Enum):
     """Timespan options for aggregate bars."""
@@ -162,10 +216,11 @@ class MassiveClient:
     Massive API client with fault tolerance.
 
     Features:
-    - Circuit breaker for failure protection
+    - Circuit breaker and concurrency bulkhead per endpoint family
     - Rate limiting to respect API limits
+    - Single-flight coalescing of concurrent identical requests
     - Automatic retry with exponential backoff
-    - Async HTTP requests with connection pooling
+    - Async HTTP requests over the shared upstream connection pool
     
     API Base URL: https://api.massive.com
     """
@@ -179,6 +234,7 @@ class MassiveClient:
         max_retries: int = 3,
         rate_limit_requests: int = 5,
         rate_limit_window: int = 1,
+        http_pool: Optional[UpstreamHTTPClientPool] = None,
     ):
         """
         Initialize Massive API client.
@@ -189,6 +245,7 @@ class MassiveClient:
             max_retries: Maximum retry attempts
             rate_limit_requests: Max requests per window
             rate_limit_window: Rate limit window in seconds
+            http_pool: Upstream connection pool (default: shared pool)
         """
         self.api_key = api_key or os.getenv("MASSIVE_API_KEY")
         if not self.api_key:
@@ -197,60 +254,60 @@ class MassiveClient:
         self.timeout = timeout_seconds
         self.max_retries = max_retries
         
-        # Initialize circuit breaker
-        self.circuit_breaker = CircuitBreaker(
-            failure_threshold=5,
-            recovery_timeout=60,
-            name="massive_api",
-        )
+        # Initialize circuit breakers, one per endpoint family
+        self.circuit_breakers: Dict[str, AsyncCircuitBreaker] = {
+            family: AsyncCircuitBreaker(
+                failure_threshold=5,
+                recovery_timeout=60,
+                max_concurrent=max_concurrent,
+                max_queued=max_concurrent * 10,
+                name=f"massive_{family}",
+                is_failure=is_upstream_failure,
+            )
+            for family, max_concurrent in ENDPOINT_FAMILY_CONCURRENCY.items()
+        }
         
-        # Initialize rate limiter
-        self.rate_limiter = RateLimiter(
+        # Initialize rate limiter (prioritized, deadline-aware token bucket)
+        self.rate_limiter = AsyncTokenBucket(
             max_requests=rate_limit_requests,
             window_seconds=rate_limit_window,
             name="massive_api",
         )
         
-        # HTTP client (lazy initialization)
-        self._client: Optional[httpx.AsyncClient] = None
+        # Coalesces concurrent identical GETs into one upstream call
+        self.single_flight = SingleFlight(name="massive_api")
+
+        # Connections are shared with every other client of the same host
+        self._http_pool = http_pool
+        self._headers = {"Authorization": f"Bearer {self.api_key}"}
 
     async def _get_client(self) -> httpx.AsyncClient:
-        """Get or create HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                base_url=self.BASE_URL,
-                timeout=self.timeout,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "User-Agent": "Finio-Search-Service/1.0",
-                },
-            )
-        return self._client
+        """Get the pooled HTTP client for the Massive API host."""
+        return (self._http_pool or get_http_client_pool()).get_client(self.BASE_URL)
 
     async def close(self):
-        """Close HTTP client connections."""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
-            self._client = None
+        """Close HTTP client connections (closes the shared upstream pool)."""
+        await (self._http_pool or get_http_client_pool()).close()
 
-    @retry(
-        retry=retry_if_exception_type(httpx.HTTPStatusError),
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-    )
     async def _request(
         self,
         method: str,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
+        coalesce: bool = False,
     ) -> Dict[str, Any]:
         """
-        Make authenticated API request with retry logic.
+        Make authenticated API request, optionally coalescing duplicates.
+
+        With coalesce enabled, concurrent calls for the same
+        (method, endpoint, params) share one in-flight upstream request,
+        including its retries and rate limiter slot.
 
         Args:
             method: HTTP method
             endpoint: API endpoint path
             params: Query parameters
+            coalesce: Share in-flight result with identical concurrent calls
 
         Returns:
             JSON response data
@@ -261,19 +318,76 @@ class MassiveClient:
         """
         if not self.api_key:
             raise ValueError("Massive API key not configured")
+
+        # Copy so callers' dicts are never mutated (apiKey is added later)
+        params = dict(params) if params else {}
+
+        if not coalesce:
+            return await self._send_request(method, endpoint, params)
+
+        key = make_request_key(method, endpoint, params)
+        return await self.single_flight.do(
+            key, lambda: self._send_request(method, endpoint, params)
+        )
+
+    @retry(
+        retry=retry_if_exception_type(httpx.HTTPStatusError),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+    )
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Send a single authenticated API request with retry logic.
+
+        Args:
+            method: HTTP method
+            endpoint: API endpoint path
+            params: Query parameters (without API key)
+
+        Returns:
+            JSON response data
+
+        Raises:
+            httpx.HTTPStatusError: On API errors
+            CircuitBreakerOpenException: If the endpoint family's circuit is open
+            BulkheadFullException: If too many calls to the family are pending
+            Exception: On connection errors
+        """
+        breaker = self.circuit_breakers[endpoint_family(endpoint)]
+        
+        # Fail fast while the circuit is open, before spending a token
+        breaker.check()
         
-        # Wait for rate limit capacity (non-blocking wait)
-        await self.rate_limiter.wait_and_acquire()
+        # Wait for a token; priority and deadline come from the request context
+        await self.rate_limiter.acquire()
         
-        # Make request through circuit breaker
+        # Make request through the family's circuit breaker and bulkhead
+        return await breaker.call(self._http_request, method, endpoint, params)
+
+    async def _http_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Perform the HTTP request and decode the JSON body."""
         client = await self._get_client()
         
         # Add API key to params if not using header auth
-        if params is None:
-            params = {}
-        params["apiKey"] = self.api_key
+        request_params = {**params, "apiKey": self.api_key}
         
-        response = await client.request(method, endpoint, params=params)
+        response = await client.request(
+            method,
+            endpoint,
+            params=request_params,
+            headers=self._headers,
+            timeout=self.timeout,
+        )
         response.raise_for_status()
         
         return response.json()
@@ -382,6 +496,7 @@ class MassiveClient:
             data = await self._request(
                 "GET",
                 f"/v3/reference/tickers/{ticker.upper()}",
+                coalesce=True,
             )
             
             result = data.get("results", {})
@@ -499,6 +614,58 @@ class MassiveClient:
             logger.error(f"Massive news failed for {ticker}: {e}")
             raise
 
+    @staticmethod
+    def _parse_snapshot(ticker_data: dict, ticker: str) -> StockSnapshot:
+        """
+        Build a StockSnapshot from a snapshot API ticker object.
+
+        Args:
+            ticker_data: Ticker object from a snapshot response
+            ticker: Requested ticker, used if the response omits it
+
+        Returns:
+            Parsed StockSnapshot
+        """
+        day = ticker_data.get("day", {})
+        prev_day = ticker_data.get("prevDay", {})
+        last_trade = ticker_data.get("lastTrade", {})
+        minute = ticker_data.get("min", {})
+        
+        return StockSnapshot(
+            ticker=ticker_data.get("ticker", ticker.upper()),
+            name=None,  # Snapshot doesn't include name
+            
+            # Day data - use 'is not None' to handle zero values correctly
+            day_open=Decimal(str(day.get("o"))) if day.get("o") is not None else None,
+            day_high=Decimal(str(day.get("h"))) if day.get("h") is not None else None,
+            day_low=Decimal(str(day.get("l"))) if day.get("l") is not None else None,
+            day_close=Decimal(str(day.get("c"))) if day.get("c") is not None else None,
+            day_volume=day.get("v"),
+            day_vwap=Decimal(str(day.get("vw"))) if day.get("vw") is not None else None,
+            
+            # Previous day
+            prev_close=Decimal(str(prev_day.get("c"))) if prev_day.get("c") is not None else None,
+            prev_volume=prev_day.get("v"),
+            
+            # Change
+            todays_change=Decimal(str(ticker_data.get("todaysChange"))) if ticker_data.get("todaysChange") is not None else None,
+            todays_change_percent=Decimal(str(ticker_data.get("todaysChangePerc"))) if ticker_data.get("todaysChangePerc") is not None else None,
+            
+            # Last trade
+            last_trade_price=Decimal(str(last_trade.get("p"))) if last_trade.get("p") is not None else None,
+            last_trade_size=last_trade.get("s"),
+            last_trade_timestamp=last_trade.get("t"),
+            
+            # Minute bar
+            minute_open=Decimal(str(minute.get("o"))) if minute.get("o") is not None else None,
+            minute_high=Decimal(str(minute.get("h"))) if minute.get("h") is not None else None,
+            minute_low=Decimal(str(minute.get("l"))) if minute.get("l") is not None else None,
+            minute_close=Decimal(str(minute.get("c"))) if minute.get("c") is not None else None,
+            minute_volume=minute.get("v"),
+            
+            updated=ticker_data.get("updated"),
+        )
+
     async def get_snapshot(self, ticker: str) -> Optional[StockSnapshot]:
         """
         Get current market snapshot for a stock.
@@ -526,51 +693,14 @@ class MassiveClient:
             data = await self._request(
                 "GET",
                 f"/v2/snapshot/locale/us/markets/stocks/tickers/{ticker.upper()}",
+                coalesce=True,
             )
             
             ticker_data = data.get("ticker", {})
             if not ticker_data:
                 return None
             
-            day = ticker_data.get("day", {})
-            prev_day = ticker_data.get("prevDay", {})
-            last_trade = ticker_data.get("lastTrade", {})
-            minute = ticker_data.get("min", {})
-            
-            return StockSnapshot(
-                ticker=ticker_data.get("ticker", ticker.upper()),
-                name=None,  # Snapshot doesn't include name
-                
-                # Day data - use 'is not None' to handle zero values correctly
-                day_open=Decimal(str(day.get("o"))) if day.get("o") is not None else None,
-                day_high=Decimal(str(day.get("h"))) if day.get("h") is not None else None,
-                day_low=Decimal(str(day.get("l"))) if day.get("l") is not None else None,
-                day_close=Decimal(str(day.get("c"))) if day.get("c") is not None else None,
-                day_volume=day.get("v"),
-                day_vwap=Decimal(str(day.get("vw"))) if day.get("vw") is not None else None,
-                
-                # Previous day
-                prev_close=Decimal(str(prev_day.get("c"))) if prev_day.get("c") is not None else None,
-                prev_volume=prev_day.get("v"),
-                
-                # Change
-                todays_change=Decimal(str(ticker_data.get("todaysChange"))) if ticker_data.get("todaysChange") is not None else None,
-                todays_change_percent=Decimal(str(ticker_data.get("todaysChangePerc"))) if ticker_data.get("todaysChangePerc") is not None else None,
-                
-                # Last trade
-                last_trade_price=Decimal(str(last_trade.get("p"))) if last_trade.get("p") is not None else None,
-                last_trade_size=last_trade.get("s"),
-                last_trade_timestamp=last_trade.get("t"),
-                
-                # Minute bar
-                minute_open=Decimal(str(minute.get("o"))) if minute.get("o") is not None else None,
-                minute_high=Decimal(str(minute.get("h"))) if minute.get("h") is not None else None,
-                minute_low=Decimal(str(minute.get("l"))) if minute.get("l") is not None else None,
-                minute_close=Decimal(str(minute.get("c"))) if minute.get("c") is not None else None,
-                minute_volume=minute.get("v"),
-                
-                updated=ticker_data.get("updated"),
-            )
+            return self._parse_snapshot(ticker_data, ticker)
             
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -580,6 +710,59 @@ class MassiveClient:
             logger.error(f"Massive snapshot failed for {ticker}: {e}")
             raise
 
+    async def get_snapshots(
+        self,
+        tickers: List[str],
+        chunk_size: int = SNAPSHOT_CHUNK_SIZE,
+    ) -> Dict[str, StockSnapshot]:
+        """
+        Get market snapshots for many stocks in as few requests as possible.
+
+        Uses GET /v2/snapshot/locale/us/markets/stocks/tickers?tickers=A,B,...
+        with at most chunk_size tickers per request. Chunks are requested
+        concurrently; each still goes through the rate limiter.
+
+        Args:
+            tickers: Stock ticker symbols
+            chunk_size: Maximum tickers per upstream request
+
+        Returns:
+            Dictionary mapping upper-cased ticker to StockSnapshot; tickers
+            without data are omitted
+        """
+        unique = list(dict.fromkeys(t.upper() for t in tickers if t))
+        if not unique:
+            return {}
+
+        chunks = [unique[i : i + chunk_size] for i in range(0, len(unique), chunk_size)]
+
+        async def fetch_chunk(chunk: List[str]) -> List[dict]:
+            data = await self._request(
+                "GET",
+                "/v2/snapshot/locale/us/markets/stocks/tickers",
+                params={"tickers": ",".join(chunk)},
+                coalesce=True,
+            )
+            return data.get("tickers") or []
+
+        try:
+            responses = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        except Exception as e:
+            logger.error(f"Massive multi-ticker snapshot failed for {len(unique)} tickers: {e}")
+            raise
+
+        snapshots: Dict[str, StockSnapshot] = {}
+        for ticker_list in responses:
+            for ticker_data in ticker_list:
+                symbol = (ticker_data.get("ticker") or "").upper()
+                if symbol:
+                    snapshots[symbol] = self._parse_snapshot(ticker_data, symbol)
+
+        logger.info(
+            f"Massive snapshots: {len(snapshots)}/{len(unique)} tickers in {len(chunks)} requests"
+        )
+        return snapshots
+
     async def get_aggregates(
         self,
         ticker: str,
@@ -634,6 +817,7 @@ class MassiveClient:
                     "sort": sort,
                     "limit": limit,
                 },
+                coalesce=True,
             )
             
             results = []
@@ -674,6 +858,7 @@ class MassiveClient:
                 "GET",
                 f"/v2/aggs/ticker/{ticker.upper()}/prev",
                 params={"adjusted": str(adjusted).lower()},
+                coalesce=True,
             )
             
             results = data.get("results", [])
@@ -0,0 +1,138 @@
+"""
+Single-flight request coalescing for upstream API calls.
+
+When many coroutines ask for the same upstream resource at the same time
+(e.g. a popular ticker whose cache entry just expired), only the first
+caller ("leader") performs the request. Concurrent callers with the same
+key ("followers") await the leader's in-flight result instead of issuing
+their own request, so a thundering herd costs a single upstream call and
+a single rate limiter slot.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+# Prometheus metrics for coalescing observability
+single_flight_calls = Counter(
+    "single_flight_calls_total",
+    "Total calls through single-flight groups by role (leader=upstream call, follower=coalesced)",
+    ["name", "role"],
+)
+
+single_flight_in_flight = Gauge(
+    "single_flight_in_flight",
+    "Number of distinct keys currently in flight",
+    ["name"],
+)
+
+
+def make_request_key(
+    method: str,
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[str, str, Tuple[Tuple[str, str], ...]]:
+    """
+    Build a hashable coalescing key from request attributes.
+
+    Params are sorted so that dict ordering does not affect the key.
+
+    Args:
+        method: HTTP method
+        endpoint: API endpoint path
+        params: Query parameters
+
+    Returns:
+        Hashable tuple identifying the request
+    """
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return (method.upper(), endpoint, items)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key into one execution.
+
+    The shared call runs as its own task, so cancelling one waiting caller
+    does not cancel the request for the remaining callers. Results and
+    exceptions are propagated to every caller; nothing is cached once the
+    call completes.
+    """
+
+    def __init__(self, name: str = "default"):
+        """
+        Initialize single-flight group.
+
+        Args:
+            name: Group name for logging and metrics
+        """
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.leader_calls = 0
+        self.follower_calls = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Execute func once per key among concurrent callers.
+
+        Args:
+            key: Hashable key identifying the request
+            func: Zero-argument coroutine factory performing the request
+
+        Returns:
+            Result of the (possibly shared) call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self.leader_calls += 1
+            single_flight_calls.labels(name=self.name, role="leader").inc()
+
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            single_flight_in_flight.labels(name=self.name).set(len(self._in_flight))
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.follower_calls += 1
+            single_flight_calls.labels(name=self.name, role="follower").inc()
+            logger.debug(f"Single-flight '{self.name}': coalesced request for {key}")
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a completed call so the next caller starts a fresh one."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        single_flight_in_flight.labels(name=self.name).set(len(self._in_flight))
+
+        # Mark exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with leader/follower counts and coalescing ratio
+        """
+        total = self.leader_calls + self.follower_calls
+        coalescing_ratio = (self.follower_calls / total) if total > 0 else 0.0
+
+        return {
+            "name": self.name,
+            "in_flight": len(self._in_flight),
+            "leader_calls": self.leader_calls,
+            "follower_calls": self.follower_calls,
+            "total_calls": total,
+            "coalescing_ratio": round(coalescing_ratio, 4),
+        }
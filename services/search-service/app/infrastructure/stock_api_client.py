@@ -5,10 +5,14 @@ Defines the contract for stock data providers (Yahoo Finance, Alpha Vantage, etc
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+import asyncio
+import logging
+from typing import Dict, List, Optional
 
 from ..domain.entities import Stock, StockIdentifier
 
+logger = logging.getLogger(__name__)
+
 
 class IStockAPIClient(ABC):
     """
@@ -35,6 +39,33 @@ class IStockAPIClient(ABC):
         """
         pass
 
+    async def fetch_stocks(self, symbols: List[str]) -> Dict[str, Stock]:
+        """
+        Fetch several stocks by symbol.
+
+        Default implementation fetches concurrently via fetch_stock;
+        providers with a multi-ticker endpoint override this with one
+        batched request. Failed symbols are omitted.
+
+        Args:
+            symbols: Normalized (uppercase) stock symbols
+
+        Returns:
+            Mapping of symbol to Stock for the symbols that were found
+        """
+        results = await asyncio.gather(
+            *[self.fetch_stock(StockIdentifier(symbol=s)) for s in symbols],
+            return_exceptions=True,
+        )
+
+        found: Dict[str, Stock] = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Stock):
+                found[symbol] = result
+            elif isinstance(result, Exception):
+                logger.warning(f"Failed to fetch {symbol}: {result}")
+        return found
+
     @abstractmethod
     async def search_by_name(self, name: str, limit: int = 10) -> List[Stock]:
         """
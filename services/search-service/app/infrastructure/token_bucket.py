@@ -0,0 +1,383 @@
+"""
+Async token-bucket rate limiter with priority classes and deadlines.
+
+Tokens refill continuously at max_requests / window_seconds up to a burst
+capacity. Callers that find the bucket empty are parked on a FIFO queue
+for their priority class instead of sleeping and re-checking; a single
+timer wakes the queue when the next token is due and hands tokens to the
+highest-priority waiters first. Within a class, waiters are served in
+arrival order.
+
+Priority and latency budget are carried in context variables so that
+callers (a user-facing search, a background refresh, a warmup job) can
+set them once without threading arguments through every client method:
+
+    with request_priority(RequestPriority.WARMUP):
+        await client.get_snapshot("AAPL")
+
+    with request_deadline(2.0):
+        await client.get_snapshot("AAPL")  # fails fast if the wait is > 2s
+
+Calls coalesced by SingleFlight run with the priority of the caller that
+started the shared request.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Deque, Dict, Iterator, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..domain.exceptions import RateLimitExceededException
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Priority classes for upstream requests (lower value is served first)."""
+
+    INTERACTIVE = 0
+    PREFETCH = 1
+    WARMUP = 2
+
+
+# Prometheus metrics for limiter observability
+rate_limiter_queue_depth = Gauge(
+    "rate_limiter_queue_depth",
+    "Number of callers waiting for a rate limiter token",
+    ["name", "priority"],
+)
+
+rate_limiter_wait_seconds = Histogram(
+    "rate_limiter_wait_seconds",
+    "Time spent waiting for a rate limiter token",
+    ["name", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+rate_limiter_rejections = Counter(
+    "rate_limiter_rejections_total",
+    "Acquisitions rejected because the wait would exceed the deadline",
+    ["name", "priority"],
+)
+
+
+_request_priority: ContextVar[RequestPriority] = ContextVar(
+    "request_priority", default=RequestPriority.INTERACTIVE
+)
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def current_priority() -> RequestPriority:
+    """Get the priority of the current context."""
+    return _request_priority.get()
+
+
+def current_deadline() -> Optional[float]:
+    """Get the deadline of the current context (time.monotonic() based)."""
+    return _request_deadline.get()
+
+
+@contextmanager
+def request_priority(priority: RequestPriority) -> Iterator[None]:
+    """
+    Run the enclosed upstream calls with the given priority.
+
+    Args:
+        priority: Priority class for rate limiter queuing
+    """
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+@contextmanager
+def request_deadline(budget_seconds: Optional[float]) -> Iterator[None]:
+    """
+    Bound the rate limiter wait of the enclosed upstream calls.
+
+    An enclosing deadline that is earlier than the new one is kept.
+
+    Args:
+        budget_seconds: Latency budget from now (None leaves the deadline unchanged)
+    """
+    if budget_seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + budget_seconds
+    outer = _request_deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+
+    token = _request_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+class _DeadlineExceeded(Exception):
+    """Internal signal for a waiter whose deadline passed while queued."""
+
+
+class AsyncTokenBucket:
+    """
+    Token-bucket rate limiter with prioritized FIFO waiter queues.
+
+    Replaces the polling wait of RateLimiter.wait_and_acquire: waiters
+    do not race each other, higher-priority waiters are served before
+    lower-priority ones, and callers with a deadline are rejected up front
+    when the estimated wait would exceed it.
+    """
+
+    def __init__(
+        self,
+        max_requests: int,
+        window_seconds: float,
+        name: str = "default",
+        burst: Optional[int] = None,
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            max_requests: Requests allowed per window (sustained rate)
+            window_seconds: Window duration in seconds
+            name: Limiter name for logging and metrics
+            burst: Bucket capacity (default: max_requests)
+        """
+        self.name = name
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.rate = max_requests / window_seconds
+        self.capacity = float(burst or max_requests)
+
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._waiters: Dict[RequestPriority, Deque[asyncio.Future]] = {
+            priority: deque() for priority in RequestPriority
+        }
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.granted = 0
+        self.rejected = 0
+
+    def _refill(self, now: float) -> None:
+        """Add tokens accrued since the last update."""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def queue_depth(self, priority: Optional[RequestPriority] = None) -> int:
+        """
+        Get the number of queued callers.
+
+        Args:
+            priority: Count only this class (default: all classes)
+
+        Returns:
+            Number of waiters
+        """
+        if priority is not None:
+            return len(self._waiters[priority])
+        return sum(len(queue) for queue in self._waiters.values())
+
+    def _ahead_of(self, priority: RequestPriority) -> int:
+        """Number of waiters that would be served before a new caller."""
+        return sum(len(self._waiters[p]) for p in RequestPriority if p <= priority)
+
+    def estimate_wait(self, priority: RequestPriority = RequestPriority.INTERACTIVE) -> float:
+        """
+        Estimate the wait for a new caller of the given priority.
+
+        Later arrivals of a higher priority can extend the actual wait.
+
+        Args:
+            priority: Priority class of the caller
+
+        Returns:
+            Estimated wait in seconds
+        """
+        self._refill(time.monotonic())
+        needed = self._ahead_of(priority) + 1 - self.tokens
+        return max(0.0, needed / self.rate)
+
+    async def acquire(
+        self,
+        priority: Optional[RequestPriority] = None,
+        deadline: Optional[float] = None,
+    ) -> float:
+        """
+        Wait for a token.
+
+        Args:
+            priority: Priority class (default: from request_priority context)
+            deadline: time.monotonic() deadline (default: from request_deadline context)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceededException: If the wait would exceed the deadline
+        """
+        if priority is None:
+            priority = current_priority()
+        if deadline is None:
+            deadline = current_deadline()
+
+        start = time.monotonic()
+        self._refill(start)
+
+        # Fast path: token available and nobody of equal or higher priority queued
+        if self.tokens >= 1 and self._ahead_of(priority) == 0:
+            self.tokens -= 1
+            self._record_grant(priority, 0.0)
+            return 0.0
+
+        estimated = self.estimate_wait(priority)
+        if deadline is not None and start + estimated > deadline:
+            self._reject(priority, estimated)
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        queue = self._waiters[priority]
+        queue.append(waiter)
+        self._update_depth(priority)
+        self._schedule(loop)
+
+        expiry = None
+        if deadline is not None:
+            expiry = loop.call_later(
+                max(0.0, deadline - start), self._expire, waiter, priority
+            )
+
+        try:
+            await waiter
+        except _DeadlineExceeded:
+            self._reject(priority, self.estimate_wait(priority))
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Token was granted as we were cancelled: give it back
+                self.tokens = min(self.capacity, self.tokens + 1)
+                self._dispatch()
+            else:
+                self._discard(waiter, priority)
+            raise
+        finally:
+            if expiry is not None:
+                expiry.cancel()
+
+        waited = time.monotonic() - start
+        self._record_grant(priority, waited)
+        return waited
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Arm the wake-up timer for the next token if waiters are queued."""
+        if self._timer is not None or self.queue_depth() == 0:
+            return
+        self._refill(time.monotonic())
+        delay = max(0.0, (1 - self.tokens) / self.rate)
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        """Timer callback: hand out accrued tokens."""
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant tokens to waiters in priority order, then re-arm the timer."""
+        self._refill(time.monotonic())
+
+        for priority in RequestPriority:
+            queue = self._waiters[priority]
+            while queue and self.tokens >= 1:
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self.tokens -= 1
+                waiter.set_result(None)
+            self._update_depth(priority)
+            if self.tokens < 1:
+                break
+
+        if self.queue_depth() and self._timer is None:
+            self._schedule(asyncio.get_running_loop())
+
+    def _expire(self, waiter: asyncio.Future, priority: RequestPriority) -> None:
+        """Deadline callback: fail a waiter that is still queued."""
+        if not waiter.done():
+            waiter.set_exception(_DeadlineExceeded())
+            self._discard(waiter, priority)
+
+    def _discard(self, waiter: asyncio.Future, priority: RequestPriority) -> None:
+        """Remove a waiter from its queue."""
+        try:
+            self._waiters[priority].remove(waiter)
+        except ValueError:
+            pass
+        self._update_depth(priority)
+
+    def _reject(self, priority: RequestPriority, estimated: float) -> None:
+        """Record a deadline rejection and raise."""
+        self.rejected += 1
+        rate_limiter_rejections.labels(name=self.name, priority=priority.name.lower()).inc()
+        logger.warning(
+            f"Rate limiter '{self.name}': rejecting {priority.name.lower()} request, "
+            f"estimated wait {estimated:.2f}s exceeds deadline"
+        )
+        raise RateLimitExceededException(
+            limit=self.max_requests,
+            window_seconds=math.ceil(self.window_seconds),
+            retry_after=max(1, math.ceil(estimated)),
+        )
+
+    def _record_grant(self, priority: RequestPriority, waited: float) -> None:
+        """Record a granted token."""
+        self.granted += 1
+        rate_limiter_wait_seconds.labels(name=self.name, priority=priority.name.lower()).observe(
+            waited
+        )
+        if waited > 0:
+            logger.debug(
+                f"Rate limiter '{self.name}': {priority.name.lower()} request waited {waited:.3f}s"
+            )
+
+    def _update_depth(self, priority: RequestPriority) -> None:
+        """Publish the queue depth of a priority class."""
+        rate_limiter_queue_depth.labels(name=self.name, priority=priority.name.lower()).set(
+            len(self._waiters[priority])
+        )
+
+    def get_current_usage(self) -> dict:
+        """Get current limiter state and queue depths."""
+        self._refill(time.monotonic())
+
+        return {
+            "name": self.name,
+            "tokens": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "rate_per_second": self.rate,
+            "queue_depth": {
+                priority.name.lower(): len(queue) for priority, queue in self._waiters.items()
+            },
+            "granted": self.granted,
+            "rejected": self.rejected,
+        }
+
+    def reset(self) -> None:
+        """Refill the bucket; queued waiters are served immediately."""
+        logger.info(f"Rate limiter '{self.name}' reset")
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        if self.queue_depth():
+            self._dispatch()
@@ -4,9 +4,12 @@ Prometheus metrics for Search Service.
 Tracks search operations, cache performance, API fallback usage, and query patterns.
 """
 
+from typing import Optional
+
 from fastapi import Response
-from prometheus_client import (CONTENT_TYPE_LATEST, Counter, Gauge, Histogram,
-                               generate_latest)
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge,
+                               Histogram, generate_latest)
+from prometheus_client.openmetrics import exposition as openmetrics
 
 # Request metrics
 http_requests_total = Counter(
@@ -73,6 +76,18 @@ search_cache_evictions_total = Counter(
     "search_cache_evictions_total", "Total cache evictions", ["cache_type"]
 )
 
+search_cache_stale_hits_total = Counter(
+    "search_cache_stale_hits_total",
+    "Total stale cache entries served while revalidating",
+    ["cache_type"],
+)
+
+search_cache_background_refreshes_total = Counter(
+    "search_cache_background_refreshes_total",
+    "Total background refreshes triggered by stale cache hits",
+    ["status"],
+)
+
 # API source metrics
 search_api_calls_total = Counter(
     "search_api_calls_total",
@@ -149,6 +164,17 @@ def track_cache_eviction(cache_type: str = "search"):
     search_cache_evictions_total.labels(cache_type=cache_type).inc()
 
 
+def track_cache_stale_hit(cache_type: str = "search"):
+    """Track stale cache entries served while revalidating."""
+    search_cache_stale_hits_total.labels(cache_type=cache_type).inc()
+
+
+def track_background_refresh(success: bool):
+    """Track background cache refresh outcomes."""
+    status = "success" if success else "failure"
+    search_cache_background_refreshes_total.labels(status=status).inc()
+
+
 def track_api_call(provider: str, success: bool, duration: float):
     """Track external API calls."""
     status = "success" if success else "failure"
@@ -170,11 +196,21 @@ def track_db_operation(operation: str, success: bool, duration: float):
     search_db_operation_duration_seconds.labels(operation=operation).observe(duration)
 
 
-async def metrics_endpoint():
+async def metrics_endpoint(accept: Optional[str] = None):
     """
     Prometheus metrics endpoint.
 
+    Scrapers that accept OpenMetrics get that format, which includes
+    histogram exemplars (trace IDs); everyone else gets the text format.
+
+    Args:
+        accept: Accept header of the scrape request
+
     Returns:
-        Response with Prometheus metrics in text format
+        Response with Prometheus metrics
     """
+    if accept and "application/openmetrics-text" in accept:
+        return Response(
+            content=openmetrics.generate_latest(REGISTRY), media_type=openmetrics.CONTENT_TYPE_LATEST
+        )
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -9,7 +9,7 @@ import logging
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from threading import Lock
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from cachetools import TTLCache  # type: ignore[import-untyped]
 from sqlalchemy import func, or_
@@ -90,18 +90,27 @@ class QueryResultCache:
 
 
 class PostgresStockRepository(IStockRepository):
-    """PostgreSQL implementation for stock data persistence."""
+    """
+    PostgreSQL implementation for stock data persistence.
+
+    Rows past expires_at (soft TTL) remain readable for stale_ttl_minutes
+    and are returned flagged as stale (stale-while-revalidate).
+    """
 
-    def __init__(self, db: Session, cache_ttl_minutes: int = 5):
+    def __init__(
+        self, db: Session, cache_ttl_minutes: int = 5, stale_ttl_minutes: int = 0
+    ):
         """
         Initialize repository.
 
         Args:
             db: SQLAlchemy database session
             cache_ttl_minutes: Cache time-to-live in minutes
+            stale_ttl_minutes: Minutes an expired row may still be served as stale
         """
         self.db = db
         self.cache_ttl_minutes = cache_ttl_minutes
+        self.stale_ttl_minutes = stale_ttl_minutes
         # Phase 5: Query result cache
         self.query_cache = QueryResultCache(maxsize=1000, ttl=300)
 
@@ -116,9 +125,10 @@ class PostgresStockRepository(IStockRepository):
 
         try:
             now = datetime.now(timezone.utc).replace(tzinfo=None)
+            stale_cutoff = now - timedelta(minutes=self.stale_ttl_minutes)
 
-            # Build query based on available identifiers
-            query = self.db.query(StockCache).filter(StockCache.expires_at > now)
+            # Build query based on available identifiers (includes stale window)
+            query = self.db.query(StockCache).filter(StockCache.expires_at > stale_cutoff)
 
             if identifier.isin:
                 query = query.filter(StockCache.isin == identifier.isin)
@@ -138,6 +148,11 @@ class PostgresStockRepository(IStockRepository):
 
                 result = self._map_to_entity(cache_entry)
 
+                if cache_entry.expires_at <= now:
+                    # Serve stale, but don't pin it in the query cache
+                    result.stale = True
+                    return result
+
                 # Phase 5: Cache the result
                 self.query_cache.set(cache_key, result)
 
@@ -149,6 +164,79 @@ class PostgresStockRepository(IStockRepository):
             logger.error(f"Error finding stock in PostgreSQL: {e}")
             raise CacheException("find", str(e))
 
+    async def find_many_by_symbols(self, symbols: List[str]) -> Dict[str, Stock]:
+        """Find several stocks by symbol with a single query."""
+        if not symbols:
+            return {}
+
+        try:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            stale_cutoff = now - timedelta(minutes=self.stale_ttl_minutes)
+
+            entries = (
+                self.db.query(StockCache)
+                .filter(
+                    StockCache.symbol.in_(symbols),
+                    StockCache.expires_at > stale_cutoff,
+                )
+                .all()
+            )
+
+            found: Dict[str, Stock] = {}
+            for entry in entries:
+                stock = self._map_to_entity(entry)
+                if entry.expires_at <= now:
+                    stock.stale = True
+                found[entry.symbol] = stock
+                entry.cache_hits += 1
+
+            if entries:
+                self.db.commit()
+
+            return found
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error batch-finding stocks in PostgreSQL: {e}")
+            raise CacheException("find_many", str(e))
+
+    async def save_many(self, stocks: List[Stock]) -> None:
+        """Upsert several stocks keyed by symbol with a single commit."""
+        stocks = [s for s in stocks if s.identifier.symbol]
+        if not stocks:
+            return
+
+        try:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            expires_at = now + timedelta(minutes=self.cache_ttl_minutes)
+
+            symbols = [s.identifier.symbol for s in stocks]
+            existing = {
+                entry.symbol: entry
+                for entry in self.db.query(StockCache)
+                .filter(StockCache.symbol.in_(symbols))
+                .all()
+            }
+
+            for stock in stocks:
+                entry = existing.get(stock.identifier.symbol)
+                if entry:
+                    self._update_cache_entry(entry, stock, expires_at)
+                else:
+                    self.db.add(self._create_cache_entry(stock, now, expires_at))
+
+            self.db.commit()
+
+            for stock in stocks:
+                self.query_cache.invalidate(
+                    f"stock:{stock.identifier.isin or stock.identifier.wkn or stock.identifier.symbol}"
+                )
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error batch-saving stocks to PostgreSQL: {e}")
+            raise CacheException("save_many", str(e))
+
     async def find_by_name(self, name: str, limit: int = 10) -> List[Stock]:
         """Search stocks by company name with fuzzy matching."""
         try:
@@ -259,6 +347,7 @@ class PostgresStockRepository(IStockRepository):
                 "expired_entries": expired,
                 "total_hits": total_hits,
                 "cache_ttl_minutes": self.cache_ttl_minutes,
+                "stale_ttl_minutes": self.stale_ttl_minutes,
             }
         except Exception as e:
             logger.error(f"Error getting cache stats: {e}")
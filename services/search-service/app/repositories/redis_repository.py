@@ -4,16 +4,14 @@ Redis implementation of stock repository.
 Implements in-memory caching layer for fast stock data retrieval.
 """
 
-import json
 import logging
-from datetime import datetime, timezone
-from decimal import Decimal
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 
 import redis.asyncio as redis
 
-from ..domain.entities import (DataSource, Stock, StockIdentifier,
-                               StockMetadata, StockPrice)
+from ..domain.entities import Stock, StockIdentifier
+from .stock_codec import CompactStockCodec, JsonStockCodec, StockCodec
 from .stock_repository import IStockRepository
 
 logger = logging.getLogger(__name__)
@@ -23,19 +21,32 @@ class RedisStockRepository(IStockRepository):
     """
     Redis implementation for fast in-memory stock caching.
 
-    Provides Layer 1 caching with TTL-based expiration.
+    Provides Layer 1 caching with TTL-based expiration. Entries are kept in
+    Redis for ttl_seconds + stale_ttl_seconds; reads past ttl_seconds return
+    the entry flagged as stale (stale-while-revalidate).
     """
 
-    def __init__(self, redis_client: redis.Redis, ttl_seconds: int = 300):
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        ttl_seconds: int = 300,
+        stale_ttl_seconds: int = 0,
+        codec: Optional[StockCodec] = None,
+    ):
         """
         Initialize Redis repository.
 
         Args:
             redis_client: Async Redis client
-            ttl_seconds: Time-to-live for cache entries (default: 5 minutes)
+            ttl_seconds: Soft time-to-live for cache entries (default: 5 minutes)
+            stale_ttl_seconds: Stale window kept after the soft TTL (default: 0)
+            codec: Value codec for writes (default: CompactStockCodec). Reads
+                accept every known format, including legacy JSON entries.
         """
         self.redis = redis_client
         self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.codec = codec or CompactStockCodec()
 
     def _build_cache_key(self, identifier: StockIdentifier) -> str:
         """
@@ -58,9 +69,14 @@ class RedisStockRepository(IStockRepository):
             cached_data = await self.redis.get(cache_key)
 
             if cached_data:
-                logger.info(f"Redis cache HIT: {cache_key}")
-                data = json.loads(cached_data)
-                return self._deserialize_stock(data)
+                stock = self.codec.decode(cached_data)
+
+                if (stock.cache_age_seconds or 0) > self.ttl_seconds:
+                    stock.stale = True
+                    logger.info(f"Redis cache HIT (stale): {cache_key}")
+                else:
+                    logger.info(f"Redis cache HIT: {cache_key}")
+                return stock
 
             logger.debug(f"Redis cache MISS: {cache_key}")
             return None
@@ -70,6 +86,58 @@ class RedisStockRepository(IStockRepository):
             # Don't raise exception - allow fallback to PostgreSQL
             return None
 
+    async def find_many_by_symbols(self, symbols: List[str]) -> Dict[str, Stock]:
+        """Find several stocks with a single MGET."""
+        if not symbols:
+            return {}
+
+        try:
+            keys = [self._build_cache_key(StockIdentifier(symbol=s)) for s in symbols]
+            values = await self.redis.mget(keys)
+
+            found: Dict[str, Stock] = {}
+            for symbol, cached_data in zip(symbols, values):
+                if not cached_data:
+                    continue
+                try:
+                    stock = self.codec.decode(cached_data)
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable Redis entry for {symbol}: {e}")
+                    continue
+                if (stock.cache_age_seconds or 0) > self.ttl_seconds:
+                    stock.stale = True
+                found[symbol] = stock
+
+            logger.info(f"Redis MGET: {len(found)}/{len(symbols)} hits")
+            return found
+
+        except Exception as e:
+            logger.error(f"Error batch-finding stocks in Redis: {e}")
+            # Don't raise exception - allow fallback to PostgreSQL
+            return {}
+
+    async def save_many(self, stocks: List[Stock]) -> None:
+        """Save several stocks with one pipelined round-trip."""
+        if not stocks:
+            return
+
+        try:
+            hard_ttl = self.ttl_seconds + self.stale_ttl_seconds
+            pipe = self.redis.pipeline(transaction=False)
+            for stock in stocks:
+                pipe.setex(
+                    self._build_cache_key(stock.identifier),
+                    hard_ttl,
+                    self.codec.encode(stock),
+                )
+            await pipe.execute()
+
+            logger.info(f"Saved {len(stocks)} stocks to Redis (TTL: {hard_ttl}s)")
+
+        except Exception as e:
+            logger.error(f"Error batch-saving stocks to Redis: {e}")
+            # Don't raise - caching failure shouldn't break the flow
+
     async def find_by_name(self, name: str, limit: int = 10) -> List[Stock]:
         """
         Search by name in Redis.
@@ -85,13 +153,14 @@ class RedisStockRepository(IStockRepository):
         try:
             cache_key = self._build_cache_key(stock.identifier)
 
-            # Serialize stock to JSON
-            data = self._serialize_stock(stock)
+            # Serialize stock with the configured codec
+            payload = self.codec.encode(stock)
 
-            # Save with TTL
-            await self.redis.setex(cache_key, self.ttl_seconds, json.dumps(data))
+            # Save with hard TTL (soft TTL + stale window)
+            hard_ttl = self.ttl_seconds + self.stale_ttl_seconds
+            await self.redis.setex(cache_key, hard_ttl, payload)
 
-            logger.info(f"Saved to Redis: {cache_key} (TTL: {self.ttl_seconds}s)")
+            logger.info(f"Saved to Redis: {cache_key} (TTL: {hard_ttl}s)")
             return stock
 
         except Exception as e:
@@ -123,6 +192,8 @@ class RedisStockRepository(IStockRepository):
                 "keyspace_misses": info.get("keyspace_misses", 0),
                 "hit_rate": self._calculate_hit_rate(info),
                 "ttl_seconds": self.ttl_seconds,
+                "stale_ttl_seconds": self.stale_ttl_seconds,
+                "codec": self.codec.name,
                 "memory_used": info.get("used_memory_human", "unknown"),
             }
         except Exception as e:
@@ -141,152 +212,12 @@ class RedisStockRepository(IStockRepository):
         return round((hits / total) * 100, 2)
 
     def _serialize_stock(self, stock: Stock) -> dict:
-        """Serialize stock entity to dict for JSON storage."""
-        return {
-            "identifier": {
-                "isin": stock.identifier.isin,
-                "wkn": stock.identifier.wkn,
-                "symbol": stock.identifier.symbol,
-                "name": stock.identifier.name,
-            },
-            "price": {
-                "current": str(stock.price.current),
-                "currency": stock.price.currency,
-                "change_absolute": (
-                    str(stock.price.change_absolute)
-                    if stock.price.change_absolute
-                    else None
-                ),
-                "change_percent": (
-                    str(stock.price.change_percent)
-                    if stock.price.change_percent
-                    else None
-                ),
-                "previous_close": (
-                    str(stock.price.previous_close)
-                    if stock.price.previous_close
-                    else None
-                ),
-                "open": str(stock.price.open_price) if stock.price.open_price else None,
-                "day_high": str(stock.price.day_high) if stock.price.day_high else None,
-                "day_low": str(stock.price.day_low) if stock.price.day_low else None,
-                "week_52_high": (
-                    str(stock.price.week_52_high) if stock.price.week_52_high else None
-                ),
-                "week_52_low": (
-                    str(stock.price.week_52_low) if stock.price.week_52_low else None
-                ),
-                "volume": stock.price.volume,
-                "avg_volume": stock.price.avg_volume,
-            },
-            "metadata": {
-                "exchange": stock.metadata.exchange,
-                "sector": stock.metadata.sector,
-                "industry": stock.metadata.industry,
-                "market_cap": (
-                    str(stock.metadata.market_cap)
-                    if stock.metadata.market_cap
-                    else None
-                ),
-                "pe_ratio": (
-                    str(stock.metadata.pe_ratio) if stock.metadata.pe_ratio else None
-                ),
-                "dividend_yield": (
-                    str(stock.metadata.dividend_yield)
-                    if stock.metadata.dividend_yield
-                    else None
-                ),
-                "beta": str(stock.metadata.beta) if stock.metadata.beta else None,
-            },
-            "data_source": stock.data_source.value,
-            "last_updated": stock.last_updated.isoformat(),
-            "cached_at": datetime.now(timezone.utc).isoformat(),
-        }
+        """Serialize stock entity to dict in the legacy JSON layout."""
+        return JsonStockCodec.to_dict(stock)
 
     def _deserialize_stock(self, data: dict) -> Stock:
-        """Deserialize dict to stock entity."""
-        identifier = StockIdentifier(
-            isin=data["identifier"].get("isin"),
-            wkn=data["identifier"].get("wkn"),
-            symbol=data["identifier"].get("symbol"),
-            name=data["identifier"].get("name"),
-        )
-
-        price_data = data["price"]
-        price = StockPrice(
-            current=Decimal(price_data["current"]),
-            currency=price_data["currency"],
-            change_absolute=(
-                Decimal(price_data["change_absolute"])
-                if price_data.get("change_absolute")
-                else None
-            ),
-            change_percent=(
-                Decimal(price_data["change_percent"])
-                if price_data.get("change_percent")
-                else None
-            ),
-            previous_close=(
-                Decimal(price_data["previous_close"])
-                if price_data.get("previous_close")
-                else None
-            ),
-            open_price=Decimal(price_data["open"]) if price_data.get("open") else None,
-            day_high=(
-                Decimal(price_data["day_high"]) if price_data.get("day_high") else None
-            ),
-            day_low=(
-                Decimal(price_data["day_low"]) if price_data.get("day_low") else None
-            ),
-            week_52_high=(
-                Decimal(price_data["week_52_high"])
-                if price_data.get("week_52_high")
-                else None
-            ),
-            week_52_low=(
-                Decimal(price_data["week_52_low"])
-                if price_data.get("week_52_low")
-                else None
-            ),
-            volume=price_data.get("volume"),
-            avg_volume=price_data.get("avg_volume"),
-        )
-
-        metadata_data = data["metadata"]
-        metadata = StockMetadata(
-            exchange=metadata_data.get("exchange"),
-            sector=metadata_data.get("sector"),
-            industry=metadata_data.get("industry"),
-            market_cap=(
-                Decimal(metadata_data["market_cap"])
-                if metadata_data.get("market_cap")
-                else None
-            ),
-            pe_ratio=(
-                Decimal(metadata_data["pe_ratio"])
-                if metadata_data.get("pe_ratio")
-                else None
-            ),
-            dividend_yield=(
-                Decimal(metadata_data["dividend_yield"])
-                if metadata_data.get("dividend_yield")
-                else None
-            ),
-            beta=Decimal(metadata_data["beta"]) if metadata_data.get("beta") else None,
-        )
-
-        # Calculate cache age
-        cached_at = datetime.fromisoformat(data["cached_at"])
-        cache_age = int((datetime.now(timezone.utc) - cached_at).total_seconds())
-
-        return Stock(
-            identifier=identifier,
-            price=price,
-            metadata=metadata,
-            data_source=DataSource(data["data_source"]),
-            last_updated=datetime.fromisoformat(data["last_updated"]),
-            cache_age_seconds=cache_age,
-        )
+        """Deserialize legacy JSON dict to stock entity."""
+        return JsonStockCodec.from_dict(data)
 
     async def count_user_favorites(self, user_id: str) -> int:
         """Not supported in Redis - use PostgreSQL."""
@@ -0,0 +1,430 @@
+"""
+Serialization codecs for cached stock entities.
+
+Two wire formats are supported for Redis values:
+
+- Legacy JSON (JsonStockCodec): nested dict with verbose keys, the original
+  RedisStockRepository format.
+- Compact (CompactStockCodec): schema-versioned positional array encoded
+  with orjson when available, optionally zlib-compressed above a size
+  threshold.
+
+Decoding sniffs the payload, so either codec can read entries written by
+the other. This lets the write format be switched (or rolled back) without
+flushing Redis.
+
+Payloads stay text-safe because the shared Redis client is created with
+decode_responses=True; compressed payloads are base64-encoded behind a
+short prefix.
+"""
+
+import base64
+import json
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, List, Optional, Union
+
+from ..domain.entities import (DataSource, Stock, StockIdentifier,
+                               StockMetadata, StockPrice)
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Current compact schema version (first element of the array)
+COMPACT_SCHEMA_VERSION = 1
+
+# Prefix marking a zlib-compressed, base64-encoded compact payload
+COMPRESSED_PREFIX = "z:"
+
+
+def _dumps(value: Any) -> str:
+    """Encode to a JSON string, preferring orjson."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _loads(payload: Union[str, bytes]) -> Any:
+    """Decode a JSON string, preferring orjson."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _dec(value: Optional[Decimal]) -> Optional[str]:
+    """Encode Decimal losslessly (None stays None, zero is kept)."""
+    return None if value is None else str(value)
+
+
+def _undec(value: Optional[str]) -> Optional[Decimal]:
+    """Decode Decimal written by _dec."""
+    return None if value is None else Decimal(value)
+
+
+def _ts(value: datetime) -> float:
+    """Epoch seconds, treating naive datetimes as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _cache_age(cached_at: datetime) -> int:
+    """Seconds since the entry was cached."""
+    return int((datetime.now(timezone.utc) - cached_at).total_seconds())
+
+
+class StockCodec(ABC):
+    """
+    Codec interface for cached stock entities.
+
+    encode() writes the codec's own format; decode() accepts every known
+    format so readers survive format migrations.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    def encode(self, stock: Stock) -> str:
+        """
+        Serialize a stock for storage.
+
+        Args:
+            stock: Stock entity to serialize
+
+        Returns:
+            Text payload
+        """
+        pass
+
+    def decode(self, payload: Union[str, bytes]) -> Stock:
+        """
+        Deserialize a stored payload in any supported format.
+
+        Args:
+            payload: Stored value
+
+        Returns:
+            Stock entity with cache_age_seconds set
+        """
+        return decode_stock_payload(payload)
+
+
+class JsonStockCodec(StockCodec):
+    """Legacy nested-dict JSON format."""
+
+    name = "json"
+
+    def encode(self, stock: Stock) -> str:
+        """Serialize stock as legacy JSON."""
+        return json.dumps(self.to_dict(stock))
+
+    @staticmethod
+    def to_dict(stock: Stock) -> dict:
+        """Serialize stock entity to dict for JSON storage."""
+        return {
+            "identifier": {
+                "isin": stock.identifier.isin,
+                "wkn": stock.identifier.wkn,
+                "symbol": stock.identifier.symbol,
+                "name": stock.identifier.name,
+            },
+            "price": {
+                "current": str(stock.price.current),
+                "currency": stock.price.currency,
+                "change_absolute": (
+                    str(stock.price.change_absolute)
+                    if stock.price.change_absolute
+                    else None
+                ),
+                "change_percent": (
+                    str(stock.price.change_percent)
+                    if stock.price.change_percent
+                    else None
+                ),
+                "previous_close": (
+                    str(stock.price.previous_close)
+                    if stock.price.previous_close
+                    else None
+                ),
+                "open": str(stock.price.open_price) if stock.price.open_price else None,
+                "day_high": str(stock.price.day_high) if stock.price.day_high else None,
+                "day_low": str(stock.price.day_low) if stock.price.day_low else None,
+                "week_52_high": (
+                    str(stock.price.week_52_high) if stock.price.week_52_high else None
+                ),
+                "week_52_low": (
+                    str(stock.price.week_52_low) if stock.price.week_52_low else None
+                ),
+                "volume": stock.price.volume,
+                "avg_volume": stock.price.avg_volume,
+            },
+            "metadata": {
+                "exchange": stock.metadata.exchange,
+                "sector": stock.metadata.sector,
+                "industry": stock.metadata.industry,
+                "market_cap": (
+                    str(stock.metadata.market_cap)
+                    if stock.metadata.market_cap
+                    else None
+                ),
+                "pe_ratio": (
+                    str(stock.metadata.pe_ratio) if stock.metadata.pe_ratio else None
+                ),
+                "dividend_yield": (
+                    str(stock.metadata.dividend_yield)
+                    if stock.metadata.dividend_yield
+                    else None
+                ),
+                "beta": str(stock.metadata.beta) if stock.metadata.beta else None,
+            },
+            "data_source": stock.data_source.value,
+            "last_updated": stock.last_updated.isoformat(),
+            "cached_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> Stock:
+        """Deserialize legacy dict to stock entity."""
+        identifier = StockIdentifier(
+            isin=data["identifier"].get("isin"),
+            wkn=data["identifier"].get("wkn"),
+            symbol=data["identifier"].get("symbol"),
+            name=data["identifier"].get("name"),
+        )
+
+        price_data = data["price"]
+        price = StockPrice(
+            current=Decimal(price_data["current"]),
+            currency=price_data["currency"],
+            change_absolute=(
+                Decimal(price_data["change_absolute"])
+                if price_data.get("change_absolute")
+                else None
+            ),
+            change_percent=(
+                Decimal(price_data["change_percent"])
+                if price_data.get("change_percent")
+                else None
+            ),
+            previous_close=(
+                Decimal(price_data["previous_close"])
+                if price_data.get("previous_close")
+                else None
+            ),
+            open_price=Decimal(price_data["open"]) if price_data.get("open") else None,
+            day_high=(
+                Decimal(price_data["day_high"]) if price_data.get("day_high") else None
+            ),
+            day_low=(
+                Decimal(price_data["day_low"]) if price_data.get("day_low") else None
+            ),
+            week_52_high=(
+                Decimal(price_data["week_52_high"])
+                if price_data.get("week_52_high")
+                else None
+            ),
+            week_52_low=(
+                Decimal(price_data["week_52_low"])
+                if price_data.get("week_52_low")
+                else None
+            ),
+            volume=price_data.get("volume"),
+            avg_volume=price_data.get("avg_volume"),
+        )
+
+        metadata_data = data["metadata"]
+        metadata = StockMetadata(
+            exchange=metadata_data.get("exchange"),
+            sector=metadata_data.get("sector"),
+            industry=metadata_data.get("industry"),
+            market_cap=(
+                Decimal(metadata_data["market_cap"])
+                if metadata_data.get("market_cap")
+                else None
+            ),
+            pe_ratio=(
+                Decimal(metadata_data["pe_ratio"])
+                if metadata_data.get("pe_ratio")
+                else None
+            ),
+            dividend_yield=(
+                Decimal(metadata_data["dividend_yield"])
+                if metadata_data.get("dividend_yield")
+                else None
+            ),
+            beta=Decimal(metadata_data["beta"]) if metadata_data.get("beta") else None,
+        )
+
+        return Stock(
+            identifier=identifier,
+            price=price,
+            metadata=metadata,
+            data_source=DataSource(data["data_source"]),
+            last_updated=datetime.fromisoformat(data["last_updated"]),
+            cache_age_seconds=_cache_age(datetime.fromisoformat(data["cached_at"])),
+        )
+
+
+class CompactStockCodec(StockCodec):
+    """
+    Schema-versioned positional array format.
+
+    Layout (schema v1):
+        [1, cached_at_ts, last_updated_ts, data_source,
+         [isin, wkn, symbol, name],
+         [current, currency, change_abs, change_pct, prev_close, open,
+          day_high, day_low, week_52_high, week_52_low, volume, avg_volume],
+         [exchange, sector, industry, market_cap, pe_ratio, dividend_yield, beta,
+          description, employees, website]]
+
+    Decimals are stored as strings to stay exact. New fields must only be
+    appended; readers tolerate shorter arrays from older writers.
+    """
+
+    name = "compact"
+
+    def __init__(self, compress_threshold: Optional[int] = None, compress_level: int = 6):
+        """
+        Initialize compact codec.
+
+        Args:
+            compress_threshold: zlib-compress payloads larger than this many
+                bytes (None disables compression)
+            compress_level: zlib compression level
+        """
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, stock: Stock) -> str:
+        """Serialize stock as a compact array."""
+        price = stock.price
+        meta = stock.metadata
+        payload = _dumps(
+            [
+                COMPACT_SCHEMA_VERSION,
+                datetime.now(timezone.utc).timestamp(),
+                _ts(stock.last_updated),
+                stock.data_source.value,
+                [
+                    stock.identifier.isin,
+                    stock.identifier.wkn,
+                    stock.identifier.symbol,
+                    stock.identifier.name,
+                ],
+                [
+                    _dec(price.current),
+                    price.currency,
+                    _dec(price.change_absolute),
+                    _dec(price.change_percent),
+                    _dec(price.previous_close),
+                    _dec(price.open_price),
+                    _dec(price.day_high),
+                    _dec(price.day_low),
+                    _dec(price.week_52_high),
+                    _dec(price.week_52_low),
+                    price.volume,
+                    price.avg_volume,
+                ],
+                [
+                    meta.exchange,
+                    meta.sector,
+                    meta.industry,
+                    _dec(meta.market_cap),
+                    _dec(meta.pe_ratio),
+                    _dec(meta.dividend_yield),
+                    _dec(meta.beta),
+                    meta.description,
+                    meta.employees,
+                    meta.website,
+                ],
+            ]
+        )
+
+        if self.compress_threshold is not None and len(payload) > self.compress_threshold:
+            compressed = zlib.compress(payload.encode("utf-8"), self.compress_level)
+            return COMPRESSED_PREFIX + base64.b64encode(compressed).decode("ascii")
+
+        return payload
+
+    @staticmethod
+    def from_array(data: List[Any]) -> Stock:
+        """Deserialize a compact array to stock entity."""
+        version = data[0]
+        if version != COMPACT_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported compact stock schema version: {version}")
+
+        ident = data[4]
+        p = data[5] + [None] * (12 - len(data[5]))
+        m = data[6] + [None] * (10 - len(data[6]))
+        last_updated = datetime.fromtimestamp(data[2], tz=timezone.utc)
+
+        return Stock(
+            identifier=StockIdentifier(
+                isin=ident[0], wkn=ident[1], symbol=ident[2], name=ident[3]
+            ),
+            price=StockPrice(
+                current=Decimal(p[0]),
+                currency=p[1],
+                change_absolute=_undec(p[2]),
+                change_percent=_undec(p[3]),
+                previous_close=_undec(p[4]),
+                open_price=_undec(p[5]),
+                day_high=_undec(p[6]),
+                day_low=_undec(p[7]),
+                week_52_high=_undec(p[8]),
+                week_52_low=_undec(p[9]),
+                volume=p[10],
+                avg_volume=p[11],
+            ),
+            metadata=StockMetadata(
+                exchange=m[0],
+                sector=m[1],
+                industry=m[2],
+                market_cap=_undec(m[3]),
+                pe_ratio=_undec(m[4]),
+                dividend_yield=_undec(m[5]),
+                beta=_undec(m[6]),
+                description=m[7],
+                employees=m[8],
+                website=m[9],
+            ),
+            data_source=DataSource(data[3]),
+            last_updated=last_updated,
+            cache_age_seconds=_cache_age(datetime.fromtimestamp(data[1], tz=timezone.utc)),
+        )
+
+
+def decode_stock_payload(payload: Union[str, bytes]) -> Stock:
+    """
+    Decode a cached stock in any supported format.
+
+    Args:
+        payload: Stored value (compressed compact, compact or legacy JSON)
+
+    Returns:
+        Stock entity with cache_age_seconds set
+
+    Raises:
+        ValueError: If the payload format is not recognized
+    """
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8")
+
+    if payload.startswith(COMPRESSED_PREFIX):
+        raw = zlib.decompress(base64.b64decode(payload[len(COMPRESSED_PREFIX):]))
+        payload = raw.decode("utf-8")
+
+    data = _loads(payload)
+
+    if isinstance(data, list):
+        return CompactStockCodec.from_array(data)
+    if isinstance(data, dict):
+        return JsonStockCodec.from_dict(data)
+
+    raise ValueError("Unrecognized cached stock payload")
@@ -7,7 +7,7 @@ independent of the underlying storage mechanism.
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from ..domain.entities import IdentifierType, Stock, StockIdentifier
 
@@ -60,6 +60,39 @@ class IStockRepository(ABC):
         """
         pass
 
+    async def find_many_by_symbols(self, symbols: List[str]) -> Dict[str, Stock]:
+        """
+        Find several stocks by symbol in one round-trip.
+
+        Default implementation looks symbols up one by one; storage
+        backends override this with a single batched query.
+
+        Args:
+            symbols: Normalized (uppercase) stock symbols
+
+        Returns:
+            Mapping of symbol to Stock for the symbols that were found
+        """
+        found: Dict[str, Stock] = {}
+        for symbol in symbols:
+            stock = await self.find_by_identifier(StockIdentifier(symbol=symbol))
+            if stock:
+                found[symbol] = stock
+        return found
+
+    async def save_many(self, stocks: List[Stock]) -> None:
+        """
+        Save several stocks in one round-trip.
+
+        Default implementation saves one by one; storage backends override
+        this with a batched write.
+
+        Args:
+            stocks: Stock entities to persist
+        """
+        for stock in stocks:
+            await self.save(stock)
+
     @abstractmethod
     async def delete_expired(self, before: datetime) -> int:
         """
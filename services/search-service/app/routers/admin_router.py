@@ -0,0 +1,60 @@
+"""
+Admin router for operational diagnostics.
+
+Exposes the on-demand event loop profiler. All endpoints require admin
+access.
+"""
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from ..core.auth import User, require_admin
+from ..core.profiler import ProfilerBusyError, get_profiler
+
+logger = structlog.get_logger(__name__)
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+@router.post(
+    "/profile",
+    summary="Profile the event loop",
+    description=(
+        "Sample this worker's event loop for a number of seconds. Returns "
+        "collapsed stacks for flamegraphs, event-loop lag and the slowest "
+        "coroutine steps."
+    ),
+)
+async def profile_event_loop(
+    seconds: float = Query(10.0, gt=0, le=60, description="Profile duration in seconds"),
+    interval_ms: float = Query(5.0, ge=1, le=100, description="Sampling interval"),
+    format: str = Query(
+        "json", pattern="^(json|collapsed)$", description="json or collapsed stacks only"
+    ),
+    user: User = Depends(require_admin),
+):
+    """
+    Run a sampling profile on the worker serving this request.
+
+    Args:
+        seconds: Profile duration
+        interval_ms: Stack sampling and lag probe interval
+        format: "json" for the full result, "collapsed" for flamegraph input
+        user: Admin user
+
+    Returns:
+        Profile result as JSON, or collapsed stacks as plain text
+
+    Raises:
+        HTTPException: 409 if a profile is already running on this worker
+    """
+    logger.info("Profile requested", user_id=user.id, seconds=seconds)
+    try:
+        result = await get_profiler().profile(seconds, interval_ms=interval_ms)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    if format == "collapsed":
+        return PlainTextResponse(result.collapsed())
+    return result.to_dict()
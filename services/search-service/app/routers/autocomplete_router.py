@@ -2,18 +2,20 @@
 Autocomplete router for fast symbol search.
 
 Provides sub-100ms autocomplete using Meilisearch with
-typo tolerance and relevance ranking.
+typo tolerance and relevance ranking. When Meilisearch fails or is slow,
+queries are answered by the embedded local index until it recovers.
 """
 
 import logging
+import time
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
 from ..core.auth import UserContext, get_current_user_optional
-from ..core.meilisearch_client import get_meilisearch_manager
 from ..core.metrics_enhanced import SearchTimer, get_metrics_tracker
+from ..search.local_autocomplete import get_autocomplete_failover
 from ..services.meilisearch_sync_service import get_sync_service
 
 logger = logging.getLogger(__name__)
@@ -40,6 +42,9 @@ class AutocompleteResponse(BaseModel):
     results: list[AutocompleteResult] = Field(description="Matching stocks")
     total: int = Field(description="Total results found")
     latency_ms: float = Field(description="Search latency in milliseconds")
+    source: str = Field(
+        "meilisearch", description="Engine that answered (meilisearch or local fallback)"
+    )
 
 
 class SyncStatus(BaseModel):
@@ -98,20 +103,12 @@ async def autocomplete_search(
 
     with SearchTimer("autocomplete", "symbol", tier) as timer:
         try:
-            meilisearch = get_meilisearch_manager()
-
-            filter_expr = None
-            if exchange:
-                filter_expr = f"exchange = {exchange}"
-
-            import time
-
             start = time.time()
 
-            hits = await meilisearch.search_autocomplete(
+            hits, source = await get_autocomplete_failover().search(
                 query=q,
                 limit=limit,
-                filters=filter_expr,
+                exchange=exchange,
             )
 
             latency_ms = (time.time() - start) * 1000
@@ -130,19 +127,21 @@ async def autocomplete_search(
             ]
 
             timer.result_count = len(results)
-            timer.cache_layer = "meilisearch"
-
-            tracker = get_metrics_tracker()
-            tracker.track_external_api_call(
-                "meilisearch",
-                latency_ms / 1000,
-                success=True,
-            )
+            timer.cache_layer = source
+
+            if source == "meilisearch":
+                tracker = get_metrics_tracker()
+                tracker.track_external_api_call(
+                    "meilisearch",
+                    latency_ms / 1000,
+                    success=True,
+                )
 
             logger.info(
-                "Autocomplete query '%s' returned %d results in %.2fms",
+                "Autocomplete query '%s' returned %d results from %s in %.2fms",
                 q,
                 len(results),
+                source,
                 latency_ms,
             )
 
@@ -151,6 +150,7 @@ async def autocomplete_search(
                 results=results,
                 total=len(results),
                 latency_ms=latency_ms,
+                source=source,
             )
 
         except Exception as e:
@@ -16,7 +16,9 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from enum import Enum
 
-from ..infrastructure.massive_client import get_massive_client, MassiveTimespan
+from ..cache.bar_cache import get_bar_cache
+from ..infrastructure.massive_client import AggregateBar, get_massive_client, MassiveTimespan
+from ..services.chart_downsampling import DownsampleMode, downsample_bars
 
 logger = structlog.get_logger(__name__)
 
@@ -82,6 +84,12 @@ class ChartMetadata(BaseModel):
     to_date: str = Field(..., description="End date")
     bar_count: int = Field(..., description="Number of bars")
     adjusted: bool = Field(default=True, description="Adjusted for splits")
+    source_bar_count: Optional[int] = Field(
+        None, description="Bars before downsampling (set when downsampled)"
+    )
+    downsampling: Optional[str] = Field(
+        None, description="Downsampling mode applied (candle or line)"
+    )
 
 
 class ChartResponse(BaseModel):
@@ -181,6 +189,35 @@ def _decimal_to_float(value: Optional[Decimal]) -> float:
     return float(value)
 
 
+def _build_bars(
+    bars: List[AggregateBar],
+    max_points: Optional[int],
+    mode: DownsampleMode,
+) -> tuple[List[OHLCBar], Optional[str]]:
+    """
+    Convert aggregate bars to response bars, downsampling above max_points.
+
+    Returns: (data, applied downsampling mode or None)
+    """
+    if max_points is not None and len(bars) > max_points:
+        rows = downsample_bars(bars, max_points, mode).to_rows()
+        return [OHLCBar(**row) for row in rows], mode.value
+
+    data = [
+        OHLCBar(
+            timestamp=bar.timestamp,
+            open=_decimal_to_float(bar.open),
+            high=_decimal_to_float(bar.high),
+            low=_decimal_to_float(bar.low),
+            close=_decimal_to_float(bar.close),
+            volume=bar.volume,
+            vwap=_decimal_to_float(bar.vwap) if bar.vwap else None,
+        )
+        for bar in bars
+    ]
+    return data, None
+
+
 @router.get(
     "/{ticker}",
     response_model=ChartResponse,
@@ -204,6 +241,9 @@ def _decimal_to_float(value: Optional[Decimal]) -> float:
     - MAX: All history monthly bars
     
     Or specify custom date range with interval.
+    
+    Set max_points to downsample long ranges to a fixed number of bars:
+    candle mode merges OHLC buckets, line mode keeps LTTB-selected bars.
     """,
 )
 async def get_chart_data(
@@ -216,6 +256,16 @@ async def get_chart_data(
         default=True,
         description="Adjust prices for splits",
     ),
+    max_points: Optional[int] = Query(
+        default=None,
+        ge=10,
+        le=10000,
+        description="Downsample to at most this many bars",
+    ),
+    mode: DownsampleMode = Query(
+        default=DownsampleMode.CANDLE,
+        description="Downsampling mode: candle (OHLC buckets) or line (LTTB)",
+    ),
 ) -> ChartResponse:
     """
     Get chart data for a stock with pre-defined range.
@@ -237,7 +287,8 @@ async def get_chart_data(
     try:
         from_date, to_date, timespan, multiplier = _get_range_params(range)
         
-        bars = await client.get_aggregates(
+        bars = await get_bar_cache().get_aggregates(
+            client,
             ticker=ticker.upper(),
             multiplier=multiplier,
             timespan=timespan,
@@ -257,18 +308,7 @@ async def get_chart_data(
             )
         
         # Convert to response format
-        data = [
-            OHLCBar(
-                timestamp=bar.timestamp,
-                open=_decimal_to_float(bar.open),
-                high=_decimal_to_float(bar.high),
-                low=_decimal_to_float(bar.low),
-                close=_decimal_to_float(bar.close),
-                volume=bar.volume,
-                vwap=_decimal_to_float(bar.vwap) if bar.vwap else None,
-            )
-            for bar in bars
-        ]
+        data, downsampling = _build_bars(bars, max_points, mode)
         
         interval_str = f"{multiplier}{timespan.value[0]}"  # e.g., "1d", "5m"
         
@@ -290,6 +330,8 @@ async def get_chart_data(
                 to_date=to_date,
                 bar_count=len(data),
                 adjusted=adjusted,
+                source_bar_count=len(bars) if downsampling else None,
+                downsampling=downsampling,
             ),
         )
         
@@ -339,6 +381,16 @@ async def get_custom_chart_data(
         le=50000,
         description="Maximum bars to return",
     ),
+    max_points: Optional[int] = Query(
+        default=None,
+        ge=10,
+        le=10000,
+        description="Downsample to at most this many bars",
+    ),
+    mode: DownsampleMode = Query(
+        default=DownsampleMode.CANDLE,
+        description="Downsampling mode: candle (OHLC buckets) or line (LTTB)",
+    ),
 ) -> ChartResponse:
     """
     Get chart data with custom date range and interval.
@@ -360,15 +412,16 @@ async def get_custom_chart_data(
     try:
         timespan, multiplier = _parse_interval(interval)
         
-        bars = await client.get_aggregates(
+        bars = await get_bar_cache().get_aggregates(
+            client,
             ticker=ticker.upper(),
             multiplier=multiplier,
             timespan=timespan,
             from_date=from_date,
             to_date=to_date,
             adjusted=adjusted,
-            limit=limit,
         )
+        bars = bars[:limit]
         
         if not bars:
             raise HTTPException(
@@ -380,18 +433,7 @@ async def get_custom_chart_data(
                 },
             )
         
-        data = [
-            OHLCBar(
-                timestamp=bar.timestamp,
-                open=_decimal_to_float(bar.open),
-                high=_decimal_to_float(bar.high),
-                low=_decimal_to_float(bar.low),
-                close=_decimal_to_float(bar.close),
-                volume=bar.volume,
-                vwap=_decimal_to_float(bar.vwap) if bar.vwap else None,
-            )
-            for bar in bars
-        ]
+        data, downsampling = _build_bars(bars, max_points, mode)
         
         logger.info(
             "Custom chart data retrieved",
@@ -413,6 +455,8 @@ async def get_custom_chart_data(
                 to_date=to_date,
                 bar_count=len(data),
                 adjusted=adjusted,
+                source_bar_count=len(bars) if downsampling else None,
+                downsampling=downsampling,
             ),
         )
         
@@ -139,6 +139,7 @@ async def legacy_search_stock(
             "cached": stock.cache_age_seconds is not None
             and stock.cache_age_seconds > 0,
             "cache_age_seconds": stock.cache_age_seconds or 0,
+            "stale": stock.stale,
         }
 
         # Return in old format matching StockSearchResponse
@@ -619,7 +619,7 @@ async def get_popular_stocks(
     Returns symbols ordered by search count (descending).
     """
     try:
-        popular = await service.history_repo.get_popular_searches(limit=limit)
+        popular = await service.get_popular_searches(limit=limit)
         
         # Extract just the symbols for easy consumption
         symbols = [entry.get("query", "").upper() for entry in popular if entry.get("query")]
@@ -10,16 +10,22 @@ Provides real-time stock price data including:
 
 import structlog
 from decimal import Decimal
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from ..dependencies import get_stock_service
+from ..domain.entities import Stock
 from ..infrastructure.massive_client import get_massive_client
+from ..services.stock_service import StockSearchService
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter(prefix="/api/v1/stocks", tags=["stocks"])
 
+# Maximum symbols per /quotes request
+MAX_QUOTE_SYMBOLS = 100
+
 
 class DayBar(BaseModel):
     """Daily OHLC data."""
@@ -126,6 +132,83 @@ def _decimal_to_float(value: Optional[Decimal]) -> Optional[float]:
     return float(value)
 
 
+def _stock_to_quote(stock: Stock) -> dict:
+    """Convert a Stock entity to a compact quote."""
+    return {
+        "symbol": stock.identifier.symbol,
+        "name": stock.identifier.name,
+        "price": _decimal_to_float(stock.price.current),
+        "change": _decimal_to_float(stock.price.change_absolute),
+        "change_percent": _decimal_to_float(stock.price.change_percent),
+        "prev_close": _decimal_to_float(stock.price.previous_close),
+        "volume": stock.price.volume,
+        "currency": stock.price.currency,
+        "data_source": stock.data_source.value,
+        "last_updated": stock.last_updated.isoformat(),
+        "stale": stock.stale,
+    }
+
+
+@router.get(
+    "/quotes",
+    response_model=dict,
+    summary="Get quotes for multiple stocks",
+    description=f"Get quotes for up to {MAX_QUOTE_SYMBOLS} symbols from the tiered cache.",
+)
+async def get_quotes(
+    symbols: str = Query(
+        ...,
+        description="Comma-separated symbols (e.g., AAPL,MSFT,GOOGL)",
+        examples=["AAPL,MSFT,GOOGL"],
+    ),
+    service: StockSearchService = Depends(get_stock_service),
+) -> dict:
+    """
+    Get quotes for multiple stocks in a single request.
+
+    Symbols are resolved through the cache tiers (memory, Redis,
+    PostgreSQL) and only the remaining misses are fetched upstream with
+    batched multi-ticker snapshots. Useful for watchlists and
+    notification fan-out.
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+
+    if not symbol_list:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "no_symbols", "message": "No symbols provided"},
+        )
+
+    if len(symbol_list) > MAX_QUOTE_SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "too_many_symbols",
+                "message": f"Maximum {MAX_QUOTE_SYMBOLS} symbols per request",
+            },
+        )
+
+    try:
+        found = await service.resolve_many(symbol_list)
+    except Exception as e:
+        logger.error("Batch quote fetch failed", error=str(e), count=len(symbol_list))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"error": "fetch_failed", "message": "Failed to fetch quotes"},
+        )
+
+    # Keyed by the requested identifier, so ISINs and WKNs map back to the request
+    quotes = {symbol: _stock_to_quote(found[symbol]) for symbol in symbol_list if symbol in found}
+    missing = [symbol for symbol in symbol_list if symbol not in quotes]
+
+    return {
+        "quotes": quotes,
+        "missing": missing,
+        "success_count": len(quotes),
+        "error_count": len(missing),
+    }
+
+
 @router.get(
     "/{ticker}/snapshot",
     response_model=StockSnapshotResponse,
@@ -366,33 +449,36 @@ async def get_batch_prices(
     
     results = {}
     errors = []
+    symbols = [ticker.upper() for ticker in tickers]
     
-    for ticker in tickers:
-        try:
-            snapshot = await client.get_snapshot(ticker.upper())
+    # One multi-ticker snapshot request instead of one request per ticker
+    try:
+        snapshots = await client.get_snapshots(symbols)
+    except Exception as e:
+        logger.warning("Batch price fetch failed", count=len(symbols), error=str(e))
+        snapshots = {}
+    
+    for symbol in symbols:
+        snapshot = snapshots.get(symbol)
+        
+        if snapshot:
+            # Determine current price with multiple fallbacks
+            # Note: API returns 0 for day values when market is closed
+            price = _decimal_to_float(snapshot.last_trade_price)
+            if price is None or price == 0:
+                price = _decimal_to_float(snapshot.day_close)
+            if price is None or price == 0:
+                price = _decimal_to_float(snapshot.minute_close)
+            if price is None or price == 0:
+                price = _decimal_to_float(snapshot.prev_close)
             
-            if snapshot:
-                # Determine current price with multiple fallbacks
-                # Note: API returns 0 for day values when market is closed
-                price = _decimal_to_float(snapshot.last_trade_price)
-                if price is None or price == 0:
-                    price = _decimal_to_float(snapshot.day_close)
-                if price is None or price == 0:
-                    price = _decimal_to_float(snapshot.minute_close)
-                if price is None or price == 0:
-                    price = _decimal_to_float(snapshot.prev_close)
-                
-                results[ticker.upper()] = {
-                    "price": price,
-                    "change": _decimal_to_float(snapshot.todays_change),
-                    "change_percent": _decimal_to_float(snapshot.todays_change_percent),
-                }
-            else:
-                errors.append(ticker.upper())
-                
-        except Exception as e:
-            logger.warning("Batch price fetch failed for ticker", ticker=ticker, error=str(e))
-            errors.append(ticker.upper())
+            results[symbol] = {
+                "price": price,
+                "change": _decimal_to_float(snapshot.todays_change),
+                "change_percent": _decimal_to_float(snapshot.todays_change_percent),
+            }
+        elif symbol not in errors:
+            errors.append(symbol)
     
     return {
         "prices": results,
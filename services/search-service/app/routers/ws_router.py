@@ -23,6 +23,9 @@ import websockets
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
 from websockets.exceptions import ConnectionClosed
 
+from ..infrastructure.massive_client import MassiveClient, get_massive_client
+from ..infrastructure.token_bucket import RequestPriority, request_priority
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["websocket"])
@@ -50,12 +53,57 @@ class PriceUpdate:
     event_type: str  # T=trade, Q=quote, AM=aggregate
 
 
+class OutboundFrame:
+    """
+    Outbound message serialized lazily, at most once.
+
+    Shared by every client receiving the same event, so JSON encoding cost
+    does not grow with the number of subscribers.
+    """
+
+    __slots__ = ("message", "_text")
+
+    def __init__(self, message: dict):
+        """
+        Create frame.
+
+        Args:
+            message: JSON-serializable message
+        """
+        self.message = message
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Serialized JSON text."""
+        if self._text is None:
+            self._text = json.dumps(self.message)
+        return self._text
+
+
 @dataclass
 class ClientConnection:
-    """Represents a connected WebSocket client."""
+    """
+    Represents a connected WebSocket client.
+
+    Outbound messages are pre-serialized JSON strings placed on a bounded
+    queue and sent by the client's own writer task, so a slow client never
+    blocks delivery to others.
+
+    With conflation enabled, price updates first land in pending (latest
+    frame per ticker) and are flushed on the manager's cadence; clients
+    with batch=True receive them as one multi-ticker frame.
+    """
     websocket: WebSocket
     subscriptions: Set[str] = field(default_factory=set)
     connected_at: datetime = field(default_factory=datetime.now)
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    writer_task: Optional[asyncio.Task] = None
+    dropped_messages: int = 0
+    overflows: int = 0
+    closing: bool = False
+    batch: bool = False
+    pending: Dict[str, OutboundFrame] = field(default_factory=dict)
 
 
 class MassiveWebSocketManager:
@@ -66,29 +114,76 @@ class MassiveWebSocketManager:
     - Single upstream connection to Massive (shared across clients)
     - Client subscription management
     - Automatic reconnection on disconnect
-    - Message filtering by subscription
+    - Ticker -> subscriber index, so each event only touches its subscribers
+    - Messages serialized once per event and queued per client
+    - Slow clients skip their backlog on queue overflow and are
+      disconnected after repeated overflows
+    - Per-client conflation: only the latest price per ticker is delivered
+      at each flush interval, optionally as a batched multi-ticker frame
+    - Shared REST polling fallback when the plan has no streaming access:
+      the union of subscriptions is polled with multi-ticker snapshots and
+      only changed prices are pushed
     """
     
     # Massive WebSocket URLs
     REALTIME_URL = "wss://socket.massive.com/stocks"
     DELAYED_URL = "wss://delayed.massive.com/stocks"
     
-    def __init__(self, use_realtime: bool = False):
+    def __init__(
+        self,
+        use_realtime: bool = False,
+        client_queue_size: int = 256,
+        max_client_overflows: int = 3,
+        conflation_interval_ms: int = 250,
+        poll_interval_seconds: float = 5.0,
+        snapshot_client: Optional[MassiveClient] = None,
+    ):
         """
         Initialize WebSocket manager.
         
         Args:
             use_realtime: Use real-time feed (requires Advanced/Business plan)
+            client_queue_size: Maximum queued outbound messages per client
+            max_client_overflows: Queue overflows tolerated before a client is dropped
+            conflation_interval_ms: Price flush cadence; 0 sends every update immediately
+            poll_interval_seconds: Snapshot polling interval when streaming is not authorized
+            snapshot_client: Massive REST client for polling (default: shared client)
         """
         self.api_key = os.getenv("MASSIVE_API_KEY")
         self.ws_url = self.REALTIME_URL if use_realtime else self.DELAYED_URL
+        self.client_queue_size = client_queue_size
+        self.max_client_overflows = max_client_overflows
+        self.conflation_interval = conflation_interval_ms / 1000
+        self.poll_interval = poll_interval_seconds
+        self._snapshot_client = snapshot_client
         
         # Connected clients
         self.clients: Dict[str, ClientConnection] = {}
         
+        # Ticker -> IDs of clients subscribed to it
+        self.subscribers: Dict[str, Set[str]] = {}
+        
         # All subscribed tickers (union of all client subscriptions)
         self.active_subscriptions: Set[str] = set()
         
+        # Fan-out statistics
+        self.messages_enqueued = 0
+        self.messages_dropped = 0
+        self.slow_client_disconnects = 0
+        self.price_updates = 0
+        self.updates_conflated = 0
+        self._background_tasks: Set[asyncio.Task] = set()
+        
+        # Clients with pending conflated updates
+        self._dirty_clients: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # REST polling fallback
+        self._poll_task: Optional[asyncio.Task] = None
+        self._last_polled: Dict[str, OutboundFrame] = {}
+        self.poll_requests = 0
+        self.poll_errors = 0
+        
         # Upstream Massive connection
         self._upstream_ws: Optional[websockets.WebSocketClientProtocol] = None
         self._upstream_task: Optional[asyncio.Task] = None
@@ -99,16 +194,25 @@ class MassiveWebSocketManager:
         self._is_connected = False
         self._is_shutting_down = False
 
-    async def connect_client(self, client_id: str, websocket: WebSocket) -> None:
+    async def connect_client(
+        self, client_id: str, websocket: WebSocket, batch: bool = False
+    ) -> None:
         """
         Register a new client connection.
         
         Args:
             client_id: Unique client identifier
             websocket: FastAPI WebSocket connection
+            batch: Deliver conflated prices as multi-ticker frames
         """
         await websocket.accept()
-        self.clients[client_id] = ClientConnection(websocket=websocket)
+        client = ClientConnection(
+            websocket=websocket,
+            queue=asyncio.Queue(maxsize=self.client_queue_size),
+            batch=batch,
+        )
+        client.writer_task = asyncio.create_task(self._client_writer(client_id, client))
+        self.clients[client_id] = client
         logger.info(f"Client connected: {client_id}, total clients: {len(self.clients)}")
         
         # Send welcome message
@@ -118,10 +222,26 @@ class MassiveWebSocketManager:
             "timestamp": datetime.now().isoformat(),
         })
         
+        # Start conflation flusher
+        if self.conflation_interval > 0 and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
         # Start upstream connection if this is first client
         if len(self.clients) == 1 and self.api_key:
             await self._start_upstream_connection()
 
+    def set_batch_mode(self, client_id: str, batch: bool) -> None:
+        """
+        Switch a client between single and batched price frames.
+        
+        Args:
+            client_id: Client ID
+            batch: Deliver conflated prices as multi-ticker frames
+        """
+        client = self.clients.get(client_id)
+        if client is not None:
+            client.batch = batch
+
     async def disconnect_client(self, client_id: str) -> None:
         """
         Remove a client connection.
@@ -129,19 +249,25 @@ class MassiveWebSocketManager:
         Args:
             client_id: Client to disconnect
         """
-        if client_id in self.clients:
-            client = self.clients[client_id]
-            
+        client = self.clients.pop(client_id, None)
+        self._dirty_clients.discard(client_id)
+        if client is not None:
             # Remove client's subscriptions
-            for ticker in client.subscriptions:
-                await self._update_upstream_subscription(ticker, subscribe=False)
+            for ticker in list(client.subscriptions):
+                await self._remove_subscriber(ticker, client_id)
+            client.subscriptions.clear()
             
-            del self.clients[client_id]
+            if client.writer_task and client.writer_task is not asyncio.current_task():
+                client.writer_task.cancel()
             logger.info(f"Client disconnected: {client_id}, remaining: {len(self.clients)}")
         
-        # Stop upstream if no clients
+        # Stop upstream, polling and flusher if no clients
         if not self.clients:
             await self._stop_upstream_connection()
+            await self._stop_polling()
+            if self._flush_task and self._flush_task is not asyncio.current_task():
+                self._flush_task.cancel()
+                self._flush_task = None
 
     async def subscribe(self, client_id: str, tickers: List[str]) -> None:
         """
@@ -159,6 +285,7 @@ class MassiveWebSocketManager:
         for ticker in tickers:
             ticker_upper = ticker.upper()
             client.subscriptions.add(ticker_upper)
+            self.subscribers.setdefault(ticker_upper, set()).add(client_id)
             
             # Add to upstream if not already subscribed
             if ticker_upper not in self.active_subscriptions:
@@ -170,6 +297,13 @@ class MassiveWebSocketManager:
             "type": "subscribed",
             "tickers": list(client.subscriptions),
         })
+        
+        # While polling, new subscribers start from the last polled price
+        if self.is_polling:
+            for ticker in tickers:
+                frame = self._last_polled.get(ticker.upper())
+                if frame is not None:
+                    self._enqueue(client_id, frame.text)
 
     async def unsubscribe(self, client_id: str, tickers: List[str]) -> None:
         """
@@ -187,19 +321,21 @@ class MassiveWebSocketManager:
         for ticker in tickers:
             ticker_upper = ticker.upper()
             client.subscriptions.discard(ticker_upper)
-            
-            # Check if any other client needs this ticker
-            still_needed = any(
-                ticker_upper in c.subscriptions 
-                for cid, c in self.clients.items() 
-                if cid != client_id
-            )
-            
-            if not still_needed:
-                await self._update_upstream_subscription(ticker_upper, subscribe=False)
+            await self._remove_subscriber(ticker_upper, client_id)
         
         logger.info(f"Client {client_id} unsubscribed from: {tickers}")
 
+    async def _remove_subscriber(self, ticker: str, client_id: str) -> None:
+        """Remove a client from a ticker's index, unsubscribing upstream when unused."""
+        subscriber_ids = self.subscribers.get(ticker)
+        if subscriber_ids is None:
+            return
+        
+        subscriber_ids.discard(client_id)
+        if not subscriber_ids:
+            del self.subscribers[ticker]
+            await self._update_upstream_subscription(ticker, subscribe=False)
+
     async def broadcast_price(self, update: PriceUpdate) -> None:
         """
         Broadcast price update to subscribed clients.
@@ -207,30 +343,128 @@ class MassiveWebSocketManager:
         Args:
             update: Price update to broadcast
         """
-        message = {
-            "type": "price",
-            "ticker": update.ticker,
-            "price": update.price,
-            "size": update.size,
-            "timestamp": update.timestamp,
-            "event": update.event_type,
-        }
+        self._broadcast_frame(update.ticker, OutboundFrame(self._price_message(update)))
+
+    def _broadcast_frame(self, ticker: str, frame: OutboundFrame) -> None:
+        """Deliver a price frame to the subscribers of a ticker."""
+        subscriber_ids = self.subscribers.get(ticker)
+        if not subscriber_ids:
+            return
         
-        # Send to clients subscribed to this ticker
-        for client_id, client in list(self.clients.items()):
-            if update.ticker in client.subscriptions:
-                try:
-                    await client.websocket.send_json(message)
-                except Exception as e:
-                    logger.warning(f"Failed to send to client {client_id}: {e}")
+        self.price_updates += len(subscriber_ids)
+        
+        if self.conflation_interval <= 0:
+            # Serialize once, enqueue for every subscriber without awaiting sends
+            for client_id in list(subscriber_ids):
+                self._enqueue(client_id, frame.text)
+            return
+        
+        # Keep only the latest frame per ticker until the next flush
+        for client_id in subscriber_ids:
+            client = self.clients.get(client_id)
+            if client is None:
+                continue
+            if ticker in client.pending:
+                self.updates_conflated += 1
+            client.pending[ticker] = frame
+            self._dirty_clients.add(client_id)
+
+    def _flush_pending(self) -> None:
+        """Move conflated updates of every dirty client onto its send queue."""
+        dirty, self._dirty_clients = self._dirty_clients, set()
+        
+        for client_id in dirty:
+            client = self.clients.get(client_id)
+            if client is None or not client.pending:
+                continue
+            
+            frames = list(client.pending.values())
+            client.pending.clear()
+            
+            if client.batch:
+                # Splice pre-serialized updates into one frame
+                updates = ",".join(frame.text for frame in frames)
+                self._enqueue(client_id, f'{{"type":"prices","updates":[{updates}]}}')
+            else:
+                for frame in frames:
+                    self._enqueue(client_id, frame.text)
 
-    async def _send_to_client(self, client_id: str, message: dict) -> None:
-        """Send message to a specific client."""
-        if client_id in self.clients:
+    async def _flush_loop(self) -> None:
+        """Flush conflated updates at the configured cadence."""
+        while True:
+            await asyncio.sleep(self.conflation_interval)
             try:
-                await self.clients[client_id].websocket.send_json(message)
+                self._flush_pending()
             except Exception as e:
-                logger.warning(f"Failed to send to client {client_id}: {e}")
+                logger.error(f"Failed to flush conflated price updates: {e}")
+
+    async def _send_to_client(self, client_id: str, message: dict) -> None:
+        """Queue message for a specific client."""
+        self._enqueue(client_id, json.dumps(message))
+
+    def _enqueue(self, client_id: str, text: str) -> None:
+        """
+        Queue a serialized message for a client.
+        
+        On overflow the client's backlog is discarded so it resumes with
+        current prices; after max_client_overflows overflows the client is
+        disconnected.
+        """
+        client = self.clients.get(client_id)
+        if client is None or client.closing:
+            return
+        
+        try:
+            client.queue.put_nowait(text)
+            self.messages_enqueued += 1
+            return
+        except asyncio.QueueFull:
+            pass
+        
+        client.overflows += 1
+        dropped = client.queue.qsize()
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        client.dropped_messages += dropped
+        self.messages_dropped += dropped
+        
+        if client.overflows > self.max_client_overflows:
+            logger.warning(f"Dropping slow client {client_id} after {client.overflows} overflows")
+            self.slow_client_disconnects += 1
+            client.closing = True
+            task = asyncio.create_task(self._drop_client(client_id, client))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+            return
+        
+        logger.info(f"Client {client_id} lagging, skipped {dropped} queued messages")
+        client.queue.put_nowait(json.dumps({
+            "type": "status",
+            "status": "lagging",
+            "message": f"Skipped {dropped} updates to catch up",
+        }))
+        client.queue.put_nowait(text)
+        self.messages_enqueued += 1
+
+    async def _client_writer(self, client_id: str, client: ClientConnection) -> None:
+        """Send queued messages to one client until it disconnects."""
+        try:
+            while True:
+                text = await client.queue.get()
+                await client.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to send to client {client_id}: {e}")
+            await self.disconnect_client(client_id)
+
+    async def _drop_client(self, client_id: str, client: ClientConnection) -> None:
+        """Disconnect a slow client and close its socket."""
+        await self.disconnect_client(client_id)
+        try:
+            await client.websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        except Exception:
+            pass
 
     async def _start_upstream_connection(self) -> None:
         """Start connection to Massive WebSocket."""
@@ -401,17 +635,130 @@ class MassiveWebSocketManager:
             await self.broadcast_price(update)
 
     async def _notify_clients_no_realtime(self) -> None:
-        """Notify all clients that real-time streaming isn't available."""
+        """Notify all clients that real-time streaming isn't available and start polling."""
+        if self.is_polling:
+            return
+        
         message = {
             "type": "status",
             "status": "limited",
             "message": "Real-time streaming not available on current plan. Using REST API for price updates.",
+            "poll_interval_seconds": self.poll_interval,
         }
-        for client_id, client in list(self.clients.items()):
+        text = json.dumps(message)
+        for client_id in list(self.clients):
+            self._enqueue(client_id, text)
+        
+        self._start_polling()
+
+    @property
+    def is_polling(self) -> bool:
+        """Whether the REST polling fallback is running."""
+        return self._poll_task is not None and not self._poll_task.done()
+
+    def _start_polling(self) -> None:
+        """Start polling snapshots for the union of subscriptions."""
+        if self.is_polling:
+            return
+        self._poll_task = asyncio.create_task(self._poll_loop())
+        logger.info(f"Started shared REST price polling every {self.poll_interval}s")
+
+    async def _stop_polling(self) -> None:
+        """Stop the polling fallback."""
+        if self._poll_task is not None:
+            if self._poll_task is not asyncio.current_task():
+                self._poll_task.cancel()
+                try:
+                    await self._poll_task
+                except asyncio.CancelledError:
+                    pass
+            self._poll_task = None
+            logger.info("Stopped shared REST price polling")
+        self._last_polled.clear()
+
+    async def _poll_loop(self) -> None:
+        """Poll snapshots once per interval and broadcast changed prices."""
+        while True:
             try:
-                await client.websocket.send_json(message)
+                await self._poll_once()
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.warning(f"Failed to notify client {client_id}: {e}")
+                self.poll_errors += 1
+                logger.warning(f"Shared price polling failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll_once(self) -> None:
+        """Fetch snapshots for every subscribed ticker and push the diffs."""
+        tickers = list(self.subscribers)
+        
+        # Forget prices nobody is watching any more
+        for ticker in [t for t in self._last_polled if t not in self.subscribers]:
+            del self._last_polled[ticker]
+        
+        if not tickers:
+            return
+        
+        client = self._snapshot_client or get_massive_client()
+        with request_priority(RequestPriority.PREFETCH):
+            snapshots = await client.get_snapshots(tickers)
+        self.poll_requests += 1
+        
+        for ticker, snapshot in snapshots.items():
+            price = snapshot.last_trade_price or snapshot.minute_close or snapshot.day_close
+            if price is None or ticker not in self.subscribers:
+                continue
+            
+            previous = self._last_polled.get(ticker)
+            if previous is not None and previous.message["price"] == float(price):
+                continue
+            
+            update = PriceUpdate(
+                ticker=ticker,
+                price=float(price),
+                size=snapshot.last_trade_size or 0,
+                timestamp=snapshot.last_trade_timestamp or snapshot.updated or 0,
+                event_type="snapshot",
+            )
+            frame = OutboundFrame(self._price_message(update))
+            self._broadcast_frame(ticker, frame)
+            self._last_polled[ticker] = frame
+
+    @staticmethod
+    def _price_message(update: PriceUpdate) -> dict:
+        """Build the client message for a price update."""
+        return {
+            "type": "price",
+            "ticker": update.ticker,
+            "price": update.price,
+            "size": update.size,
+            "timestamp": update.timestamp,
+            "event": update.event_type,
+        }
+
+    def get_stats(self) -> dict:
+        """
+        Get fan-out statistics.
+        
+        Returns:
+            Dictionary with client, subscription and queue counters
+        """
+        return {
+            "connected_clients": len(self.clients),
+            "indexed_tickers": len(self.subscribers),
+            "messages_enqueued": self.messages_enqueued,
+            "messages_dropped": self.messages_dropped,
+            "slow_client_disconnects": self.slow_client_disconnects,
+            "conflation_interval_ms": int(self.conflation_interval * 1000),
+            "price_updates": self.price_updates,
+            "updates_conflated": self.updates_conflated,
+            "polling": self.is_polling,
+            "poll_requests": self.poll_requests,
+            "poll_errors": self.poll_errors,
+            "queued_messages": sum(
+                c.queue.qsize() for c in self.clients.values() if c.queue is not None
+            ),
+        }
 
 
 # Singleton manager instance
@@ -423,7 +770,13 @@ def get_ws_manager() -> MassiveWebSocketManager:
     global _ws_manager
     if _ws_manager is None:
         use_realtime = os.getenv("MASSIVE_USE_REALTIME", "false").lower() == "true"
-        _ws_manager = MassiveWebSocketManager(use_realtime=use_realtime)
+        _ws_manager = MassiveWebSocketManager(
+            use_realtime=use_realtime,
+            client_queue_size=int(os.getenv("WS_CLIENT_QUEUE_SIZE", "256")),
+            max_client_overflows=int(os.getenv("WS_MAX_CLIENT_OVERFLOWS", "3")),
+            conflation_interval_ms=int(os.getenv("WS_CONFLATION_MS", "250")),
+            poll_interval_seconds=float(os.getenv("WS_POLL_INTERVAL_SECONDS", "5")),
+        )
     return _ws_manager
 
 
@@ -434,6 +787,10 @@ async def websocket_prices(
         default=None,
         description="Comma-separated list of tickers to subscribe to",
     ),
+    batch: bool = Query(
+        default=False,
+        description="Receive price updates as batched multi-ticker frames",
+    ),
 ):
     """
     WebSocket endpoint for real-time price updates.
@@ -451,7 +808,13 @@ async def websocket_prices(
     {"action": "unsubscribe", "tickers": ["AAPL"]}
     ```
     
-    Price updates are sent as:
+    Switch batched delivery:
+    ```json
+    {"action": "configure", "batch": true}
+    ```
+    
+    Updates are conflated: at most one price per ticker is sent per flush
+    interval (WS_CONFLATION_MS, default 250ms). Price updates are sent as:
     ```json
     {
         "type": "price",
@@ -462,6 +825,11 @@ async def websocket_prices(
         "event": "trade"
     }
     ```
+    
+    With batch enabled, each flush sends one frame:
+    ```json
+    {"type": "prices", "updates": [{"type": "price", "ticker": "AAPL", ...}]}
+    ```
     """
     manager = get_ws_manager()
     
@@ -470,7 +838,7 @@ async def websocket_prices(
     
     try:
         # Connect client
-        await manager.connect_client(client_id, websocket)
+        await manager.connect_client(client_id, websocket, batch=batch)
         
         # Subscribe to initial tickers if provided
         if tickers:
@@ -494,14 +862,22 @@ async def websocket_prices(
                     if ticker_list:
                         await manager.unsubscribe(client_id, ticker_list)
                         
+                elif action == "configure":
+                    manager.set_batch_mode(client_id, bool(data.get("batch", False)))
+                    
                 elif action == "ping":
-                    await websocket.send_json({"type": "pong", "timestamp": datetime.now().isoformat()})
+                    await manager._send_to_client(
+                        client_id, {"type": "pong", "timestamp": datetime.now().isoformat()}
+                    )
                     
             except WebSocketDisconnect:
                 break
             except Exception as e:
+                if client_id not in manager.clients:
+                    # Dropped by the manager (e.g. slow consumer)
+                    break
                 logger.warning(f"Error processing client message: {e}")
-                await websocket.send_json({
+                await manager._send_to_client(client_id, {
                     "type": "error",
                     "message": str(e),
                 })
@@ -529,4 +905,5 @@ async def websocket_status():
         "upstream_connected": manager._is_connected,
         "websocket_url": manager.ws_url,
         "api_key_configured": bool(manager.api_key),
+        "fanout": manager.get_stats(),
     }
@@ -5,10 +5,17 @@ Provides fuzzy matching, relevance scoring, and smart search capabilities.
 """
 
 from .fuzzy_matcher import FuzzyMatcher
+from .local_autocomplete import (AutocompleteFailover, LocalAutocompleteIndex,
+                                 get_autocomplete_failover,
+                                 get_local_autocomplete_index)
 from .relevance_scorer import RelevanceScorer, SearchMatch
 
 __all__ = [
     "FuzzyMatcher",
     "RelevanceScorer",
     "SearchMatch",
+    "LocalAutocompleteIndex",
+    "AutocompleteFailover",
+    "get_local_autocomplete_index",
+    "get_autocomplete_failover",
 ]
@@ -0,0 +1,431 @@
+"""
+Embedded autocomplete engine used when Meilisearch is unavailable.
+
+LocalAutocompleteIndex holds the same documents that
+MeilisearchSyncService pushes to Meilisearch (one per symbol) and answers
+prefix and typo-tolerant queries in-process. Matching mirrors the index
+settings in MeilisearchClientManager.initialize_index:
+
+- searchable attributes, in rank order: symbol, name, isin, wkn
+- the last query word matches as a prefix, earlier words as whole words
+- one typo allowed from 3 characters, two from 5 (first letter must match)
+- ranking: matched words, typos, attribute, exactness; ties by priority
+
+AutocompleteFailover routes queries to Meilisearch and switches to the
+local index after repeated errors or latency-budget overruns. While
+failed over, Meilisearch health is probed periodically and queries switch
+back as soon as it reports available.
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import re
+import time
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+try:
+    from rapidfuzz.distance import OSA
+
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Failover configuration
+AUTOCOMPLETE_LATENCY_BUDGET_MS = float(os.getenv("AUTOCOMPLETE_LATENCY_BUDGET_MS", "150"))
+AUTOCOMPLETE_FAILURE_THRESHOLD = int(os.getenv("AUTOCOMPLETE_FAILURE_THRESHOLD", "3"))
+AUTOCOMPLETE_RECOVERY_SECONDS = float(os.getenv("AUTOCOMPLETE_RECOVERY_SECONDS", "10"))
+
+# Searchable attributes in Meilisearch rank order
+SEARCHABLE_ATTRIBUTES = ("symbol", "name", "isin", "wkn")
+
+# Typo tolerance (min_word_size_for_typos in the index settings)
+ONE_TYPO_MIN_LENGTH = 3
+TWO_TYPOS_MIN_LENGTH = 5
+
+# Words, keeping inner dots and hyphens of tickers such as BRK.B or BMW.DE
+_WORD_PATTERN = re.compile(r"\w+(?:[.\-]\w+)*")
+
+# Prometheus metrics
+autocomplete_source_total = Counter(
+    "autocomplete_queries_by_source_total",
+    "Autocomplete queries by the engine that answered them",
+    ["source"],
+)
+
+autocomplete_failover_active = Gauge(
+    "autocomplete_failover_active",
+    "Whether autocomplete is currently served by the local fallback (1) or Meilisearch (0)",
+)
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lower-case words."""
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def _allowed_typos(word: str) -> int:
+    """Number of typos tolerated for a query word."""
+    if len(word) >= TWO_TYPOS_MIN_LENGTH:
+        return 2
+    if len(word) >= ONE_TYPO_MIN_LENGTH:
+        return 1
+    return 0
+
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance with adjacent transpositions, bounded by max_distance.
+
+    Returns max_distance + 1 if the distance exceeds the bound.
+    """
+    if RAPIDFUZZ_AVAILABLE:
+        return OSA.distance(a, b, score_cutoff=max_distance)
+
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class LocalAutocompleteIndex:
+    """
+    In-process prefix and typo-tolerant index over autocomplete documents.
+
+    Documents are keyed by symbol; upsert() and remove() apply sync
+    changes, load() replaces the whole set.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        # term -> {symbol: best attribute rank}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._sorted_terms: List[str] = []
+        self._terms_by_initial: Dict[str, List[str]] = {}
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    async def load(self, documents: AsyncIterable[Dict[str, Any]]) -> int:
+        """
+        Replace the index contents with a full document set.
+
+        Args:
+            documents: All current documents
+
+        Returns:
+            Number of documents loaded
+        """
+        fresh = LocalAutocompleteIndex()
+        async for doc in documents:
+            fresh._add(doc)
+        fresh._rebuild_terms()
+
+        self._documents = fresh._documents
+        self._postings = fresh._postings
+        self._sorted_terms = fresh._sorted_terms
+        self._terms_by_initial = fresh._terms_by_initial
+        self._dirty = False
+
+        logger.info("Local autocomplete index loaded with %d documents", len(self._documents))
+        return len(self._documents)
+
+    def upsert(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """Add or replace documents."""
+        for doc in documents:
+            self._remove(doc["symbol"])
+            self._add(doc)
+        self._dirty = True
+
+    def remove(self, symbols: Iterable[str]) -> None:
+        """Remove documents by symbol."""
+        for symbol in symbols:
+            self._remove(symbol)
+        self._dirty = True
+
+    def _add(self, doc: Dict[str, Any]) -> None:
+        """Index one document."""
+        symbol = doc["symbol"]
+        self._documents[symbol] = doc
+        for rank, attribute in enumerate(SEARCHABLE_ATTRIBUTES):
+            for term in _tokenize(str(doc.get(attribute) or "")):
+                postings = self._postings.setdefault(term, {})
+                postings[symbol] = min(rank, postings.get(symbol, rank))
+
+    def _remove(self, symbol: str) -> None:
+        """Unindex one document."""
+        doc = self._documents.pop(symbol, None)
+        if doc is None:
+            return
+        for attribute in SEARCHABLE_ATTRIBUTES:
+            for term in _tokenize(str(doc.get(attribute) or "")):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(symbol, None)
+                    if not postings:
+                        del self._postings[term]
+
+    def _rebuild_terms(self) -> None:
+        """Rebuild the sorted term list and typo candidate buckets."""
+        self._sorted_terms = sorted(self._postings)
+        buckets: Dict[str, List[str]] = {}
+        for term in self._sorted_terms:
+            buckets.setdefault(term[0], []).append(term)
+        self._terms_by_initial = buckets
+        self._dirty = False
+
+    def _match_word(self, word: str, is_prefix: bool) -> Dict[str, Tuple[int, int, bool]]:
+        """
+        Find documents matching one query word.
+
+        Args:
+            word: Lower-case query word
+            is_prefix: Allow the word to match the start of a term
+
+        Returns:
+            symbol -> (typos, attribute rank, exact) of the best match
+        """
+        matches: Dict[str, Tuple[int, int, bool]] = {}
+
+        def record(term: str, typos: int) -> None:
+            exact = typos == 0 and term == word
+            for symbol, rank in self._postings.get(term, {}).items():
+                best = matches.get(symbol)
+                if best is None or (typos, rank, not exact) < (best[0], best[1], not best[2]):
+                    matches[symbol] = (typos, rank, exact)
+
+        # Exact and prefix matches
+        if is_prefix:
+            start = bisect.bisect_left(self._sorted_terms, word)
+            for term in self._sorted_terms[start:]:
+                if not term.startswith(word):
+                    break
+                record(term, 0)
+        elif word in self._postings:
+            record(word, 0)
+
+        # Typo matches (first letter must match)
+        max_typos = _allowed_typos(word)
+        if max_typos:
+            for term in self._terms_by_initial.get(word[0], []):
+                if term == word or (is_prefix and term.startswith(word)):
+                    continue
+                target = term[: len(word)] if is_prefix and len(term) > len(word) else term
+                typos = _edit_distance(word, target, max_typos)
+                if 0 < typos <= max_typos:
+                    record(term, typos)
+
+        return matches
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        exchange: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the index.
+
+        Args:
+            query: Search query
+            limit: Maximum results
+            exchange: Only return documents on this exchange
+
+        Returns:
+            Matching documents, best first
+        """
+        words = _tokenize(query)
+        if not words or not self._documents:
+            return []
+        if self._dirty:
+            self._rebuild_terms()
+
+        # symbol -> [matched words, typos, best attribute, exact words]
+        scores: Dict[str, List[int]] = {}
+        for i, word in enumerate(words):
+            for symbol, (typos, rank, exact) in self._match_word(
+                word, is_prefix=i == len(words) - 1
+            ).items():
+                score = scores.setdefault(symbol, [0, 0, len(SEARCHABLE_ATTRIBUTES), 0])
+                score[0] += 1
+                score[1] += typos
+                score[2] = min(score[2], rank)
+                score[3] += int(exact)
+
+        ranked = []
+        for symbol, (matched, typos, rank, exact_words) in scores.items():
+            doc = self._documents[symbol]
+            if exchange and doc.get("exchange") != exchange:
+                continue
+            key = (-matched, typos, rank, -exact_words, -(doc.get("priority") or 0), symbol)
+            ranked.append((key, doc))
+
+        ranked.sort(key=lambda item: item[0])
+        return [doc for _, doc in ranked[:limit]]
+
+
+class AutocompleteFailover:
+    """
+    Routes autocomplete queries to Meilisearch or the local index.
+
+    Every query that fails or exceeds the latency budget on Meilisearch is
+    answered from the local index. After failure_threshold consecutive
+    failures, queries go to the local index directly until a health probe
+    (at most every recovery_seconds) reports Meilisearch available again.
+    """
+
+    def __init__(
+        self,
+        primary: Any,
+        local_index: LocalAutocompleteIndex,
+        latency_budget_ms: float = AUTOCOMPLETE_LATENCY_BUDGET_MS,
+        failure_threshold: int = AUTOCOMPLETE_FAILURE_THRESHOLD,
+        recovery_seconds: float = AUTOCOMPLETE_RECOVERY_SECONDS,
+    ):
+        """
+        Initialize failover router.
+
+        Args:
+            primary: Meilisearch manager (search_autocomplete, health_check)
+            local_index: Embedded fallback index
+            latency_budget_ms: Max Meilisearch latency before falling back
+            failure_threshold: Consecutive failures before failing over
+            recovery_seconds: Minimum interval between health probes
+        """
+        self.primary = primary
+        self.local_index = local_index
+        self.latency_budget_seconds = latency_budget_ms / 1000
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+
+        self.failed_over = False
+        self.consecutive_failures = 0
+        self.failovers = 0
+        self._next_probe = 0.0
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 10,
+        exchange: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Run an autocomplete query on the active engine.
+
+        Args:
+            query: Search query
+            limit: Maximum results
+            exchange: Optional exchange filter
+
+        Returns:
+            (hits, source) where source is "meilisearch" or "local"
+        """
+        if self.failed_over:
+            await self._maybe_recover()
+
+        if not self.failed_over:
+            filter_expr = f"exchange = {exchange}" if exchange else None
+            try:
+                hits = await asyncio.wait_for(
+                    self.primary.search_autocomplete(
+                        query=query, limit=limit, filters=filter_expr, raise_errors=True
+                    ),
+                    timeout=self.latency_budget_seconds,
+                )
+                self.consecutive_failures = 0
+                autocomplete_source_total.labels(source="meilisearch").inc()
+                return hits, "meilisearch"
+            except asyncio.TimeoutError:
+                self._record_failure("latency budget exceeded")
+            except Exception as e:
+                self._record_failure(str(e))
+
+        autocomplete_source_total.labels(source="local").inc()
+        return self.local_index.search(query, limit=limit, exchange=exchange), "local"
+
+    def _record_failure(self, reason: str) -> None:
+        """Count a Meilisearch failure and fail over at the threshold."""
+        self.consecutive_failures += 1
+        logger.warning(
+            "Meilisearch autocomplete failed (%s), answering from local index", reason
+        )
+        if not self.failed_over and self.consecutive_failures >= self.failure_threshold:
+            self.failed_over = True
+            self.failovers += 1
+            self._next_probe = time.monotonic() + self.recovery_seconds
+            autocomplete_failover_active.set(1)
+            logger.error(
+                "Autocomplete failed over to local index after %d failures",
+                self.consecutive_failures,
+            )
+
+    async def _maybe_recover(self) -> None:
+        """Probe Meilisearch health and switch back if it is available."""
+        now = time.monotonic()
+        if now < self._next_probe:
+            return
+        self._next_probe = now + self.recovery_seconds
+
+        try:
+            health = await asyncio.wait_for(
+                self.primary.health_check(), timeout=self.latency_budget_seconds * 4
+            )
+        except Exception as e:
+            logger.debug("Meilisearch health probe failed: %s", e)
+            return
+
+        if health.get("status") == "available":
+            self.failed_over = False
+            self.consecutive_failures = 0
+            autocomplete_failover_active.set(0)
+            logger.info("Meilisearch healthy again, autocomplete switched back")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get failover state."""
+        return {
+            "source": "local" if self.failed_over else "meilisearch",
+            "consecutive_failures": self.consecutive_failures,
+            "failovers": self.failovers,
+            "local_documents": len(self.local_index),
+        }
+
+
+_local_index: Optional[LocalAutocompleteIndex] = None
+_failover: Optional[AutocompleteFailover] = None
+
+
+def get_local_autocomplete_index() -> LocalAutocompleteIndex:
+    """Get global local autocomplete index."""
+    global _local_index
+    if _local_index is None:
+        _local_index = LocalAutocompleteIndex()
+    return _local_index
+
+
+def get_autocomplete_failover() -> AutocompleteFailover:
+    """Get global autocomplete failover router."""
+    global _failover
+    if _failover is None:
+        from ..core.meilisearch_client import get_meilisearch_manager
+
+        _failover = AutocompleteFailover(get_meilisearch_manager(), get_local_autocomplete_index())
+    return _failover
@@ -6,9 +6,11 @@ match quality, popularity, field priority, and recency.
 """
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+import numpy as np
 
 from ..domain.entities import Stock
 
@@ -177,36 +179,176 @@ class RelevanceScorer:
         )
 
     def score_batch(
-        self, matches: List[tuple], user_search_history: Optional[List[str]] = None
+        self,
+        matches: List[tuple],
+        user_search_history: Optional[List[str]] = None,
+        limit: Optional[int] = None,
     ) -> List[SearchMatch]:
         """
         Score multiple matches and return sorted by relevance.
 
+        Columnar equivalent of calling score() per match: the candidate
+        features are gathered into NumPy arrays, combined in one weighted
+        expression and the top results selected with argpartition.
+        SearchMatch objects are only built for the returned results.
+
         Args:
             matches: List of (stock, match_type, matched_field, similarity) tuples
             user_search_history: List of user's recent searches
+            limit: Return only the best `limit` matches (default: all)
 
         Returns:
             List of SearchMatch objects sorted by score (descending)
         """
-        scored_matches = []
-
-        for match_data in matches:
-            if len(match_data) == 3:
-                stock, match_type, matched_field = match_data
-                similarity = 1.0
-            else:
-                stock, match_type, matched_field, similarity = match_data
+        if not matches:
+            return []
+
+        stocks = [m[0] for m in matches]
+        match_types = [m[1] for m in matches]
+        matched_fields = [m[2] for m in matches]
+        similarity = np.fromiter(
+            (m[3] if len(m) > 3 else 1.0 for m in matches),
+            dtype=np.float64,
+            count=len(matches),
+        )
+        symbols = [stock.identifier.symbol for stock in stocks]
+
+        total = (
+            self._match_scores(match_types, similarity) * self.MATCH_TYPE_WEIGHT
+            + self._popularity_scores(stocks, symbols) * self.POPULARITY_WEIGHT
+            + self._lookup(matched_fields, self.FIELD_PRIORITY_SCORES, 50)
+            * self.FIELD_PRIORITY_WEIGHT
+            + self._recency_scores(symbols, user_search_history) * self.RECENCY_WEIGHT
+        )
 
-            scored_match = self.score(
-                stock, match_type, matched_field, similarity, user_search_history
+        # Top-k selection; ties keep input order like a stable sort would
+        if limit is not None and 0 < limit < len(matches):
+            top = np.sort(np.argpartition(-total, limit - 1)[:limit])
+        else:
+            top = np.arange(len(matches))
+        order = top[np.argsort(-total[top], kind="stable")]
+
+        return [
+            SearchMatch(
+                stock=stocks[i],
+                score=float(total[i]),
+                match_type=match_types[i],
+                matched_field=matched_fields[i],
+                similarity=float(similarity[i]),
             )
-            scored_matches.append(scored_match)
+            for i in order.tolist()
+        ]
+
+    @staticmethod
+    def _lookup(keys: List[str], table: dict, default: float) -> np.ndarray:
+        """Map keys to their table scores as an array."""
+        return np.fromiter(
+            (table.get(key, default) for key in keys),
+            dtype=np.float64,
+            count=len(keys),
+        )
+
+    def _match_scores(
+        self, match_types: List[str], similarity: np.ndarray
+    ) -> np.ndarray:
+        """Vectorized _calculate_match_score."""
+        base = self._lookup(match_types, self.MATCH_TYPE_SCORES, 30)
+        fuzzy = np.fromiter(
+            (t == "fuzzy" for t in match_types), dtype=bool, count=len(match_types)
+        )
+        return np.where(fuzzy & (similarity < 1.0), np.trunc(base * similarity), base)
+
+    def _popularity_scores(
+        self, stocks: List[Stock], symbols: List[Optional[str]]
+    ) -> np.ndarray:
+        """Vectorized _calculate_popularity_score."""
+        search_counts = np.fromiter(
+            (self.search_stats.get(symbol, 0) for symbol in symbols),
+            dtype=np.float64,
+            count=len(symbols),
+        )
+        search_score = (
+            search_counts / self.max_search_count * 70
+            if self.max_search_count > 0
+            else np.zeros(len(symbols))
+        )
+
+        caps = np.fromiter(
+            (
+                float(stock.metadata.market_cap) if stock.metadata.market_cap else 0.0
+                for stock in stocks
+            ),
+            dtype=np.float64,
+            count=len(stocks),
+        )
+        cap_billions = caps / 1_000_000_000
+        market_cap_score = np.select(
+            [
+                caps <= 0,
+                cap_billions >= 200,
+                cap_billions >= 10,
+                cap_billions >= 2,
+                cap_billions >= 0.3,
+            ],
+            [5, 30, 25, 20, 15],
+            default=10,
+        )
 
-        # Sort by score descending
-        scored_matches.sort(key=lambda m: m.score, reverse=True)
+        return search_score + market_cap_score
+
+    @staticmethod
+    def _recency_scores(
+        symbols: List[Optional[str]], user_search_history: Optional[List[str]]
+    ) -> np.ndarray:
+        """Vectorized _calculate_recency_score using a position dict."""
+        if not user_search_history:
+            return np.full(len(symbols), 50.0)
+
+        # First occurrence wins, matching list.index
+        positions: Dict[str, int] = {}
+        for position, query in enumerate(user_search_history):
+            positions.setdefault(query, position)
+
+        return np.fromiter(
+            (
+                max(20, 100 - positions[symbol] * 4) if symbol in positions else 30
+                for symbol in symbols
+            ),
+            dtype=np.float64,
+            count=len(symbols),
+        )
+
+    def rerank(
+        self, ranked: List[SearchMatch], user_search_history: Optional[List[str]] = None
+    ) -> List[SearchMatch]:
+        """
+        Apply a user's recency boost to an unpersonalized ranking.
+
+        Matches scored without history carry the neutral recency score, so
+        only the recency component has to be recomputed. The input list is
+        not modified, which lets callers cache and share it.
+
+        Args:
+            ranked: SearchMatch objects scored without user history
+            user_search_history: List of user's recent searches
+
+        Returns:
+            New list of SearchMatch objects sorted by score (descending)
+        """
+        if not user_search_history:
+            return list(ranked)
+
+        reranked = []
+        for match in ranked:
+            boost = self._calculate_recency_score(
+                match.stock, user_search_history
+            ) - self._calculate_recency_score(match.stock)
+            reranked.append(
+                replace(match, score=match.score + boost * self.RECENCY_WEIGHT)
+            )
+        reranked.sort(key=lambda m: m.score, reverse=True)
 
-        return scored_matches
+        return reranked
 
     def _calculate_match_score(self, match_type: str, similarity: float) -> float:
         """
@@ -0,0 +1,247 @@
+"""
+Server-side downsampling of chart bars to a point budget.
+
+Long ranges (MAX, multi-year minute bars) can return tens of thousands of
+bars, far more than a chart can draw. Downsampling them before building
+response models bounds payload size and serialization cost.
+
+Modes:
+- candle: bars are merged into equal-count buckets, preserving OHLC
+  semantics (first open, max high, min low, last close, summed volume,
+  volume-weighted VWAP)
+- line: Largest-Triangle-Three-Buckets (LTTB) picks the original bars that
+  best preserve the visual shape of the close series
+"""
+
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import List
+
+import numpy as np
+
+from ..infrastructure.massive_client import AggregateBar
+
+logger = logging.getLogger(__name__)
+
+
+class DownsampleMode(str, Enum):
+    """Downsampling strategy."""
+
+    CANDLE = "candle"
+    LINE = "line"
+
+
+@dataclass
+class BarArrays:
+    """
+    Column-oriented bar data.
+
+    Attributes:
+        timestamp: Bar start in Unix milliseconds (int64)
+        open: Opening prices (float64)
+        high: High prices (float64)
+        low: Low prices (float64)
+        close: Closing prices (float64)
+        volume: Volumes (int64)
+        vwap: Volume-weighted average prices, NaN when missing (float64)
+    """
+
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    vwap: np.ndarray
+
+    def __len__(self) -> int:
+        """Number of bars."""
+        return len(self.timestamp)
+
+    def take(self, indices: np.ndarray) -> "BarArrays":
+        """Select bars by index."""
+        return BarArrays(
+            timestamp=self.timestamp[indices],
+            open=self.open[indices],
+            high=self.high[indices],
+            low=self.low[indices],
+            close=self.close[indices],
+            volume=self.volume[indices],
+            vwap=self.vwap[indices],
+        )
+
+    def to_rows(self) -> List[dict]:
+        """
+        Convert to row dictionaries with native Python types.
+
+        Returns:
+            List of dicts with timestamp, open, high, low, close, volume, vwap
+        """
+        vwap = [None if np.isnan(v) else v for v in self.vwap.tolist()]
+        return [
+            {
+                "timestamp": t,
+                "open": o,
+                "high": h,
+                "low": low,
+                "close": c,
+                "volume": v,
+                "vwap": vw,
+            }
+            for t, o, h, low, c, v, vw in zip(
+                self.timestamp.tolist(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+                vwap,
+            )
+        ]
+
+
+def bars_to_arrays(bars: List[AggregateBar]) -> BarArrays:
+    """
+    Convert aggregate bars to column arrays.
+
+    Args:
+        bars: Bars in ascending timestamp order
+
+    Returns:
+        BarArrays with one element per bar
+    """
+    return BarArrays(
+        timestamp=np.fromiter((b.timestamp for b in bars), dtype=np.int64, count=len(bars)),
+        open=np.fromiter((float(b.open) for b in bars), dtype=np.float64, count=len(bars)),
+        high=np.fromiter((float(b.high) for b in bars), dtype=np.float64, count=len(bars)),
+        low=np.fromiter((float(b.low) for b in bars), dtype=np.float64, count=len(bars)),
+        close=np.fromiter((float(b.close) for b in bars), dtype=np.float64, count=len(bars)),
+        volume=np.fromiter((b.volume or 0 for b in bars), dtype=np.int64, count=len(bars)),
+        vwap=np.fromiter(
+            (float(b.vwap) if b.vwap else np.nan for b in bars),
+            dtype=np.float64,
+            count=len(bars),
+        ),
+    )
+
+
+def bucket_ohlc(arrays: BarArrays, max_points: int) -> BarArrays:
+    """
+    Merge bars into at most max_points equal-count OHLC buckets.
+
+    Args:
+        arrays: Source bars
+        max_points: Maximum number of output bars
+
+    Returns:
+        Aggregated bars (unchanged if already within budget)
+    """
+    n = len(arrays)
+    if n <= max_points or max_points < 1:
+        return arrays
+
+    # Bucket start offsets; strictly increasing because n > max_points
+    starts = np.linspace(0, n, max_points + 1).astype(np.int64)[:-1]
+    ends = np.append(starts[1:], n)
+
+    volume = np.add.reduceat(arrays.volume, starts)
+
+    # VWAP weighted by volume; buckets without volume or VWAP fall back to NaN
+    has_vwap = ~np.isnan(arrays.vwap)
+    weights = np.where(has_vwap, arrays.volume, 0).astype(np.float64)
+    weighted = np.add.reduceat(np.where(has_vwap, arrays.vwap, 0.0) * weights, starts)
+    weight_sum = np.add.reduceat(weights, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.where(weight_sum > 0, weighted / weight_sum, np.nan)
+
+    return BarArrays(
+        timestamp=arrays.timestamp[starts],
+        open=arrays.open[starts],
+        high=np.maximum.reduceat(arrays.high, starts),
+        low=np.minimum.reduceat(arrays.low, starts),
+        close=arrays.close[ends - 1],
+        volume=volume,
+        vwap=vwap,
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Select indices with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Each inner bucket keeps the
+    point forming the largest triangle with the previously selected point
+    and the mean of the next bucket. Triangle areas are computed for a
+    whole bucket at once.
+
+    Args:
+        x: X values (e.g. timestamps), ascending
+        y: Y values (e.g. close prices)
+        max_points: Number of points to keep (>= 3)
+
+    Returns:
+        Sorted array of selected indices
+    """
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+
+    # Inner points 1..n-2 split into max_points-2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    # Mean of each bucket, used as the third triangle vertex
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / counts
+    # The last bucket looks ahead to the final point
+    next_x = np.append(mean_x[1:], x[n - 1])
+    next_y = np.append(mean_y[1:], y[n - 1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[prev], y[prev]
+        areas = np.abs(
+            (ax - next_x[i]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (next_y[i] - ay)
+        )
+        prev = lo + int(np.argmax(areas))
+        selected[i + 1] = prev
+
+    return selected
+
+
+def downsample_bars(
+    bars: List[AggregateBar],
+    max_points: int,
+    mode: DownsampleMode = DownsampleMode.CANDLE,
+) -> BarArrays:
+    """
+    Downsample bars to a point budget.
+
+    Args:
+        bars: Bars in ascending timestamp order
+        max_points: Maximum number of output bars
+        mode: candle (bucket aggregation) or line (LTTB on close)
+
+    Returns:
+        Downsampled bars as column arrays
+    """
+    arrays = bars_to_arrays(bars)
+    if len(arrays) <= max_points:
+        return arrays
+
+    if mode == DownsampleMode.LINE:
+        result = arrays.take(lttb_indices(arrays.timestamp, arrays.close, max_points))
+    else:
+        result = bucket_ohlc(arrays, max_points)
+
+    logger.debug(f"Downsampled {len(arrays)} bars to {len(result)} ({mode.value})")
+    return result
@@ -17,7 +17,9 @@ import os
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
-import aiohttp
+import httpx
+
+from ..infrastructure.http_client import get_http_client_pool
 
 logger = logging.getLogger(__name__)
 
@@ -34,21 +36,17 @@ class FinancialDataService:
         """Initialize the financial data service."""
         self.api_key = os.getenv("MASSIVE_API_KEY", "")
         self.base_url = "https://api.massive.com"
-        self.session: Optional[aiohttp.ClientSession] = None
 
         if not self.api_key:
             logger.error("CRITICAL: MASSIVE_API_KEY not set - real stock data will be unavailable")
 
-    async def get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
-        return self.session
+    def get_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client shared with other Massive API callers."""
+        return get_http_client_pool().get_client(self.base_url)
 
     async def close(self):
-        """Close the aiohttp session."""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Close upstream connections (closes the shared upstream pool)."""
+        await get_http_client_pool().close()
 
     async def get_real_time_quote(self, symbol: str) -> Dict[str, Any]:
         """
@@ -116,41 +114,41 @@ class FinancialDataService:
 
     async def _get_previous_close(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get previous day's closing data."""
-        session = await self.get_session()
+        client = self.get_client()
         url = f"{self.base_url}/v2/aggs/ticker/{symbol.upper()}/prev"
         params = {"adjusted": "true", "apiKey": self.api_key}
 
         try:
-            async with session.get(url, params=params, timeout=5) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    results = data.get("results", [])
-                    if results:
-                        result = results[0]
-                        return {
-                            "close": result.get("c", 0),
-                            "open": result.get("o", 0),
-                            "high": result.get("h", 0),
-                            "low": result.get("l", 0),
-                            "volume": result.get("v", 0),
-                        }
-                return None
+            response = await client.get(url, params=params, timeout=5)
+            if response.status_code == 200:
+                data = response.json()
+                results = data.get("results", [])
+                if results:
+                    result = results[0]
+                    return {
+                        "close": result.get("c", 0),
+                        "open": result.get("o", 0),
+                        "high": result.get("h", 0),
+                        "low": result.get("l", 0),
+                        "volume": result.get("v", 0),
+                    }
+            return None
         except Exception as e:
             logger.error(f"Error fetching previous close for {symbol}: {e}")
             return None
 
     async def _get_snapshot(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get current snapshot data."""
-        session = await self.get_session()
+        client = self.get_client()
         url = f"{self.base_url}/v2/snapshot/locale/us/markets/stocks/tickers/{symbol.upper()}"
         params = {"apiKey": self.api_key}
 
         try:
-            async with session.get(url, params=params, timeout=5) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data.get("ticker", {})
-                return None
+            response = await client.get(url, params=params, timeout=5)
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("ticker", {})
+            return None
         except Exception as e:
             logger.error(f"Error fetching snapshot for {symbol}: {e}")
             return None
@@ -182,37 +180,37 @@ class FinancialDataService:
             to_date = datetime.utcnow()
             from_date = to_date - timedelta(days=1)
 
-            session = await self.get_session()
+            client = self.get_client()
             url = f"{self.base_url}/v2/aggs/ticker/{symbol.upper()}/range/{multiplier}/{timespan}/{from_date.strftime('%Y-%m-%d')}/{to_date.strftime('%Y-%m-%d')}"
             params = {"adjusted": "true", "sort": "asc", "apiKey": self.api_key}
 
-            async with session.get(url, params=params, timeout=10) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch intraday data: HTTP {response.status}")
-                    raise ValueError(f"Failed to fetch intraday data for {symbol}: HTTP {response.status}")
-
-                data = await response.json()
-                results = data.get("results", [])
-
-                if not results:
-                    logger.error(f"No intraday data available for {symbol}")
-                    raise ValueError(f"No intraday data available for symbol: {symbol}")
-
-                chart_data = []
-                for bar in results[-100:]:  # Last 100 data points
-                    timestamp = datetime.fromtimestamp(bar["t"] / 1000)
-                    chart_data.append(
-                        {
-                            "timestamp": timestamp.isoformat(),
-                            "open": round(bar["o"], 2),
-                            "high": round(bar["h"], 2),
-                            "low": round(bar["l"], 2),
-                            "close": round(bar["c"], 2),
-                            "volume": bar["v"],
-                        }
-                    )
-
-                return chart_data
+            response = await client.get(url, params=params, timeout=10)
+            if response.status_code != 200:
+                logger.error(f"Failed to fetch intraday data: HTTP {response.status_code}")
+                raise ValueError(f"Failed to fetch intraday data for {symbol}: HTTP {response.status_code}")
+
+            data = response.json()
+            results = data.get("results", [])
+
+            if not results:
+                logger.error(f"No intraday data available for {symbol}")
+                raise ValueError(f"No intraday data available for symbol: {symbol}")
+
+            chart_data = []
+            for bar in results[-100:]:  # Last 100 data points
+                timestamp = datetime.fromtimestamp(bar["t"] / 1000)
+                chart_data.append(
+                    {
+                        "timestamp": timestamp.isoformat(),
+                        "open": round(bar["o"], 2),
+                        "high": round(bar["h"], 2),
+                        "low": round(bar["l"], 2),
+                        "close": round(bar["c"], 2),
+                        "volume": bar["v"],
+                    }
+                )
+
+            return chart_data
 
         except (APIKeyNotConfiguredError, ValueError):
             raise
@@ -240,7 +238,7 @@ class FinancialDataService:
             raise APIKeyNotConfiguredError("MASSIVE_API_KEY environment variable is not configured")
 
         try:
-            session = await self.get_session()
+            client = self.get_client()
             url = f"{self.base_url}/v2/reference/news"
             params = {
                 "ticker": symbol.upper(),
@@ -249,32 +247,32 @@ class FinancialDataService:
                 "apiKey": self.api_key,
             }
 
-            async with session.get(url, params=params, timeout=10) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch news for {symbol}: HTTP {response.status}")
-                    raise ValueError(f"Failed to fetch news for {symbol}: HTTP {response.status}")
-
-                data = await response.json()
-                results = data.get("results", [])
-
-                if not results:
-                    logger.warning(f"No news articles available for {symbol}")
-                    return []  # Return empty list for news - this is acceptable
-
-                news_items = []
-                for item in results[:limit]:
-                    news_items.append(
-                        {
-                            "title": item.get("title", ""),
-                            "url": item.get("article_url", ""),
-                            "summary": item.get("description", ""),
-                            "source": item.get("publisher", {}).get("name", "Unknown"),
-                            "published_at": item.get("published_utc", ""),
-                            "image_url": item.get("image_url", ""),
-                        }
-                    )
-
-                return news_items
+            response = await client.get(url, params=params, timeout=10)
+            if response.status_code != 200:
+                logger.error(f"Failed to fetch news for {symbol}: HTTP {response.status_code}")
+                raise ValueError(f"Failed to fetch news for {symbol}: HTTP {response.status_code}")
+
+            data = response.json()
+            results = data.get("results", [])
+
+            if not results:
+                logger.warning(f"No news articles available for {symbol}")
+                return []  # Return empty list for news - this is acceptable
+
+            news_items = []
+            for item in results[:limit]:
+                news_items.append(
+                    {
+                        "title": item.get("title", ""),
+                        "url": item.get("article_url", ""),
+                        "summary": item.get("description", ""),
+                        "source": item.get("publisher", {}).get("name", "Unknown"),
+                        "published_at": item.get("published_utc", ""),
+                        "image_url": item.get("image_url", ""),
+                    }
+                )
+
+            return news_items
 
         except (APIKeyNotConfiguredError, ValueError):
             raise
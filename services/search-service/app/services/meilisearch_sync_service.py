@@ -3,82 +3,109 @@ Meilisearch index synchronization service.
 
 Keeps Meilisearch index in sync with PostgreSQL symbol mappings
 for fast autocomplete functionality.
+
+Sync is diff-based: mappings are streamed from PostgreSQL with a
+server-side cursor, grouped into one document per symbol and hashed.
+Only documents whose hash differs from the indexed version are pushed,
+in sized batches, and each batch's indexing task is awaited before its
+hashes are recorded. Symbols that no longer have an active mapping are
+deleted from the index. Sync time and memory therefore scale with the
+number of changes rather than the size of the symbol universe.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+import os
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.meilisearch_client import get_meilisearch_manager
 from ..database import AsyncSessionLocal
 from ..models import SymbolMapping
-from .meilisearch_client import get_meilisearch_manager
+from ..search.local_autocomplete import (LocalAutocompleteIndex,
+                                         get_local_autocomplete_index)
 
 logger = logging.getLogger(__name__)
 
+# Sync configuration
+SYNC_BATCH_SIZE = int(os.getenv("MEILISEARCH_SYNC_BATCH_SIZE", "1000"))
+SYNC_STREAM_CHUNK_SIZE = int(os.getenv("MEILISEARCH_SYNC_STREAM_CHUNK_SIZE", "2000"))
+SYNC_TASK_TIMEOUT_MS = int(os.getenv("MEILISEARCH_SYNC_TASK_TIMEOUT_MS", "60000"))
+
+# Document field holding the content hash of the indexed version
+HASH_FIELD = "content_hash"
+
+
+def document_hash(document: dict[str, Any]) -> str:
+    """
+    Compute a stable content hash for a document.
+
+    Args:
+        document: Document without the hash field
+
+    Returns:
+        Hex digest
+    """
+    payload = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
 
 class MeilisearchSyncService:
     """
     Synchronizes PostgreSQL data to Meilisearch index.
 
-    Provides batch and incremental sync operations to keep
-    Meilisearch autocomplete index up-to-date.
+    Provides full and incremental diff-based sync operations to keep
+    Meilisearch autocomplete index up-to-date. The content hash of every
+    indexed document is tracked in memory, seeded from the index on first
+    use, so unchanged documents are never re-sent.
+
+    Changed and removed documents are also applied to the local
+    autocomplete index that answers queries while Meilisearch is down.
     """
 
-    def __init__(self) -> None:
-        """Initialize sync service."""
+    def __init__(
+        self,
+        batch_size: int = SYNC_BATCH_SIZE,
+        stream_chunk_size: int = SYNC_STREAM_CHUNK_SIZE,
+        task_timeout_ms: int = SYNC_TASK_TIMEOUT_MS,
+        local_index: Optional[LocalAutocompleteIndex] = None,
+    ) -> None:
+        """
+        Initialize sync service.
+
+        Args:
+            batch_size: Maximum documents per add/delete request
+            stream_chunk_size: Rows fetched per server-side cursor round-trip
+            task_timeout_ms: Maximum wait for each indexing task
+            local_index: Local fallback index (default: shared index)
+        """
         self.meilisearch = get_meilisearch_manager()
+        self.local_index = local_index or get_local_autocomplete_index()
+        self.batch_size = batch_size
+        self.stream_chunk_size = stream_chunk_size
+        self.task_timeout_ms = task_timeout_ms
+
+        # symbol -> content hash of the indexed document (None until seeded)
+        self._indexed_hashes: Optional[dict[str, str]] = None
+        self._lock = asyncio.Lock()
 
     async def full_sync(self) -> dict[str, Any]:
         """
         Perform full index synchronization.
 
-        Loads all symbol mappings from PostgreSQL and updates
-        Meilisearch index.
+        Streams all active symbol mappings from PostgreSQL, pushes changed
+        documents and deletes symbols without an active mapping.
 
         Returns:
             Sync statistics
         """
-        start_time = datetime.now(timezone.utc)
         logger.info("Starting full Meilisearch index sync")
-
-        try:
-            async with AsyncSessionLocal() as session:
-                documents = await self._load_all_symbols(session)
-
-            if not documents:
-                logger.warning("No symbols found for sync")
-                return {
-                    "status": "completed",
-                    "documents_synced": 0,
-                    "duration_seconds": 0,
-                }
-
-            await self.meilisearch.add_documents(documents)
-
-            duration = (datetime.now(timezone.utc) - start_time).total_seconds()
-
-            logger.info(
-                "Full sync completed: %d documents in %.2f seconds",
-                len(documents),
-                duration,
-            )
-
-            return {
-                "status": "completed",
-                "documents_synced": len(documents),
-                "duration_seconds": duration,
-                "synced_at": start_time.isoformat(),
-            }
-
-        except Exception as e:
-            logger.error("Full sync failed: %s", e)
-            return {
-                "status": "failed",
-                "error": str(e),
-            }
+        return await self._run("full", None)
 
     async def incremental_sync(
         self,
@@ -87,181 +114,328 @@ class MeilisearchSyncService:
         """
         Perform incremental sync for recently updated symbols.
 
+        Symbols with any mapping updated after the timestamp (including
+        deactivated ones) are rebuilt from their active mappings; symbols
+        left without an active mapping are deleted.
+
         Args:
             since: Only sync symbols updated after this timestamp
 
         Returns:
             Sync statistics
         """
-        start_time = datetime.now(timezone.utc)
         logger.info("Starting incremental sync since %s", since)
+        return await self._run("incremental", since)
 
-        try:
-            async with AsyncSessionLocal() as session:
-                documents = await self._load_symbols_since(session, since)
+    async def _run(self, mode: str, since: Optional[datetime]) -> dict[str, Any]:
+        """
+        Run one sync pass; passes never overlap.
+
+        Args:
+            mode: "full" or "incremental"
+            since: Cutoff for incremental sync
+
+        Returns:
+            Sync statistics
+        """
+        async with self._lock:
+            start_time = datetime.now(timezone.utc)
+
+            try:
+                indexed = await self._get_indexed_hashes(verify=mode == "full")
+
+                async with AsyncSessionLocal() as session:
+                    stmt = self._active_mappings_stmt()
+                    scope: Optional[set[str]] = None
+
+                    if since is not None:
+                        scope = await self._load_changed_symbols(session, since)
+                        if not scope:
+                            logger.info("No updates found for incremental sync")
+                            return self._result(mode, start_time, self._new_stats())
+                        stmt = stmt.where(SymbolMapping.yahoo_symbol.in_(scope))
+
+                    stats = await self._sync_documents(
+                        self._stream_documents(session, stmt), indexed, scope
+                    )
+
+                result = self._result(mode, start_time, stats)
+                logger.info(
+                    "%s sync completed: %d scanned, %d upserted, %d deleted, "
+                    "%d unchanged in %.2f seconds",
+                    mode.capitalize(),
+                    stats["documents_scanned"],
+                    stats["documents_synced"],
+                    stats["documents_deleted"],
+                    stats["documents_unchanged"],
+                    result["duration_seconds"],
+                )
+                return result
 
-            if not documents:
-                logger.info("No updates found for incremental sync")
+            except Exception as e:
+                logger.error("%s sync failed: %s", mode.capitalize(), e)
                 return {
-                    "status": "completed",
-                    "documents_synced": 0,
-                    "duration_seconds": 0,
+                    "status": "failed",
+                    "error": str(e),
                 }
 
-            await self.meilisearch.add_documents(documents)
-
-            duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+    async def iter_all_documents(self) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream every current document from the database.
 
-            logger.info(
-                "Incremental sync completed: %d documents in %.2f seconds",
-                len(documents),
-                duration,
-            )
+        Used to load the local autocomplete index independently of
+        Meilisearch.
 
-            return {
-                "status": "completed",
-                "documents_synced": len(documents),
-                "duration_seconds": duration,
-                "synced_at": start_time.isoformat(),
-            }
+        Yields:
+            Documents with their content hash
+        """
+        async with AsyncSessionLocal() as session:
+            async for doc in self._stream_documents(session, self._active_mappings_stmt()):
+                yield doc
 
-        except Exception as e:
-            logger.error("Incremental sync failed: %s", e)
-            return {
-                "status": "failed",
-                "error": str(e),
-            }
+    def _active_mappings_stmt(self) -> Select:
+        """Build the base query for active mappings, grouped by symbol."""
+        return (
+            select(SymbolMapping)
+            .where(SymbolMapping.is_active == 1)
+            .order_by(
+                SymbolMapping.yahoo_symbol,
+                SymbolMapping.priority.desc(),
+                SymbolMapping.id,
+            )
+        )
 
-    async def _load_all_symbols(
+    async def _load_changed_symbols(
         self,
         session: AsyncSession,
-    ) -> list[dict[str, Any]]:
+        since: datetime,
+    ) -> set[str]:
         """
-        Load all active symbol mappings from database.
+        Load symbols with any mapping updated since the timestamp.
 
         Args:
             session: Database session
+            since: Timestamp cutoff
 
         Returns:
-            List of documents for Meilisearch
+            Set of changed symbols
         """
-        stmt = select(SymbolMapping).where(SymbolMapping.is_active == True)
+        stmt = (
+            select(SymbolMapping.yahoo_symbol)
+            .where(SymbolMapping.updated_at >= since)
+            .distinct()
+        )
         result = await session.execute(stmt)
-        mappings = result.scalars().all()
+        return set(result.scalars().all())
 
-        documents = []
-        symbols_seen = set()
+    async def _stream_documents(
+        self,
+        session: AsyncSession,
+        stmt: Select,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream one document per symbol from the database.
 
-        for mapping in mappings:
-            if mapping.yahoo_symbol not in symbols_seen:
-                doc = self._create_document(mapping)
+        Uses a server-side cursor; only the mappings of the current
+        symbol are held in memory.
+
+        Args:
+            session: Database session
+            stmt: Mapping query ordered by symbol
+
+        Yields:
+            Documents with their content hash
+        """
+        result = await session.stream(
+            stmt.execution_options(yield_per=self.stream_chunk_size)
+        )
+
+        group: list[SymbolMapping] = []
+        async for mapping in result.scalars():
+            if group and mapping.yahoo_symbol != group[0].yahoo_symbol:
+                doc = self._create_document(group)
                 if doc:
-                    documents.append(doc)
-                    symbols_seen.add(mapping.yahoo_symbol)
-            else:
-                existing_doc = next(
-                    (d for d in documents if d["symbol"] == mapping.yahoo_symbol),
-                    None,
-                )
-                if existing_doc:
-                    self._merge_identifiers(existing_doc, mapping)
+                    yield doc
+                group = []
+            group.append(mapping)
 
-        logger.info("Loaded %d unique symbols from database", len(documents))
-        return documents
+        if group:
+            doc = self._create_document(group)
+            if doc:
+                yield doc
 
-    async def _load_symbols_since(
+    async def _sync_documents(
         self,
-        session: AsyncSession,
-        since: datetime,
-    ) -> list[dict[str, Any]]:
+        documents: AsyncIterator[dict[str, Any]],
+        indexed: dict[str, str],
+        scope: Optional[set[str]] = None,
+    ) -> dict[str, int]:
         """
-        Load symbols updated since timestamp.
+        Push changed documents and delete removed symbols.
 
         Args:
-            session: Database session
-            since: Timestamp cutoff
+            documents: Current documents (symbol order, hash included)
+            indexed: Content hashes of the indexed documents (updated in place)
+            scope: Symbols covered by the documents (None: the whole index)
 
         Returns:
-            List of updated documents
+            Sync counters
         """
-        stmt = (
-            select(SymbolMapping)
-            .where(SymbolMapping.is_active == True)
-            .where(SymbolMapping.updated_at >= since)
-        )
-        result = await session.execute(stmt)
-        mappings = result.scalars().all()
+        stats = self._new_stats()
+        seen: set[str] = set()
+        batch: list[dict[str, Any]] = []
 
-        documents = []
-        symbols_seen = set()
+        async for doc in documents:
+            symbol = doc["symbol"]
+            seen.add(symbol)
+            stats["documents_scanned"] += 1
 
-        for mapping in mappings:
-            if mapping.yahoo_symbol not in symbols_seen:
-                doc = self._create_document(mapping)
-                if doc:
-                    documents.append(doc)
-                    symbols_seen.add(mapping.yahoo_symbol)
-            else:
-                existing_doc = next(
-                    (d for d in documents if d["symbol"] == mapping.yahoo_symbol),
-                    None,
-                )
-                if existing_doc:
-                    self._merge_identifiers(existing_doc, mapping)
+            if indexed.get(symbol) == doc[HASH_FIELD]:
+                stats["documents_unchanged"] += 1
+                continue
 
-        return documents
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                await self._push_batch(batch, indexed, stats)
+                batch = []
+
+        if batch:
+            await self._push_batch(batch, indexed, stats)
+
+        candidates = indexed.keys() if scope is None else scope & indexed.keys()
+        removed = [symbol for symbol in candidates if symbol not in seen]
+        for i in range(0, len(removed), self.batch_size):
+            await self._delete_batch(removed[i : i + self.batch_size], indexed, stats)
+
+        return stats
+
+    async def _push_batch(
+        self,
+        batch: list[dict[str, Any]],
+        indexed: dict[str, str],
+        stats: dict[str, int],
+    ) -> None:
+        """Upsert a batch and record its hashes once the task succeeded."""
+        self.local_index.upsert(batch)
+        task_uid = await self.meilisearch.add_documents(batch)
+        stats["batches"] += 1
+
+        if await self.meilisearch.wait_for_task(task_uid, self.task_timeout_ms):
+            for doc in batch:
+                indexed[doc["symbol"]] = doc[HASH_FIELD]
+            stats["documents_synced"] += len(batch)
+        else:
+            stats["documents_failed"] += len(batch)
+
+    async def _delete_batch(
+        self,
+        symbols: list[str],
+        indexed: dict[str, str],
+        stats: dict[str, int],
+    ) -> None:
+        """Delete a batch of symbols and forget their hashes once the task succeeded."""
+        self.local_index.remove(symbols)
+        task_uid = await self.meilisearch.delete_documents(symbols)
+        stats["batches"] += 1
+
+        if await self.meilisearch.wait_for_task(task_uid, self.task_timeout_ms):
+            for symbol in symbols:
+                indexed.pop(symbol, None)
+            stats["documents_deleted"] += len(symbols)
+        else:
+            stats["documents_failed"] += len(symbols)
+
+    async def _get_indexed_hashes(self, verify: bool = False) -> dict[str, str]:
+        """
+        Get the content hashes of the indexed documents.
+
+        Seeded from the index on first use. With verify, the tracked set
+        is reloaded if its size no longer matches the index (e.g. the index
+        was cleared or written by another process).
+
+        Args:
+            verify: Compare the tracked size with the index document count
+
+        Returns:
+            Mapping of symbol to content hash ("" for documents without one)
+        """
+        if self._indexed_hashes is not None and verify:
+            stats = await self.meilisearch.get_index_stats()
+            if stats.get("number_of_documents") != len(self._indexed_hashes):
+                logger.info("Tracked document hashes out of date, reloading from index")
+                self._indexed_hashes = None
+
+        if self._indexed_hashes is None:
+            hashes: dict[str, str] = {}
+            async for doc in self.meilisearch.iter_documents(
+                fields=["symbol", HASH_FIELD], batch_size=self.stream_chunk_size
+            ):
+                hashes[doc["symbol"]] = doc.get(HASH_FIELD) or ""
+            self._indexed_hashes = hashes
+            logger.info("Loaded %d document hashes from Meilisearch", len(hashes))
+
+        return self._indexed_hashes
 
     def _create_document(
         self,
-        mapping: SymbolMapping,
+        mappings: list[SymbolMapping],
     ) -> dict[str, Any] | None:
         """
-        Create Meilisearch document from symbol mapping.
+        Create Meilisearch document from the mappings of one symbol.
+
+        The first (highest-priority) mapping provides name, priority and
+        exchange; the first ISIN and WKN mappings provide the identifiers.
 
         Args:
-            mapping: Symbol mapping from database
+            mappings: Active mappings of one symbol, highest priority first
 
         Returns:
-            Document dict or None if invalid
+            Document dict with content hash, or None if invalid
         """
-        if not mapping.yahoo_symbol:
+        primary = mappings[0]
+        if not primary.yahoo_symbol:
             return None
 
-        doc = {
-            "symbol": mapping.yahoo_symbol,
-            "name": mapping.company_name or "",
-            "priority": mapping.priority or 0,
+        doc: dict[str, Any] = {
+            "symbol": primary.yahoo_symbol,
+            "name": primary.stock_name or "",
+            "priority": primary.priority or 0,
         }
 
-        if mapping.identifier_type == "ISIN":
-            doc["isin"] = mapping.identifier_value
-        elif mapping.identifier_type == "WKN":
-            doc["wkn"] = mapping.identifier_value
-
-        if hasattr(mapping, "exchange") and mapping.exchange:
-            doc["exchange"] = mapping.exchange
+        for mapping in mappings:
+            identifier_type = (mapping.identifier_type or "").lower()
+            if identifier_type in ("isin", "wkn") and identifier_type not in doc:
+                doc[identifier_type] = mapping.identifier_value
 
-        if hasattr(mapping, "currency") and mapping.currency:
-            doc["currency"] = mapping.currency
+        if primary.exchange:
+            doc["exchange"] = primary.exchange
 
+        doc[HASH_FIELD] = document_hash(doc)
         return doc
 
-    def _merge_identifiers(
-        self,
-        doc: dict[str, Any],
-        mapping: SymbolMapping,
-    ) -> None:
-        """
-        Merge additional identifiers into existing document.
+    @staticmethod
+    def _new_stats() -> dict[str, int]:
+        """Create zeroed sync counters."""
+        return {
+            "documents_scanned": 0,
+            "documents_synced": 0,
+            "documents_unchanged": 0,
+            "documents_deleted": 0,
+            "documents_failed": 0,
+            "batches": 0,
+        }
 
-        Args:
-            doc: Existing document
-            mapping: Additional mapping to merge
-        """
-        if mapping.identifier_type == "ISIN" and "isin" not in doc:
-            doc["isin"] = mapping.identifier_value
-        elif mapping.identifier_type == "WKN" and "wkn" not in doc:
-            doc["wkn"] = mapping.identifier_value
+    @staticmethod
+    def _result(mode: str, start_time: datetime, stats: dict[str, int]) -> dict[str, Any]:
+        """Build the sync result from counters."""
+        duration = (datetime.now(timezone.utc) - start_time).total_seconds()
+        return {
+            "status": "completed" if not stats["documents_failed"] else "partial",
+            "mode": mode,
+            **stats,
+            "duration_seconds": duration,
+            "synced_at": start_time.isoformat(),
+        }
 
     async def get_sync_status(self) -> dict[str, Any]:
         """
@@ -10,10 +10,20 @@ import logging
 import time
 from typing import Any, Dict, List, Optional, Tuple
 
+from cachetools import TTLCache  # type: ignore[import-untyped]
+
 from ..cache.memory_cache import get_memory_cache
+from ..cache.negative_cache import (KnownIdentifierIndex, NegativeCache,
+                                    get_known_identifiers)
+from ..cache.popularity import PopularityRanking
+from ..core.stage_timing import stage
 from ..domain.entities import IdentifierType, Stock, StockIdentifier
 from ..domain.exceptions import StockNotFoundException, ValidationException
 from ..infrastructure.stock_api_client import IStockAPIClient
+from ..infrastructure.token_bucket import (RequestPriority, request_deadline,
+                                           request_priority)
+from ..metrics import (track_background_refresh, track_cache_hit,
+                       track_cache_stale_hit)
 from ..repositories.stock_repository import (ISearchHistoryRepository,
                                              IStockRepository)
 from ..search import FuzzyMatcher, RelevanceScorer, SearchMatch
@@ -31,6 +41,25 @@ class StockSearchService:
     2. Check PostgreSQL (persistent cache, ~10ms)
     3. Fetch from external API (Massive API, ~500ms)
     4. Save to all caches
+
+    Stale-while-revalidate: a cache entry past its soft TTL but within its
+    stale window is returned immediately (flagged stale) and a single
+    background refresh per key is scheduled against the external API.
+
+    Upstream calls made on behalf of a user wait at most
+    api_wait_budget_seconds for a rate limiter token; background refreshes
+    queue behind them at prefetch priority.
+
+    Identifiers that cannot exist (not in the known-identifier filter) or
+    were recently not found (negative cache) are rejected before Layer 0,
+    without touching the database or the external API.
+
+    intelligent_search caches the unpersonalized ranked candidates per
+    normalized query; the per-user recency boost is re-applied on each hit.
+
+    With a PopularityRanking, successful searches feed a shared time-decayed
+    counter that relevance scoring and get_popular_searches read instead of
+    aggregating the search history table.
     """
 
     def __init__(
@@ -39,6 +68,14 @@ class StockSearchService:
         postgres_repo: IStockRepository,
         api_client: IStockAPIClient,
         history_repo: ISearchHistoryRepository,
+        memory_stale_ttl_minutes: float = 10,
+        memory_ttl_minutes: float = 5,
+        api_wait_budget_seconds: Optional[float] = 2.0,
+        negative_cache_ttl_seconds: float = 60,
+        known_identifiers: Optional[KnownIdentifierIndex] = None,
+        query_cache_ttl_seconds: float = 30,
+        query_cache_size: int = 2048,
+        popularity: Optional[PopularityRanking] = None,
     ):
         """
         Initialize search service.
@@ -48,12 +85,31 @@ class StockSearchService:
             postgres_repo: PostgreSQL repository for Layer 2 cache
             api_client: External API client
             history_repo: Search history repository
+            memory_stale_ttl_minutes: Stale window for Layer 0 entries
+            memory_ttl_minutes: Soft TTL for Layer 0 entries
+            api_wait_budget_seconds: Max rate limiter wait for user-facing
+                upstream fetches (None waits indefinitely)
+            negative_cache_ttl_seconds: How long not-found identifiers are remembered
+            known_identifiers: Known-identifier filter (default: shared index)
+            query_cache_ttl_seconds: How long intelligent_search rankings and
+                user histories are reused
+            query_cache_size: Maximum number of cached query rankings
+            popularity: Shared popularity ranking (default: search history stats)
         """
         self.redis_repo = redis_repo
         self.postgres_repo = postgres_repo
         self.api_client = api_client
         self.history_repo = history_repo
         self.memory_cache = get_memory_cache()  # Layer 0 cache
+        self.memory_stale_ttl_minutes = memory_stale_ttl_minutes
+        self.memory_ttl_minutes = memory_ttl_minutes
+        self.api_wait_budget_seconds = api_wait_budget_seconds
+        self.negative_cache = NegativeCache(ttl_seconds=negative_cache_ttl_seconds)
+        self.known_identifiers = known_identifiers or get_known_identifiers()
+        self.popularity = popularity
+
+        # Stale-while-revalidate: one background refresh per cache key
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
 
         # Phase 4: Intelligent search components
         self.fuzzy_matcher = FuzzyMatcher(symbol_threshold=0.75, name_threshold=0.70)
@@ -61,6 +117,14 @@ class StockSearchService:
         self._search_stats_cache: Optional[Dict[str, Any]] = None
         self._stats_last_updated = 0.0
 
+        # Query-level result cache: (normalized query, limit, fuzzy) -> ranking
+        self._query_cache: TTLCache = TTLCache(
+            maxsize=query_cache_size, ttl=query_cache_ttl_seconds
+        )
+        self._user_history_cache: TTLCache = TTLCache(
+            maxsize=query_cache_size, ttl=query_cache_ttl_seconds
+        )
+
     async def search(self, query: str, user_id: Optional[str] = None) -> Stock:
         """
         Search for stock by any identifier.
@@ -110,34 +174,50 @@ class StockSearchService:
         identifier = self._build_identifier(query, identifier_type)
         cache_key = query.upper()
 
+        # Junk guard: answer impossible or recently missed identifiers immediately
+        if self._is_known_miss(cache_key, identifier_type):
+            logger.info(f"Rejected unknown identifier: {query}")
+            raise StockNotFoundException(query, identifier_type.value)
+
         try:
             # Layer 0: Check In-Memory LRU Cache
-            cached_stock = self.memory_cache.get(cache_key)
+            with stage("memory"):
+                cached_stock = self.memory_cache.get(cache_key, allow_stale=True)
             if cached_stock:
                 logger.info(f"Found in MEMORY cache: {query}")
+                if cached_stock.stale:
+                    self._serve_stale("memory", cache_key, identifier)
                 await self._record_search(
                     query, identifier_type, True, start_time, user_id
                 )
                 return cached_stock
 
             # Layer 1: Check Redis
-            stock = await self.redis_repo.find_by_identifier(identifier)
+            with stage("redis"):
+                stock = await self.redis_repo.find_by_identifier(identifier)
             if stock:
                 logger.info(f"Found in Redis: {query}")
-                # Save to memory cache for next time
-                self.memory_cache.set(cache_key, stock)
+                if stock.stale:
+                    self._serve_stale("redis", cache_key, identifier)
+                else:
+                    # Save to memory cache for next time
+                    self._set_memory(cache_key, stock)
                 await self._record_search(
                     query, identifier_type, True, start_time, user_id
                 )
                 return stock
 
             # Layer 2: Check PostgreSQL
-            stock = await self.postgres_repo.find_by_identifier(identifier)
+            with stage("postgres_exact"):
+                stock = await self.postgres_repo.find_by_identifier(identifier)
             if stock:
                 logger.info(f"Found in PostgreSQL: {query}")
-                # Save to Redis and Memory for next time
-                await self.redis_repo.save(stock)
-                self.memory_cache.set(cache_key, stock)
+                if stock.stale:
+                    self._serve_stale("postgresql", cache_key, identifier)
+                else:
+                    # Save to Redis and Memory for next time
+                    await self.redis_repo.save(stock)
+                    self._set_memory(cache_key, stock)
                 await self._record_search(
                     query, identifier_type, True, start_time, user_id
                 )
@@ -145,7 +225,8 @@ class StockSearchService:
 
             # Layer 3: Fetch from external API
             logger.info(f"Fetching from external API: {query}")
-            stock = await self.api_client.fetch_stock(identifier)
+            with stage("upstream"), request_deadline(self.api_wait_budget_seconds):
+                stock = await self.api_client.fetch_stock(identifier)
 
             if not stock:
                 # Fallback for ISIN/WKN: Try name search if available
@@ -169,7 +250,7 @@ class StockSearchService:
                             # Return first match and cache it with the new identifier
                             stock = name_results[0]
                             await self.redis_repo.save(stock)
-                            self.memory_cache.set(cache_key, stock)
+                            self._set_memory(cache_key, stock)
                             await self._record_search(
                                 query, identifier_type, True, start_time, user_id
                             )
@@ -177,15 +258,14 @@ class StockSearchService:
                     except Exception as e:
                         logger.debug(f"Cache lookup failed during fallback: {e}")
 
+                self.negative_cache.add(cache_key)
                 await self._record_search(
                     query, identifier_type, False, start_time, user_id
                 )
                 raise StockNotFoundException(query, identifier_type.value)
 
             # Save to all caches (PostgreSQL, Redis, Memory)
-            await self.postgres_repo.save(stock)
-            await self.redis_repo.save(stock)
-            self.memory_cache.set(cache_key, stock)
+            await self._save_to_all_tiers(cache_key, stock)
 
             await self._record_search(query, identifier_type, True, start_time, user_id)
             return stock
@@ -265,6 +345,136 @@ class StockSearchService:
             "external_api": api_health,
         }
 
+    def _set_memory(self, cache_key: str, stock: Stock, broadcast: bool = False) -> None:
+        """Store stock in Layer 0 with the configured TTL and stale window."""
+        self.memory_cache.set(
+            cache_key,
+            stock,
+            ttl_minutes=self.memory_ttl_minutes,
+            stale_ttl_minutes=self.memory_stale_ttl_minutes,
+            broadcast=broadcast,
+        )
+
+    async def _save_to_all_tiers(self, cache_key: str, stock: Stock) -> None:
+        """
+        Write a freshly fetched stock to PostgreSQL, Redis and memory.
+
+        The memory write is broadcast so other replicas drop their copy.
+        """
+        await self.postgres_repo.save(stock)
+        await self.redis_repo.save(stock)
+        self._set_memory(cache_key, stock, broadcast=True)
+        self._mark_known(cache_key, stock)
+
+    def _is_known_miss(self, cache_key: str, identifier_type: IdentifierType) -> bool:
+        """
+        Check whether a key can be answered as not found without lookups.
+
+        Args:
+            cache_key: Normalized cache key
+            identifier_type: Detected identifier type
+
+        Returns:
+            True if the key is negatively cached or definitely unknown
+        """
+        if self.negative_cache.contains(cache_key):
+            track_cache_hit("negative")
+            return True
+        if not self.known_identifiers.might_exist(identifier_type, cache_key):
+            track_cache_hit("bloom")
+            return True
+        return False
+
+    def _mark_known(self, cache_key: str, stock: Stock) -> None:
+        """Record a resolved stock in the known-identifier filter."""
+        self.negative_cache.discard(cache_key)
+        self.known_identifiers.add(
+            cache_key, stock.identifier.symbol, stock.identifier.isin, stock.identifier.wkn
+        )
+
+    def _serve_stale(
+        self, cache_type: str, cache_key: str, identifier: StockIdentifier
+    ) -> None:
+        """
+        Record a stale hit and schedule a background refresh for the key.
+
+        At most one refresh per key is in flight; further stale hits for the
+        same key are served without scheduling another upstream call.
+
+        Args:
+            cache_type: Cache tier the stale entry came from
+            cache_key: Normalized cache key
+            identifier: Identifier to refresh from the external API
+        """
+        track_cache_stale_hit(cache_type)
+        logger.info(f"Serving stale {cache_type} entry for {cache_key}")
+
+        if cache_key in self._refresh_tasks:
+            return
+
+        task = asyncio.create_task(self._refresh_stock(cache_key, identifier))
+        self._refresh_tasks[cache_key] = task
+        task.add_done_callback(lambda _t: self._refresh_tasks.pop(cache_key, None))
+
+    async def _refresh_stock(self, cache_key: str, identifier: StockIdentifier) -> None:
+        """
+        Revalidate a stale cache entry from the external API.
+
+        Failures are logged and swallowed; the stale entry keeps being
+        served until its hard TTL.
+
+        Args:
+            cache_key: Normalized cache key
+            identifier: Identifier to fetch
+        """
+        try:
+            with request_priority(RequestPriority.PREFETCH):
+                stock = await self.api_client.fetch_stock(identifier)
+            if not stock:
+                logger.warning(f"Background refresh found no data for {cache_key}")
+                track_background_refresh(False)
+                return
+
+            await self._save_to_all_tiers(cache_key, stock)
+            track_background_refresh(True)
+            logger.info(f"Background refresh completed for {cache_key}")
+
+        except Exception as e:
+            track_background_refresh(False)
+            logger.warning(f"Background refresh failed for {cache_key}: {e}")
+
+    async def refresh_stocks(self, keys_by_symbol: Dict[str, List[str]]) -> Dict[str, Stock]:
+        """
+        Refresh several cached stocks ahead of expiry with one upstream call.
+
+        Runs at warmup priority so user-facing requests are served first.
+        Fresh data is written to every tier under all of its cache keys.
+
+        Args:
+            keys_by_symbol: Symbol to refresh mapped to the memory cache
+                keys (symbol, ISIN, WKN) that hold it
+
+        Returns:
+            Mapping of symbol to refreshed Stock (failed symbols omitted)
+        """
+        with request_priority(RequestPriority.WARMUP):
+            refreshed = await self.api_client.fetch_stocks(list(keys_by_symbol))
+        if not refreshed:
+            return {}
+
+        fetched = list(refreshed.values())
+        try:
+            await self.postgres_repo.save_many(fetched)
+        except Exception as e:
+            logger.warning(f"Batch PostgreSQL save failed during refresh: {e}")
+        await self.redis_repo.save_many(fetched)
+
+        for symbol, stock in refreshed.items():
+            for key in keys_by_symbol.get(symbol, [symbol]):
+                self._set_memory(key, stock, broadcast=True)
+
+        return refreshed
+
     def _build_identifier(self, query: str, id_type: IdentifierType) -> StockIdentifier:
         """Build StockIdentifier from query and type."""
         query_upper = query.upper()
@@ -288,15 +498,19 @@ class StockSearchService:
         user_id: Optional[str] = None,
     ) -> None:
         """Record search in history for analytics."""
+        if found and self.popularity:
+            # Off the request path: a slow Redis must not delay the search
+            self.popularity.record_nowait(query.upper())
         try:
             response_time_ms = (time.time() - start_time) * 1000
-            await self.history_repo.record_search(
-                query=query,
-                query_type=query_type,
-                found=found,
-                response_time_ms=response_time_ms,
-                user_id=user_id,
-            )
+            with stage("history_write"):
+                await self.history_repo.record_search(
+                    query=query,
+                    query_type=query_type,
+                    found=found,
+                    response_time_ms=response_time_ms,
+                    user_id=user_id,
+                )
         except Exception as e:
             # Don't fail the request if history recording fails
             logger.warning(f"Failed to record search history: {e}")
@@ -305,37 +519,168 @@ class StockSearchService:
         self, symbols: List[str], user_id: Optional[str] = None
     ) -> List[Stock]:
         """
-        Search multiple stocks efficiently using concurrent requests.
+        Search multiple stocks with one round-trip per cache layer.
+
+        See resolve_many() for how the symbols are looked up.
 
         Args:
             symbols: List of stock symbols to search
             user_id: Optional user ID for history tracking
 
         Returns:
-            List of Stock objects (excludes symbols that failed)
+            List of Stock objects in request order (excludes symbols that failed)
 
         Example:
             stocks = await service.batch_search(["AAPL", "MSFT", "GOOGL"], user_id="user123")
         """
-        logger.info(f"Batch search for {len(symbols)} symbols")
-
-        # Create concurrent search tasks
-        tasks = [self.search(symbol, user_id=user_id) for symbol in symbols]
+        found = await self.resolve_many(symbols, user_id=user_id)
 
-        # Execute all searches concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Filter out exceptions and return only successful Stock objects
         stocks = []
-        for i, result in enumerate(results):
-            if isinstance(result, Stock):
-                stocks.append(result)
-            elif isinstance(result, Exception):
-                logger.warning(f"Failed to fetch {symbols[i]}: {result}")
+        for symbol in symbols:
+            stock = found.get(symbol.strip().upper())
+            if stock:
+                stocks.append(stock)
 
         logger.info(f"Batch search completed: {len(stocks)}/{len(symbols)} successful")
         return stocks
 
+    async def resolve_many(
+        self, queries: List[str], user_id: Optional[str] = None
+    ) -> Dict[str, Stock]:
+        """
+        Resolve multiple queries with one round-trip per cache layer.
+
+        Queries are resolved tier by tier: memory for all keys, one Redis
+        MGET for the misses, one PostgreSQL query for the rest and one
+        batched upstream fetch for what remains. Non-symbol queries (ISIN,
+        WKN, names) fall back to individual search() calls.
+
+        Args:
+            queries: Symbols or other identifiers
+            user_id: Optional user ID for history tracking
+
+        Returns:
+            Mapping of normalized query (stripped, upper case) to Stock for
+            the queries that were found
+        """
+        logger.info(f"Batch search for {len(queries)} symbols")
+
+        # Normalize and de-duplicate while preserving request order
+        keys: List[str] = []
+        other_queries: List[str] = []
+        seen = set()
+        for query in queries:
+            key = query.strip().upper()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if StockIdentifier.detect_type(key) == IdentifierType.SYMBOL:
+                keys.append(key)
+            else:
+                other_queries.append(key)
+
+        keys = [k for k in keys if not self._is_known_miss(k, IdentifierType.SYMBOL)]
+        found = await self._multi_get(keys) if keys else {}
+
+        if other_queries:
+            results = await asyncio.gather(
+                *[self.search(q, user_id=user_id) for q in other_queries],
+                return_exceptions=True,
+            )
+            for query, result in zip(other_queries, results):
+                if isinstance(result, Stock):
+                    found[query] = result
+                elif isinstance(result, Exception):
+                    logger.warning(f"Failed to fetch {query}: {result}")
+
+        return found
+
+    async def _multi_get(self, keys: List[str]) -> Dict[str, Stock]:
+        """
+        Resolve symbols through all cache layers with batched lookups.
+
+        Stale hits are served and revalidated in the background, like
+        search(). Fresh hits are promoted to the faster layers.
+
+        Args:
+            keys: Normalized, de-duplicated stock symbols
+
+        Returns:
+            Mapping of symbol to Stock for the symbols that were found
+        """
+        found: Dict[str, Stock] = {}
+
+        # Layer 0: Memory (no I/O)
+        missing: List[str] = []
+        for key in keys:
+            stock = self.memory_cache.get(key, allow_stale=True)
+            if stock:
+                if stock.stale:
+                    self._serve_stale("memory", key, StockIdentifier(symbol=key))
+                found[key] = stock
+            else:
+                missing.append(key)
+
+        # Layer 1: Redis (one MGET)
+        if missing:
+            with stage("redis"):
+                redis_hits = await self.redis_repo.find_many_by_symbols(missing)
+            for key, stock in redis_hits.items():
+                if stock.stale:
+                    self._serve_stale("redis", key, StockIdentifier(symbol=key))
+                else:
+                    self._set_memory(key, stock)
+                found[key] = stock
+            missing = [k for k in missing if k not in redis_hits]
+
+        # Layer 2: PostgreSQL (one query)
+        if missing:
+            try:
+                with stage("postgres_exact"):
+                    postgres_hits = await self.postgres_repo.find_many_by_symbols(missing)
+            except Exception as e:
+                logger.warning(f"Batch PostgreSQL lookup failed: {e}")
+                postgres_hits = {}
+
+            fresh = []
+            for key, stock in postgres_hits.items():
+                if stock.stale:
+                    self._serve_stale("postgresql", key, StockIdentifier(symbol=key))
+                else:
+                    self._set_memory(key, stock)
+                    fresh.append(stock)
+                found[key] = stock
+            if fresh:
+                await self.redis_repo.save_many(fresh)
+            missing = [k for k in missing if k not in postgres_hits]
+
+        # Layer 3: External API (one batched fetch)
+        if missing:
+            logger.info(f"Fetching {len(missing)} symbols from external API")
+            try:
+                with stage("upstream"), request_deadline(self.api_wait_budget_seconds):
+                    api_hits = await self.api_client.fetch_stocks(missing)
+            except Exception as e:
+                # Serve the cached hits; an outage must not be cached as "not found"
+                logger.warning(f"Batch API fetch failed for {len(missing)} symbols: {e}")
+                return found
+            if api_hits:
+                fetched = list(api_hits.values())
+                try:
+                    await self.postgres_repo.save_many(fetched)
+                except Exception as e:
+                    logger.warning(f"Batch PostgreSQL save failed: {e}")
+                await self.redis_repo.save_many(fetched)
+                for key, stock in api_hits.items():
+                    self._set_memory(key, stock, broadcast=True)
+                    self._mark_known(key, stock)
+                found.update(api_hits)
+            for key in missing:
+                if not api_hits or key not in api_hits:
+                    self.negative_cache.add(key)
+
+        return found
+
     async def get_user_search_history(
         self, user_id: str, limit: int = 10
     ) -> List[dict]:
@@ -439,6 +784,11 @@ class StockSearchService:
         """
         return {
             "memory_cache": self.memory_cache.get_stats(),
+            "query_cache": {
+                "size": len(self._query_cache),
+                "maxsize": self._query_cache.maxsize,
+                "ttl_seconds": self._query_cache.ttl,
+            },
         }
 
     async def intelligent_search(
@@ -458,7 +808,9 @@ class StockSearchService:
         4. Fuzzy symbol matching
         5. Fuzzy name matching
 
-        All results ranked by relevance score.
+        All results ranked by relevance score. The unpersonalized ranking
+        is cached per (normalized query, limit, include_fuzzy); the user's
+        recency boost is applied on top as a re-rank.
 
         Args:
             query: Search query
@@ -471,11 +823,60 @@ class StockSearchService:
         """
         start_time = time.time()
 
-        # Validate query
-        query = query.strip()
-        if not query or len(query) < 1:
+        # Normalize whitespace before validating, so blank queries are rejected
+        query = " ".join(query.split())
+        if not query:
             raise ValidationException("query", query, "Query cannot be empty")
 
+        # Identical prefixes from different users share one ranking
+        cache_key = (query.lower(), limit, include_fuzzy)
+        with stage("memory"):
+            candidates = self._query_cache.get(cache_key)
+        if candidates is not None:
+            track_cache_hit("query")
+        else:
+            candidates = await self._rank_candidates(query, limit, include_fuzzy)
+            self._query_cache[cache_key] = candidates
+
+        # Cheap per-user re-rank: only the recency component changes
+        user_history = await self._get_recent_queries(user_id) if user_id else []
+        with stage("scoring"):
+            ranked_matches = self.relevance_scorer.rerank(candidates, user_history)
+
+        # Limit results
+        ranked_matches = ranked_matches[:limit]
+
+        # Record search
+        latency_ms = (time.time() - start_time) * 1000
+        found = len(ranked_matches) > 0
+        await self._record_search(
+            query, IdentifierType.NAME, found, start_time, user_id
+        )
+
+        logger.info(
+            f"Intelligent search: query={query}, results={len(ranked_matches)}, "
+            f"latency={latency_ms:.1f}ms"
+        )
+
+        return ranked_matches
+
+    async def _rank_candidates(
+        self, query: str, limit: int, include_fuzzy: bool
+    ) -> List[SearchMatch]:
+        """
+        Collect and score intelligent_search candidates for a query.
+
+        The ranking is unpersonalized (neutral recency) so it can be cached
+        and shared between users.
+
+        Args:
+            query: Whitespace-normalized search query
+            limit: Maximum results requested
+            include_fuzzy: Whether to include fuzzy matches
+
+        Returns:
+            All candidates as SearchMatch objects sorted by relevance
+        """
         query_upper = query.upper()
         matches: List[Tuple[Stock, str, str, float]] = []
 
@@ -483,9 +884,11 @@ class StockSearchService:
         try:
             # Exact symbol match
             identifier = StockIdentifier(symbol=query_upper)
-            stock = await self.redis_repo.find_by_identifier(identifier)
+            with stage("redis"):
+                stock = await self.redis_repo.find_by_identifier(identifier)
             if not stock:
-                stock = await self.postgres_repo.find_by_identifier(identifier)
+                with stage("postgres_exact"):
+                    stock = await self.postgres_repo.find_by_identifier(identifier)
             if stock:
                 matches.append((stock, "exact", "symbol", 1.0))
                 logger.info(f"Exact symbol match: {query_upper}")
@@ -494,7 +897,8 @@ class StockSearchService:
 
         # Stage 2: Search by name in database
         try:
-            name_results = await self.postgres_repo.find_by_name(query, limit=limit)
+            with stage("name_search"):
+                name_results = await self.postgres_repo.find_by_name(query, limit=limit)
             for stock in name_results:
                 # Check if exact name match
                 if (
@@ -512,43 +916,28 @@ class StockSearchService:
 
         # Stage 3: Fuzzy matching (if enabled and not enough exact matches)
         if include_fuzzy and len(matches) < limit:
-            await self._add_fuzzy_matches(query, query_upper, matches, limit)
+            with stage("fuzzy"):
+                await self._add_fuzzy_matches(query, query_upper, matches, limit)
 
         # Stage 4: Rank results with relevance scoring
         await self._refresh_search_stats()
 
-        # Get user history for recency boost
-        user_history = []
-        if user_id:
+        # Score and rank without personalization
+        with stage("scoring"):
+            return self.relevance_scorer.score_batch(matches)  # type: ignore[arg-type]
+
+    async def _get_recent_queries(self, user_id: str) -> List[str]:
+        """Get a user's recent queries for the recency boost, briefly cached."""
+        history = self._user_history_cache.get(user_id)
+        if history is None:
             try:
                 history_entries = await self.get_user_search_history(user_id, limit=20)
-                user_history = [
-                    entry.get("query", "").upper() for entry in history_entries
-                ]
+                history = [entry.get("query", "").upper() for entry in history_entries]
             except Exception as e:
                 logger.debug(f"Could not load user history: {e}")
-
-        # Score and rank
-        ranked_matches = self.relevance_scorer.score_batch(
-            matches, user_search_history=user_history  # type: ignore[arg-type]
-        )
-
-        # Limit results
-        ranked_matches = ranked_matches[:limit]
-
-        # Record search
-        latency_ms = (time.time() - start_time) * 1000
-        found = len(ranked_matches) > 0
-        await self._record_search(
-            query, IdentifierType.NAME, found, start_time, user_id
-        )
-
-        logger.info(
-            f"Intelligent search: query={query}, results={len(ranked_matches)}, "
-            f"latency={latency_ms:.1f}ms"
-        )
-
-        return ranked_matches
+                history = []
+            self._user_history_cache[user_id] = history
+        return history
 
     async def _add_fuzzy_matches(
         self,
@@ -597,15 +986,39 @@ class StockSearchService:
         # Refresh every 5 minutes
         if current_time - self._stats_last_updated > 300:
             try:
-                stats = await self.history_repo.get_search_stats()
+                if self.popularity:
+                    stats = await self.popularity.get_scores()
+                else:
+                    stats = await self.history_repo.get_search_stats()
                 if stats:
                     self.relevance_scorer.update_search_stats(stats)
                     self._search_stats_cache = stats
+                    # Cached rankings used the old popularity scores
+                    self._query_cache.clear()
                     self._stats_last_updated = int(current_time)
                     logger.info(f"Updated search stats: {len(stats)} symbols")
             except Exception as e:
                 logger.warning(f"Failed to refresh search stats: {e}")
 
+    async def get_popular_searches(self, limit: int = 10) -> List[dict]:
+        """
+        Get the most popular searches.
+
+        Args:
+            limit: Maximum number of entries
+
+        Returns:
+            List of {"query", "count"} dicts, most popular first; counts are
+            time-decayed when a popularity ranking is configured
+        """
+        if self.popularity:
+            try:
+                top = await self.popularity.top(limit)
+                return [{"query": member, "count": round(count, 2)} for member, count in top]
+            except Exception as e:
+                logger.warning(f"Failed to read popularity ranking, using history: {e}")
+        return await self.history_repo.get_popular_searches(limit=limit)
+
     async def get_search_suggestions(
         self, query: str, limit: int = 5, user_id: Optional[str] = None
     ) -> List[dict]:
@@ -0,0 +1,126 @@
+"""
+Benchmark cached stock codecs.
+
+Measures encode/decode throughput and payload size for each codec and,
+when REDIS_URL is set, the Redis memory used per key (MEMORY USAGE).
+
+Usage (from services/search-service):
+    python -m tests.benchmarks.benchmark_stock_codec [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from app.domain.entities import (DataSource, Stock, StockIdentifier,
+                                 StockMetadata, StockPrice)
+from app.repositories.stock_codec import (ORJSON_AVAILABLE, CompactStockCodec,
+                                          JsonStockCodec, StockCodec)
+
+
+def build_stock() -> Stock:
+    """Create a representative cached stock."""
+    return Stock(
+        identifier=StockIdentifier(isin="US0378331005", symbol="AAPL", name="Apple Inc."),
+        price=StockPrice(
+            current=Decimal("175.50"),
+            currency="USD",
+            change_absolute=Decimal("2.50"),
+            change_percent=Decimal("1.45"),
+            previous_close=Decimal("173.00"),
+            open_price=Decimal("174.10"),
+            day_high=Decimal("176.00"),
+            day_low=Decimal("172.90"),
+            volume=51234567,
+        ),
+        metadata=StockMetadata(
+            exchange="XNAS",
+            sector="Technology",
+            industry="Consumer Electronics",
+            market_cap=Decimal("2800000000000"),
+            employees=161000,
+            website="https://www.apple.com",
+        ),
+        data_source=DataSource.MASSIVE,
+        last_updated=datetime.now(timezone.utc),
+    )
+
+
+def bench_codec(codec: StockCodec, stock: Stock, iterations: int) -> Dict[str, float]:
+    """Time encode and decode loops for one codec."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        payload = codec.encode(stock)
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(payload)
+    decode_s = time.perf_counter() - start
+
+    return {
+        "bytes": len(payload.encode("utf-8")),
+        "encode_per_s": iterations / encode_s,
+        "decode_per_s": iterations / decode_s,
+        "payload": payload,
+    }
+
+
+async def redis_memory_usage(payloads: Dict[str, str]) -> Dict[str, int]:
+    """Store each payload once and report MEMORY USAGE per key."""
+    import redis.asyncio as redis
+
+    client = redis.from_url(os.environ["REDIS_URL"], decode_responses=True)
+    usage = {}
+    try:
+        for name, payload in payloads.items():
+            key = f"bench:stock_codec:{name}"
+            await client.set(key, payload, ex=60)
+            usage[name] = await client.memory_usage(key)
+            await client.delete(key)
+    finally:
+        await client.aclose()
+    return usage
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    stock = build_stock()
+    codecs: List[StockCodec] = [
+        JsonStockCodec(),
+        CompactStockCodec(),
+        CompactStockCodec(compress_threshold=0),
+    ]
+    labels = ["json (legacy)", "compact", "compact+zlib"]
+
+    print(f"orjson available: {ORJSON_AVAILABLE}, iterations: {args.iterations}")
+    print(f"{'codec':<16}{'bytes':>8}{'encode/s':>14}{'decode/s':>14}")
+
+    results = {}
+    for label, codec in zip(labels, codecs):
+        result = bench_codec(codec, stock, args.iterations)
+        results[label] = result
+        print(
+            f"{label:<16}{result['bytes']:>8}"
+            f"{result['encode_per_s']:>14,.0f}{result['decode_per_s']:>14,.0f}"
+        )
+
+    if os.getenv("REDIS_URL"):
+        usage = asyncio.run(
+            redis_memory_usage({label: r["payload"] for label, r in results.items()})
+        )
+        print("\nRedis MEMORY USAGE per key:")
+        for label, used in usage.items():
+            print(f"{label:<16}{used:>8}")
+
+
+if __name__ == "__main__":
+    main()
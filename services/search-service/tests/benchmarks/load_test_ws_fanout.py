@@ -0,0 +1,136 @@
+"""
+Load test for WebSocket price fan-out.
+
+Connects thousands of simulated clients to MassiveWebSocketManager,
+broadcasts trade events and reports broadcast throughput, delivery
+latency and slow-client handling.
+
+Usage (from services/search-service):
+    python -m tests.benchmarks.load_test_ws_fanout [--clients 10000] [--events 2000]
+        [--conflation-ms 250] [--batch]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.routers.ws_router import MassiveWebSocketManager, PriceUpdate
+
+
+class SimulatedClient:
+    """WebSocket stand-in recording delivery latency."""
+
+    def __init__(self, send_delay: float = 0.0):
+        """Create client with an optional per-send delay."""
+        self.send_delay = send_delay
+        self.received = 0
+        self.latencies = []
+
+    async def accept(self):
+        """Accept the connection."""
+
+    async def send_text(self, text: str):
+        """Record delivery latency for price messages."""
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        message = json.loads(text)
+        prices = message["updates"] if message.get("type") == "prices" else [message]
+        for price in prices:
+            if price.get("type") == "price":
+                self.received += 1
+                self.latencies.append(time.perf_counter() - price["timestamp"] / 1e9)
+
+    async def close(self, code: int = 1000):
+        """Close the connection."""
+
+
+async def run(
+    clients: int,
+    events: int,
+    tickers: int,
+    per_client: int,
+    slow_ratio: float,
+    conflation_ms: int,
+    batch: bool,
+):
+    """Run the load test and print a summary."""
+    manager = MassiveWebSocketManager(conflation_interval_ms=conflation_ms)
+    manager.api_key = None
+    symbols = [f"SYM{i}" for i in range(tickers)]
+    sockets = []
+
+    for i in range(clients):
+        slow = random.random() < slow_ratio
+        ws = SimulatedClient(send_delay=0.05 if slow else 0.0)
+        sockets.append(ws)
+        await manager.connect_client(f"client-{i}", ws, batch=batch)
+        await manager.subscribe(f"client-{i}", random.sample(symbols, per_client))
+
+    start = time.perf_counter()
+    for i in range(events):
+        now_ns = int(time.perf_counter() * 1e9)
+        await manager.broadcast_price(
+            PriceUpdate(
+                ticker=random.choice(symbols),
+                price=100.0 + i * 0.01,
+                size=100,
+                timestamp=now_ns,
+                event_type="trade",
+            )
+        )
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    broadcast_seconds = time.perf_counter() - start
+
+    await asyncio.sleep(1.0)
+
+    latencies = sorted(lat for ws in sockets for lat in ws.latencies)
+    delivered = sum(ws.received for ws in sockets)
+    stats = manager.get_stats()
+
+    print(f"clients={clients} events={events} tickers={tickers} per_client={per_client}")
+    print(f"broadcast: {events / broadcast_seconds:,.0f} events/s ({broadcast_seconds:.3f}s)")
+    print(f"delivered: {delivered:,} messages")
+    if latencies:
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"latency: p50={statistics.median(latencies) * 1000:.2f}ms p99={p99 * 1000:.2f}ms")
+    print(
+        f"frames enqueued={stats['messages_enqueued']:,} "
+        f"updates={stats['price_updates']:,} conflated={stats['updates_conflated']:,}"
+    )
+    print(
+        f"dropped={stats['messages_dropped']:,} "
+        f"slow_client_disconnects={stats['slow_client_disconnects']}"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--per-client", type=int, default=5)
+    parser.add_argument("--slow-ratio", type=float, default=0.01)
+    parser.add_argument("--conflation-ms", type=int, default=250)
+    parser.add_argument("--batch", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(
+            args.clients,
+            args.events,
+            args.tickers,
+            args.per_client,
+            args.slow_ratio,
+            args.conflation_ms,
+            args.batch,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
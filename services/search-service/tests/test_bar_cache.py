@@ -0,0 +1,307 @@
+"""
+Tests for the aggregate bar cache.
+
+Covers:
+- Closed historical ranges served without upstream calls
+- Tail-only fetches for ranges ending today
+- Short-lived caching of forming bars
+- Truncated pages and ticker invalidation
+- Redis bar store encoding and writes
+"""
+
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.cache.bar_cache import (MARKET_TZ, AggregateBarCache, InMemoryBarStore,
+                                 RedisBarStore, SeriesCoverage, _decode_bar,
+                                 _encode_bar, date_to_ms, end_of_date_ms)
+from app.infrastructure.massive_client import AggregateBar, MassiveTimespan
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def make_bar(timestamp: int, close: str = "100.00") -> AggregateBar:
+    """Create a test bar."""
+    return AggregateBar(
+        timestamp=timestamp,
+        open=Decimal("99.00"),
+        high=Decimal("101.00"),
+        low=Decimal("98.50"),
+        close=Decimal(close),
+        volume=1000,
+        vwap=Decimal("100.10"),
+        transactions=42,
+    )
+
+
+def daily_bars(from_ms: int, to_ms: int) -> list:
+    """Create one bar per market-time midnight in [from_ms, to_ms)."""
+    bars = []
+    day = datetime.fromtimestamp(from_ms / 1000, tz=MARKET_TZ).date()
+    while True:
+        ts = date_to_ms(day.isoformat())
+        if ts >= to_ms:
+            break
+        if ts >= from_ms:
+            bars.append(make_bar(ts))
+        day += timedelta(days=1)
+    return bars
+
+
+@pytest.fixture
+def mock_client():
+    """Create Massive client whose aggregates follow the requested range."""
+    client = MagicMock()
+
+    async def get_aggregates(ticker, multiplier, timespan, from_date, to_date, adjusted, limit):
+        from_ms = int(from_date) if from_date.isdigit() else date_to_ms(from_date)
+        to_ms = min(end_of_date_ms(to_date), int(time.time() * 1000))
+        return daily_bars(from_ms, to_ms)
+
+    client.get_aggregates = AsyncMock(side_effect=get_aggregates)
+    return client
+
+
+@pytest.fixture
+def cache():
+    """Create bar cache with an in-memory store."""
+    return AggregateBarCache(store=InMemoryBarStore())
+
+
+def today() -> str:
+    """Today's date in market time."""
+    return datetime.now(MARKET_TZ).date().isoformat()
+
+
+def days_ago(days: int) -> str:
+    """Date N days ago in market time."""
+    return (datetime.now(MARKET_TZ).date() - timedelta(days=days)).isoformat()
+
+
+class TestHistoricalRanges:
+    """Test ranges whose bars are all closed."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_store(self, cache, mock_client):
+        """Test closed history is fetched once."""
+        first = await cache.get_aggregates(
+            mock_client, "aapl", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+        second = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+
+        assert mock_client.get_aggregates.await_count == 1
+        assert [b.timestamp for b in second] == [b.timestamp for b in first]
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_sub_range_served_from_store(self, cache, mock_client):
+        """Test a range inside the covered span needs no fetch."""
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+        bars = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-10", "2024-01-12"
+        )
+
+        assert mock_client.get_aggregates.await_count == 1
+        assert len(bars) == 3
+        assert bars[0].timestamp == date_to_ms("2024-01-10")
+
+    @pytest.mark.asyncio
+    async def test_earlier_start_refetches(self, cache, mock_client):
+        """Test a range starting before the covered span does a full fetch."""
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-10", "2024-01-31"
+        )
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+
+        assert mock_client.get_aggregates.await_count == 2
+        assert cache.misses == 2
+
+    @pytest.mark.asyncio
+    async def test_start_after_coverage_is_a_miss(self, cache, mock_client):
+        """Test a range starting after the stored span ends returns only its own bars."""
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2010-01-01", "2015-01-01"
+        )
+        bars = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2020-01-01", "2020-12-31"
+        )
+
+        second_call = mock_client.get_aggregates.await_args_list[1]
+        assert second_call.kwargs["from_date"] == "2020-01-01"
+        assert len(bars) == 366
+        assert bars[0].timestamp == date_to_ms("2020-01-01")
+        assert cache.misses == 2
+        assert cache.partial_hits == 0
+
+    @pytest.mark.asyncio
+    async def test_series_keyed_by_adjustment(self, cache, mock_client):
+        """Test adjusted and unadjusted series are stored separately."""
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31",
+            adjusted=False,
+        )
+
+        assert mock_client.get_aggregates.await_count == 2
+
+
+class TestTailFetch:
+    """Test ranges ending today."""
+
+    @pytest.mark.asyncio
+    async def test_only_tail_is_fetched(self, cache, mock_client):
+        """Test the second request fetches from the coverage end onwards."""
+        first = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, days_ago(30), today()
+        )
+        coverage = await cache.store.get_coverage("AAPL:1:day:adj")
+
+        cache.open_bars.clear()
+        second = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, days_ago(30), today()
+        )
+
+        tail_call = mock_client.get_aggregates.await_args_list[1]
+        assert tail_call.kwargs["from_date"] == str(coverage.closed_until_ms)
+        assert [b.timestamp for b in second] == [b.timestamp for b in first]
+        assert cache.partial_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_forming_bar_not_stored(self, cache, mock_client):
+        """Test today's bar is returned but never stored."""
+        bars = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, days_ago(5), today()
+        )
+        stored = await cache.store.get_bars("AAPL:1:day:adj", 0, end_of_date_ms(today()))
+
+        assert bars[-1].timestamp == date_to_ms(today())
+        assert date_to_ms(today()) not in [b.timestamp for b in stored]
+
+    @pytest.mark.asyncio
+    async def test_tail_cached_briefly(self, cache, mock_client):
+        """Test repeated tail fetches within the TTL hit the open-bar cache."""
+        for _ in range(3):
+            await cache.get_aggregates(
+                mock_client, "AAPL", 1, MassiveTimespan.DAY, days_ago(5), today()
+            )
+
+        # One full fetch, one tail fetch, then the tail comes from the TTL cache
+        assert mock_client.get_aggregates.await_count == 2
+        assert cache.tail_cache_hits == 1
+
+
+class TestCoverage:
+    """Test coverage bookkeeping."""
+
+    @pytest.mark.asyncio
+    async def test_truncated_page_limits_coverage(self, cache, monkeypatch):
+        """Test coverage stops at the last bar of a truncated page."""
+        client = MagicMock()
+        bars = [make_bar(date_to_ms("2024-01-02")), make_bar(date_to_ms("2024-01-03"))]
+        client.get_aggregates = AsyncMock(return_value=bars)
+        monkeypatch.setattr("app.cache.bar_cache.MAX_AGGREGATES_LIMIT", 2)
+
+        await cache.get_aggregates(
+            client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+
+        coverage = await cache.store.get_coverage("AAPL:1:day:adj")
+        assert coverage.closed_until_ms == date_to_ms("2024-01-03") + 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_ticker(self, cache, mock_client):
+        """Test invalidation drops every series of the ticker."""
+        await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+        await cache.get_aggregates(
+            mock_client, "MSFT", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+
+        removed = await cache.invalidate_ticker("aapl")
+
+        assert removed == 1
+        assert await cache.store.get_coverage("AAPL:1:day:adj") is None
+        assert await cache.store.get_coverage("MSFT:1:day:adj") is not None
+
+    @pytest.mark.asyncio
+    async def test_store_errors_fall_back_to_fetch(self, mock_client):
+        """Test a failing store does not fail the request."""
+        store = MagicMock()
+        store.get_coverage = AsyncMock(side_effect=Exception("Redis down"))
+        store.save = AsyncMock(side_effect=Exception("Redis down"))
+        cache = AggregateBarCache(store=store)
+
+        bars = await cache.get_aggregates(
+            mock_client, "AAPL", 1, MassiveTimespan.DAY, "2024-01-01", "2024-01-31"
+        )
+
+        assert len(bars) == 31
+        assert cache.store_errors == 2
+
+
+class TestRedisBarStore:
+    """Test Redis-backed bar store."""
+
+    def test_bar_roundtrip(self):
+        """Test bar encoding preserves all fields."""
+        bar = make_bar(1704067200000, close="186.10")
+
+        assert _decode_bar(_encode_bar(bar)) == bar
+
+    @pytest.mark.asyncio
+    async def test_get_coverage(self):
+        """Test coverage is read from the meta hash."""
+        redis_client = MagicMock()
+        redis_client.hgetall = AsyncMock(return_value={"from_ms": "10", "closed_until_ms": "20"})
+        store = RedisBarStore(redis_client)
+
+        coverage = await store.get_coverage("AAPL:1:day:adj")
+
+        redis_client.hgetall.assert_awaited_once_with("bars:AAPL:1:day:adj:meta")
+        assert coverage == SeriesCoverage(from_ms=10, closed_until_ms=20)
+
+    @pytest.mark.asyncio
+    async def test_get_bars_uses_exclusive_end(self):
+        """Test range reads exclude the end timestamp."""
+        redis_client = MagicMock()
+        redis_client.zrangebyscore = AsyncMock(return_value=[_encode_bar(make_bar(10))])
+        store = RedisBarStore(redis_client)
+
+        bars = await store.get_bars("AAPL:1:day:adj", 0, 20)
+
+        redis_client.zrangebyscore.assert_awaited_once_with("bars:AAPL:1:day:adj", 0, "(20")
+        assert bars[0].timestamp == 10
+
+    @pytest.mark.asyncio
+    async def test_save_replaces_span(self):
+        """Test save removes the replaced span and writes bars and coverage."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[])
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        redis_client = MagicMock()
+        redis_client.pipeline.return_value = pipe
+        store = RedisBarStore(redis_client, history_ttl_seconds=3600)
+
+        bar = make_bar(15)
+        await store.save("AAPL:1:day:adj", [bar], SeriesCoverage(0, 20), replace_from_ms=5)
+
+        redis_client.pipeline.assert_called_once_with(transaction=True)
+        pipe.zremrangebyscore.assert_called_once_with("bars:AAPL:1:day:adj", 5, "(20")
+        pipe.zadd.assert_called_once_with("bars:AAPL:1:day:adj", {_encode_bar(bar): 15})
+        pipe.hset.assert_called_once()
+        assert pipe.expire.call_count == 2
+        pipe.execute.assert_awaited_once()
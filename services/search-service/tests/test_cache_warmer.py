@@ -6,10 +6,11 @@ Comprehensive tests for cache warming functionality.
 
 from datetime import datetime, timezone
 from decimal import Decimal
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
-from app.cache.cache_warmer import CacheWarmer, warmup_cache_on_startup
+from app.cache.cache_warmer import (CacheWarmer, RefreshAheadWarmer,
+                                    warmup_cache_on_startup)
 from app.cache.memory_cache import MemoryStockCache
 from app.domain.entities import Stock
 from app.models import StockCache, StockSearchIndex
@@ -501,3 +502,93 @@ class TestCacheWarmerIntegration:
 
         # Verify order_by was called (checking it was called, actual order handled by SQLAlchemy)
         assert mock_query.order_by.called
+
+
+class TestRefreshAheadWarmer:
+    """Test continuous refresh of hot entries."""
+
+    @pytest.fixture
+    def stock_service(self):
+        """Create a service mock whose refresh succeeds for every symbol."""
+        service = MagicMock()
+
+        async def refresh_stocks(keys_by_symbol):
+            return {symbol: MagicMock() for symbol in keys_by_symbol}
+
+        service.refresh_stocks = AsyncMock(side_effect=refresh_stocks)
+        return service
+
+    @staticmethod
+    def cached(symbol):
+        """Create a cached stock stand-in with an identifier symbol."""
+        stock = MagicMock()
+        stock.identifier.symbol = symbol
+        return stock
+
+    @pytest.mark.asyncio
+    async def test_groups_keys_by_symbol(self, mock_memory_cache, stock_service):
+        """Test ISIN/WKN keys are refreshed together with their symbol."""
+        apple = self.cached("AAPL")
+        mock_memory_cache.refresh_candidates.return_value = [
+            ("AAPL", apple),
+            ("US0378331005", apple),
+            ("MSFT", self.cached("MSFT")),
+        ]
+        warmer = RefreshAheadWarmer(mock_memory_cache, stock_service)
+
+        refreshed = await warmer.refresh_once()
+
+        assert refreshed == 2
+        stock_service.refresh_stocks.assert_awaited_once_with(
+            {"AAPL": ["AAPL", "US0378331005"], "MSFT": ["MSFT"]}
+        )
+
+    @pytest.mark.asyncio
+    async def test_batches_upstream_loads(self, mock_memory_cache, stock_service):
+        """Test symbols are refreshed in batches of batch_size."""
+        mock_memory_cache.refresh_candidates.return_value = [
+            (f"SYM{i}", self.cached(f"SYM{i}")) for i in range(5)
+        ]
+        warmer = RefreshAheadWarmer(mock_memory_cache, stock_service, batch_size=2)
+
+        refreshed = await warmer.refresh_once()
+
+        assert refreshed == 5
+        assert [len(c.args[0]) for c in stock_service.refresh_stocks.await_args_list] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_stop_cycle(self, mock_memory_cache, stock_service):
+        """Test a failing batch is counted and later batches still run."""
+        mock_memory_cache.refresh_candidates.return_value = [
+            (f"SYM{i}", self.cached(f"SYM{i}")) for i in range(4)
+        ]
+        stock_service.refresh_stocks.side_effect = [Exception("circuit open"), {"SYM2": None}]
+        warmer = RefreshAheadWarmer(mock_memory_cache, stock_service, batch_size=2)
+
+        refreshed = await warmer.refresh_once()
+
+        assert refreshed == 1
+        assert warmer.get_stats()["failed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_no_candidates_skips_service(self, mock_memory_cache, stock_service):
+        """Test an idle cycle makes no upstream call."""
+        mock_memory_cache.refresh_candidates.return_value = []
+        warmer = RefreshAheadWarmer(mock_memory_cache, stock_service)
+
+        assert await warmer.refresh_once() == 0
+        stock_service.refresh_stocks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, mock_memory_cache, stock_service):
+        """Test the background task starts once and stops cleanly."""
+        warmer = RefreshAheadWarmer(mock_memory_cache, stock_service, interval_seconds=3600)
+
+        await warmer.start()
+        task = warmer._task
+        await warmer.start()
+        assert warmer._task is task
+        assert warmer.get_stats()["running"]
+
+        await warmer.stop()
+        assert warmer._task is None
@@ -0,0 +1,137 @@
+"""
+Tests for chart downsampling.
+
+Covers:
+- OHLC bucket aggregation semantics
+- LTTB point selection
+- Point budget enforcement and passthrough of small inputs
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from app.infrastructure.massive_client import AggregateBar
+from app.services.chart_downsampling import (DownsampleMode, bars_to_arrays,
+                                             bucket_ohlc, downsample_bars,
+                                             lttb_indices)
+
+
+def make_bars(closes, vwap=True):
+    """Create bars with the given closes, one minute apart."""
+    bars = []
+    for i, close in enumerate(closes):
+        bars.append(
+            AggregateBar(
+                timestamp=1_700_000_000_000 + i * 60_000,
+                open=Decimal(str(close - 0.5)),
+                high=Decimal(str(close + 1)),
+                low=Decimal(str(close - 1)),
+                close=Decimal(str(close)),
+                volume=100 * (i + 1),
+                vwap=Decimal(str(close)) if vwap else None,
+            )
+        )
+    return bars
+
+
+class TestBucketOHLC:
+    """Test candle bucket aggregation."""
+
+    def test_bucket_values(self):
+        """Test buckets keep first open, extreme high/low, last close, summed volume."""
+        bars = make_bars([10, 12, 11, 20, 18, 19])
+        result = bucket_ohlc(bars_to_arrays(bars), 2)
+
+        assert len(result) == 2
+        assert result.timestamp.tolist() == [bars[0].timestamp, bars[3].timestamp]
+        assert result.open.tolist() == [9.5, 19.5]
+        assert result.high.tolist() == [13.0, 21.0]
+        assert result.low.tolist() == [9.0, 17.0]
+        assert result.close.tolist() == [11.0, 19.0]
+        assert result.volume.tolist() == [600, 1500]
+
+    def test_vwap_is_volume_weighted(self):
+        """Test bucket VWAP weights each bar by its volume."""
+        bars = make_bars([10, 20, 30, 40])
+        result = bucket_ohlc(bars_to_arrays(bars), 2)
+
+        expected = (10 * 100 + 20 * 200) / 300
+        assert result.vwap[0] == pytest.approx(expected)
+
+    def test_missing_vwap_is_nan(self):
+        """Test buckets without VWAP data report none."""
+        bars = make_bars([10, 20, 30, 40], vwap=False)
+        rows = bucket_ohlc(bars_to_arrays(bars), 2).to_rows()
+
+        assert rows[0]["vwap"] is None
+
+    def test_within_budget_unchanged(self):
+        """Test inputs within budget are returned as-is."""
+        arrays = bars_to_arrays(make_bars([1, 2, 3]))
+
+        assert bucket_ohlc(arrays, 10) is arrays
+
+
+class TestLTTB:
+    """Test Largest-Triangle-Three-Buckets selection."""
+
+    def test_keeps_endpoints_and_budget(self):
+        """Test first and last points are kept and output size matches budget."""
+        x = np.arange(1000)
+        y = np.sin(x / 50.0)
+
+        indices = lttb_indices(x, y, 100)
+
+        assert len(indices) == 100
+        assert indices[0] == 0
+        assert indices[-1] == 999
+        assert np.all(np.diff(indices) > 0)
+
+    def test_keeps_spike(self):
+        """Test a single outlier survives downsampling."""
+        x = np.arange(500)
+        y = np.zeros(500)
+        y[257] = 100.0
+
+        indices = lttb_indices(x, y, 20)
+
+        assert 257 in indices.tolist()
+
+    def test_small_input_passthrough(self):
+        """Test inputs within budget keep every index."""
+        indices = lttb_indices(np.arange(5), np.arange(5), 10)
+
+        assert indices.tolist() == [0, 1, 2, 3, 4]
+
+
+class TestDownsampleBars:
+    """Test downsampling entry point."""
+
+    def test_candle_mode(self):
+        """Test candle mode returns aggregated bars within budget."""
+        bars = make_bars(list(range(1, 1001)))
+        result = downsample_bars(bars, 50, DownsampleMode.CANDLE)
+
+        assert len(result) == 50
+        assert result.volume.sum() == sum(b.volume for b in bars)
+
+    def test_line_mode_returns_original_bars(self):
+        """Test line mode keeps original bar values."""
+        bars = make_bars([float(i % 37) for i in range(1000)])
+        result = downsample_bars(bars, 50, DownsampleMode.LINE)
+        originals = {b.timestamp: float(b.close) for b in bars}
+
+        assert len(result) == 50
+        for row in result.to_rows():
+            assert originals[row["timestamp"]] == row["close"]
+
+    def test_rows_are_native_types(self):
+        """Test rows contain plain Python values for serialization."""
+        row = downsample_bars(make_bars([1, 2, 3, 4]), 2).to_rows()[0]
+
+        assert isinstance(row["timestamp"], int)
+        assert isinstance(row["volume"], int)
+        assert isinstance(row["close"], float)
+        # np.float64 subclasses float, so rule out NumPy scalars explicitly
+        assert not any(isinstance(value, np.generic) for value in row.values())
@@ -0,0 +1,173 @@
+"""
+Tests for the historical OHLCV cache.
+
+Covers:
+- Columnar round trip of OHLCV rows
+- Interval-aware freshness and full reloads
+- Tail fetches merged into rolling and anchored periods
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.cache.history_cache import (HistoricalDataCache, HistorySeries,
+                                     interval_class)
+
+DAY = 24 * 60 * 60
+BASE = 1_704_067_200  # 2024-01-01 UTC
+
+
+def make_rows(days, close_offset=0.0):
+    """Create one daily row per day offset."""
+    return [
+        {
+            "timestamp": BASE + d * DAY,
+            "open": 100.0 + d,
+            "high": 101.0 + d,
+            "low": 99.0 + d,
+            "close": 100.5 + d + close_offset,
+            "volume": 1000 + d,
+        }
+        for d in days
+    ]
+
+
+def fetcher(rows_by_period):
+    """Create a fetch callable returning rows per requested period."""
+    return MagicMock(side_effect=lambda symbol, period, interval: rows_by_period[period])
+
+
+class TestHistorySeries:
+    """Test the columnar encoding."""
+
+    def test_round_trip(self):
+        """Test rows survive encode/decode, including ints and None."""
+        rows = make_rows(range(3))
+        rows[1]["volume"] = None
+        rows.append(
+            {
+                "timestamp": "2024-01-10T09:30:00-05:00",
+                "open": 1.5,
+                "high": 2.0,
+                "low": 1.0,
+                "close": 1.75,
+                "volume": 7,
+            }
+        )
+
+        decoded = HistorySeries.from_rows(rows).to_rows()
+
+        assert decoded == rows
+        assert isinstance(decoded[0]["volume"], int)
+
+    def test_sorted_and_deduplicated(self):
+        """Test rows are ordered by time and the last duplicate wins."""
+        rows = make_rows([2, 0, 1]) + make_rows([1], close_offset=5)
+
+        series = HistorySeries.from_rows(rows)
+
+        assert series.epochs.tolist() == [BASE, BASE + DAY, BASE + 2 * DAY]
+        assert series.to_rows()[1]["close"] == pytest.approx(106.5)
+
+    def test_rolling_merge_replaces_tail_and_drops_head(self):
+        """Test the tail overwrites overlap and old rows roll off."""
+        series = HistorySeries.from_rows(make_rows(range(10)))
+        tail = HistorySeries.from_rows(make_rows(range(8, 12), close_offset=1))
+
+        merged = series.merge_tail(tail, rolling=True).to_rows()
+
+        assert [r["timestamp"] for r in merged] == [BASE + d * DAY for d in range(2, 12)]
+        assert merged[-4]["close"] == pytest.approx(109.5)
+
+    def test_anchored_merge_keeps_head(self):
+        """Test ytd/max series grow instead of rolling."""
+        series = HistorySeries.from_rows(make_rows(range(5)))
+        tail = HistorySeries.from_rows(make_rows(range(4, 7)))
+
+        merged = series.merge_tail(tail, rolling=False)
+
+        assert len(merged) == 7
+
+
+class TestHistoricalDataCache:
+    """Test cache lookups and refresh strategy."""
+
+    def test_interval_classes(self):
+        """Test intervals map to freshness classes."""
+        assert interval_class("5m") == "intraday"
+        assert interval_class("1d") == "daily"
+        assert interval_class("1wk") == "long"
+
+    def test_fresh_series_served_locally(self):
+        """Test a second request within the TTL does not call upstream."""
+        cache = HistoricalDataCache()
+        fetch = fetcher({"1y": make_rows(range(5))})
+
+        first, first_cached = cache.load("aapl", "1y", "1d", fetch)
+        second, second_cached = cache.load("AAPL", "1y", "1d", fetch)
+
+        assert not first_cached and second_cached
+        assert second == first
+        assert fetch.call_count == 1
+
+    def test_stale_series_fetches_only_tail(self):
+        """Test a stale daily series refreshes with a 5d tail fetch."""
+        cache = HistoricalDataCache()
+        fetch = fetcher({"1y": make_rows(range(10)), "5d": make_rows(range(8, 11))})
+
+        with patch("app.cache.history_cache.time.time", return_value=BASE):
+            cache.load("AAPL", "1y", "1d", fetch)
+        with patch("app.cache.history_cache.time.time", return_value=BASE + 20 * 60):
+            rows, cached = cache.load("AAPL", "1y", "1d", fetch)
+
+        assert cached
+        assert [c.args[1] for c in fetch.call_args_list] == ["1y", "5d"]
+        assert rows[-1]["timestamp"] == BASE + 10 * DAY
+        assert len(rows) == 10
+        assert cache.get_stats()["tail_merges"] == 1
+
+    def test_short_period_reloaded_in_full(self):
+        """Test periods no longer than the tail are simply refetched."""
+        cache = HistoricalDataCache()
+        fetch = fetcher({"5d": make_rows(range(5))})
+
+        with patch("app.cache.history_cache.time.time", return_value=BASE):
+            cache.load("AAPL", "5d", "1d", fetch)
+        with patch("app.cache.history_cache.time.time", return_value=BASE + 20 * 60):
+            _, cached = cache.load("AAPL", "5d", "1d", fetch)
+
+        assert not cached
+        assert [c.args[1] for c in fetch.call_args_list] == ["5d", "5d"]
+
+    def test_intraday_expires_quickly(self):
+        """Test intraday series go stale after a minute."""
+        cache = HistoricalDataCache()
+        cache.put("AAPL", "1d", "5m", make_rows(range(3)))
+
+        with patch("app.cache.history_cache.time.time") as now:
+            now.return_value = cache._series[("AAPL", "1d", "5m")].refreshed_at + 30
+            assert cache.get("AAPL", "1d", "5m")[1] is True
+            now.return_value += 60
+            assert cache.get("AAPL", "1d", "5m")[1] is False
+
+    def test_old_series_reloaded_in_full(self):
+        """Test series past their max age are not tail-merged."""
+        cache = HistoricalDataCache()
+        fetch = fetcher({"1y": make_rows(range(10)), "5d": make_rows(range(8, 11))})
+
+        with patch("app.cache.history_cache.time.time", return_value=BASE):
+            cache.load("AAPL", "1y", "1d", fetch)
+        with patch("app.cache.history_cache.time.time", return_value=BASE + 2 * DAY):
+            _, cached = cache.load("AAPL", "1y", "1d", fetch)
+
+        assert not cached
+        assert [c.args[1] for c in fetch.call_args_list] == ["1y", "1y"]
+
+    def test_empty_upstream_not_cached(self):
+        """Test empty responses are not stored."""
+        cache = HistoricalDataCache()
+
+        rows, cached = cache.load("NOPE", "1y", "1d", fetcher({"1y": []}))
+
+        assert rows == [] and not cached
+        assert cache.get_stats()["series"] == 0
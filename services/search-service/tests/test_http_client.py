@@ -0,0 +1,120 @@
+"""
+Tests for the shared upstream HTTP client pool.
+
+Covers:
+- One pooled client per origin, recreated after close
+- Connection reuse and connect-phase metrics against a local server
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from app.infrastructure.http_client import (UpstreamHTTPClientPool,
+                                            _ConnectionTrace)
+from prometheus_client import REGISTRY
+
+
+def request_count(host: str, connection: str) -> float:
+    """Read the upstream request counter for a host and reuse label."""
+    value = REGISTRY.get_sample_value(
+        "upstream_http_requests_total",
+        {"host": host, "connection": connection, "http_version": "HTTP/1.1"},
+    )
+    return value or 0.0
+
+
+@asynccontextmanager
+async def local_server():
+    """Run a minimal keep-alive HTTP/1.1 server on localhost."""
+
+    async def handle(reader, writer):
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: 2\r\n\r\n{}"
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+    server.close()
+    await server.wait_closed()
+
+
+class TestClientPool:
+    """Test per-origin client sharing."""
+
+    @pytest.mark.asyncio
+    async def test_same_origin_shares_client(self):
+        """Test URLs on one origin get the same client."""
+        pool = UpstreamHTTPClientPool()
+
+        first = pool.get_client("https://api.massive.com")
+        second = pool.get_client("https://API.massive.com/v2/aggs")
+        other = pool.get_client("https://example.com")
+
+        assert first is second
+        assert other is not first
+        assert pool.get_stats()["origins"] == ["https://api.massive.com", "https://example.com"]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_closed_client_recreated(self):
+        """Test a client is recreated after the pool was closed."""
+        pool = UpstreamHTTPClientPool()
+        first = pool.get_client("https://api.massive.com")
+
+        await pool.close()
+
+        assert first.is_closed
+        assert pool.get_client("https://api.massive.com") is not first
+        await pool.close()
+
+    def test_limits_applied(self):
+        """Test configured limits are used for pooled clients."""
+        pool = UpstreamHTTPClientPool(max_connections=7, max_keepalive_connections=3)
+
+        stats = pool.get_stats()
+
+        assert stats["max_connections"] == 7
+        assert stats["max_keepalive_connections"] == 3
+
+
+class TestConnectionMetrics:
+    """Test connection reuse observability."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_reuses_connection(self):
+        """Test only the first request opens a connection."""
+        pool = UpstreamHTTPClientPool(http2=False)
+        new_before = request_count("127.0.0.1", "new")
+        reused_before = request_count("127.0.0.1", "reused")
+
+        async with local_server() as base_url:
+            client = pool.get_client(base_url)
+            for _ in range(3):
+                response = await client.get("/ping")
+                assert response.json() == {}
+            await pool.close()
+
+        assert request_count("127.0.0.1", "new") - new_before == 1
+        assert request_count("127.0.0.1", "reused") - reused_before == 2
+
+    @pytest.mark.asyncio
+    async def test_trace_marks_new_connection(self):
+        """Test connect_tcp events flag the request as a new connection."""
+        trace = _ConnectionTrace("api.massive.com")
+
+        await trace("http11.send_request_headers.started", {})
+        assert not trace.new_connection
+
+        await trace("connection.connect_tcp.started", {})
+        await trace("connection.connect_tcp.complete", {})
+        assert trace.new_connection
@@ -4,10 +4,14 @@ Unit tests for infrastructure components.
 Tests for Circuit Breaker, Rate Limiter, and API clients.
 """
 
+import asyncio
+
 import pytest
-from app.domain.exceptions import (CircuitBreakerOpenException,
+from app.domain.exceptions import (BulkheadFullException,
+                                   CircuitBreakerOpenException,
                                    RateLimitExceededException)
-from app.infrastructure.circuit_breaker import CircuitBreaker, CircuitState
+from app.infrastructure.circuit_breaker import (AsyncCircuitBreaker,
+                                                CircuitBreaker, CircuitState)
 from app.infrastructure.rate_limiter import RateLimiter
 
 
@@ -88,6 +92,110 @@ class TestCircuitBreaker:
         assert status["failure_count"] == 0
 
 
+class TestAsyncCircuitBreaker:
+    """Tests for the async circuit breaker with bulkhead."""
+
+    async def open_breaker(self, breaker):
+        """Fail calls until the circuit opens."""
+
+        async def failing_func():
+            raise Exception("API Error")
+
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(Exception):
+                await breaker.call(failing_func)
+
+    @pytest.mark.asyncio
+    async def test_opens_after_threshold(self):
+        """Test circuit opens and rejects calls without running them."""
+        breaker = AsyncCircuitBreaker(failure_threshold=2, recovery_timeout=60, name="test")
+        await self.open_breaker(breaker)
+        calls = []
+
+        async def func():
+            calls.append(1)
+
+        with pytest.raises(CircuitBreakerOpenException):
+            await breaker.call(func)
+
+        assert breaker.state == CircuitState.OPEN
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_half_open_admits_single_probe(self):
+        """Test only one trial call runs while half-open."""
+        breaker = AsyncCircuitBreaker(failure_threshold=1, recovery_timeout=0, name="test")
+        await self.open_breaker(breaker)
+        release = asyncio.Event()
+
+        async def slow_probe():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(breaker.call(slow_probe))
+        await asyncio.sleep(0)
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        with pytest.raises(CircuitBreakerOpenException):
+            await breaker.call(slow_probe)
+
+        release.set()
+        assert await probe == "ok"
+        assert breaker.state == CircuitState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_reopens(self):
+        """Test a failing probe reopens the circuit."""
+        breaker = AsyncCircuitBreaker(failure_threshold=1, recovery_timeout=0, name="test")
+        await self.open_breaker(breaker)
+        await self.open_breaker(breaker)
+
+        assert breaker.state == CircuitState.OPEN
+
+    @pytest.mark.asyncio
+    async def test_non_failures_do_not_count(self):
+        """Test exceptions rejected by is_failure leave the circuit closed."""
+        breaker = AsyncCircuitBreaker(
+            failure_threshold=1,
+            name="test",
+            is_failure=lambda exc: not isinstance(exc, KeyError),
+        )
+
+        async def not_found():
+            raise KeyError("missing")
+
+        with pytest.raises(KeyError):
+            await breaker.call(not_found)
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failure_count == 0
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_limits_concurrency(self):
+        """Test calls beyond max_concurrent + max_queued are rejected."""
+        breaker = AsyncCircuitBreaker(max_concurrent=2, max_queued=1, name="test")
+        release = asyncio.Event()
+        running = []
+
+        async def func():
+            running.append(1)
+            await release.wait()
+            running.pop()
+
+        tasks = [asyncio.create_task(breaker.call(func)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        assert len(running) == 2
+        with pytest.raises(BulkheadFullException):
+            await breaker.call(func)
+
+        release.set()
+        await asyncio.gather(*tasks)
+        status = breaker.get_status()
+        assert status["in_flight"] == 0
+        assert status["rejected_calls"] == 1
+
+
 class TestRateLimiter:
     """Tests for Rate Limiter."""
 
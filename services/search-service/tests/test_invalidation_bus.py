@@ -0,0 +1,232 @@
+"""
+Tests for cross-replica memory cache invalidation.
+
+Covers:
+- Local bus delivery between replicas
+- Own-message filtering
+- MemoryStockCache eviction on remote update/delete/clear
+- Redis bus publishing and message dispatch
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from app.cache.invalidation_bus import (LocalInvalidationBroker,
+                                        LocalInvalidationBus,
+                                        RedisInvalidationBus)
+from app.cache.memory_cache import MemoryStockCache
+from app.domain.entities import (DataSource, Stock, StockIdentifier,
+                                 StockMetadata, StockPrice)
+
+
+def make_stock(symbol: str = "AAPL", price: str = "175.50") -> Stock:
+    """Create a stock for testing."""
+    return Stock(
+        identifier=StockIdentifier(symbol=symbol, name=f"{symbol} Inc."),
+        price=StockPrice(current=Decimal(price), currency="USD"),
+        metadata=StockMetadata(exchange="NASDAQ"),
+        data_source=DataSource.MASSIVE,
+        last_updated=datetime.now(timezone.utc),
+    )
+
+
+@pytest.fixture
+def replicas():
+    """Create two memory caches connected through a local broker."""
+    broker = LocalInvalidationBroker()
+    cache_a = MemoryStockCache(max_size=100)
+    cache_b = MemoryStockCache(max_size=100)
+    cache_a.attach_invalidation_bus(LocalInvalidationBus(broker))
+    cache_b.attach_invalidation_bus(LocalInvalidationBus(broker))
+    return cache_a, cache_b
+
+
+async def flush(*caches: MemoryStockCache) -> None:
+    """Wait for scheduled publishes to complete."""
+    for cache in caches:
+        await cache.invalidation_bus.stop()
+
+
+class TestLocalInvalidationBus:
+    """Test in-memory bus semantics."""
+
+    @pytest.mark.asyncio
+    async def test_delivers_to_other_buses_only(self):
+        """Test publishers do not receive their own messages."""
+        broker = LocalInvalidationBroker()
+        bus_a = LocalInvalidationBus(broker)
+        bus_b = LocalInvalidationBus(broker)
+        received_a, received_b = [], []
+        bus_a.subscribe(lambda action, key: received_a.append((action, key)))
+        bus_b.subscribe(lambda action, key: received_b.append((action, key)))
+
+        await bus_a.publish("delete", "AAPL")
+
+        assert received_a == []
+        assert received_b == [("delete", "AAPL")]
+        assert bus_a.get_stats()["published"] == 1
+        assert bus_b.get_stats()["received"] == 1
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_isolated(self):
+        """Test a failing handler does not block other handlers."""
+        broker = LocalInvalidationBroker()
+        bus_a = LocalInvalidationBus(broker)
+        bus_b = LocalInvalidationBus(broker)
+        received = []
+
+        def failing(action, key):
+            raise RuntimeError("boom")
+
+        bus_b.subscribe(failing)
+        bus_b.subscribe(lambda action, key: received.append(key))
+
+        await bus_a.publish("update", "MSFT")
+
+        assert received == ["MSFT"]
+
+    def test_publish_nowait_without_loop(self):
+        """Test scheduling outside an event loop is a no-op."""
+        bus = LocalInvalidationBus()
+
+        bus.publish_nowait("delete", "AAPL")
+
+        assert bus.get_stats()["published"] == 0
+
+    def test_malformed_message_ignored(self):
+        """Test malformed payloads are dropped."""
+        bus = LocalInvalidationBus()
+        received = []
+        bus.subscribe(lambda action, key: received.append(key))
+
+        bus._dispatch("not json")
+
+        assert received == []
+
+
+class TestMemoryCacheInvalidation:
+    """Test MemoryStockCache reacting to remote invalidations."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_update_evicts_other_replica(self, replicas):
+        """Test a broadcast set evicts the key on other replicas."""
+        cache_a, cache_b = replicas
+        cache_b.set("AAPL", make_stock(price="170.00"))
+
+        cache_a.set("AAPL", make_stock(price="175.50"), broadcast=True)
+        await flush(cache_a, cache_b)
+
+        assert cache_b.get("AAPL") is None
+        assert cache_a.get("AAPL").price.current == Decimal("175.50")
+        assert cache_b.get_stats()["remote_invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_plain_set_not_broadcast(self, replicas):
+        """Test promotions from lower tiers do not evict other replicas."""
+        cache_a, cache_b = replicas
+        cache_b.set("AAPL", make_stock())
+
+        cache_a.set("AAPL", make_stock())
+        await flush(cache_a, cache_b)
+
+        assert cache_b.get("AAPL") is not None
+
+    @pytest.mark.asyncio
+    async def test_delete_propagates(self, replicas):
+        """Test deletes are applied on every replica."""
+        cache_a, cache_b = replicas
+        cache_a.set("AAPL", make_stock())
+        cache_b.set("AAPL", make_stock())
+
+        cache_a.delete("AAPL")
+        await flush(cache_a, cache_b)
+
+        assert "AAPL" not in cache_a.cache
+        assert "AAPL" not in cache_b.cache
+
+    @pytest.mark.asyncio
+    async def test_clear_propagates(self, replicas):
+        """Test clears are applied on every replica."""
+        cache_a, cache_b = replicas
+        cache_b.set("AAPL", make_stock())
+        cache_b.set("MSFT", make_stock("MSFT"))
+
+        cache_a.clear()
+        await flush(cache_a, cache_b)
+
+        assert len(cache_b.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_remote_invalidation_not_rebroadcast(self, replicas):
+        """Test applying a remote invalidation does not publish again."""
+        cache_a, cache_b = replicas
+        cache_b.set("AAPL", make_stock())
+
+        cache_a.delete("AAPL")
+        await flush(cache_a, cache_b)
+
+        assert cache_b.invalidation_bus.get_stats()["published"] == 0
+
+
+class TestRedisInvalidationBus:
+    """Test Redis pub/sub bus."""
+
+    @pytest.mark.asyncio
+    async def test_publish_uses_channel(self):
+        """Test messages are published on the configured channel."""
+        redis_client = AsyncMock()
+        bus = RedisInvalidationBus(redis_client, channel="test:channel")
+
+        await bus.publish("delete", "AAPL")
+
+        channel, payload = redis_client.publish.call_args[0]
+        assert channel == "test:channel"
+        assert json.loads(payload) == {
+            "origin": bus.instance_id,
+            "action": "delete",
+            "key": "AAPL",
+        }
+
+    @pytest.mark.asyncio
+    async def test_publish_error_swallowed(self):
+        """Test Redis errors do not propagate to cache writers."""
+        redis_client = AsyncMock()
+        redis_client.publish.side_effect = ConnectionError("down")
+        bus = RedisInvalidationBus(redis_client)
+
+        await bus.publish("delete", "AAPL")
+
+        assert bus.get_stats()["publish_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_listener_dispatches_messages(self):
+        """Test received pub/sub messages reach the cache."""
+        remote = json.dumps({"origin": "other", "action": "delete", "key": "AAPL"})
+        pubsub = AsyncMock()
+        messages = [{"type": "message", "data": remote}]
+
+        async def get_message(**kwargs):
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(0.01)
+            return None
+
+        pubsub.get_message.side_effect = get_message
+        redis_client = AsyncMock()
+        redis_client.pubsub = lambda: pubsub
+
+        cache = MemoryStockCache(max_size=10)
+        cache.set("AAPL", make_stock())
+        bus = RedisInvalidationBus(redis_client, channel="test:channel")
+        cache.attach_invalidation_bus(bus)
+
+        await bus.start()
+        await asyncio.sleep(0.02)
+        await bus.stop()
+
+        pubsub.subscribe.assert_called_once_with("test:channel")
+        assert "AAPL" not in cache.cache
@@ -0,0 +1,252 @@
+"""
+Tests for the local autocomplete fallback.
+
+Covers:
+- Prefix, whole-word and typo-tolerant matching
+- Ranking by matched words, typos, attribute and exactness
+- Incremental upserts and removals
+- Failover to the local index and recovery on health
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.search.local_autocomplete import (AutocompleteFailover,
+                                           LocalAutocompleteIndex,
+                                           _edit_distance)
+from meilisearch_python_sdk.errors import MeilisearchCommunicationError
+
+DOCUMENTS = [
+    {
+        "symbol": "AAPL",
+        "name": "Apple Inc.",
+        "isin": "US0378331005",
+        "wkn": "865985",
+        "exchange": "NASDAQ",
+        "priority": 10,
+    },
+    {"symbol": "AMZN", "name": "Amazon.com Inc.", "exchange": "NASDAQ", "priority": 5},
+    {"symbol": "APLE", "name": "Apple Hospitality REIT", "exchange": "NYSE", "priority": 0},
+    {
+        "symbol": "MSFT",
+        "name": "Microsoft Corporation",
+        "isin": "US5949181045",
+        "exchange": "NASDAQ",
+        "priority": 8,
+    },
+    {
+        "symbol": "BMW.DE",
+        "name": "Bayerische Motoren Werke AG",
+        "exchange": "XETRA",
+        "priority": 3,
+    },
+]
+
+
+async def stream(documents):
+    """Yield documents as an async stream."""
+    for document in documents:
+        yield document
+
+
+async def loaded_index():
+    """Create an index loaded with the sample documents."""
+    index = LocalAutocompleteIndex()
+    await index.load(stream(DOCUMENTS))
+    return index
+
+
+def symbols(hits):
+    """Extract symbols from hits."""
+    return [hit["symbol"] for hit in hits]
+
+
+class TestLocalIndexMatching:
+    """Test query matching."""
+
+    @pytest.mark.asyncio
+    async def test_prefix_on_symbol_and_name(self):
+        """Test the last word matches as a prefix across attributes."""
+        index = await loaded_index()
+
+        assert symbols(index.search("ms")) == ["MSFT"]
+        assert set(symbols(index.search("appl"))) == {"AAPL", "APLE"}
+
+    @pytest.mark.asyncio
+    async def test_identifier_lookup(self):
+        """Test ISIN and WKN values are searchable."""
+        index = await loaded_index()
+
+        assert symbols(index.search("US0378331005")) == ["AAPL"]
+        assert symbols(index.search("865985")) == ["AAPL"]
+
+    @pytest.mark.asyncio
+    async def test_typo_tolerance(self):
+        """Test words of 5+ characters tolerate two typos, short words none."""
+        index = await loaded_index()
+
+        assert symbols(index.search("micorsoft")) == ["MSFT"]
+        assert symbols(index.search("amazn")) == ["AMZN"]
+        assert index.search("xq") == []
+
+    @pytest.mark.asyncio
+    async def test_dotted_ticker(self):
+        """Test tickers with exchange suffixes are matched whole."""
+        index = await loaded_index()
+
+        assert symbols(index.search("bmw.de")) == ["BMW.DE"]
+
+    @pytest.mark.asyncio
+    async def test_exchange_filter_and_limit(self):
+        """Test the exchange filter and limit are applied."""
+        index = await loaded_index()
+
+        assert symbols(index.search("apple", exchange="NYSE")) == ["APLE"]
+        assert len(index.search("a", limit=2)) == 2
+
+
+class TestLocalIndexRanking:
+    """Test ranking rules."""
+
+    @pytest.mark.asyncio
+    async def test_symbol_attribute_before_name(self):
+        """Test a symbol match outranks a name match."""
+        index = LocalAutocompleteIndex()
+        await index.load(
+            stream(
+                [
+                    {"symbol": "XYZ", "name": "Apple Tree Holdings", "priority": 100},
+                    {"symbol": "APPLE", "name": "Something Else", "priority": 0},
+                ]
+            )
+        )
+
+        assert symbols(index.search("apple")) == ["APPLE", "XYZ"]
+
+    @pytest.mark.asyncio
+    async def test_more_words_then_fewer_typos(self):
+        """Test documents matching more words rank first, then fewer typos."""
+        index = await loaded_index()
+
+        assert symbols(index.search("apple hosp"))[0] == "APLE"
+
+        index.upsert([{"symbol": "X1", "name": "Strive"}, {"symbol": "X2", "name": "Stripe"}])
+        assert symbols(index.search("stripe")) == ["X2", "X1"]
+
+    @pytest.mark.asyncio
+    async def test_priority_breaks_ties(self):
+        """Test equally relevant documents are ordered by priority."""
+        index = await loaded_index()
+
+        assert symbols(index.search("apple")) == ["AAPL", "APLE"]
+
+    def test_edit_distance_counts_transposition_once(self):
+        """Test an adjacent swap is one typo and the bound is respected."""
+        assert _edit_distance("aplpe", "apple", 2) == 1
+        assert _edit_distance("abcdef", "uvwxyz", 2) == 3
+
+
+class TestLocalIndexUpdates:
+    """Test incremental updates."""
+
+    @pytest.mark.asyncio
+    async def test_upsert_replaces_terms(self):
+        """Test an updated document is found by its new name only."""
+        index = await loaded_index()
+
+        index.upsert([{"symbol": "MSFT", "name": "Contoso Ltd", "priority": 8}])
+
+        assert symbols(index.search("contoso")) == ["MSFT"]
+        assert index.search("microsoft") == []
+
+    @pytest.mark.asyncio
+    async def test_remove(self):
+        """Test removed documents are no longer returned."""
+        index = await loaded_index()
+
+        index.remove(["AAPL"])
+
+        assert "AAPL" not in symbols(index.search("apple"))
+        assert len(index) == 4
+
+
+class TestAutocompleteFailover:
+    """Test switching between Meilisearch and the local index."""
+
+    @staticmethod
+    def primary():
+        """Create a Meilisearch manager mock."""
+        manager = MagicMock()
+        manager.search_autocomplete = AsyncMock(return_value=[{"symbol": "REMOTE"}])
+        manager.health_check = AsyncMock(return_value={"status": "available"})
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_healthy_primary_used(self):
+        """Test queries go to Meilisearch while it is healthy."""
+        primary = self.primary()
+        failover = AutocompleteFailover(primary, await loaded_index())
+
+        hits, source = await failover.search("apple", exchange="NASDAQ")
+
+        assert source == "meilisearch"
+        assert hits == [{"symbol": "REMOTE"}]
+        assert primary.search_autocomplete.await_args.kwargs["filters"] == "exchange = NASDAQ"
+
+    @pytest.mark.asyncio
+    async def test_error_answered_locally(self):
+        """Test a Meilisearch error still returns local results."""
+        primary = self.primary()
+        primary.search_autocomplete.side_effect = MeilisearchCommunicationError("down")
+        failover = AutocompleteFailover(primary, await loaded_index(), failure_threshold=3)
+
+        hits, source = await failover.search("micro")
+
+        assert source == "local"
+        assert symbols(hits) == ["MSFT"]
+        assert not failover.failed_over
+
+    @pytest.mark.asyncio
+    async def test_latency_overrun_counts_as_failure(self):
+        """Test a slow Meilisearch response is abandoned for the local index."""
+        primary = self.primary()
+
+        async def slow(**_):
+            await asyncio.sleep(1)
+            return []
+
+        primary.search_autocomplete.side_effect = slow
+        failover = AutocompleteFailover(
+            primary, await loaded_index(), latency_budget_ms=10, failure_threshold=1
+        )
+
+        _, source = await failover.search("apple")
+
+        assert source == "local"
+        assert failover.failed_over
+
+    @pytest.mark.asyncio
+    async def test_fails_over_then_recovers(self):
+        """Test Meilisearch is skipped while failed over and used again once healthy."""
+        primary = self.primary()
+        primary.search_autocomplete.side_effect = MeilisearchCommunicationError("down")
+        primary.health_check.return_value = {"status": "unhealthy"}
+        failover = AutocompleteFailover(
+            primary, await loaded_index(), failure_threshold=2, recovery_seconds=0
+        )
+
+        for _ in range(2):
+            await failover.search("apple")
+        assert failover.failed_over
+        calls = primary.search_autocomplete.await_count
+
+        await failover.search("apple")
+        assert primary.search_autocomplete.await_count == calls
+
+        primary.search_autocomplete.side_effect = None
+        primary.health_check.return_value = {"status": "available"}
+        _, source = await failover.search("apple")
+
+        assert source == "meilisearch"
+        assert failover.get_status()["failovers"] == 1
@@ -0,0 +1,316 @@
+"""
+Tests for MassiveClient response handling.
+
+Covers:
+- Multi-ticker snapshots: chunking, deduplication and parsing
+- Per-endpoint-family circuit breakers
+- Adapter batch fetches with cached ticker details
+- Batch quote endpoint
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from app.dependencies import get_stock_service
+from app.domain.exceptions import (CircuitBreakerOpenException,
+                                   ExternalServiceException)
+from app.infrastructure.circuit_breaker import CircuitState
+from app.infrastructure.massive_adapter import MassiveAPIAdapter
+from app.infrastructure.massive_client import (MassiveClient, TickerInfo,
+                                               endpoint_family,
+                                               is_upstream_failure)
+from app.routers import stock_router
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def snapshot_payload(tickers):
+    """Build a multi-ticker snapshot response."""
+    return {
+        "status": "OK",
+        "tickers": [
+            {
+                "ticker": ticker,
+                "day": {"o": 100.0, "c": 101.5, "v": 1000},
+                "prevDay": {"c": 100.0},
+                "lastTrade": {"p": 101.6, "s": 10, "t": 1704067200000},
+                "todaysChange": 1.6,
+                "todaysChangePerc": 1.6,
+            }
+            for ticker in tickers
+        ],
+    }
+
+
+class TestGetSnapshots:
+    """Test multi-ticker snapshot retrieval."""
+
+    @pytest.fixture
+    def client(self):
+        """Create client echoing requested tickers."""
+        client = MassiveClient(api_key="test-key")
+
+        async def send(method, endpoint, params):
+            return snapshot_payload(params["tickers"].split(","))
+
+        client._send_request = AsyncMock(side_effect=send)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_single_request_for_small_batch(self, client):
+        """Test a small batch uses one upstream request."""
+        snapshots = await client.get_snapshots(["aapl", "MSFT", "AAPL"])
+
+        assert client._send_request.await_count == 1
+        endpoint = client._send_request.await_args.args[1]
+        assert endpoint == "/v2/snapshot/locale/us/markets/stocks/tickers"
+        assert client._send_request.await_args.args[2]["tickers"] == "AAPL,MSFT"
+        assert set(snapshots) == {"AAPL", "MSFT"}
+
+    @pytest.mark.asyncio
+    async def test_chunks_large_batch(self, client):
+        """Test tickers are split into chunks of chunk_size."""
+        tickers = [f"T{i}" for i in range(25)]
+
+        snapshots = await client.get_snapshots(tickers, chunk_size=10)
+
+        assert client._send_request.await_count == 3
+        assert len(snapshots) == 25
+
+    @pytest.mark.asyncio
+    async def test_parses_snapshot_fields(self, client):
+        """Test snapshot fields are parsed like single-ticker snapshots."""
+        snapshot = (await client.get_snapshots(["AAPL"]))["AAPL"]
+
+        assert str(snapshot.day_close) == "101.5"
+        assert str(snapshot.last_trade_price) == "101.6"
+        assert snapshot.last_trade_timestamp == 1704067200000
+
+    @pytest.mark.asyncio
+    async def test_missing_tickers_omitted(self, client):
+        """Test tickers absent from the response are not returned."""
+        client._send_request = AsyncMock(return_value=snapshot_payload(["AAPL"]))
+
+        snapshots = await client.get_snapshots(["AAPL", "NOPE"])
+
+        assert list(snapshots) == ["AAPL"]
+
+    @pytest.mark.asyncio
+    async def test_empty_input(self, client):
+        """Test no request is made without tickers."""
+        assert await client.get_snapshots([]) == {}
+        client._send_request.assert_not_awaited()
+
+
+def http_error(status_code):
+    """Build an HTTPStatusError with the given status."""
+    request = httpx.Request("GET", "https://api.massive.com/test")
+    response = httpx.Response(status_code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestEndpointFamilies:
+    """Test circuit breaker isolation between endpoint families."""
+
+    def test_endpoint_family_mapping(self):
+        """Test API paths map to their endpoint family."""
+        assert endpoint_family("/v2/snapshot/locale/us/markets/stocks/tickers") == "snapshot"
+        assert endpoint_family("/v2/aggs/ticker/AAPL/prev") == "aggregates"
+        assert endpoint_family("/v2/reference/news") == "news"
+        assert endpoint_family("/v3/reference/tickers/AAPL") == "reference"
+
+    def test_client_errors_are_not_failures(self):
+        """Test 404 does not count as upstream failure but 429 and 5xx do."""
+        assert not is_upstream_failure(http_error(404))
+        assert is_upstream_failure(http_error(429))
+        assert is_upstream_failure(http_error(503))
+        assert is_upstream_failure(httpx.ConnectError("refused"))
+
+    @pytest.mark.asyncio
+    async def test_news_failures_do_not_open_snapshot_circuit(self):
+        """Test a failing family opens only its own circuit."""
+        client = MassiveClient(api_key="test-key")
+
+        async def http_request(method, endpoint, params):
+            if endpoint_family(endpoint) == "news":
+                raise httpx.ConnectError("refused")
+            return snapshot_payload(["AAPL"])
+
+        client._http_request = AsyncMock(side_effect=http_request)
+        news = client.circuit_breakers["news"]
+        for _ in range(news.failure_threshold):
+            with pytest.raises(httpx.ConnectError):
+                await client._send_request("GET", "/v2/reference/news", {})
+
+        assert news.state == CircuitState.OPEN
+        with pytest.raises(CircuitBreakerOpenException):
+            await client._send_request("GET", "/v2/reference/news", {})
+        snapshots = await client.get_snapshots(["AAPL"])
+
+        assert "AAPL" in snapshots
+        assert client.circuit_breakers["snapshot"].state == CircuitState.CLOSED
+
+
+class TestAdapterFetchStocks:
+    """Test MassiveAPIAdapter batch fetches."""
+
+    @pytest.fixture
+    def client(self):
+        """Create client with multi-ticker snapshots and ticker details."""
+        client = MassiveClient(api_key="test-key")
+
+        async def send(method, endpoint, params):
+            return snapshot_payload(params["tickers"].split(","))
+
+        async def details(ticker):
+            return TickerInfo(
+                ticker=ticker,
+                name=f"{ticker} Inc.",
+                market="stocks",
+                locale="us",
+                primary_exchange="XNAS",
+                type="CS",
+                active=True,
+            )
+
+        client._send_request = AsyncMock(side_effect=send)
+        client.get_ticker_details = AsyncMock(side_effect=details)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_one_snapshot_request(self, client):
+        """Test several stocks are fetched with one snapshot request."""
+        adapter = MassiveAPIAdapter(client)
+
+        stocks = await adapter.fetch_stocks(["AAPL", "MSFT", "GOOGL"])
+
+        assert client._send_request.await_count == 1
+        assert set(stocks) == {"AAPL", "MSFT", "GOOGL"}
+        assert stocks["MSFT"].identifier.name == "MSFT Inc."
+        assert str(stocks["MSFT"].price.current) == "101.6"
+
+    @pytest.mark.asyncio
+    async def test_ticker_details_cached(self, client):
+        """Test ticker details are fetched once per symbol."""
+        adapter = MassiveAPIAdapter(client)
+
+        await adapter.fetch_stocks(["AAPL", "MSFT"])
+        await adapter.fetch_stocks(["AAPL", "MSFT"])
+
+        assert client.get_ticker_details.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cold_batch_defers_most_details(self, client):
+        """Test a cold batch fetches few details inline and the rest later."""
+        adapter = MassiveAPIAdapter(client)
+        symbols = [f"T{i}" for i in range(20)]
+
+        stocks = await adapter.fetch_stocks(symbols)
+
+        assert set(stocks) == set(symbols)
+        assert client._send_request.await_count == 1
+        assert client.get_ticker_details.await_count == adapter.INLINE_DETAILS_LIMIT
+        assert stocks["T19"].identifier.symbol == "T19"
+
+        await asyncio.gather(*adapter._background_tasks)
+
+        assert client.get_ticker_details.await_count == 20
+        assert adapter._details_cache.currsize == 20
+        assert not adapter._details_pending
+
+    @pytest.mark.asyncio
+    async def test_missing_details_still_returns_stock(self, client):
+        """Test a missing ticker detail does not drop the quote."""
+        client.get_ticker_details = AsyncMock(return_value=None)
+        adapter = MassiveAPIAdapter(client)
+
+        stocks = await adapter.fetch_stocks(["AAPL"])
+
+        assert "AAPL" in stocks
+        assert adapter._details_cache.currsize == 0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_error_wrapped(self, client):
+        """Test upstream failures raise ExternalServiceException."""
+        client._send_request = AsyncMock(side_effect=Exception("boom"))
+        adapter = MassiveAPIAdapter(client)
+
+        with pytest.raises(ExternalServiceException):
+            await adapter.fetch_stocks(["AAPL"])
+
+
+class TestQuotesEndpoint:
+    """Test the batch quote endpoint."""
+
+    @pytest.fixture
+    def service(self):
+        """Create mock stock service."""
+        return MagicMock()
+
+    @pytest.fixture
+    def api(self, service):
+        """Create test client with the stock service overridden."""
+        app = FastAPI()
+        app.include_router(stock_router.router)
+        app.dependency_overrides[get_stock_service] = lambda: service
+        return TestClient(app)
+
+    @pytest.mark.asyncio
+    async def test_returns_quotes_and_missing(self, api, service):
+        """Test quotes are keyed by symbol and misses are reported."""
+        client = MassiveClient(api_key="test-key")
+        client._send_request = AsyncMock(return_value=snapshot_payload(["AAPL", "MSFT"]))
+        client.get_ticker_details = AsyncMock(return_value=None)
+        stocks = await MassiveAPIAdapter(client).fetch_stocks(["AAPL", "MSFT"])
+        service.resolve_many = AsyncMock(return_value=stocks)
+
+        response = api.get("/api/v1/stocks/quotes", params={"symbols": "aapl, MSFT,NOPE,AAPL"})
+
+        assert response.status_code == 200
+        body = response.json()
+        service.resolve_many.assert_awaited_once_with(["AAPL", "MSFT", "NOPE"])
+        assert set(body["quotes"]) == {"AAPL", "MSFT"}
+        assert body["quotes"]["AAPL"]["price"] == 101.6
+        assert body["missing"] == ["NOPE"]
+
+    @pytest.mark.asyncio
+    async def test_quotes_keyed_by_requested_identifier(self, api, service):
+        """Test an ISIN resolving to a symbol is reported under the ISIN."""
+        client = MassiveClient(api_key="test-key")
+        client._send_request = AsyncMock(return_value=snapshot_payload(["AAPL"]))
+        client.get_ticker_details = AsyncMock(return_value=None)
+        stocks = await MassiveAPIAdapter(client).fetch_stocks(["AAPL"])
+        service.resolve_many = AsyncMock(return_value={"US0378331005": stocks["AAPL"]})
+
+        response = api.get("/api/v1/stocks/quotes", params={"symbols": "US0378331005"})
+
+        body = response.json()
+        assert set(body["quotes"]) == {"US0378331005"}
+        assert body["quotes"]["US0378331005"]["symbol"] == "AAPL"
+        assert body["missing"] == []
+
+    def test_error_detail_is_generic(self, api, service):
+        """Test internal error text is not returned to the client."""
+        service.resolve_many = AsyncMock(side_effect=RuntimeError("secret internals"))
+
+        response = api.get("/api/v1/stocks/quotes", params={"symbols": "AAPL"})
+
+        assert response.status_code == 500
+        assert "secret internals" not in response.text
+
+    def test_rejects_too_many_symbols(self, api, service):
+        """Test requests above the symbol limit are rejected."""
+        symbols = ",".join(f"T{i}" for i in range(stock_router.MAX_QUOTE_SYMBOLS + 1))
+
+        response = api.get("/api/v1/stocks/quotes", params={"symbols": symbols})
+
+        assert response.status_code == 400
+        service.resolve_many.assert_not_called()
+
+    def test_rejects_empty_symbols(self, api):
+        """Test an empty symbol list is rejected."""
+        response = api.get("/api/v1/stocks/quotes", params={"symbols": " , "})
+
+        assert response.status_code == 400
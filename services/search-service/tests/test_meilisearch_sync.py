@@ -0,0 +1,180 @@
+"""
+Tests for diff-based Meilisearch index synchronization.
+
+Covers:
+- Document building and content hashing
+- Pushing only changed documents, in batches, after task completion
+- Deleting symbols without active mappings
+- Seeding tracked hashes from the index
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.services.meilisearch_sync_service import (HASH_FIELD,
+                                                   MeilisearchSyncService)
+
+
+def mapping(symbol, identifier_type, value, priority=0, name="Apple Inc.", exchange="NASDAQ"):
+    """Create a symbol mapping stand-in."""
+    return SimpleNamespace(
+        yahoo_symbol=symbol,
+        identifier_type=identifier_type,
+        identifier_value=value,
+        priority=priority,
+        stock_name=name,
+        exchange=exchange,
+    )
+
+
+async def stream(documents):
+    """Yield documents as an async stream."""
+    for document in documents:
+        yield document
+
+
+@pytest.fixture
+def meilisearch():
+    """Create a Meilisearch manager mock whose tasks succeed."""
+    manager = MagicMock()
+    manager.add_documents = AsyncMock(return_value=1)
+    manager.delete_documents = AsyncMock(return_value=2)
+    manager.wait_for_task = AsyncMock(return_value=True)
+    return manager
+
+
+@pytest.fixture
+def sync_service(meilisearch):
+    """Create a sync service with small batches."""
+    service = MeilisearchSyncService(batch_size=2)
+    service.meilisearch = meilisearch
+    return service
+
+
+class TestCreateDocument:
+    """Test document building."""
+
+    def test_merges_identifiers_of_one_symbol(self, sync_service):
+        """Test ISIN and WKN mappings are merged into one document."""
+        doc = sync_service._create_document(
+            [
+                mapping("AAPL", "isin", "US0378331005", priority=10),
+                mapping("AAPL", "wkn", "865985"),
+                mapping("AAPL", "name", "Apple"),
+            ]
+        )
+
+        assert doc["symbol"] == "AAPL"
+        assert doc["isin"] == "US0378331005"
+        assert doc["wkn"] == "865985"
+        assert doc["priority"] == 10
+        assert doc["name"] == "Apple Inc."
+
+    def test_hash_tracks_content(self, sync_service):
+        """Test the hash is stable for equal content and changes with it."""
+        first = sync_service._create_document([mapping("AAPL", "isin", "US0378331005")])
+        same = sync_service._create_document([mapping("AAPL", "isin", "US0378331005")])
+        renamed = sync_service._create_document(
+            [mapping("AAPL", "isin", "US0378331005", name="Apple")]
+        )
+
+        assert first[HASH_FIELD] == same[HASH_FIELD]
+        assert first[HASH_FIELD] != renamed[HASH_FIELD]
+
+
+class TestSyncDocuments:
+    """Test the diff engine."""
+
+    def documents(self, sync_service, symbols):
+        """Build one document per symbol."""
+        return [sync_service._create_document([mapping(s, "isin", f"US{s}")]) for s in symbols]
+
+    @pytest.mark.asyncio
+    async def test_only_changed_documents_pushed(self, sync_service, meilisearch):
+        """Test unchanged documents are skipped."""
+        docs = self.documents(sync_service, ["AAPL", "MSFT", "NVDA"])
+        indexed = {"AAPL": docs[0][HASH_FIELD], "MSFT": "outdated"}
+
+        stats = await sync_service._sync_documents(stream(docs), indexed)
+
+        meilisearch.add_documents.assert_awaited_once_with(docs[1:])
+        assert stats["documents_unchanged"] == 1
+        assert stats["documents_synced"] == 2
+        assert indexed["NVDA"] == docs[2][HASH_FIELD]
+
+    @pytest.mark.asyncio
+    async def test_pushes_in_batches(self, sync_service, meilisearch):
+        """Test changed documents are sent in batch_size chunks, each awaited."""
+        docs = self.documents(sync_service, ["A", "B", "C", "D", "E"])
+
+        stats = await sync_service._sync_documents(stream(docs), {})
+
+        sizes = [len(c.args[0]) for c in meilisearch.add_documents.await_args_list]
+        assert sizes == [2, 2, 1]
+        assert meilisearch.wait_for_task.await_count == 3
+        assert stats["batches"] == 3
+
+    @pytest.mark.asyncio
+    async def test_removed_symbols_deleted(self, sync_service, meilisearch):
+        """Test indexed symbols without an active mapping are deleted."""
+        docs = self.documents(sync_service, ["AAPL"])
+        indexed = {"AAPL": docs[0][HASH_FIELD], "DELISTED": "x"}
+
+        stats = await sync_service._sync_documents(stream(docs), indexed)
+
+        meilisearch.delete_documents.assert_awaited_once_with(["DELISTED"])
+        assert stats["documents_deleted"] == 1
+        assert "DELISTED" not in indexed
+
+    @pytest.mark.asyncio
+    async def test_incremental_deletes_only_in_scope(self, sync_service, meilisearch):
+        """Test an incremental pass leaves symbols outside its scope alone."""
+        indexed = {"AAPL": "x", "MSFT": "y"}
+
+        await sync_service._sync_documents(stream([]), indexed, scope={"AAPL"})
+
+        meilisearch.delete_documents.assert_awaited_once_with(["AAPL"])
+        assert indexed == {"MSFT": "y"}
+
+    @pytest.mark.asyncio
+    async def test_failed_task_keeps_old_hash(self, sync_service, meilisearch):
+        """Test a failed indexing task is retried on the next sync."""
+        meilisearch.wait_for_task.return_value = False
+        docs = self.documents(sync_service, ["AAPL"])
+        indexed = {"AAPL": "old"}
+
+        stats = await sync_service._sync_documents(stream(docs), indexed)
+
+        assert stats["documents_failed"] == 1
+        assert indexed["AAPL"] == "old"
+
+
+class TestIndexedHashes:
+    """Test tracking of indexed document hashes."""
+
+    @pytest.mark.asyncio
+    async def test_seeded_from_index_once(self, sync_service, meilisearch):
+        """Test hashes are read from the index on first use only."""
+        meilisearch.iter_documents = MagicMock(
+            side_effect=lambda **_: stream([{"symbol": "AAPL", HASH_FIELD: "h"}, {"symbol": "OLD"}])
+        )
+
+        first = await sync_service._get_indexed_hashes()
+        second = await sync_service._get_indexed_hashes()
+
+        assert first == {"AAPL": "h", "OLD": ""}
+        assert second is first
+        assert meilisearch.iter_documents.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_reloaded_when_index_size_differs(self, sync_service, meilisearch):
+        """Test a verify pass reloads hashes after the index changed externally."""
+        meilisearch.iter_documents = MagicMock(side_effect=lambda **_: stream([]))
+        meilisearch.get_index_stats = AsyncMock(return_value={"number_of_documents": 5})
+        sync_service._indexed_hashes = {"AAPL": "h"}
+
+        hashes = await sync_service._get_indexed_hashes(verify=True)
+
+        assert hashes == {}
+        meilisearch.iter_documents.assert_called_once()
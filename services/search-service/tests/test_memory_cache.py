@@ -4,13 +4,15 @@ Tests for Phase 2: In-Memory LRU Cache
 Comprehensive tests for the memory cache implementation with LRU eviction.
 """
 
+import dataclasses
 import threading
 import time
 from datetime import datetime, timezone
 from decimal import Decimal
 
 import pytest
-from app.cache.memory_cache import MemoryStockCache, get_memory_cache
+from app.cache.memory_cache import (CountMinSketch, MemoryStockCache,
+                                    get_memory_cache)
 from app.domain.entities import (DataSource, Stock, StockIdentifier,
                                  StockMetadata, StockPrice)
 
@@ -258,6 +260,79 @@ class TestCacheTTL:
         assert len(cache.cache) == 0
 
 
+class TestStaleWhileRevalidate:
+    """Test soft/hard TTL stale-while-revalidate behaviour."""
+
+    def test_stale_entry_hidden_by_default(self, sample_stock):
+        """Test entries past soft TTL are a miss without allow_stale."""
+        cache = MemoryStockCache(max_size=100)
+        cache.set("AAPL", sample_stock, ttl_minutes=0, stale_ttl_minutes=1)
+
+        time.sleep(0.01)
+
+        assert cache.get("AAPL") is None
+        assert len(cache.cache) == 1
+
+    def test_stale_entry_served_when_allowed(self, sample_stock):
+        """Test stale entries are returned flagged within the stale window."""
+        cache = MemoryStockCache(max_size=100)
+        cache.set("AAPL", sample_stock, ttl_minutes=0, stale_ttl_minutes=1)
+
+        time.sleep(0.01)
+        result = cache.get("AAPL", allow_stale=True)
+
+        assert result is not None
+        assert result.stale is True
+        assert result.identifier.symbol == "AAPL"
+        # Cached instance itself stays unflagged
+        assert sample_stock.stale is False
+        assert cache.get_stats()["stale_hits"] == 1
+
+    def test_fresh_entry_not_flagged(self, memory_cache, sample_stock):
+        """Test fresh entries are returned as-is."""
+        memory_cache.set("AAPL", sample_stock, stale_ttl_minutes=10)
+
+        result = memory_cache.get("AAPL", allow_stale=True)
+
+        assert result is sample_stock
+        assert result.stale is False
+
+    def test_entry_removed_after_hard_ttl(self, sample_stock):
+        """Test entries are dropped once past soft TTL + stale window."""
+        cache = MemoryStockCache(max_size=100)
+        cache.set("AAPL", sample_stock, ttl_minutes=0, stale_ttl_minutes=0)
+
+        time.sleep(0.01)
+
+        assert cache.get("AAPL", allow_stale=True) is None
+        assert len(cache.cache) == 0
+
+    def test_default_stale_window_from_constructor(self, sample_stock):
+        """Test set() uses the cache-wide stale window by default."""
+        cache = MemoryStockCache(max_size=100, stale_ttl_minutes=2)
+        cache.set("AAPL", sample_stock, ttl_minutes=1)
+
+        window = sample_stock.cache_expires_at - sample_stock.cache_fresh_until
+        assert window == pytest.approx(120)
+
+    def test_stale_copy_not_recached(self, memory_cache, sample_stock):
+        """Test a stale-flagged copy is never stored as fresh."""
+        sample_stock.stale = True
+
+        memory_cache.set("AAPL", sample_stock)
+
+        assert len(memory_cache.cache) == 0
+
+    def test_set_refreshes_expiry(self, memory_cache, sample_stock):
+        """Test re-setting the same stock extends its TTL."""
+        memory_cache.set("AAPL", sample_stock, ttl_minutes=0)
+        first_expiry = sample_stock.cache_fresh_until
+
+        memory_cache.set("AAPL", sample_stock, ttl_minutes=5)
+
+        assert sample_stock.cache_fresh_until > first_expiry
+
+
 class TestCacheWithMultipleStocks:
     """Test cache with multiple different stocks."""
 
@@ -428,3 +503,69 @@ class TestErrorHandling:
         except Exception:
             # Acceptable to raise validation error
             pass
+
+
+class TestAccessFrequency:
+    """Test access counting and refresh-ahead candidate selection."""
+
+    def test_sketch_never_undercounts(self):
+        """Test estimates are at least the true count."""
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(50):
+            for _ in range(i % 5 + 1):
+                sketch.add(f"KEY{i}")
+
+        assert all(sketch.estimate(f"KEY{i}") >= i % 5 + 1 for i in range(50))
+
+    def test_sketch_ages_counts(self):
+        """Test counters are halved after sample_size additions."""
+        sketch = CountMinSketch(width=64, depth=2, sample_size=8)
+        for _ in range(7):
+            sketch.add("AAPL")
+        assert sketch.estimate("AAPL") == 7
+
+        sketch.add("AAPL")
+
+        assert sketch.estimate("AAPL") == 4
+
+    def test_lookups_counted(self, memory_cache, sample_stock):
+        """Test every get() counts as an access, hit or miss."""
+        memory_cache.set("AAPL", sample_stock)
+        for _ in range(3):
+            memory_cache.get("AAPL")
+        memory_cache.get("MSFT")
+
+        assert memory_cache.access_frequency("AAPL") >= 3
+        assert memory_cache.access_frequency("MSFT") >= 1
+
+    def test_candidates_hottest_expiring_first(self, sample_stock):
+        """Test only hot entries near expiry are returned, hottest first."""
+        cache = MemoryStockCache(max_size=100, stale_ttl_minutes=5)
+        cold = dataclasses.replace(sample_stock)
+        warm = dataclasses.replace(sample_stock)
+        hot = dataclasses.replace(sample_stock)
+        later = dataclasses.replace(sample_stock)
+        cache.set("COLD", cold, ttl_minutes=0.5)
+        cache.set("WARM", warm, ttl_minutes=0.5)
+        cache.set("HOT", hot, ttl_minutes=0)
+        cache.set("LATER", later, ttl_minutes=30)
+        for key, count in [("COLD", 1), ("WARM", 2), ("HOT", 5), ("LATER", 9)]:
+            for _ in range(count):
+                cache.get(key, allow_stale=True)
+
+        candidates = cache.refresh_candidates(within_seconds=60, limit=10)
+
+        assert [key for key, _ in candidates] == ["HOT", "WARM"]
+
+    def test_ttl_jitter_spreads_expiry(self, sample_stock):
+        """Test jittered soft TTLs stay within the configured spread."""
+        cache = MemoryStockCache(max_size=100, ttl_jitter=0.2)
+        expiries = []
+        for i in range(20):
+            stock = dataclasses.replace(sample_stock)
+            before = time.time()
+            cache.set(f"K{i}", stock, ttl_minutes=10)
+            expiries.append(stock.cache_fresh_until - before)
+
+        assert all(480 - 1 <= e <= 720 + 1 for e in expiries)
+        assert len({round(e) for e in expiries}) > 1
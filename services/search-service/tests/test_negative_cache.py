@@ -0,0 +1,137 @@
+"""
+Tests for the negative-result cache and known-identifier filter.
+
+Covers:
+- Bloom filter membership and false-positive rate
+- Negative cache expiry and statistics
+- Fail-open behaviour and identifier-type rules of the index
+- Loading identifiers from symbol_mappings and the stock cache
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from app.cache.negative_cache import (BloomFilter, KnownIdentifierIndex,
+                                      NegativeCache, load_known_identifiers)
+from app.domain.entities import IdentifierType
+
+
+class TestBloomFilter:
+    """Test Bloom filter membership."""
+
+    def test_no_false_negatives(self):
+        """Test every added item is reported as present."""
+        bloom = BloomFilter(capacity=1000)
+        items = [f"US{i:010d}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        assert all(item in bloom for item in items)
+        assert len(bloom) == 1000
+
+    def test_false_positive_rate_near_target(self):
+        """Test unseen items rarely match at capacity."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"KNOWN{i}")
+
+        false_positives = sum(f"JUNK{i}" in bloom for i in range(10000))
+
+        assert false_positives < 300
+
+
+class TestNegativeCache:
+    """Test short-lived miss caching."""
+
+    def test_add_and_discard(self):
+        """Test keys are remembered until discarded."""
+        cache = NegativeCache(maxsize=10, ttl_seconds=60)
+
+        cache.add("ZZZZ")
+        assert cache.contains("ZZZZ")
+
+        cache.discard("ZZZZ")
+        assert not cache.contains("ZZZZ")
+        assert cache.get_stats()["hits"] == 1
+
+    def test_entries_expire(self):
+        """Test keys are forgotten after the TTL."""
+        cache = NegativeCache(maxsize=10, ttl_seconds=0.05)
+        cache.add("ZZZZ")
+        time.sleep(0.1)
+
+        assert not cache.contains("ZZZZ")
+
+
+class TestKnownIdentifierIndex:
+    """Test identifier rejection rules."""
+
+    @pytest.fixture
+    def index(self):
+        """Create an index loaded with a few identifiers."""
+        index = KnownIdentifierIndex(authoritative_symbols=False)
+        index.load(["us0378331005", "865985", "AAPL"])
+        return index
+
+    def test_fails_open_until_loaded(self):
+        """Test nothing is rejected before the filter is loaded."""
+        index = KnownIdentifierIndex()
+
+        assert index.might_exist(IdentifierType.ISIN, "DE000BAY0017")
+        assert not index.loaded
+
+    def test_unknown_isin_and_wkn_rejected(self, index):
+        """Test ISINs and WKNs outside the filter are rejected."""
+        assert index.might_exist(IdentifierType.ISIN, "US0378331005")
+        assert index.might_exist(IdentifierType.WKN, "865985")
+        assert not index.might_exist(IdentifierType.ISIN, "DE000BAY0017")
+        assert not index.might_exist(IdentifierType.WKN, "BAY001")
+        assert index.rejections == 2
+
+    def test_symbols_and_names_pass_by_default(self, index):
+        """Test symbols pass unless the filter is authoritative for them."""
+        assert index.might_exist(IdentifierType.SYMBOL, "ZZZZ")
+        assert index.might_exist(IdentifierType.NAME, "Unknown Corp")
+
+        index.authoritative_symbols = True
+        assert not index.might_exist(IdentifierType.SYMBOL, "ZZZZ")
+        assert index.might_exist(IdentifierType.SYMBOL, "AAPL")
+
+    def test_runtime_additions(self, index):
+        """Test identifiers learned at runtime are accepted."""
+        index.add("DE000BAY0017", None)
+
+        assert index.might_exist(IdentifierType.ISIN, "DE000BAY0017")
+
+    @pytest.mark.asyncio
+    async def test_start_loads_and_stop_cancels(self):
+        """Test start() loads immediately and stop() ends the reload task."""
+        index = KnownIdentifierIndex()
+
+        async def loader():
+            return ["US0378331005"]
+
+        await index.start(loader, interval_seconds=3600)
+        assert index.loaded
+        assert index._reload_task is not None
+
+        await index.stop()
+        assert index._reload_task is None
+
+
+class TestLoadKnownIdentifiers:
+    """Test collecting identifiers from the database."""
+
+    def test_collects_mappings_cache_and_builtins(self):
+        """Test mappings, cached stocks and built-in maps are combined."""
+        db = MagicMock()
+        mapping_query = MagicMock()
+        mapping_query.filter.return_value = [("DE0005140008", "DBK.DE")]
+        db.query.side_effect = [mapping_query, [("SAP", "DE0007164600", "716460")]]
+
+        identifiers = load_known_identifiers(db)
+
+        assert {"DE0005140008", "DBK.DE", "SAP", "DE0007164600", "716460"} <= identifiers
+        assert "US0378331005" in identifiers
+        assert "865985" in identifiers
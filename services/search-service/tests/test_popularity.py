@@ -0,0 +1,240 @@
+"""
+Tests for the time-decayed popularity ranking.
+
+Covers:
+- Increments and top-N reads with decayed counts
+- Forward decay favouring recent searches
+- Seeding without overwriting and long-tail trimming
+- Epoch rebasing across generations without overflow
+- Errors swallowed on the search path
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from app.cache.popularity import PopularityRanking
+
+HOUR = 3600
+
+
+class FakeSortedSetRedis:
+    """Minimal async sorted-set subset of the Redis API."""
+
+    def __init__(self):
+        self.zsets = {}
+        self.strings = {}
+
+    async def zincrby(self, key, amount, member):
+        zset = self.zsets.setdefault(key, {})
+        zset[member] = zset.get(member, 0.0) + amount
+        return zset[member]
+
+    async def zadd(self, key, mapping, nx=False):
+        zset = self.zsets.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in zset:
+                continue
+            added += member not in zset
+            zset[member] = score
+        return added
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def _ranked(self, key):
+        return sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        ranked = list(reversed(self._ranked(key)))
+        rows = ranked[start : None if end == -1 else end + 1]
+        return [(m.encode(), s) for m, s in rows] if withscores else [m.encode() for m, _ in rows]
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    async def expire(self, key, seconds):
+        return key in self.zsets
+
+    async def zunionstore(self, dest, keys):
+        union = {}
+        for key, weight in keys.items():
+            for member, score in self.zsets.get(key, {}).items():
+                union[member] = union.get(member, 0.0) + score * weight
+        self.zsets[dest] = union
+        return len(union)
+
+    async def zremrangebyrank(self, key, start, end):
+        ranked = self._ranked(key)
+        stop = len(ranked) + end + 1 if end < 0 else end + 1
+        for member, _ in ranked[start:max(stop, 0)]:
+            del self.zsets[key][member]
+
+
+def ranking(**kwargs) -> PopularityRanking:
+    """Create a ranking over a fake Redis with epoch 0."""
+    kwargs.setdefault("half_life_hours", 1)
+    return PopularityRanking(FakeSortedSetRedis(), epoch=0, **kwargs)
+
+
+class TestRecordAndTop:
+    """Test counting and reading popularity."""
+
+    @pytest.mark.asyncio
+    async def test_counts_within_same_instant(self):
+        """Test decayed counts equal raw counts at the same time."""
+        popularity = ranking()
+
+        with patch("app.cache.popularity.time.time", return_value=10 * HOUR):
+            for member in ["AAPL", "AAPL", "AAPL", "MSFT"]:
+                await popularity.record(member)
+            top = await popularity.top(10)
+
+        assert [member for member, _ in top] == ["AAPL", "MSFT"]
+        assert top[0][1] == pytest.approx(3.0)
+        assert top[1][1] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_recent_searches_outweigh_old(self):
+        """Test one half-life later a search counts double."""
+        popularity = ranking()
+
+        with patch("app.cache.popularity.time.time", return_value=10 * HOUR):
+            await popularity.record("OLD")
+            await popularity.record("OLD")
+            await popularity.record("OLD")
+        with patch("app.cache.popularity.time.time", return_value=12 * HOUR):
+            await popularity.record("NEW")
+            await popularity.record("NEW")
+            top = await popularity.top(10)
+
+        assert [member for member, _ in top] == ["NEW", "OLD"]
+        assert dict(top)["OLD"] == pytest.approx(0.75)
+
+    @pytest.mark.asyncio
+    async def test_get_scores_limited(self):
+        """Test get_scores returns only the top members."""
+        popularity = ranking()
+
+        with patch("app.cache.popularity.time.time", return_value=HOUR):
+            for i in range(5):
+                for _ in range(i + 1):
+                    await popularity.record(f"SYM{i}")
+            scores = await popularity.get_scores(limit=2)
+
+        assert set(scores) == {"SYM4", "SYM3"}
+
+
+class TestSeedAndTrim:
+    """Test seeding from history and bounding the set."""
+
+    @pytest.mark.asyncio
+    async def test_seed_does_not_overwrite(self):
+        """Test seeding only adds members that are not ranked yet."""
+        popularity = ranking()
+        with patch("app.cache.popularity.time.time", return_value=HOUR):
+            await popularity.record("AAPL")
+            added = await popularity.seed({"AAPL": 100, "MSFT": 5})
+            top = dict(await popularity.top(10))
+
+        assert added == 1
+        assert top["AAPL"] == pytest.approx(1.0)
+        assert top["MSFT"] == pytest.approx(5.0)
+
+    @pytest.mark.asyncio
+    async def test_trim_keeps_most_popular(self):
+        """Test trim drops the long tail beyond max_members."""
+        popularity = ranking(max_members=2)
+
+        with patch("app.cache.popularity.time.time", return_value=HOUR):
+            await popularity.seed({"A": 1, "B": 2, "C": 3})
+            await popularity.trim()
+            top = await popularity.top(10)
+            size = await popularity.size()
+
+        assert size == 2
+        assert [member for member, _ in top] == ["C", "B"]
+
+
+class TestRebase:
+    """Test the epoch moves forward instead of weights growing unbounded."""
+
+    @pytest.mark.asyncio
+    async def test_short_half_life_far_future(self):
+        """Test years of 1h half-lives neither overflow nor lose counts."""
+        popularity = ranking(half_life_hours=1)
+        far_future = 50 * 365 * 24 * HOUR
+
+        with patch("app.cache.popularity.time.time", return_value=far_future):
+            await popularity.record("AAPL")
+            await popularity.record("AAPL")
+            top = await popularity.top(10)
+
+        assert top == [("AAPL", pytest.approx(2.0))]
+        assert all(
+            score < 2.0**8 for zset in popularity.redis.zsets.values() for score in zset.values()
+        )
+
+    @pytest.mark.asyncio
+    async def test_counts_carried_into_next_generation(self):
+        """Test decayed counts survive a generation boundary."""
+        popularity = ranking(half_life_hours=1)
+        other_process = PopularityRanking(popularity.redis, epoch=0, half_life_hours=1)
+
+        with patch("app.cache.popularity.time.time", return_value=3 * HOUR):
+            for _ in range(4):
+                await popularity.record("OLD")
+        # Two half-lives later, in the next generation (4h long)
+        with patch("app.cache.popularity.time.time", return_value=5 * HOUR):
+            await other_process.record("NEW")
+            top = dict(await popularity.top(10))
+            size = await popularity.size()
+
+        assert top["OLD"] == pytest.approx(1.0)
+        assert top["NEW"] == pytest.approx(1.0)
+        assert size == 2
+
+
+class TestFailureHandling:
+    """Test Redis errors never fail the search path."""
+
+    @pytest.mark.asyncio
+    async def test_record_swallows_errors(self):
+        """Test record logs and returns on Redis errors."""
+        redis = AsyncMock()
+        redis.zincrby.side_effect = ConnectionError("down")
+
+        await PopularityRanking(redis).record("AAPL")
+
+    @pytest.mark.asyncio
+    async def test_record_nowait_runs_in_background(self):
+        """Test record_nowait returns before Redis answers."""
+        popularity = ranking()
+        release = asyncio.Event()
+        original = popularity.redis.zincrby
+
+        async def slow_zincrby(*args):
+            await release.wait()
+            return await original(*args)
+
+        popularity.redis.zincrby = slow_zincrby
+        with patch("app.cache.popularity.time.time", return_value=HOUR):
+            popularity.record_nowait("AAPL")
+            assert len(popularity._pending) == 1
+            release.set()
+            await asyncio.gather(*popularity._pending)
+            top = await popularity.top(10)
+
+        assert top == [("AAPL", pytest.approx(1.0))]
+
+    @pytest.mark.asyncio
+    async def test_get_scores_empty_on_error(self):
+        """Test get_scores returns no stats on Redis errors."""
+        redis = AsyncMock()
+        redis.zrevrange.side_effect = ConnectionError("down")
+
+        assert await PopularityRanking(redis).get_scores() == {}
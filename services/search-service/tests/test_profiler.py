@@ -0,0 +1,160 @@
+"""
+Tests for the on-demand event loop profiler.
+
+Covers:
+- Collapsed stack format
+- Stack sampling, loop lag and slow coroutine steps
+- Hooks removed after a profile and one profile at a time
+- Admin-only access to the profile endpoint
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+from app.core.auth import User, require_admin
+from app.core.profiler import (EventLoopProfiler, ProfileResult, ProfilerBusyError,
+                               collapse_stack)
+from app.routers.admin_router import router
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+
+async def blocking_handler():
+    """Coroutine step that blocks the event loop."""
+    await asyncio.sleep(0.05)
+    time.sleep(0.1)
+
+
+class TestCollapsedStacks:
+    """Test collapsed stack formatting."""
+
+    def test_root_first(self):
+        """Test frames are listed from the outermost caller inwards."""
+
+        def inner():
+            return collapse_stack(sys._getframe())
+
+        def outer():
+            return inner()
+
+        frames = outer().split(";")
+
+        assert "outer" in frames[-2]
+        assert "inner" in frames[-1]
+        assert "test_profiler.py" in frames[-1]
+
+    def test_max_depth(self):
+        """Test the innermost frames are kept when truncating."""
+        stack = collapse_stack(sys._getframe(), max_depth=1)
+
+        assert ";" not in stack
+        assert "test_max_depth" in stack
+
+    def test_collapsed_output(self):
+        """Test collapsed output is most frequent first with counts."""
+        result = ProfileResult(duration_seconds=1, interval_ms=5)
+        result.stacks.update({"a;b": 2, "a;c": 5})
+
+        assert result.collapsed() == "a;c 5\na;b 2"
+
+
+class TestProfile:
+    """Test a profiling run."""
+
+    @pytest.mark.asyncio
+    async def test_captures_blocking_step(self):
+        """Test a blocking coroutine shows up in stacks, lag and slow steps."""
+        profiler = EventLoopProfiler()
+        original_run = asyncio.events.Handle._run
+
+        task = asyncio.create_task(blocking_handler(), name="blocker")
+        result = await profiler.profile(0.3, interval_ms=5)
+        await task
+
+        assert result.samples > 0
+        assert any("blocking_handler" in stack for stack in result.stacks)
+        assert result.loop_lag_summary()["max_ms"] >= 50
+        slowest_ms, slowest_step = result.slow_steps[0]
+        assert slowest_ms >= 90
+        assert slowest_step == "blocker blocking_handler"
+        assert asyncio.events.Handle._run is original_run
+
+    @pytest.mark.asyncio
+    async def test_duration_capped(self):
+        """Test profiles are limited to max_seconds."""
+        profiler = EventLoopProfiler(max_seconds=0.05)
+
+        result = await profiler.profile(30)
+
+        assert result.duration_seconds < 1
+
+    @pytest.mark.asyncio
+    async def test_one_profile_at_a_time(self):
+        """Test a concurrent profile request is rejected."""
+        profiler = EventLoopProfiler()
+
+        first = asyncio.create_task(profiler.profile(0.1))
+        await asyncio.sleep(0)
+        with pytest.raises(ProfilerBusyError):
+            await profiler.profile(0.1)
+        await first
+
+        assert not profiler.running
+
+    @pytest.mark.asyncio
+    async def test_result_serializable(self):
+        """Test the JSON result shape."""
+        result = await EventLoopProfiler().profile(0.05)
+
+        data = result.to_dict()
+        assert set(data) == {
+            "duration_seconds",
+            "interval_ms",
+            "samples",
+            "loop_lag",
+            "slow_steps",
+            "collapsed",
+        }
+
+
+class TestAdminAccess:
+    """Test the profile endpoint is admin only."""
+
+    @pytest.mark.asyncio
+    async def test_require_admin_rejects_regular_user(self):
+        """Test regular users get 403."""
+        with pytest.raises(HTTPException) as exc_info:
+            await require_admin(User(id="u1", email="user@example.com", tier="paid"))
+
+        assert exc_info.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_require_admin_accepts_admin_role(self):
+        """Test users with the admin role pass."""
+        admin = User(id="u1", email="ops@example.com", tier="free", role="admin")
+
+        assert await require_admin(admin) is admin
+
+    def test_endpoint_requires_authentication(self):
+        """Test anonymous profile requests are rejected."""
+        app = FastAPI()
+        app.include_router(router)
+
+        response = TestClient(app).post("/api/v1/admin/profile?seconds=0.1")
+
+        assert response.status_code == 401
+
+    def test_endpoint_returns_collapsed_stacks(self):
+        """Test admins can fetch flamegraph input."""
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[require_admin] = lambda: User(
+            id="u1", email="ops@example.com", tier="free", role="admin"
+        )
+
+        response = TestClient(app).post("/api/v1/admin/profile?seconds=0.1&format=collapsed")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
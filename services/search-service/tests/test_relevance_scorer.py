@@ -8,7 +8,7 @@ Tests cover:
 - Field priority scoring (symbol, isin, wkn, name)
 - Recency scoring (user search history)
 - Weighted combination calculation
-- Batch scoring and sorting
+- Batch scoring and sorting (columnar path, top-k)
 - SearchMatch to_dict conversion
 - Edge cases and error handling
 """
@@ -496,6 +496,67 @@ class TestBatchScoring:
         # Should default similarity to 1.0
         assert all(r.similarity == 1.0 for r in results)
 
+    def test_score_batch_matches_scalar_scoring(self, scorer):
+        """Test the columnar path gives the same scores as score()."""
+        caps = [
+            None,
+            Decimal("0"),
+            Decimal("500000000"),
+            Decimal("5000000000"),
+            Decimal("50000000000"),
+            Decimal("3000000000000"),
+        ]
+        kinds = [
+            ("exact", "symbol", 1.0),
+            ("prefix", "isin", 1.0),
+            ("fuzzy", "name", 0.73),
+            ("contains", "wkn", 1.0),
+            ("token", "name", 1.0),
+            ("unknown", "other", 0.5),
+        ]
+        symbols = ["AAPL", "MSFT", "TSLA", "NEW1", "GOOGL", "AMZN"]
+        history = ["TSLA", "AAPL", "TSLA"]
+        matches = [
+            (create_stock(symbol, symbol, market_cap=cap), *kind)
+            for symbol, cap, kind in zip(symbols, caps, kinds)
+        ]
+
+        results = scorer.score_batch(matches, user_search_history=history)
+
+        expected = {
+            m[0].identifier.symbol: scorer.score(*m, user_search_history=history).score
+            for m in matches
+        }
+        assert len(results) == len(matches)
+        for result in results:
+            symbol = result.stock.identifier.symbol
+            assert result.score == pytest.approx(expected[symbol])
+
+    def test_score_batch_limit_returns_top_k(self, scorer):
+        """Test limit keeps only the best matches, sorted."""
+        stocks = [create_stock(f"SYM{i}", f"Company {i}") for i in range(20)]
+        matches = [(s, "fuzzy", "name", 0.5 + i / 40) for i, s in enumerate(stocks)]
+
+        full = scorer.score_batch(matches)
+        top = scorer.score_batch(matches, limit=5)
+
+        assert [m.stock.identifier.symbol for m in top] == [
+            m.stock.identifier.symbol for m in full[:5]
+        ]
+
+    def test_score_batch_ties_keep_input_order(self, scorer):
+        """Test equal scores keep their input order."""
+        stocks = [create_stock(f"SYM{i}", f"Company {i}") for i in range(6)]
+        matches = [(s, "exact", "symbol", 1.0) for s in stocks]
+
+        results = scorer.score_batch(matches, limit=3)
+
+        assert [m.stock.identifier.symbol for m in results] == ["SYM0", "SYM1", "SYM2"]
+
+    def test_score_batch_empty(self, scorer):
+        """Test an empty candidate list."""
+        assert scorer.score_batch([]) == []
+
     def test_score_batch_with_user_history(self, scorer):
         """Test batch scoring with user search history."""
         stocks = [
@@ -760,6 +821,40 @@ class TestRealWorldScenarios:
 # ============================================================================
 
 
+class TestRerank:
+    """Test per-user re-ranking of a cached unpersonalized ranking."""
+
+    def test_rerank_matches_full_scoring(self, scorer):
+        """Test re-ranking equals scoring with the history from scratch."""
+        stocks = [create_stock(s, f"{s} Corp") for s in ("AAPL", "MSFT", "TSLA")]
+        matches = [(s, "prefix", "symbol", 1.0) for s in stocks]
+        history = ["TSLA", "MSFT"]
+
+        reranked = scorer.rerank(scorer.score_batch(matches), history)
+        expected = scorer.score_batch(matches, user_search_history=history)
+
+        assert [m.stock.identifier.symbol for m in reranked] == [
+            m.stock.identifier.symbol for m in expected
+        ]
+        for got, want in zip(reranked, expected):
+            assert got.score == pytest.approx(want.score)
+
+    def test_rerank_does_not_modify_input(self, scorer):
+        """Test the cached ranking is left untouched."""
+        ranked = scorer.score_batch([(create_stock("AAPL", "Apple"), "exact", "symbol")])
+        original_score = ranked[0].score
+
+        scorer.rerank(ranked, ["AAPL"])
+
+        assert ranked[0].score == original_score
+
+    def test_rerank_without_history(self, scorer):
+        """Test no history returns the ranking unchanged."""
+        ranked = scorer.score_batch([(create_stock("AAPL", "Apple"), "exact", "symbol")])
+
+        assert scorer.rerank(ranked, []) == ranked
+
+
 class TestPerformance:
     """Test scorer performance."""
 
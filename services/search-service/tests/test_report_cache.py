@@ -0,0 +1,266 @@
+"""
+Tests for the tiered stock report cache.
+
+Covers:
+- Memory, Redis (compressed) and PostgreSQL tiers with promotion
+- Stale-while-revalidate and expired fallbacks
+- Background rebuilds for stale and popular reports
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from app.cache.report_cache import (ReportCache, decode_entry, encode_entry,
+                                    flatten_report)
+from app.models import StockReportCache
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+NOW = 1_700_000_000.0
+
+
+def make_report(symbol="AAPL", price=175.5):
+    """Create a flat report dict."""
+    return {
+        "symbol": symbol,
+        "name": "Apple Inc.",
+        "isin": "US0378331005",
+        "wkn": None,
+        "current_price": price,
+        "currency": "USD",
+        "exchange": "NASDAQ",
+        "market_cap": 2.8e12,
+        "sector": "Technology",
+        "industry": None,
+        "price_change_1d": {"absolute": 2.5, "percentage": 1.44, "direction": "up"},
+        "week_52_range": {"high": 199.62, "low": 164.08, "high_date": None, "low_date": None},
+        "price_history_7d": [{"timestamp": "2024-01-01", "price": 170.0, "volume": 10}],
+        "data_source": "yahoo",
+    }
+
+
+class FakeRedis:
+    """Minimal async get/set store."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def sqlite_session_factory():
+    """Create a session factory with only the report cache table."""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    StockReportCache.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def clock(seconds):
+    """Patch the report cache clock."""
+    return patch("app.cache.report_cache.time.time", return_value=NOW + seconds)
+
+
+class TestEncoding:
+    """Test report payload formats."""
+
+    def test_compressed_round_trip(self):
+        """Test Redis payloads are compressed and decode losslessly."""
+        report = make_report()
+
+        blob = encode_entry(report, NOW)
+
+        assert decode_entry(blob) == (report, NOW)
+        assert not blob.startswith(b"{")
+
+    def test_decode_text_payload(self):
+        """Test payloads returned as text by decoding clients still decode."""
+        report = make_report()
+
+        blob = encode_entry(report, NOW).decode("latin-1")
+
+        assert decode_entry(blob) == (report, NOW)
+
+    def test_flatten_report(self):
+        """Test upstream report data is flattened for caching."""
+        flat = flatten_report(
+            {
+                "basic_info": {"symbol": "aapl", "name": "Apple", "current_price": 1.0},
+                "price_change_1d": {"absolute": 1, "percentage": 1, "direction": "up"},
+            }
+        )
+
+        assert flat["symbol"] == "AAPL"
+        assert flat["currency"] == "USD"
+        assert flat["price_history_7d"] == []
+
+
+class TestTiers:
+    """Test lookups across memory, Redis and PostgreSQL."""
+
+    @pytest.mark.asyncio
+    async def test_memory_hit(self):
+        """Test a fresh report is served from memory."""
+        cache = ReportCache()
+        with clock(0):
+            await cache.set("aapl", make_report())
+        with clock(10):
+            report, stale = await cache.get("AAPL")
+
+        assert report["current_price"] == 175.5
+        assert report["cache_timestamp"].startswith("2023-11-14")
+        assert not stale
+        assert cache.stats["memory"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_promoted_to_memory(self):
+        """Test another replica's Redis entry is served and promoted."""
+        redis = FakeRedis()
+        with clock(0):
+            await ReportCache(redis_client=redis).set("AAPL", make_report())
+        cache = ReportCache(redis_client=redis)
+
+        with clock(10):
+            first, _ = await cache.get("AAPL")
+            second, _ = await cache.get("AAPL")
+
+        assert first == second
+        assert cache.stats["redis"] == 1
+        assert cache.stats["memory"] == 1
+
+    @pytest.mark.asyncio
+    async def test_postgres_hit_promoted(self):
+        """Test a PostgreSQL row is served and copied to Redis and memory."""
+        session_factory = sqlite_session_factory()
+        with clock(0):
+            await ReportCache(session_factory=session_factory).set("AAPL", make_report())
+        redis = FakeRedis()
+        cache = ReportCache(redis_client=redis, session_factory=session_factory)
+
+        with clock(10):
+            report, stale = await cache.get("AAPL")
+
+        assert {k: report[k] for k in make_report()} == make_report()
+        assert not stale
+        assert cache.stats["postgresql"] == 1
+        assert "report:AAPL" in redis.data
+
+    @pytest.mark.asyncio
+    async def test_postgres_upsert(self):
+        """Test rebuilding a report updates the existing row."""
+        session_factory = sqlite_session_factory()
+        cache = ReportCache(session_factory=session_factory)
+
+        await cache.set("AAPL", make_report(price=1.0))
+        await cache.set("AAPL", make_report(price=2.0))
+
+        db = session_factory()
+        rows = db.query(StockReportCache).all()
+        assert [row.current_price for row in rows] == [2.0]
+        db.close()
+
+    @pytest.mark.asyncio
+    async def test_fresher_lower_tier_preferred_over_stale_memory(self):
+        """Test a stale memory entry is replaced by a fresher Redis entry."""
+        redis = FakeRedis()
+        cache = ReportCache(redis_client=redis, ttl_seconds=60)
+        with clock(0):
+            await cache.set("AAPL", make_report(price=1.0))
+        with clock(100):
+            await ReportCache(redis_client=redis).set("AAPL", make_report(price=2.0))
+            report, stale = await cache.get("AAPL")
+
+        assert report["current_price"] == 2.0
+        assert not stale
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_ignored(self):
+        """Test Redis failures degrade to a miss."""
+        redis = AsyncMock()
+        redis.get.side_effect = ConnectionError("down")
+
+        assert await ReportCache(redis_client=redis).get("AAPL") == (None, False)
+
+
+class TestStaleness:
+    """Test stale-while-revalidate behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_stale_within_window(self):
+        """Test reports past the TTL are served flagged stale."""
+        cache = ReportCache(ttl_seconds=60, stale_seconds=600)
+        with clock(0):
+            await cache.set("AAPL", make_report())
+        with clock(120):
+            report, stale = await cache.get("AAPL")
+
+        assert report is not None and stale
+
+    @pytest.mark.asyncio
+    async def test_expired_only_as_fallback(self):
+        """Test reports past the stale window need allow_expired."""
+        cache = ReportCache(ttl_seconds=60, stale_seconds=60)
+        with clock(0):
+            await cache.set("AAPL", make_report())
+        with clock(1000):
+            assert await cache.get("AAPL") == (None, False)
+            report, stale = await cache.get("AAPL", allow_expired=True)
+
+        assert report is not None and stale
+
+    @pytest.mark.asyncio
+    async def test_schedule_rebuild_once_per_symbol(self):
+        """Test concurrent stale hits start a single rebuild."""
+        cache = ReportCache()
+        builder = MagicMock(return_value=make_report(price=9.0))
+
+        cache.schedule_rebuild("AAPL", builder)
+        cache.schedule_rebuild("aapl", builder)
+        await asyncio.gather(*cache._rebuild_tasks.values())
+
+        builder.assert_called_once_with("AAPL")
+        report, _ = await cache.get("AAPL")
+        assert report["current_price"] == 9.0
+        assert cache._rebuild_tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_rebuild_keeps_entry(self):
+        """Test a failing builder leaves the cached report in place."""
+        cache = ReportCache()
+        await cache.set("AAPL", make_report())
+
+        rebuilt = await cache._rebuild("AAPL", MagicMock(side_effect=RuntimeError("api")))
+
+        assert not rebuilt
+        assert (await cache.get("AAPL"))[0]["current_price"] == 175.5
+
+
+class TestPopularRebuilds:
+    """Test ahead-of-expiry rebuilds for popular symbols."""
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_only_cached_reports_near_expiry(self):
+        """Test only cached reports close to their TTL are rebuilt."""
+        cache = ReportCache(ttl_seconds=300)
+        with clock(0):
+            await cache.set("OLD", make_report("OLD"))
+        with clock(200):
+            await cache.set("NEW", make_report("NEW"))
+        builder = MagicMock(side_effect=lambda symbol: make_report(symbol))
+
+        with clock(250):
+            rebuilt = await cache.rebuild_popular(
+                ["old", "NEW", "APPLE"], builder, lead_seconds=60
+            )
+
+        assert rebuilt == 1
+        builder.assert_called_once_with("OLD")
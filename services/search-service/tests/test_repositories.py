@@ -10,7 +10,7 @@ Covers:
 """
 
 import json
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
@@ -103,6 +103,78 @@ class TestRedisRepository:
         assert result.identifier.symbol == "AAPL"
         mock_redis.get.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_find_by_identifier_flags_stale(
+        self, redis_repo, mock_redis, sample_stock
+    ):
+        """Test entries older than the soft TTL are returned as stale."""
+        serialized = redis_repo._serialize_stock(sample_stock)
+        serialized["cached_at"] = (
+            datetime.now(timezone.utc) - timedelta(seconds=400)
+        ).isoformat()
+        mock_redis.get.return_value = json.dumps(serialized).encode("utf-8")
+
+        result = await redis_repo.find_by_identifier(StockIdentifier(symbol="AAPL"))
+
+        assert result is not None
+        assert result.stale is True
+
+    @pytest.mark.asyncio
+    async def test_find_by_identifier_fresh_not_stale(
+        self, redis_repo, mock_redis, sample_stock
+    ):
+        """Test entries within the soft TTL are not flagged."""
+        serialized = redis_repo._serialize_stock(sample_stock)
+        mock_redis.get.return_value = json.dumps(serialized).encode("utf-8")
+
+        result = await redis_repo.find_by_identifier(StockIdentifier(symbol="AAPL"))
+
+        assert result.stale is False
+
+    @pytest.mark.asyncio
+    async def test_save_uses_hard_ttl(self, mock_redis, sample_stock):
+        """Test entries are stored for soft TTL plus stale window."""
+        repo = RedisStockRepository(mock_redis, ttl_seconds=300, stale_ttl_seconds=600)
+
+        await repo.save(sample_stock)
+
+        assert mock_redis.setex.call_args[0][1] == 900
+
+    @pytest.mark.asyncio
+    async def test_find_many_by_symbols_uses_mget(
+        self, redis_repo, mock_redis, sample_stock
+    ):
+        """Test batch lookup issues a single MGET."""
+        serialized = json.dumps(redis_repo._serialize_stock(sample_stock))
+        mock_redis.mget.return_value = [serialized, None]
+
+        result = await redis_repo.find_many_by_symbols(["AAPL", "MSFT"])
+
+        mock_redis.mget.assert_called_once_with(
+            ["stock:symbol:AAPL", "stock:symbol:MSFT"]
+        )
+        assert list(result) == ["AAPL"]
+        mock_redis.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_find_many_by_symbols_error_returns_empty(self, redis_repo, mock_redis):
+        """Test batch lookup errors fall through to the next layer."""
+        mock_redis.mget.side_effect = Exception("Redis connection error")
+
+        assert await redis_repo.find_many_by_symbols(["AAPL"]) == {}
+
+    @pytest.mark.asyncio
+    async def test_save_many_pipelines_writes(self, redis_repo, mock_redis, sample_stock):
+        """Test batch save uses one pipeline."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+
+        await redis_repo.save_many([sample_stock, sample_stock])
+
+        assert pipe.setex.call_count == 2
+        pipe.execute.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_find_by_identifier_cache_miss(self, redis_repo, mock_redis):
         """Test finding stock when not in cache."""
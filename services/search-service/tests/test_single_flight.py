@@ -0,0 +1,170 @@
+"""
+Tests for single-flight request coalescing.
+
+Covers:
+- Concurrent identical calls share one execution
+- Distinct keys run independently
+- Exception propagation to all waiters
+- Coalescing statistics
+- MassiveClient integration
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from app.infrastructure.massive_client import MassiveClient
+from app.infrastructure.single_flight import SingleFlight, make_request_key
+
+
+class TestRequestKey:
+    """Test coalescing key construction."""
+
+    def test_key_ignores_param_order(self):
+        """Test params in different order produce the same key."""
+        key_a = make_request_key("GET", "/v2/aggs", {"a": 1, "b": "x"})
+        key_b = make_request_key("get", "/v2/aggs", {"b": "x", "a": 1})
+
+        assert key_a == key_b
+
+    def test_key_differs_by_params(self):
+        """Test different params produce different keys."""
+        key_a = make_request_key("GET", "/v2/aggs", {"limit": 10})
+        key_b = make_request_key("GET", "/v2/aggs", {"limit": 20})
+
+        assert key_a != key_b
+
+    def test_key_without_params(self):
+        """Test key can be built without params."""
+        assert make_request_key("GET", "/v3/reference/tickers/AAPL") == (
+            "GET",
+            "/v3/reference/tickers/AAPL",
+            (),
+        )
+
+
+class TestSingleFlight:
+    """Test SingleFlight coalescing behaviour."""
+
+    @pytest.fixture
+    def group(self):
+        """Create a fresh single-flight group."""
+        return SingleFlight(name="test_group")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_coalesced(self, group):
+        """Test a thundering herd results in one execution."""
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"ticker": "AAPL"}
+
+        results = await asyncio.gather(*[group.do("AAPL", fetch) for _ in range(20)])
+
+        assert calls == 1
+        assert all(r == {"ticker": "AAPL"} for r in results)
+
+        stats = group.get_stats()
+        assert stats["leader_calls"] == 1
+        assert stats["follower_calls"] == 19
+        assert stats["coalescing_ratio"] == 0.95
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys_not_coalesced(self, group):
+        """Test different keys each execute."""
+        fetch = AsyncMock(return_value="ok")
+
+        await asyncio.gather(group.do("AAPL", fetch), group.do("MSFT", fetch))
+
+        assert fetch.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_not_cached(self, group):
+        """Test completed calls are not reused by later callers."""
+        fetch = AsyncMock(side_effect=[1, 2])
+
+        assert await group.do("AAPL", fetch) == 1
+        assert await group.do("AAPL", fetch) == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self, group):
+        """Test every coalesced caller sees the leader's exception."""
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(
+            *[group.do("AAPL", failing) for _ in range(3)], return_exceptions=True
+        )
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert group.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self, group):
+        """Test cancelling the leader's caller leaves followers unaffected."""
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        leader = asyncio.ensure_future(group.do("AAPL", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.do("AAPL", fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+
+        assert await follower == "done"
+
+    def test_stats_empty(self, group):
+        """Test statistics before any call."""
+        stats = group.get_stats()
+
+        assert stats["total_calls"] == 0
+        assert stats["coalescing_ratio"] == 0.0
+
+
+class TestMassiveClientCoalescing:
+    """Test single-flight integration in MassiveClient."""
+
+    @pytest.fixture
+    def client(self):
+        """Create client with a stubbed transport."""
+        client = MassiveClient(api_key="test-key")
+
+        async def send(method, endpoint, params):
+            await asyncio.sleep(0.01)
+            return {"ticker": {"ticker": "AAPL", "day": {"c": 175.5}}}
+
+        client._send_request = AsyncMock(side_effect=send)
+        return client
+
+    @pytest.mark.asyncio
+    async def test_snapshot_requests_coalesced(self, client):
+        """Test concurrent snapshots for one ticker hit upstream once."""
+        snapshots = await asyncio.gather(*[client.get_snapshot("AAPL") for _ in range(10)])
+
+        assert client._send_request.await_count == 1
+        assert all(s.ticker == "AAPL" for s in snapshots)
+
+    @pytest.mark.asyncio
+    async def test_uncoalesced_requests_not_shared(self, client):
+        """Test call sites without coalescing issue separate requests."""
+        await asyncio.gather(*[client._request("GET", "/v2/reference/news") for _ in range(3)])
+
+        assert client._send_request.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_caller_params_not_mutated(self, client):
+        """Test API key is not written into caller-owned params."""
+        params = {"limit": 5}
+
+        await client._request("GET", "/v2/reference/news", params=params, coalesce=True)
+
+        assert params == {"limit": 5}
@@ -0,0 +1,149 @@
+"""
+Tests for per-stage search latency instrumentation.
+
+Covers:
+- Stage histogram observations, including failed stages
+- Trace ID exemplars
+- Server-Timing header formatting and middleware
+- OpenMetrics exposition on /metrics
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from app.core import stage_timing
+from app.core.stage_timing import (ServerTimingMiddleware, format_server_timing,
+                                   record_stage, stage)
+from app.metrics import metrics_endpoint
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+
+def observed_count(stage_name: str) -> float:
+    """Number of observations recorded for a stage."""
+    value = REGISTRY.get_sample_value(
+        "search_stage_latency_seconds_count", {"stage": stage_name}
+    )
+    return value or 0.0
+
+
+class TestStage:
+    """Test the stage() context manager."""
+
+    def test_records_histogram_observation(self):
+        """Test a timed block is observed in the stage histogram."""
+        before = observed_count("name_search")
+
+        with stage("name_search"):
+            pass
+
+        assert observed_count("name_search") == before + 1
+
+    def test_records_failed_stage(self):
+        """Test a stage that raises is still timed."""
+        before = observed_count("upstream")
+
+        with pytest.raises(RuntimeError):
+            with stage("upstream"):
+                raise RuntimeError("boom")
+
+        assert observed_count("upstream") == before + 1
+
+    def test_no_request_collection_outside_middleware(self):
+        """Test timings are not accumulated without an active request."""
+        record_stage("redis", 0.001)
+
+        assert stage_timing._request_timings.get() is None
+
+
+class TestExemplar:
+    """Test trace ID exemplars."""
+
+    def test_no_exemplar_without_span(self):
+        """Test no exemplar is attached outside a valid span."""
+        assert stage_timing._trace_exemplar() is None
+
+    def test_exemplar_carries_trace_id(self):
+        """Test the current trace ID is formatted as 32 hex chars."""
+        context = MagicMock(is_valid=True, trace_id=0xABC)
+        span = MagicMock()
+        span.get_span_context.return_value = context
+
+        with patch.object(stage_timing.trace, "get_current_span", return_value=span):
+            exemplar = stage_timing._trace_exemplar()
+
+        assert exemplar == {"trace_id": "0" * 29 + "abc"}
+
+
+class TestFormatServerTiming:
+    """Test Server-Timing header formatting."""
+
+    def test_pipeline_order_and_total(self):
+        """Test stages are listed in pipeline order followed by total."""
+        header = format_server_timing(
+            {"scoring": 0.25, "redis": 1.04, "postgres_exact": 3.0}, total_ms=6.33
+        )
+
+        assert header == (
+            "redis;dur=1.0, postgres_exact;dur=3.0, scoring;dur=0.2, total;dur=6.3"
+        )
+
+
+class TestServerTimingMiddleware:
+    """Test the Server-Timing middleware."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a test app with one instrumented and one plain route."""
+        app = FastAPI()
+        app.add_middleware(ServerTimingMiddleware)
+
+        @app.get("/search")
+        async def search():
+            with stage("redis"):
+                pass
+            with stage("postgres_exact"):
+                pass
+            with stage("redis"):
+                pass
+            return {"ok": True}
+
+        @app.get("/plain")
+        async def plain():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_header_lists_recorded_stages(self, client):
+        """Test instrumented responses carry the stage timings."""
+        response = client.get("/search")
+
+        header = response.headers["Server-Timing"]
+        names = [entry.split(";")[0] for entry in header.split(", ")]
+        assert names == ["redis", "postgres_exact", "total"]
+
+    def test_no_header_without_stages(self, client):
+        """Test routes without stages are left untouched."""
+        response = client.get("/plain")
+
+        assert "Server-Timing" not in response.headers
+
+
+class TestMetricsExposition:
+    """Test /metrics content negotiation."""
+
+    @pytest.mark.asyncio
+    async def test_text_format_by_default(self):
+        """Test plain scrapes get the Prometheus text format."""
+        response = await metrics_endpoint()
+
+        assert response.media_type.startswith("text/plain")
+
+    @pytest.mark.asyncio
+    async def test_openmetrics_when_accepted(self):
+        """Test OpenMetrics scrapers get exemplar-capable output."""
+        response = await metrics_endpoint("application/openmetrics-text; version=1.0.0")
+
+        assert response.media_type.startswith("application/openmetrics-text")
+        assert response.body.rstrip().endswith(b"# EOF")
@@ -0,0 +1,179 @@
+"""
+Tests for cached stock codecs.
+
+Covers:
+- Compact codec round-trip (including zero values)
+- Compression above threshold
+- Reading legacy JSON entries with the compact codec and vice versa
+- Schema version checks
+- RedisStockRepository codec integration
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from app.domain.entities import (DataSource, Stock, StockIdentifier,
+                                 StockMetadata, StockPrice)
+from app.repositories.redis_repository import RedisStockRepository
+from app.repositories.stock_codec import (COMPRESSED_PREFIX, CompactStockCodec,
+                                          JsonStockCodec, decode_stock_payload)
+
+
+@pytest.fixture
+def sample_stock():
+    """Create a fully populated stock."""
+    return Stock(
+        identifier=StockIdentifier(isin="US0378331005", symbol="AAPL", name="Apple Inc."),
+        price=StockPrice(
+            current=Decimal("175.50"),
+            currency="USD",
+            change_absolute=Decimal("0"),
+            change_percent=Decimal("1.45"),
+            previous_close=Decimal("173.00"),
+            open_price=Decimal("174.10"),
+            day_high=Decimal("176.00"),
+            day_low=Decimal("172.90"),
+            volume=51234567,
+        ),
+        metadata=StockMetadata(
+            exchange="NASDAQ",
+            sector="Technology",
+            industry="Consumer Electronics",
+            market_cap=Decimal("2800000000000"),
+            description="Designs smartphones. " * 40,
+            employees=161000,
+        ),
+        data_source=DataSource.MASSIVE,
+        last_updated=datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc),
+    )
+
+
+class TestCompactCodec:
+    """Test compact positional encoding."""
+
+    def test_round_trip(self, sample_stock):
+        """Test all fields survive encode/decode."""
+        codec = CompactStockCodec()
+
+        decoded = codec.decode(codec.encode(sample_stock))
+
+        assert decoded.identifier == sample_stock.identifier
+        assert decoded.price.current == Decimal("175.50")
+        assert decoded.price.change_absolute == Decimal("0")
+        assert decoded.price.volume == 51234567
+        assert decoded.metadata.market_cap == Decimal("2800000000000")
+        assert decoded.metadata.description == sample_stock.metadata.description
+        assert decoded.metadata.employees == 161000
+        assert decoded.data_source == DataSource.MASSIVE
+        assert decoded.last_updated == sample_stock.last_updated
+        assert decoded.cache_age_seconds == 0
+
+    def test_smaller_than_legacy(self, sample_stock):
+        """Test compact payload is smaller than legacy JSON."""
+        sample_stock.metadata.description = None
+
+        compact = CompactStockCodec().encode(sample_stock)
+        legacy = JsonStockCodec().encode(sample_stock)
+
+        assert len(compact) < len(legacy) * 0.6
+
+    def test_compression_above_threshold(self, sample_stock):
+        """Test large payloads are compressed and still decodable."""
+        codec = CompactStockCodec(compress_threshold=256)
+
+        payload = codec.encode(sample_stock)
+
+        assert payload.startswith(COMPRESSED_PREFIX)
+        assert len(payload) < len(CompactStockCodec().encode(sample_stock))
+        assert codec.decode(payload).metadata.description == sample_stock.metadata.description
+
+    def test_no_compression_below_threshold(self, sample_stock):
+        """Test small payloads are stored uncompressed."""
+        sample_stock.metadata.description = None
+        codec = CompactStockCodec(compress_threshold=4096)
+
+        assert not codec.encode(sample_stock).startswith(COMPRESSED_PREFIX)
+
+    def test_unknown_schema_version_rejected(self, sample_stock):
+        """Test payloads from a future schema are rejected."""
+        data = json.loads(CompactStockCodec().encode(sample_stock))
+        data[0] = 99
+
+        with pytest.raises(ValueError):
+            decode_stock_payload(json.dumps(data))
+
+    def test_naive_last_updated_treated_as_utc(self, sample_stock):
+        """Test naive timestamps (e.g. from PostgreSQL) round-trip as UTC."""
+        sample_stock.last_updated = datetime(2024, 1, 15, 14, 30)
+
+        decoded = decode_stock_payload(CompactStockCodec().encode(sample_stock))
+
+        assert decoded.last_updated == datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc)
+
+
+class TestFormatMigration:
+    """Test cross-format reads."""
+
+    def test_compact_codec_reads_legacy_json(self, sample_stock):
+        """Test entries written before the migration stay readable."""
+        legacy = JsonStockCodec.to_dict(sample_stock)
+        legacy["cached_at"] = (datetime.now(timezone.utc) - timedelta(seconds=30)).isoformat()
+
+        decoded = CompactStockCodec().decode(json.dumps(legacy))
+
+        assert decoded.identifier.symbol == "AAPL"
+        assert decoded.price.current == Decimal("175.50")
+        assert decoded.cache_age_seconds >= 30
+
+    def test_legacy_codec_reads_compact(self, sample_stock):
+        """Test rolling back to JSON writes keeps compact entries readable."""
+        payload = CompactStockCodec(compress_threshold=64).encode(sample_stock)
+
+        assert JsonStockCodec().decode(payload).identifier.symbol == "AAPL"
+
+    def test_bytes_payload(self, sample_stock):
+        """Test payloads read from a binary Redis client are accepted."""
+        payload = CompactStockCodec().encode(sample_stock).encode("utf-8")
+
+        assert decode_stock_payload(payload).identifier.symbol == "AAPL"
+
+
+class TestRedisRepositoryCodec:
+    """Test codec usage in RedisStockRepository."""
+
+    @pytest.mark.asyncio
+    async def test_writes_compact_by_default(self, sample_stock):
+        """Test saves use the compact codec."""
+        redis_client = AsyncMock()
+        repo = RedisStockRepository(redis_client)
+
+        await repo.save(sample_stock)
+
+        payload = redis_client.setex.call_args[0][2]
+        assert json.loads(payload)[0] == 1
+
+    @pytest.mark.asyncio
+    async def test_custom_codec(self, sample_stock):
+        """Test a codec can be injected."""
+        redis_client = AsyncMock()
+        repo = RedisStockRepository(redis_client, codec=JsonStockCodec())
+
+        await repo.save(sample_stock)
+
+        payload = redis_client.setex.call_args[0][2]
+        assert "identifier" in json.loads(payload)
+
+    @pytest.mark.asyncio
+    async def test_reads_compact_entry(self, sample_stock):
+        """Test find_by_identifier decodes compact entries."""
+        redis_client = AsyncMock()
+        redis_client.get.return_value = CompactStockCodec().encode(sample_stock)
+        repo = RedisStockRepository(redis_client)
+
+        stock = await repo.find_by_identifier(StockIdentifier(symbol="AAPL"))
+
+        assert stock.price.current == Decimal("175.50")
+        assert stock.stale is False
@@ -9,7 +9,7 @@ Covers:
 - Search history tracking
 
 Note: Advanced features like intelligent_search() and get_search_suggestions()
-require integration tests due to complex interactions between:
+(beyond the query-result cache) require integration tests due to complex interactions between:
 - Entity validation (StockIdentifier, Stock, StockMetadata)
 - Relevance scorer with popularity metrics
 - Fuzzy matcher integration
@@ -18,14 +18,18 @@ require integration tests due to complex interactions between:
 These should be tested in end-to-end integration test suite.
 """
 
+import asyncio
+import dataclasses
 from datetime import datetime, timezone
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from app.cache.negative_cache import KnownIdentifierIndex
 from app.domain.entities import (DataSource, IdentifierType, Stock,
                                  StockIdentifier, StockMetadata, StockPrice)
-from app.domain.exceptions import StockNotFoundException, ValidationException
+from app.domain.exceptions import (ExternalServiceException,
+                                   StockNotFoundException, ValidationException)
 from app.services.stock_service import StockSearchService
 
 
@@ -312,6 +316,456 @@ class TestSearchByName:
             await search_service.search_by_name("", limit=10)
 
 
+class TestStaleWhileRevalidate:
+    """Test stale-while-revalidate across cache tiers."""
+
+    @pytest.mark.asyncio
+    async def test_stale_redis_hit_served_and_refreshed(
+        self, search_service, mock_repositories, mock_api_client, sample_stock
+    ):
+        """Test stale Redis entry is returned immediately and refreshed once."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        stale_stock = dataclasses.replace(sample_stock, stale=True)
+        redis_repo.find_by_identifier.return_value = stale_stock
+        mock_api_client.fetch_stock.return_value = sample_stock
+
+        result = await search_service.search("AAPL")
+
+        assert result is stale_stock
+        assert result.stale is True
+        postgres_repo.find_by_identifier.assert_not_called()
+
+        # Let the background refresh run
+        await asyncio.gather(*search_service._refresh_tasks.values())
+
+        mock_api_client.fetch_stock.assert_called_once()
+        postgres_repo.save.assert_called_once_with(sample_stock)
+        redis_repo.save.assert_called_once_with(sample_stock)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_stale_hits_schedule_one_refresh(
+        self, search_service, mock_repositories, mock_api_client, sample_stock
+    ):
+        """Test many stale hits for a key trigger a single refresh."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        stale_stock = dataclasses.replace(sample_stock, stale=True)
+        redis_repo.find_by_identifier.return_value = stale_stock
+
+        async def slow_fetch(identifier):
+            await asyncio.sleep(0.01)
+            return sample_stock
+
+        mock_api_client.fetch_stock.side_effect = slow_fetch
+
+        await asyncio.gather(*[search_service.search("AAPL") for _ in range(5)])
+        await asyncio.gather(*search_service._refresh_tasks.values())
+
+        assert mock_api_client.fetch_stock.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_postgres_hit_not_promoted(
+        self, search_service, mock_repositories, mock_api_client, sample_stock
+    ):
+        """Test stale PostgreSQL entries are not written to upper tiers."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        stale_stock = dataclasses.replace(sample_stock, stale=True)
+        redis_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_identifier.return_value = stale_stock
+        mock_api_client.fetch_stock.side_effect = RuntimeError("rate limited")
+
+        result = await search_service.search("AAPL")
+        await asyncio.gather(*search_service._refresh_tasks.values())
+
+        assert result is stale_stock
+        redis_repo.save.assert_not_called()
+        search_service._mock_memory_cache.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stale_memory_hit_triggers_refresh(
+        self, search_service, mock_repositories, mock_api_client, sample_stock
+    ):
+        """Test stale memory entry short-circuits lower tiers."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        stale_stock = dataclasses.replace(sample_stock, stale=True)
+        search_service._mock_memory_cache.get.return_value = stale_stock
+        mock_api_client.fetch_stock.return_value = sample_stock
+
+        result = await search_service.search("AAPL")
+        await asyncio.gather(*search_service._refresh_tasks.values())
+
+        assert result.stale is True
+        redis_repo.find_by_identifier.assert_not_called()
+        mock_api_client.fetch_stock.assert_called_once()
+
+
+class TestBatchSearch:
+    """Test batched multi-layer lookup."""
+
+    @pytest.fixture
+    def stocks(self, sample_stock):
+        """Create distinct stocks keyed by symbol."""
+        return {
+            symbol: dataclasses.replace(
+                sample_stock,
+                identifier=StockIdentifier(symbol=symbol, name=f"{symbol} Inc."),
+            )
+            for symbol in ["AAPL", "MSFT", "GOOGL", "AMZN"]
+        }
+
+    @pytest.mark.asyncio
+    async def test_one_round_trip_per_layer(
+        self, search_service, mock_repositories, mock_api_client, stocks
+    ):
+        """Test each layer is queried once for all of its misses."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        memory = search_service._mock_memory_cache
+        memory.get.side_effect = lambda key, allow_stale=False: (
+            stocks["AAPL"] if key == "AAPL" else None
+        )
+        redis_repo.find_many_by_symbols.return_value = {"MSFT": stocks["MSFT"]}
+        postgres_repo.find_many_by_symbols.return_value = {"GOOGL": stocks["GOOGL"]}
+        mock_api_client.fetch_stocks.return_value = {"AMZN": stocks["AMZN"]}
+
+        results = await search_service.batch_search(["aapl", "MSFT", "GOOGL", "AMZN"])
+
+        assert [s.identifier.symbol for s in results] == ["AAPL", "MSFT", "GOOGL", "AMZN"]
+        redis_repo.find_many_by_symbols.assert_called_once_with(["MSFT", "GOOGL", "AMZN"])
+        postgres_repo.find_many_by_symbols.assert_called_once_with(["GOOGL", "AMZN"])
+        mock_api_client.fetch_stocks.assert_called_once_with(["AMZN"])
+        mock_api_client.fetch_stock.assert_not_called()
+
+        # Postgres hit promoted to Redis, API hit saved to both tiers
+        redis_repo.save_many.assert_any_call([stocks["GOOGL"]])
+        redis_repo.save_many.assert_any_call([stocks["AMZN"]])
+        postgres_repo.save_many.assert_called_once_with([stocks["AMZN"]])
+
+    @pytest.mark.asyncio
+    async def test_all_memory_hits_skip_io(
+        self, search_service, mock_repositories, mock_api_client, stocks
+    ):
+        """Test a fully cached batch does not touch Redis or PostgreSQL."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        search_service._mock_memory_cache.get.side_effect = (
+            lambda key, allow_stale=False: stocks[key]
+        )
+
+        results = await search_service.batch_search(["AAPL", "MSFT"])
+
+        assert len(results) == 2
+        redis_repo.find_many_by_symbols.assert_not_called()
+        postgres_repo.find_many_by_symbols.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_symbols_excluded(
+        self, search_service, mock_repositories, mock_api_client
+    ):
+        """Test symbols not found anywhere are omitted."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_many_by_symbols.return_value = {}
+        postgres_repo.find_many_by_symbols.return_value = {}
+        mock_api_client.fetch_stocks.return_value = {}
+
+        results = await search_service.batch_search(["ZZZZ"])
+
+        assert results == []
+
+    @pytest.mark.asyncio
+    async def test_duplicates_looked_up_once(
+        self, search_service, mock_repositories, mock_api_client, stocks
+    ):
+        """Test duplicate symbols are fetched once but returned per request."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_many_by_symbols.return_value = {"MSFT": stocks["MSFT"]}
+
+        results = await search_service.batch_search(["MSFT", "msft"])
+
+        assert len(results) == 2
+        redis_repo.find_many_by_symbols.assert_called_once_with(["MSFT"])
+
+    @pytest.mark.asyncio
+    async def test_stale_redis_hits_not_promoted(
+        self, search_service, mock_repositories, mock_api_client, stocks
+    ):
+        """Test stale batch hits are served and revalidated."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        stale = dataclasses.replace(stocks["MSFT"], stale=True)
+        redis_repo.find_many_by_symbols.return_value = {"MSFT": stale}
+        mock_api_client.fetch_stock.return_value = stocks["MSFT"]
+
+        results = await search_service.batch_search(["MSFT"])
+        await asyncio.gather(*search_service._refresh_tasks.values())
+
+        assert results == [stale]
+        mock_api_client.fetch_stock.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_upstream_failure_returns_cached_hits(
+        self, search_service, mock_repositories, mock_api_client, stocks
+    ):
+        """Test an upstream failure keeps cached hits and is not negative-cached."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_many_by_symbols.return_value = {"AAPL": stocks["AAPL"]}
+        postgres_repo.find_many_by_symbols.return_value = {}
+        mock_api_client.fetch_stocks.side_effect = ExternalServiceException(
+            "Massive", "circuit open"
+        )
+
+        results = await search_service.batch_search(["AAPL", "ZZZZ"])
+
+        assert results == [stocks["AAPL"]]
+        assert not search_service.negative_cache.contains("ZZZZ")
+
+    @pytest.mark.asyncio
+    async def test_resolve_many_keyed_by_request(
+        self, search_service, mock_repositories, mock_api_client, stocks
+    ):
+        """Test non-symbol queries are keyed by the normalized request."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_many_by_symbols.return_value = {"MSFT": stocks["MSFT"]}
+        search_service.search = AsyncMock(return_value=stocks["AAPL"])
+
+        found = await search_service.resolve_many(["msft", " us0378331005 "])
+
+        assert found == {"MSFT": stocks["MSFT"], "US0378331005": stocks["AAPL"]}
+
+
+class TestRefreshStocks:
+    """Test batched refresh-ahead reloads."""
+
+    @pytest.mark.asyncio
+    async def test_one_upstream_call_all_keys_updated(
+        self, search_service, mock_repositories, mock_api_client, sample_stock
+    ):
+        """Test refreshed stocks are saved once and set under every alias key."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        mock_api_client.fetch_stocks.return_value = {"AAPL": sample_stock}
+
+        refreshed = await search_service.refresh_stocks(
+            {"AAPL": ["AAPL", "US0378331005"], "ZZZZ": ["ZZZZ"]}
+        )
+
+        assert refreshed == {"AAPL": sample_stock}
+        mock_api_client.fetch_stocks.assert_called_once_with(["AAPL", "ZZZZ"])
+        postgres_repo.save_many.assert_called_once_with([sample_stock])
+        redis_repo.save_many.assert_called_once_with([sample_stock])
+        keys = [c.args[0] for c in search_service._mock_memory_cache.set.call_args_list]
+        assert keys == ["AAPL", "US0378331005"]
+
+
+class TestUnknownIdentifierGuard:
+    """Test negative caching and known-identifier rejection."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_miss_skips_lookups(
+        self, search_service, mock_repositories, mock_api_client
+    ):
+        """Test a not-found symbol is answered from the negative cache next time."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_identifier.return_value = None
+        mock_api_client.fetch_stock.return_value = None
+
+        for _ in range(3):
+            with pytest.raises(StockNotFoundException):
+                await search_service.search("ZZZZ")
+
+        mock_api_client.fetch_stock.assert_called_once()
+        redis_repo.find_by_identifier.assert_called_once()
+        assert search_service.negative_cache.hits == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_isin_rejected_without_io(
+        self, search_service, mock_repositories, mock_api_client
+    ):
+        """Test an ISIN missing from the loaded filter never reaches a repository."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        index = KnownIdentifierIndex()
+        index.load(["US0378331005", "AAPL"])
+        search_service.known_identifiers = index
+
+        with pytest.raises(StockNotFoundException):
+            await search_service.search("DE000BAY0017")
+
+        redis_repo.find_by_identifier.assert_not_called()
+        postgres_repo.find_by_identifier.assert_not_called()
+        mock_api_client.fetch_stock.assert_not_called()
+        history_repo.record_search.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_saved_stock_becomes_known(self, search_service, sample_stock):
+        """Test a saved stock clears its negative entry and joins the filter."""
+        index = KnownIdentifierIndex()
+        index.load(["MSFT"])
+        search_service.known_identifiers = index
+        search_service.negative_cache.add("AAPL")
+
+        await search_service._save_to_all_tiers("AAPL", sample_stock)
+
+        assert not search_service.negative_cache.contains("AAPL")
+        assert index.might_exist(IdentifierType.ISIN, "US0378331005")
+
+    @pytest.mark.asyncio
+    async def test_batch_negative_caches_api_misses(
+        self, search_service, mock_repositories, mock_api_client
+    ):
+        """Test symbols the API did not return are skipped in the next batch."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_many_by_symbols.return_value = {}
+        postgres_repo.find_many_by_symbols.return_value = {}
+        mock_api_client.fetch_stocks.return_value = {}
+
+        await search_service.batch_search(["ZZZZ"])
+        await search_service.batch_search(["ZZZZ"])
+
+        mock_api_client.fetch_stocks.assert_called_once_with(["ZZZZ"])
+        redis_repo.find_many_by_symbols.assert_called_once()
+
+
+class TestQueryResultCache:
+    """Test the intelligent_search query-result cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_skips_database(
+        self, search_service, mock_repositories, sample_stock
+    ):
+        """Test equivalent queries are answered from the cached ranking."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_name.return_value = [sample_stock]
+
+        first = await search_service.intelligent_search("Apple", include_fuzzy=False)
+        second = await search_service.intelligent_search("  apple ", include_fuzzy=False)
+
+        assert [m.stock.identifier.symbol for m in first] == ["AAPL"]
+        assert [m.stock.identifier.symbol for m in second] == ["AAPL"]
+        postgres_repo.find_by_name.assert_called_once()
+        assert history_repo.record_search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_blank_query_rejected(self, search_service, mock_repositories):
+        """Test whitespace-only queries are rejected, not ranked and cached."""
+        _, postgres_repo, _ = mock_repositories
+
+        with pytest.raises(ValidationException):
+            await search_service.intelligent_search(" \t\n ")
+
+        postgres_repo.find_by_name.assert_not_called()
+        assert len(search_service._query_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_key_includes_limit_and_fuzzy(
+        self, search_service, mock_repositories, sample_stock
+    ):
+        """Test different limits or fuzzy flags are cached separately."""
+        redis_repo, postgres_repo, _ = mock_repositories
+        redis_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_name.return_value = [sample_stock]
+
+        await search_service.intelligent_search("apple", limit=5, include_fuzzy=False)
+        await search_service.intelligent_search("apple", limit=10, include_fuzzy=False)
+        await search_service.intelligent_search("apple", limit=10, include_fuzzy=True)
+
+        assert len(search_service._query_cache) == 3
+
+    @pytest.mark.asyncio
+    async def test_user_history_reranks_cached_list(
+        self, search_service, mock_repositories, sample_stock
+    ):
+        """Test each user's recency boost is applied on top of the shared ranking."""
+        redis_repo, postgres_repo, history_repo = mock_repositories
+        redis_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_identifier.return_value = None
+        postgres_repo.find_by_name.return_value = [
+            dataclasses.replace(
+                sample_stock, identifier=StockIdentifier(symbol=symbol, name=name)
+            )
+            for symbol, name in (("ALPA", "Alpha Corp"), ("ALPB", "Alpha Bank"))
+        ]
+        history_repo.get_user_history.side_effect = lambda user_id, limit: (
+            [{"query": "alpb"}] if user_id == "user-b" else [{"query": "alpa"}]
+        )
+
+        user_a = await search_service.intelligent_search(
+            "alpha", user_id="user-a", include_fuzzy=False
+        )
+        user_b = await search_service.intelligent_search(
+            "alpha", user_id="user-b", include_fuzzy=False
+        )
+
+        assert user_a[0].stock.identifier.symbol == "ALPA"
+        assert user_b[0].stock.identifier.symbol == "ALPB"
+        postgres_repo.find_by_name.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stats_refresh_clears_cache(self, search_service, mock_repositories):
+        """Test new popularity stats invalidate cached rankings."""
+        _, _, history_repo = mock_repositories
+        search_service._query_cache[("apple", 10, True)] = []
+        history_repo.get_search_stats.return_value = {"AAPL": 10}
+
+        await search_service._refresh_search_stats()
+
+        assert len(search_service._query_cache) == 0
+
+
+class TestPopularityRanking:
+    """Test the service reads and feeds the shared popularity ranking."""
+
+    @pytest.mark.asyncio
+    async def test_found_searches_feed_ranking(
+        self, search_service, mock_repositories, sample_stock
+    ):
+        """Test successful searches increment popularity in the background."""
+        redis_repo, _, _ = mock_repositories
+        redis_repo.find_by_identifier.return_value = sample_stock
+        search_service.popularity = MagicMock()
+
+        await search_service.search("aapl")
+
+        search_service.popularity.record_nowait.assert_called_once_with("AAPL")
+        search_service.popularity.record.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stats_read_from_ranking(self, search_service, mock_repositories):
+        """Test relevance stats come from the ranking, not a table scan."""
+        _, _, history_repo = mock_repositories
+        search_service.popularity = AsyncMock()
+        search_service.popularity.get_scores.return_value = {"AAPL": 12.5}
+
+        await search_service._refresh_search_stats()
+
+        assert search_service.relevance_scorer.search_stats == {"AAPL": 12.5}
+        history_repo.get_search_stats.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_popular_searches_from_ranking(self, search_service, mock_repositories):
+        """Test popular searches use decayed counts from the ranking."""
+        _, _, history_repo = mock_repositories
+        search_service.popularity = AsyncMock()
+        search_service.popularity.top.return_value = [("AAPL", 3.456), ("MSFT", 1.0)]
+
+        popular = await search_service.get_popular_searches(limit=2)
+
+        assert popular == [{"query": "AAPL", "count": 3.46}, {"query": "MSFT", "count": 1.0}]
+        history_repo.get_popular_searches.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_popular_searches_fall_back_to_history(
+        self, search_service, mock_repositories
+    ):
+        """Test a failing ranking falls back to search history."""
+        _, _, history_repo = mock_repositories
+        search_service.popularity = AsyncMock()
+        search_service.popularity.top.side_effect = ConnectionError("down")
+        history_repo.get_popular_searches.return_value = [{"query": "AAPL", "count": 3}]
+
+        popular = await search_service.get_popular_searches(limit=2)
+
+        assert popular == [{"query": "AAPL", "count": 3}]
+
+
 class TestBuildIdentifier:
     """Test _build_identifier helper method."""
 
@@ -0,0 +1,200 @@
+"""
+Tests for the async token-bucket rate limiter.
+
+Covers:
+- Burst capacity and refill
+- FIFO order within a priority class and priority order across classes
+- Deadline-aware fail-fast and expiry while queued
+- Cancellation and context-carried priority/deadline
+"""
+
+import asyncio
+import time
+
+import pytest
+from app.domain.exceptions import RateLimitExceededException
+from app.infrastructure.token_bucket import (AsyncTokenBucket, RequestPriority,
+                                             current_deadline, current_priority,
+                                             request_deadline, request_priority)
+
+
+@pytest.fixture
+def bucket():
+    """Create a bucket with one token refilled every 20ms."""
+    return AsyncTokenBucket(max_requests=1, window_seconds=0.02, name="test")
+
+
+async def acquire_into(bucket, order, label, priority):
+    """Acquire a token and record the grant order."""
+    await bucket.acquire(priority=priority)
+    order.append(label)
+
+
+class TestCapacity:
+    """Test token accounting."""
+
+    @pytest.mark.asyncio
+    async def test_burst_without_waiting(self):
+        """Test up to capacity tokens are granted immediately."""
+        bucket = AsyncTokenBucket(max_requests=5, window_seconds=1, name="test")
+
+        waits = [await bucket.acquire() for _ in range(5)]
+
+        assert waits == [0.0] * 5
+        assert bucket.tokens < 1
+
+    @pytest.mark.asyncio
+    async def test_waits_for_refill(self, bucket):
+        """Test an empty bucket waits roughly one refill interval."""
+        await bucket.acquire()
+
+        waited = await bucket.acquire()
+
+        assert 0.01 < waited < 0.2
+        assert bucket.granted == 2
+
+
+class TestOrdering:
+    """Test waiter queue ordering."""
+
+    @pytest.mark.asyncio
+    async def test_fifo_within_priority(self, bucket):
+        """Test waiters of one class are served in arrival order."""
+        await bucket.acquire()
+        order = []
+
+        tasks = []
+        for label in ["a", "b", "c"]:
+            tasks.append(
+                asyncio.create_task(
+                    acquire_into(bucket, order, label, RequestPriority.INTERACTIVE)
+                )
+            )
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_interactive_before_warmup(self, bucket):
+        """Test a later interactive request overtakes queued warmup requests."""
+        await bucket.acquire()
+        order = []
+
+        warmups = [
+            asyncio.create_task(acquire_into(bucket, order, f"w{i}", RequestPriority.WARMUP))
+            for i in range(2)
+        ]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(
+            acquire_into(bucket, order, "i", RequestPriority.INTERACTIVE)
+        )
+        await asyncio.sleep(0)
+
+        assert bucket.queue_depth(RequestPriority.WARMUP) == 2
+        assert bucket.queue_depth(RequestPriority.INTERACTIVE) == 1
+
+        await asyncio.gather(interactive, *warmups)
+
+        assert order == ["i", "w0", "w1"]
+        assert bucket.queue_depth() == 0
+
+
+class TestDeadlines:
+    """Test deadline-aware acquisition."""
+
+    @pytest.mark.asyncio
+    async def test_fails_fast_when_wait_exceeds_deadline(self):
+        """Test the caller is rejected up front without queuing."""
+        bucket = AsyncTokenBucket(max_requests=1, window_seconds=10, name="test")
+        await bucket.acquire()
+
+        start = time.monotonic()
+        with pytest.raises(RateLimitExceededException) as exc_info:
+            await bucket.acquire(deadline=time.monotonic() + 1)
+
+        assert time.monotonic() - start < 0.1
+        assert exc_info.value.details["retry_after"] == 10
+        assert bucket.queue_depth() == 0
+        assert bucket.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_expires_when_overtaken(self):
+        """Test a queued waiter fails once its deadline passes."""
+        bucket = AsyncTokenBucket(max_requests=1, window_seconds=0.1, name="test")
+        await bucket.acquire()
+
+        # Fits the deadline on arrival, then gets overtaken by interactive traffic
+        low = asyncio.create_task(
+            bucket.acquire(
+                priority=RequestPriority.WARMUP, deadline=time.monotonic() + 0.15
+            )
+        )
+        await asyncio.sleep(0)
+        high = [
+            asyncio.create_task(bucket.acquire(priority=RequestPriority.INTERACTIVE))
+            for _ in range(2)
+        ]
+
+        with pytest.raises(RateLimitExceededException):
+            await low
+        await asyncio.gather(*high)
+
+        assert bucket.queue_depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_from_context(self):
+        """Test acquire reads the deadline from request_deadline."""
+        bucket = AsyncTokenBucket(max_requests=1, window_seconds=10, name="test")
+        await bucket.acquire()
+
+        with request_deadline(0.5):
+            with pytest.raises(RateLimitExceededException):
+                await bucket.acquire()
+
+
+class TestCancellation:
+    """Test cancelled waiters."""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self, bucket):
+        """Test cancelling a waiter removes it and later waiters still run."""
+        await bucket.acquire()
+        first = asyncio.create_task(bucket.acquire())
+        second = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        assert bucket.queue_depth() == 1
+        await second
+        assert bucket.granted == 2
+
+
+class TestRequestContext:
+    """Test context-carried priority and deadline."""
+
+    def test_priority_scoped(self):
+        """Test request_priority applies only inside the block."""
+        with request_priority(RequestPriority.WARMUP):
+            assert current_priority() == RequestPriority.WARMUP
+
+        assert current_priority() == RequestPriority.INTERACTIVE
+
+    def test_nested_deadline_keeps_earliest(self):
+        """Test an inner, longer budget does not extend the outer deadline."""
+        with request_deadline(1.0):
+            outer = current_deadline()
+            with request_deadline(60.0):
+                assert current_deadline() == outer
+
+        assert current_deadline() is None
+
+    def test_usage_reports_queue_depth(self, bucket):
+        """Test usage stats include per-class queue depth."""
+        usage = bucket.get_current_usage()
+
+        assert usage["name"] == "test"
+        assert usage["queue_depth"] == {"interactive": 0, "prefetch": 0, "warmup": 0}
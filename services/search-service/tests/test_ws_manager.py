@@ -0,0 +1,456 @@
+"""
+Tests for the WebSocket price fan-out manager.
+
+Covers:
+- Ticker -> subscriber index maintenance
+- Serialize-once delivery through per-client queues
+- Slow client isolation, backlog skipping and disconnects
+- Per-client conflation and batched frames
+- Shared REST polling fallback
+- Fan-out to thousands of simulated clients
+"""
+
+import asyncio
+import json
+import time
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from app.routers.ws_router import MassiveWebSocketManager, PriceUpdate
+
+
+class FakeWebSocket:
+    """In-memory stand-in for a FastAPI WebSocket."""
+
+    def __init__(self, delay: float = 0.0, block: bool = False):
+        """Create socket optionally delaying or blocking every send."""
+        self.sent = []
+        self.delay = delay
+        self.block = block
+        self.closed = False
+        self._unblock = asyncio.Event()
+
+    async def accept(self):
+        """Accept the connection."""
+
+    async def send_text(self, text: str):
+        """Record a sent frame."""
+        if self.block:
+            await self._unblock.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        """Close the socket."""
+        self.closed = True
+
+    def prices(self):
+        """Sent price messages."""
+        return [m for m in self.sent if m.get("type") == "price"]
+
+
+def make_update(ticker: str = "AAPL", price: float = 185.0) -> PriceUpdate:
+    """Create a trade update."""
+    return PriceUpdate(ticker=ticker, price=price, size=100, timestamp=1, event_type="trade")
+
+
+async def drain():
+    """Let writer tasks flush their queues."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def manager():
+    """Create manager without an upstream API key, sending updates immediately."""
+    manager = MassiveWebSocketManager(conflation_interval_ms=0)
+    manager.api_key = None
+    return manager
+
+
+class TestSubscriberIndex:
+    """Test ticker -> subscriber index."""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_indexes_client(self, manager):
+        """Test subscriptions populate the index."""
+        await manager.connect_client("c1", FakeWebSocket())
+        await manager.connect_client("c2", FakeWebSocket())
+
+        await manager.subscribe("c1", ["aapl", "MSFT"])
+        await manager.subscribe("c2", ["AAPL"])
+
+        assert manager.subscribers == {"AAPL": {"c1", "c2"}, "MSFT": {"c1"}}
+        assert manager.active_subscriptions == {"AAPL", "MSFT"}
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_keeps_shared_ticker(self, manager):
+        """Test upstream subscription stays while another client needs it."""
+        await manager.connect_client("c1", FakeWebSocket())
+        await manager.connect_client("c2", FakeWebSocket())
+        await manager.subscribe("c1", ["AAPL"])
+        await manager.subscribe("c2", ["AAPL"])
+
+        await manager.unsubscribe("c1", ["AAPL"])
+
+        assert manager.subscribers == {"AAPL": {"c2"}}
+        assert "AAPL" in manager.active_subscriptions
+
+    @pytest.mark.asyncio
+    async def test_disconnect_only_drops_unused_tickers(self, manager):
+        """Test disconnect unsubscribes upstream only for tickers nobody else watches."""
+        await manager.connect_client("c1", FakeWebSocket())
+        await manager.connect_client("c2", FakeWebSocket())
+        await manager.subscribe("c1", ["AAPL", "TSLA"])
+        await manager.subscribe("c2", ["AAPL"])
+
+        await manager.disconnect_client("c1")
+
+        assert manager.subscribers == {"AAPL": {"c2"}}
+        assert manager.active_subscriptions == {"AAPL"}
+
+
+class TestBroadcast:
+    """Test price fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_only_subscribers_receive(self, manager):
+        """Test updates go to subscribers of the ticker only."""
+        ws1, ws2 = FakeWebSocket(), FakeWebSocket()
+        await manager.connect_client("c1", ws1)
+        await manager.connect_client("c2", ws2)
+        await manager.subscribe("c1", ["AAPL"])
+        await manager.subscribe("c2", ["MSFT"])
+
+        await manager.broadcast_price(make_update("AAPL"))
+        await drain()
+
+        assert [m["ticker"] for m in ws1.prices()] == ["AAPL"]
+        assert ws2.prices() == []
+
+    @pytest.mark.asyncio
+    async def test_serialized_once(self, manager, monkeypatch):
+        """Test one event is serialized once regardless of subscriber count."""
+        for i in range(10):
+            await manager.connect_client(f"c{i}", FakeWebSocket())
+            await manager.subscribe(f"c{i}", ["AAPL"])
+
+        calls = []
+        original = json.dumps
+        monkeypatch.setattr(
+            "app.routers.ws_router.json.dumps", lambda *a, **k: calls.append(1) or original(*a, **k)
+        )
+        await manager.broadcast_price(make_update())
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_broadcast_does_not_wait_for_slow_client(self, manager):
+        """Test a blocked client does not delay the broadcaster or other clients."""
+        slow, fast = FakeWebSocket(block=True), FakeWebSocket()
+        await manager.connect_client("slow", slow)
+        await manager.connect_client("fast", fast)
+        await manager.subscribe("slow", ["AAPL"])
+        await manager.subscribe("fast", ["AAPL"])
+
+        await asyncio.wait_for(manager.broadcast_price(make_update()), timeout=0.1)
+        await drain()
+
+        assert len(fast.prices()) == 1
+        assert slow.prices() == []
+
+
+class TestSlowClients:
+    """Test queue overflow handling."""
+
+    @pytest.mark.asyncio
+    async def test_overflow_skips_backlog(self):
+        """Test an overflowing client skips its backlog and gets a lagging notice."""
+        manager = MassiveWebSocketManager(
+            client_queue_size=4, max_client_overflows=3, conflation_interval_ms=0
+        )
+        ws = FakeWebSocket(block=True)
+        await manager.connect_client("c1", ws)
+        await manager.subscribe("c1", ["AAPL"])
+        await drain()
+
+        for i in range(6):
+            await manager.broadcast_price(make_update(price=100.0 + i))
+
+        client = manager.clients["c1"]
+        queued = [json.loads(client.queue.get_nowait()) for _ in range(client.queue.qsize())]
+        assert client.overflows == 1
+        assert queued[0]["status"] == "lagging"
+        assert queued[-1]["price"] == 105.0
+        assert manager.messages_dropped > 0
+
+    @pytest.mark.asyncio
+    async def test_repeated_overflow_disconnects(self):
+        """Test a client that keeps overflowing is disconnected."""
+        manager = MassiveWebSocketManager(
+            client_queue_size=2, max_client_overflows=1, conflation_interval_ms=0
+        )
+        ws = FakeWebSocket(block=True)
+        await manager.connect_client("c1", ws)
+        await manager.subscribe("c1", ["AAPL"])
+        await drain()
+
+        for i in range(20):
+            await manager.broadcast_price(make_update(price=100.0 + i))
+        await drain()
+
+        assert "c1" not in manager.clients
+        assert "AAPL" not in manager.subscribers
+        assert ws.closed
+        assert manager.slow_client_disconnects == 1
+
+    @pytest.mark.asyncio
+    async def test_send_failure_disconnects(self, manager):
+        """Test a client whose socket errors is removed."""
+        ws = FakeWebSocket()
+
+        async def broken_send(text):
+            raise RuntimeError("socket closed")
+
+        await manager.connect_client("c1", ws)
+        ws.send_text = broken_send
+        await manager.subscribe("c1", ["AAPL"])
+        await drain()
+
+        assert "c1" not in manager.clients
+
+
+class TestConflation:
+    """Test conflated, throttled delivery."""
+
+    @pytest.fixture
+    def conflating(self):
+        """Create manager with a long flush interval flushed manually."""
+        manager = MassiveWebSocketManager(conflation_interval_ms=60_000)
+        manager.api_key = None
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_only_latest_price_per_ticker(self, conflating):
+        """Test bursts of updates collapse to the latest price per ticker."""
+        ws = FakeWebSocket()
+        await conflating.connect_client("c1", ws)
+        await conflating.subscribe("c1", ["AAPL", "MSFT"])
+
+        for i in range(100):
+            await conflating.broadcast_price(make_update("AAPL", price=100.0 + i))
+        await conflating.broadcast_price(make_update("MSFT", price=400.0))
+        await drain()
+        assert ws.prices() == []
+
+        conflating._flush_pending()
+        await drain()
+
+        assert [(m["ticker"], m["price"]) for m in ws.prices()] == [
+            ("AAPL", 199.0),
+            ("MSFT", 400.0),
+        ]
+        assert conflating.updates_conflated == 99
+
+    @pytest.mark.asyncio
+    async def test_batched_frame(self, conflating):
+        """Test batch clients receive one multi-ticker frame per flush."""
+        ws = FakeWebSocket()
+        await conflating.connect_client("c1", ws, batch=True)
+        await conflating.subscribe("c1", ["AAPL", "MSFT"])
+
+        await conflating.broadcast_price(make_update("AAPL", price=185.0))
+        await conflating.broadcast_price(make_update("MSFT", price=400.0))
+        conflating._flush_pending()
+        await drain()
+
+        batches = [m for m in ws.sent if m.get("type") == "prices"]
+        assert len(batches) == 1
+        assert {u["ticker"]: u["price"] for u in batches[0]["updates"]} == {
+            "AAPL": 185.0,
+            "MSFT": 400.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_configure_switches_batch_mode(self, conflating):
+        """Test batch mode can be toggled after connecting."""
+        ws = FakeWebSocket()
+        await conflating.connect_client("c1", ws)
+        await conflating.subscribe("c1", ["AAPL"])
+
+        conflating.set_batch_mode("c1", True)
+        await conflating.broadcast_price(make_update("AAPL"))
+        conflating._flush_pending()
+        await drain()
+
+        assert [m["type"] for m in ws.sent][-1] == "prices"
+
+    @pytest.mark.asyncio
+    async def test_flush_loop_delivers(self):
+        """Test the background flusher delivers on its cadence."""
+        manager = MassiveWebSocketManager(conflation_interval_ms=10)
+        manager.api_key = None
+        ws = FakeWebSocket()
+        await manager.connect_client("c1", ws)
+        await manager.subscribe("c1", ["AAPL"])
+
+        await manager.broadcast_price(make_update("AAPL", price=190.0))
+        await asyncio.sleep(0.05)
+
+        assert [m["price"] for m in ws.prices()] == [190.0]
+        await manager.disconnect_client("c1")
+        assert manager._flush_task is None
+
+    @pytest.mark.asyncio
+    async def test_disconnected_client_not_flushed(self, conflating):
+        """Test pending updates of a disconnected client are discarded."""
+        ws = FakeWebSocket()
+        await conflating.connect_client("c1", ws)
+        await conflating.connect_client("c2", FakeWebSocket())
+        await conflating.subscribe("c1", ["AAPL"])
+        await conflating.broadcast_price(make_update("AAPL"))
+
+        await conflating.disconnect_client("c1")
+        conflating._flush_pending()
+        await drain()
+
+        assert ws.prices() == []
+
+
+def make_snapshot(price: str):
+    """Create a snapshot stand-in with a last trade price."""
+    snapshot = MagicMock()
+    snapshot.last_trade_price = Decimal(price)
+    snapshot.last_trade_size = 10
+    snapshot.last_trade_timestamp = 1704067200000
+    snapshot.updated = None
+    return snapshot
+
+
+class TestRestPolling:
+    """Test the shared polling fallback."""
+
+    @pytest.fixture
+    def snapshot_client(self):
+        """Create REST client returning fixed snapshots."""
+        client = MagicMock()
+        client.get_snapshots = AsyncMock(
+            return_value={"AAPL": make_snapshot("185.50"), "MSFT": make_snapshot("400.00")}
+        )
+        return client
+
+    @pytest.fixture
+    def polling(self, snapshot_client):
+        """Create manager polling through the stub client."""
+        manager = MassiveWebSocketManager(
+            conflation_interval_ms=0, poll_interval_seconds=60, snapshot_client=snapshot_client
+        )
+        manager.api_key = None
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_polls_union_once(self, polling, snapshot_client):
+        """Test one batched request covers every viewer's tickers."""
+        viewers = [FakeWebSocket() for _ in range(20)]
+        for i, ws in enumerate(viewers):
+            await polling.connect_client(f"c{i}", ws)
+            await polling.subscribe(f"c{i}", ["AAPL", "MSFT"])
+
+        await polling._poll_once()
+        await drain()
+
+        snapshot_client.get_snapshots.assert_awaited_once()
+        assert sorted(snapshot_client.get_snapshots.await_args.args[0]) == ["AAPL", "MSFT"]
+        assert all(len(ws.prices()) == 2 for ws in viewers)
+        assert viewers[0].prices()[0]["event"] == "snapshot"
+
+    @pytest.mark.asyncio
+    async def test_only_changes_pushed(self, polling, snapshot_client):
+        """Test unchanged prices are not re-sent."""
+        ws = FakeWebSocket()
+        await polling.connect_client("c1", ws)
+        await polling.subscribe("c1", ["AAPL", "MSFT"])
+
+        await polling._poll_once()
+        snapshot_client.get_snapshots.return_value = {
+            "AAPL": make_snapshot("186.00"),
+            "MSFT": make_snapshot("400.00"),
+        }
+        await polling._poll_once()
+        await drain()
+
+        assert [(m["ticker"], m["price"]) for m in ws.prices()] == [
+            ("AAPL", 185.5),
+            ("MSFT", 400.0),
+            ("AAPL", 186.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_not_authorized_starts_polling(self, polling):
+        """Test a not-authorized status switches clients to the shared poller."""
+        ws = FakeWebSocket()
+        await polling.connect_client("c1", ws)
+
+        await polling._process_event({"ev": "status", "status": "error", "message": "not authorized"})
+        await polling._process_event({"ev": "status", "status": "error", "message": "not authorized"})
+        await drain()
+
+        assert polling.is_polling
+        assert len([m for m in ws.sent if m.get("status") == "limited"]) == 1
+
+        await polling.disconnect_client("c1")
+        assert not polling.is_polling
+
+    @pytest.mark.asyncio
+    async def test_new_subscriber_gets_last_price(self, polling):
+        """Test a late subscriber immediately receives the last polled price."""
+        await polling.connect_client("c1", FakeWebSocket())
+        await polling.subscribe("c1", ["AAPL"])
+        polling._start_polling()
+        await polling._poll_once()
+
+        late = FakeWebSocket()
+        await polling.connect_client("c2", late)
+        await polling.subscribe("c2", ["AAPL"])
+        await drain()
+
+        assert [m["price"] for m in late.prices()] == [185.5]
+        await polling._stop_polling()
+
+
+class TestFanOutLoad:
+    """Load test with thousands of simulated clients."""
+
+    @pytest.mark.asyncio
+    async def test_thousands_of_clients(self):
+        """Test every subscriber receives every event with a few slow clients mixed in."""
+        manager = MassiveWebSocketManager(client_queue_size=1000, conflation_interval_ms=0)
+        manager.api_key = None
+        tickers = [f"T{i}" for i in range(50)]
+        sockets = {}
+
+        for i in range(3000):
+            ws = FakeWebSocket(delay=0.01 if i % 500 == 0 else 0.0)
+            sockets[f"c{i}"] = ws
+            await manager.connect_client(f"c{i}", ws)
+            await manager.subscribe(f"c{i}", [tickers[i % 50], tickers[(i + 1) % 50]])
+
+        start = time.perf_counter()
+        for round_ in range(10):
+            for ticker in tickers:
+                await manager.broadcast_price(make_update(ticker, price=100.0 + round_))
+        broadcast_seconds = time.perf_counter() - start
+
+        # Each client watches 2 of 50 tickers: 10 rounds -> 20 prices each
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            fast = [ws for cid, ws in sockets.items() if ws.delay == 0]
+            if all(len(ws.prices()) == 20 for ws in fast):
+                break
+
+        assert all(len(ws.prices()) == 20 for ws in fast)
+        assert manager.messages_dropped == 0
+        # Broadcasting only enqueues; 500 events to 3000 clients stays well under a second
+        assert broadcast_seconds < 1.0